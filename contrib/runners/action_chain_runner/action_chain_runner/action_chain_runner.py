@@ -40,6 +40,7 @@ from st2common.models.utils import action_param_utils
 from st2common.persistence.execution import ActionExecution
 from st2common.persistence.liveaction import LiveAction
 from st2common.services import action as action_service
+from st2common.services import completions as completions_service
 from st2common.services import keyvalues as kv_service
 from st2common.util import action_db as action_db_util
 from st2common.util import isotime
@@ -478,6 +479,9 @@ class ActionChainRunner(ActionRunner):
         if getattr(self.liveaction, 'context', None):
             parent_context.update(self.liveaction.context)
 
+        # End timestamp of the previously completed task (used to calculate the step latency)
+        last_end_timestamp = None
+
         # Run the action chain until there are no more tasks.
         while action_node:
             error = None
@@ -556,6 +560,14 @@ class ActionChainRunner(ActionRunner):
                     error=error
                 )
 
+                # Time it took to start this task after the previous task has completed
+                task_result['step_latency'] = None
+                if last_end_timestamp:
+                    step_latency = (created_at - last_end_timestamp).total_seconds()
+                    task_result['step_latency'] = max(step_latency, 0.0)
+
+                last_end_timestamp = getattr(liveaction, 'end_timestamp', None)
+
                 result['tasks'].append(task_result)
 
                 try:
@@ -749,12 +761,12 @@ class ActionChainRunner(ActionRunner):
             LOG.exception('Failed to schedule liveaction.')
             raise e
 
-        while (wait_for_completion and liveaction.status not in (
-                action_constants.LIVEACTION_COMPLETED_STATES +
-                [action_constants.LIVEACTION_STATUS_PAUSED,
-                 action_constants.LIVEACTION_STATUS_PENDING])):
-            eventlet.sleep(sleep_delay)
-            liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
+        if wait_for_completion:
+            statuses = (action_constants.LIVEACTION_COMPLETED_STATES +
+                        [action_constants.LIVEACTION_STATUS_PAUSED,
+                         action_constants.LIVEACTION_STATUS_PENDING])
+            liveaction = self._wait_for_status(liveaction, statuses=statuses,
+                                               sleep_delay=sleep_delay)
 
         return liveaction
 
@@ -771,12 +783,49 @@ class ActionChainRunner(ActionRunner):
             LOG.exception('Failed to schedule liveaction.')
             raise e
 
-        while (wait_for_completion and liveaction.status not in (
-                action_constants.LIVEACTION_COMPLETED_STATES +
-                [action_constants.LIVEACTION_STATUS_PAUSED])):
-            eventlet.sleep(sleep_delay)
+        if wait_for_completion:
+            statuses = (action_constants.LIVEACTION_COMPLETED_STATES +
+                        [action_constants.LIVEACTION_STATUS_PAUSED])
+            liveaction = self._wait_for_status(liveaction, statuses=statuses,
+                                               sleep_delay=sleep_delay)
+
+        return liveaction
+
+    def _wait_for_status(self, liveaction, statuses, sleep_delay=1.0):
+        """
+        Wait until the provided liveaction reaches one of the provided statuses and return the
+        latest version of it.
+
+        If the completion registry is enabled (action runner service), the waiting green thread
+        is woken up by the liveaction status event and the database is only checked every
+        "actionrunner.completion_poll_interval" seconds in case an event has been missed.
+        Otherwise, database is polled every "sleep_delay" seconds.
+
+        :param sleep_delay: Number of seconds to wait during "is completed" polls.
+        :type sleep_delay: ``float``
+        """
+        if liveaction.status in statuses:
+            return liveaction
+
+        registry = completions_service.get_completion_registry()
+
+        if registry is None:
+            while liveaction.status not in statuses:
+                eventlet.sleep(sleep_delay)
+                liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
+
+            return liveaction
+
+        poll_interval = cfg.CONF.actionrunner.completion_poll_interval
+
+        with registry.register(liveaction.id) as waiter:
+            # Status event could have been published before the waiter has been registered
             liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
 
+            while liveaction.status not in statuses:
+                waiter.wait(timeout=poll_interval)
+                liveaction = action_db_util.get_liveaction_by_id(liveaction.id)
+
         return liveaction
 
     def _build_liveaction_object(self, action_node, resolved_params, parent_context):
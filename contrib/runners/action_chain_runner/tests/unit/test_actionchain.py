@@ -31,6 +31,7 @@ from st2common.models.system.common import ResourceReference
 from st2common.persistence.keyvalue import KeyValuePair
 from st2common.persistence.runner import RunnerType
 from st2common.services import action as action_service
+from st2common.services import completions
 from st2common.util import action_db as action_db_util
 from st2common.exceptions.action import ParameterRenderingFailedException
 from st2tests import ExecutionDbTestCase
@@ -315,6 +316,38 @@ class TestActionChainRunner(ExecutionDbTestCase):
         # based on the chain the callcount is known to be 3. Not great but works.
         self.assertEqual(request.call_count, 3)
 
+    @mock.patch('eventlet.sleep')
+    @mock.patch.object(completions.CompletionWaiter, 'wait')
+    @mock.patch.object(action_db_util, 'get_liveaction_by_id', mock.MagicMock(
+        side_effect=[DummyActionExecution(status=LIVEACTION_STATUS_RUNNING),
+                     DummyActionExecution()] * 3))
+    @mock.patch.object(action_db_util, 'get_action_by_ref',
+                       mock.MagicMock(return_value=ACTION_1))
+    @mock.patch.object(action_service, 'request',
+                       return_value=(DummyActionExecution(status=LIVEACTION_STATUS_RUNNING), None))
+    def test_chain_runner_success_path_with_completion_registry(self, request, mock_wait,
+                                                                mock_sleep):
+        registry = completions.enable_completion_registry()
+        self.addCleanup(completions.disable_completion_registry)
+
+        chain_runner = acr.get_runner()
+        chain_runner.entry_point = CHAIN_1_PATH
+        chain_runner.action = ACTION_1
+        action_ref = ResourceReference.to_string_reference(name=ACTION_1.name, pack=ACTION_1.pack)
+        chain_runner.liveaction = LiveActionDB(action=action_ref)
+        chain_runner.pre_run()
+        status, result, _ = chain_runner.run({})
+
+        self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(len(result['tasks']), 3)
+        self.assertEqual(result['tasks'][0]['step_latency'], None)
+
+        # Runner waits for the status events and database is not polled in short intervals
+        self.assertEqual(mock_wait.call_args_list, [mock.call(timeout=10.0)] * 3)
+        self.assertFalse(mock_sleep.called)
+        self.assertEqual(len(registry), 0)
+
     @mock.patch.object(action_db_util, 'get_action_by_ref',
                        mock.MagicMock(return_value=ACTION_1))
     @mock.patch.object(action_service, 'request',
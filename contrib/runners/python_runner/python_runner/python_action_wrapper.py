@@ -22,6 +22,7 @@ warnings.filterwarnings('ignore', category=CryptographyDeprecationWarning)
 import os
 import sys
 import select
+import resource
 import traceback
 
 import distutils.sysconfig
@@ -59,10 +60,13 @@ from st2common.constants.action import ACTION_OUTPUT_RESULT_DELIMITER
 from st2common.constants.keyvalue import SYSTEM_SCOPE
 from st2common.constants.runners import PYTHON_RUNNER_INVALID_ACTION_STATUS_EXIT_CODE
 from st2common.constants.runners import PYTHON_RUNNER_DEFAULT_LOG_LEVEL
+from st2common.constants.runners import PYTHON_RUNNER_WORKER_RUN_END_DELIMITER
 
 __all__ = [
     'PythonActionWrapper',
-    'ActionService'
+    'ActionService',
+
+    'run_worker'
 ]
 
 LOG = logging.getLogger(__name__)
@@ -142,7 +146,7 @@ class ActionService(object):
 
 class PythonActionWrapper(object):
     def __init__(self, pack, file_path, config=None, parameters=None, user=None, parent_args=None,
-                 log_level=PYTHON_RUNNER_DEFAULT_LOG_LEVEL):
+                 log_level=PYTHON_RUNNER_DEFAULT_LOG_LEVEL, parse_config=True):
         """
         :param pack: Name of the pack this action belongs to.
         :type pack: ``str``
@@ -161,6 +165,10 @@ class PythonActionWrapper(object):
 
         :param parent_args: Command line arguments passed to the parent process.
         :type parse_args: ``list``
+
+        :param parse_config: False if the config has already been parsed by this process (worker
+                             mode).
+        :type parse_config: ``bool``
         """
 
         self._pack = pack
@@ -174,11 +182,8 @@ class PythonActionWrapper(object):
         self._class_name = None
         self._logger = logging.getLogger('PythonActionWrapper')
 
-        try:
-            st2common_config.parse_args(args=self._parent_args)
-        except Exception as e:
-            LOG.debug('Failed to parse config using parent args (parent_args=%s): %s' %
-                      (str(self._parent_args), six.text_type(e)))
+        if parse_config:
+            _parse_config(parent_args=self._parent_args)
 
         # Note: We can only set a default user value if one is not provided after parsing the
         # config
@@ -261,12 +266,130 @@ class PythonActionWrapper(object):
         return action_instance
 
 
+def run_worker(parent_args=None, max_runs=0, max_memory_growth=0):
+    """
+    Run actions in this process for the requests read from stdin (one JSON object per line) until
+    stdin is closed or the worker needs to be recycled.
+
+    Each request contains "pack", "file_path", "config", "parameters", "user", "log_level" and
+    "env" (environment variables which are only set for the duration of the run) attributes.
+    Action output and result are written to stdout and stderr the same way as in the single run
+    mode and each run is terminated by writing PYTHON_RUNNER_WORKER_RUN_END_DELIMITER to stderr
+    and PYTHON_RUNNER_WORKER_RUN_END_DELIMITER followed by a JSON object with "exit_code" and
+    "recycle" attributes to stdout.
+
+    :param max_runs: Exit after this many runs (0 means no limit).
+    :type max_runs: ``int``
+
+    :param max_memory_growth: Exit when peak memory usage of this process has grown by this many
+                              megabytes since the start (0 means no limit).
+    :type max_memory_growth: ``int``
+    """
+    parent_args = parent_args or []
+    _parse_config(parent_args=parent_args)
+
+    runs = 0
+    initial_memory_usage = _get_memory_usage()
+
+    while True:
+        line = sys.stdin.readline()
+
+        if not line:
+            break
+
+        exit_code = _run_worker_request(request=json.loads(line), parent_args=parent_args)
+        runs += 1
+
+        memory_growth = _get_memory_usage() - initial_memory_usage
+        recycle = bool((max_runs and runs >= max_runs) or
+                       (max_memory_growth and memory_growth >= max_memory_growth))
+
+        sys.stderr.write(PYTHON_RUNNER_WORKER_RUN_END_DELIMITER + '\n')
+        sys.stderr.flush()
+        sys.stdout.write(PYTHON_RUNNER_WORKER_RUN_END_DELIMITER +
+                         json.dumps({'exit_code': exit_code, 'recycle': recycle}) + '\n')
+        sys.stdout.flush()
+
+        if recycle:
+            LOG.debug('Recycling worker (runs=%s, memory_growth=%sMB)', runs, memory_growth)
+            break
+
+
+def _run_worker_request(request, parent_args):
+    """
+    Run action for the provided worker request and return exit code with which the process would
+    exit in the single run mode.
+
+    :rtype: ``int``
+    """
+    env = request.get('env', None) or {}
+    original_env = dict([(key, os.environ.get(key, None)) for key in env])
+
+    try:
+        os.environ.update(env)
+
+        obj = PythonActionWrapper(pack=request['pack'],
+                                  file_path=request['file_path'],
+                                  config=request.get('config', None),
+                                  parameters=request.get('parameters', None),
+                                  user=request.get('user', None),
+                                  parent_args=parent_args,
+                                  log_level=request.get('log_level',
+                                                        PYTHON_RUNNER_DEFAULT_LOG_LEVEL),
+                                  parse_config=False)
+        obj.run()
+        exit_code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or 0
+        else:
+            sys.stderr.write('%s\n' % (e.code))
+            exit_code = 1
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        for key, value in six.iteritems(original_env):
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    return exit_code
+
+
+def _parse_config(parent_args):
+    try:
+        st2common_config.parse_args(args=parent_args)
+    except Exception as e:
+        LOG.debug('Failed to parse config using parent args (parent_args=%s): %s' %
+                  (str(parent_args), six.text_type(e)))
+
+
+def _get_memory_usage():
+    """
+    Return peak memory usage (resident set size) of this process in megabytes.
+
+    :rtype: ``int``
+    """
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on OS X and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return max_rss // (1024 * 1024)
+
+    return max_rss // 1024
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Python action runner process wrapper')
     parser.add_argument('--pack', required=True,
                         help='Name of the pack this action belongs to')
-    parser.add_argument('--file-path', required=True,
-                        help='Path to the action module')
+    parser.add_argument('--file-path', required=False,
+                        help='Path to the action module (not used in the worker mode)')
     parser.add_argument('--config', required=False,
                         help='Pack config serialized as JSON')
     parser.add_argument('--parameters', required=False,
@@ -280,8 +403,25 @@ if __name__ == '__main__':
                              ' JSON')
     parser.add_argument('--log-level', required=False, default=PYTHON_RUNNER_DEFAULT_LOG_LEVEL,
                         help='Log level for actions')
+    parser.add_argument('--worker', required=False, action='store_true',
+                        help='Run actions for the requests read from stdin until stdin is closed')
+    parser.add_argument('--max-runs', required=False, type=int, default=0,
+                        help='Number of runs after which the worker exits')
+    parser.add_argument('--max-memory-growth', required=False, type=int, default=0,
+                        help='Memory usage growth (in MB) after which the worker exits')
     args = parser.parse_args()
 
+    if args.worker:
+        parent_args = json.loads(args.parent_args) if args.parent_args else []
+        assert isinstance(parent_args, list)
+
+        run_worker(parent_args=parent_args, max_runs=args.max_runs,
+                   max_memory_growth=args.max_memory_growth)
+        sys.exit(0)
+
+    if not args.file_path:
+        parser.error('argument --file-path is required')
+
     config = json.loads(args.config) if args.config else {}
     user = args.user
     parent_args = json.loads(args.parent_args) if args.parent_args else []
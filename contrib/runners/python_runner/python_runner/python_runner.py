@@ -55,12 +55,15 @@ from st2common.services.action import store_execution_output_data
 from st2common.runners.utils import make_read_and_store_stream_func
 
 from python_runner import python_action_wrapper
+from python_runner.worker_pool import PythonWorkerPool
 
 __all__ = [
     'PythonRunner',
 
     'get_runner',
     'get_metadata',
+    'get_worker_pool',
+    'shutdown'
 ]
 
 LOG = logging.getLogger(__name__)
@@ -80,6 +83,38 @@ BASE_DIR = os.path.dirname(os.path.abspath(python_action_wrapper.__file__))
 WRAPPER_SCRIPT_NAME = 'python_action_wrapper.py'
 WRAPPER_SCRIPT_PATH = os.path.join(BASE_DIR, WRAPPER_SCRIPT_NAME)
 
+# Process wide pool of Python runner workers (see get_worker_pool)
+WORKER_POOL = None
+
+
+def get_worker_pool():
+    """
+    Return process wide pool of Python runner workers.
+
+    :rtype: :class:`python_runner.worker_pool.PythonWorkerPool`
+    """
+    global WORKER_POOL
+
+    if WORKER_POOL is None:
+        WORKER_POOL = PythonWorkerPool(
+            size=cfg.CONF.actionrunner.python_runner_worker_pool_size,
+            max_runs=cfg.CONF.actionrunner.python_runner_worker_max_runs,
+            max_memory_growth=cfg.CONF.actionrunner.python_runner_worker_max_memory_growth)
+
+    return WORKER_POOL
+
+
+def shutdown():
+    """
+    Stop the worker processes of the process wide worker pool (if it has been created). Called by
+    the runner container when the action runner shuts down.
+    """
+    global WORKER_POOL
+
+    if WORKER_POOL is not None:
+        WORKER_POOL.shutdown()
+        WORKER_POOL = None
+
 
 class PythonRunner(GitWorktreeActionRunner):
 
@@ -224,15 +259,22 @@ class PythonRunner(GitWorktreeActionRunner):
 
         env['PYTHONPATH'] = sandbox_python_path
 
+        # Workers are shared by executions of the same pack so execution specific environment
+        # variables are only passed to the worker with the request
+        worker_env = env.copy()
+        action_env_vars = {}
+
         # Include user provided environment variables (if any)
         user_env_vars = self._get_env_vars()
-        env.update(user_env_vars)
+        action_env_vars.update(user_env_vars)
 
         # Include common st2 environment variables
         st2_env_vars = self._get_common_action_env_variables()
-        env.update(st2_env_vars)
+        action_env_vars.update(st2_env_vars)
         datastore_env_vars = self._get_datastore_access_env_vars()
-        env.update(datastore_env_vars)
+        action_env_vars.update(datastore_env_vars)
+
+        env.update(action_env_vars)
 
         stdout = StringIO()
         stderr = StringIO()
@@ -247,6 +289,30 @@ class PythonRunner(GitWorktreeActionRunner):
         read_and_store_stderr = make_read_and_store_stream_func(execution_db=self.execution,
             action_db=self.action, store_data_func=store_execution_stderr_line)
 
+        if self._use_worker_pool():
+            worker_args = [python_path, '-u', WRAPPER_SCRIPT_PATH, '--pack=%s' % (pack),
+                           '--parent-args=%s' % (parent_args)]
+            request = {
+                'pack': pack,
+                'file_path': self.entry_point,
+                'config': self._config,
+                'parameters': action_parameters or {},
+                'user': user,
+                'log_level': self._log_level,
+                'env': action_env_vars
+            }
+
+            LOG.debug('Running action in a worker: PATH=%s PYTHONPATH=%s %s' %
+                      (env['PATH'], env['PYTHONPATH'], list2cmdline(worker_args)))
+            exit_code, stdout, stderr, timed_out = get_worker_pool().run(
+                pack=pack, pack_version=self._get_pack_version(pack=pack), args=worker_args,
+                env=worker_env, request=request, timeout=self._timeout,
+                read_stdout_func=read_and_store_stdout,
+                read_stderr_func=read_and_store_stderr,
+                read_stdout_buffer=stdout,
+                read_stderr_buffer=stderr)
+            return self._get_output_values(exit_code, stdout, stderr, timed_out)
+
         command_string = list2cmdline(args)
         if stdin_params:
             command_string = 'echo %s | %s' % (quote_unix(stdin_params), command_string)
@@ -273,6 +339,38 @@ class PythonRunner(GitWorktreeActionRunner):
         LOG.debug('Returning.')
         return self._get_output_values(exit_code, stdout, stderr, timed_out)
 
+    def _use_worker_pool(self):
+        """
+        Return True if the action should run in a worker from the worker pool.
+
+        Actions which run from a git worktree (content_version runner parameter) always run in a
+        new process, because modules imported by the worker would be shared by different
+        revisions of the pack content.
+
+        :rtype: ``bool``
+        """
+        if not cfg.CONF.actionrunner.python_runner_worker_pool:
+            return False
+
+        return not self.git_worktree_path
+
+    def _get_pack_version(self, pack):
+        """
+        Return version of the pack code on disk which is used to select the workers.
+
+        Pack directory is replaced when the pack is installed or updated so the directory
+        modification time changes and actions don't run in workers which have imported modules
+        of the previous version.
+
+        :rtype: ``str``
+        """
+        pack_base_path = get_pack_base_path(pack_name=pack)
+
+        try:
+            return str(os.stat(pack_base_path).st_mtime)
+        except (OSError, TypeError):
+            return None
+
     def _get_pack_common_libs_path(self, pack_ref):
         """
         Retrieve path to the pack common lib/ directory taking git work tree path into account
@@ -0,0 +1,303 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pool of long running, pre-imported Python action wrapper processes (workers).
+
+Starting a new Python interpreter for each action execution means importing st2common, parsing
+the config and importing the pack dependencies over and over again. Workers do that once and then
+run actions for the requests which are sent to them over stdin (see
+``python_action_wrapper.run_worker``).
+
+Workers are kept per pack, pack code version, Python binary and PYTHONPATH (pack virtualenv) and a
+worker only runs one action at a time. A worker exits (and is replaced with a new pre-forked
+worker) after a configurable number of runs or when its memory usage grows too much. Idle workers
+of the previous pack code version are stopped once the pack is installed or updated so actions
+never run with the old pack modules which have been imported by those workers.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import json
+
+import six
+
+from st2common import log as logging
+from st2common.constants.runners import PYTHON_RUNNER_WORKER_RUN_END_DELIMITER
+from st2common.util import concurrency
+from st2common.util.green.shell import TIMEOUT_EXIT_CODE
+
+__all__ = [
+    'PythonWorker',
+    'PythonWorkerPool'
+]
+
+LOG = logging.getLogger(__name__)
+
+
+class WorkerRunStream(object):
+    """
+    Wrapper around worker process stdout / stderr which only returns the output of a single run
+    (it returns EOF once the run end delimiter has been read).
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.closed = False
+        self.run_result = None
+
+    def readline(self):
+        if self.closed:
+            return ''
+
+        line = self._stream.readline()
+
+        if not line:
+            self.closed = True
+            return ''
+
+        if isinstance(line, six.binary_type):
+            line = line.decode('utf-8')
+
+        if PYTHON_RUNNER_WORKER_RUN_END_DELIMITER not in line:
+            return line
+
+        # Delimiter is not necessary at the beginning of the line if the action output doesn't
+        # end with a new line
+        self.closed = True
+        line, run_result = line.split(PYTHON_RUNNER_WORKER_RUN_END_DELIMITER, 1)
+
+        if run_result.strip():
+            self.run_result = json.loads(run_result)
+
+        return line
+
+
+class PythonWorker(object):
+    """
+    Single worker process.
+    """
+
+    def __init__(self, args, env):
+        """
+        :param args: Command line arguments for the wrapper script in worker mode.
+        :type args: ``list``
+
+        :param env: Environment for the worker process.
+        :type env: ``dict``
+        """
+        subprocess = concurrency.get_subprocess_module()
+
+        self.runs = 0
+        self.process = concurrency.subprocess_popen(args=args, stdin=subprocess.PIPE,
+                                                    stdout=subprocess.PIPE,
+                                                    stderr=subprocess.PIPE, env=env,
+                                                    shell=False)
+        self.recycle = False
+
+    @property
+    def alive(self):
+        return not self.recycle and self.process.poll() is None
+
+    def run(self, request, timeout, read_stdout_func, read_stderr_func, read_stdout_buffer,
+            read_stderr_buffer):
+        """
+        Run action for the provided request in this worker and wait until it completes.
+
+        Stream read functions and buffers have the same meaning as the ones which are passed to
+        :func:`st2common.util.green.shell.run_command`.
+
+        :param request: Worker request (see ``python_action_wrapper.run_worker``).
+        :type request: ``dict``
+
+        :rtype: ``tuple`` (exit_code, stdout, stderr, timed_out)
+        """
+        self.runs += 1
+        stdout = WorkerRunStream(self.process.stdout)
+        stderr = WorkerRunStream(self.process.stderr)
+
+        read_stdout_thread = concurrency.spawn(read_stdout_func, stdout, read_stdout_buffer)
+        read_stderr_thread = concurrency.spawn(read_stderr_func, stderr, read_stderr_buffer)
+
+        timed_out = []
+
+        def on_timeout_expired(timeout):
+            concurrency.sleep(timeout)
+
+            LOG.debug('Worker run timeout reached, killing worker process %s.', self.process.pid)
+            timed_out.append(True)
+            self.recycle = True
+            self.process.kill()
+
+        timeout_thread = concurrency.spawn(on_timeout_expired, timeout)
+
+        try:
+            data = json.dumps(request) + '\n'
+            self.process.stdin.write(data.encode('utf-8'))
+            self.process.stdin.flush()
+        except (IOError, OSError) as e:
+            LOG.debug('Failed to send request to worker process %s: %s', self.process.pid,
+                      six.text_type(e))
+
+        concurrency.wait(read_stdout_thread)
+        concurrency.wait(read_stderr_thread)
+        concurrency.kill(timeout_thread)
+
+        if timed_out:
+            exit_code = TIMEOUT_EXIT_CODE
+        elif stdout.run_result is not None:
+            exit_code = stdout.run_result.get('exit_code', 0)
+            self.recycle = stdout.run_result.get('recycle', False)
+        else:
+            # Worker process has exited in the middle of the run (e.g. action called os._exit)
+            exit_code = self.process.wait()
+            self.recycle = True
+
+        return (exit_code, read_stdout_buffer.getvalue(), read_stderr_buffer.getvalue(),
+                bool(timed_out))
+
+    def shutdown(self):
+        """
+        Ask worker process to exit by closing its stdin.
+        """
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+
+        # Reap the process in the background so we don't leave zombie processes behind
+        concurrency.spawn(self.process.wait)
+
+
+class PythonWorkerPool(object):
+    """
+    Pool of idle workers per pack virtual environment.
+
+    Workers are created on demand so the number of concurrently running workers is bounded by the
+    number of concurrently running Python actions. Up to "size" idle workers are kept per pack
+    virtual environment.
+    """
+
+    def __init__(self, size=4, max_runs=100, max_memory_growth=0):
+        """
+        :param size: Maximum number of idle workers per pack virtual environment.
+        :type size: ``int``
+
+        :param max_runs: Number of runs after which a worker is recycled (0 means no limit).
+        :type max_runs: ``int``
+
+        :param max_memory_growth: Memory usage growth (in MB) after which a worker is recycled
+                                  (0 means no limit).
+        :type max_memory_growth: ``int``
+        """
+        self.size = size
+        self.max_runs = max_runs
+        self.max_memory_growth = max_memory_growth
+
+        # (pack, python path, PYTHONPATH, pack version) -> list of idle workers
+        self._idle_workers = collections.defaultdict(list)
+
+    def run(self, pack, args, env, request, timeout, read_stdout_func, read_stderr_func,
+            read_stdout_buffer, read_stderr_buffer, pack_version=None):
+        """
+        Run action for the provided request in an idle worker for this pack virtual environment
+        (a new worker is started if there are no idle workers).
+
+        :param args: Command line arguments for the wrapper script (without worker arguments).
+                     The first argument needs to be path to the Python binary.
+        :type args: ``list``
+
+        :param env: Environment for the worker process. Request environment variables are only
+                    set for the duration of the run.
+        :type env: ``dict``
+
+        :param pack_version: Version of the pack code on disk. Workers which have been started
+                             for a different version are not used.
+        :type pack_version: ``str``
+
+        :rtype: ``tuple`` (exit_code, stdout, stderr, timed_out)
+        """
+        key = (pack, args[0], env.get('PYTHONPATH', None), pack_version)
+        self._shutdown_stale_workers(key=key)
+        worker = self._acquire(key=key, args=args, env=env)
+
+        try:
+            result = worker.run(request=request, timeout=timeout,
+                                read_stdout_func=read_stdout_func,
+                                read_stderr_func=read_stderr_func,
+                                read_stdout_buffer=read_stdout_buffer,
+                                read_stderr_buffer=read_stderr_buffer)
+        except Exception:
+            worker.recycle = True
+            raise
+        finally:
+            self._release(key=key, worker=worker, args=args, env=env)
+
+        return result
+
+    def shutdown(self):
+        for workers in six.itervalues(self._idle_workers):
+            for worker in workers:
+                worker.shutdown()
+
+        self._idle_workers.clear()
+
+    def _shutdown_stale_workers(self, key):
+        """
+        Shutdown idle workers for the same pack virtual environment which have been started for a
+        different version of the pack code.
+        """
+        stale_keys = [other_key for other_key in self._idle_workers
+                      if other_key[:3] == key[:3] and other_key != key]
+
+        for stale_key in stale_keys:
+            for worker in self._idle_workers.pop(stale_key):
+                worker.shutdown()
+
+    def _acquire(self, key, args, env):
+        workers = self._idle_workers[key]
+
+        while workers:
+            worker = workers.pop()
+
+            if worker.alive:
+                return worker
+
+        return self._start_worker(args=args, env=env)
+
+    def _release(self, key, worker, args, env):
+        workers = self._idle_workers[key]
+
+        if worker.alive and len(workers) < self.size:
+            workers.append(worker)
+            return
+
+        worker.shutdown()
+
+        # Start a replacement for the recycled worker so the imports happen before the next run
+        if worker.recycle and len(workers) < self.size:
+            workers.append(self._start_worker(args=args, env=env))
+
+    def _start_worker(self, args, env):
+        args = list(args) + [
+            '--worker',
+            '--max-runs=%s' % (self.max_runs),
+            '--max-memory-growth=%s' % (self.max_memory_growth)
+        ]
+
+        worker = PythonWorker(args=args, env=env)
+        LOG.debug('Started Python runner worker process %s.', worker.process.pid)
+
+        return worker
@@ -0,0 +1,148 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark which measures how many short Python actions per second can be executed when starting
+a new Python action wrapper process for each run and when using the Python runner worker pool.
+
+Actions are executed the same way as the Python runner executes them, but without the rest of the
+action runner (database, message bus) so the benchmark only measures the process overhead.
+
+Usage:
+
+    python contrib/runners/python_runner/tests/benchmarks/benchmark_worker_pool.py \
+        [--runs 200] [--concurrency 1,4]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import eventlet
+from six.moves import StringIO
+
+from st2common.util.green.shell import run_command
+from python_runner.python_runner import WRAPPER_SCRIPT_PATH
+from python_runner.worker_pool import PythonWorkerPool
+
+__all__ = [
+    'run_benchmark'
+]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ACTION_PATH = os.path.abspath(os.path.join(BASE_DIR,
+    '../../../../../st2tests/st2tests/resources/packs/pythonactions/actions/echoer.py'))
+CONFIG_PATH = os.path.abspath(os.path.join(BASE_DIR, '../../../../../conf/st2.tests.conf'))
+
+PACK = 'pythonactions'
+PARENT_ARGS = json.dumps(['--config-file', CONFIG_PATH])
+ARGS = [sys.executable, '-u', WRAPPER_SCRIPT_PATH, '--pack=%s' % (PACK),
+        '--parent-args=%s' % (PARENT_ARGS)]
+
+
+def _read_stream(stream, buff):
+    while True:
+        line = stream.readline()
+
+        if not line:
+            break
+
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+
+        buff.write(line)
+
+
+def _run_subprocess(index):
+    args = ARGS + [
+        '--file-path=%s' % (ACTION_PATH),
+        '--user=stanley',
+        '--parameters=%s' % (json.dumps({'action_input': index}))
+    ]
+    exit_code, _, stderr, _ = run_command(cmd=args, env=os.environ.copy(), timeout=60,
+                                          read_stdout_func=_read_stream,
+                                          read_stderr_func=_read_stream,
+                                          read_stdout_buffer=StringIO(),
+                                          read_stderr_buffer=StringIO())
+    assert exit_code == 0, stderr
+
+
+def _get_run_worker_func(pool):
+    def run_worker(index):
+        request = {
+            'pack': PACK,
+            'file_path': ACTION_PATH,
+            'parameters': {'action_input': index},
+            'user': 'stanley'
+        }
+        exit_code, _, stderr, _ = pool.run(pack=PACK, args=ARGS, env=os.environ.copy(),
+                                           request=request, timeout=60,
+                                           read_stdout_func=_read_stream,
+                                           read_stderr_func=_read_stream,
+                                           read_stdout_buffer=StringIO(),
+                                           read_stderr_buffer=StringIO())
+        assert exit_code == 0, stderr
+
+    return run_worker
+
+
+def _run(run_func, runs, concurrency):
+    pool = eventlet.GreenPool(concurrency)
+
+    start_ts = time.time()
+    for _ in pool.imap(run_func, range(0, runs)):
+        pass
+    duration = (time.time() - start_ts)
+
+    return (runs / duration)
+
+
+def run_benchmark(runs, concurrencies, max_runs):
+    print('Python actions per second (%s runs):' % (runs))
+
+    for concurrency in concurrencies:
+        worker_pool = PythonWorkerPool(size=concurrency, max_runs=max_runs)
+
+        try:
+            # Warm up the worker pool so the first worker start up is not included
+            _run(_get_run_worker_func(worker_pool), runs=concurrency, concurrency=concurrency)
+
+            subprocess_rate = _run(_run_subprocess, runs=runs, concurrency=concurrency)
+            worker_rate = _run(_get_run_worker_func(worker_pool), runs=runs,
+                               concurrency=concurrency)
+        finally:
+            worker_pool.shutdown()
+
+        print('  concurrency %s: subprocess %.2f, worker pool %.2f (%.2fx)' %
+              (concurrency, subprocess_rate, worker_rate, worker_rate / subprocess_rate))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Python runner worker pool benchmark.')
+    parser.add_argument('--runs', type=int, default=200,
+                        help='Number of action runs for each mode.')
+    parser.add_argument('--concurrency', default='1,4',
+                        help='Comma separated list of the number of concurrent runs.')
+    parser.add_argument('--max-runs', type=int, default=100,
+                        help='Number of runs after which a worker is recycled.')
+    args = parser.parse_args()
+
+    run_benchmark(runs=args.runs,
+                  concurrencies=[int(value) for value in args.concurrency.split(',')],
+                  max_runs=args.max_runs)
@@ -0,0 +1,139 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import os
+import sys
+import json
+
+import unittest2
+from six.moves import StringIO
+
+from st2common.constants.action import ACTION_OUTPUT_RESULT_DELIMITER
+from python_runner.python_runner import WRAPPER_SCRIPT_PATH
+from python_runner.worker_pool import PythonWorkerPool
+
+__all__ = [
+    'PythonWorkerPoolTestCase'
+]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ACTIONS_PATH = os.path.abspath(os.path.join(BASE_DIR,
+    '../../../../../st2tests/st2tests/resources/packs/pythonactions/actions/'))
+ECHOER_ACTION_PATH = os.path.join(ACTIONS_PATH, 'echoer.py')
+PRINT_TO_STDOUT_STDERR_ACTION_PATH = os.path.join(ACTIONS_PATH, 'print_to_stdout_and_stderr.py')
+
+WORKER_ARGS = [sys.executable, '-u', WRAPPER_SCRIPT_PATH, '--pack=pythonactions']
+
+
+def read_stream(stream, buff):
+    while True:
+        line = stream.readline()
+
+        if not line:
+            break
+
+        buff.write(line)
+
+
+class PythonWorkerPoolTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(PythonWorkerPoolTestCase, self).setUp()
+        self.pool = PythonWorkerPool(size=1, max_runs=2)
+
+    def tearDown(self):
+        super(PythonWorkerPoolTestCase, self).tearDown()
+        self.pool.shutdown()
+
+    def _run(self, file_path, parameters=None, env=None, pack_version=None):
+        request = {
+            'pack': 'pythonactions',
+            'file_path': file_path,
+            'parameters': parameters or {},
+            'user': 'stanley',
+            'env': env or {}
+        }
+        return self.pool.run(pack='pythonactions', args=WORKER_ARGS, env=os.environ.copy(),
+                             request=request, timeout=30, read_stdout_func=read_stream,
+                             read_stderr_func=read_stream, read_stdout_buffer=StringIO(),
+                             read_stderr_buffer=StringIO(), pack_version=pack_version)
+
+    def _get_worker_pids(self):
+        return [worker.process.pid for workers in self.pool._idle_workers.values()
+                for worker in workers]
+
+    def test_worker_is_reused_and_recycled(self):
+        exit_code, stdout, _, timed_out = self._run(ECHOER_ACTION_PATH,
+                                                    parameters={'action_input': 'a'})
+        self.assertEqual(exit_code, 0)
+        self.assertFalse(timed_out)
+
+        result = json.loads(stdout.split(ACTION_OUTPUT_RESULT_DELIMITER)[1])
+        self.assertEqual(result['result'], {'action_input': 'a'})
+
+        pids = self._get_worker_pids()
+        self.assertEqual(len(pids), 1)
+
+        # Second run uses the same worker which is then recycled (max_runs=2) and replaced with
+        # a new worker
+        exit_code, stdout, _, _ = self._run(ECHOER_ACTION_PATH, parameters={'action_input': 'b'})
+        self.assertEqual(exit_code, 0)
+        result = json.loads(stdout.split(ACTION_OUTPUT_RESULT_DELIMITER)[1])
+        self.assertEqual(result['result'], {'action_input': 'b'})
+
+        new_pids = self._get_worker_pids()
+        self.assertEqual(len(new_pids), 1)
+        self.assertNotEqual(new_pids, pids)
+
+    def test_output_of_each_run_is_returned_separately(self):
+        for index in range(0, 2):
+            exit_code, stdout, stderr, _ = self._run(PRINT_TO_STDOUT_STDERR_ACTION_PATH,
+                                                     parameters={'stdout_count': 2,
+                                                                 'stderr_count': 1})
+            self.assertEqual(exit_code, 0)
+            self.assertTrue(stdout.startswith('stdout line 0\nstdout line 1\n'))
+            self.assertEqual(stdout.count('stdout line'), 2)
+            self.assertEqual(stderr, 'stderr line 0\n')
+
+    def test_failed_run_doesnt_terminate_worker(self):
+        self.pool.max_runs = 10
+
+        exit_code, _, stderr, _ = self._run(os.path.join(ACTIONS_PATH, 'doesnt_exist.py'))
+        self.assertEqual(exit_code, 1)
+        self.assertTrue('Failed to load action class from file' in stderr)
+
+        pids = self._get_worker_pids()
+
+        exit_code, _, _, _ = self._run(ECHOER_ACTION_PATH, parameters={'action_input': 'a'})
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self._get_worker_pids(), pids)
+
+    def test_workers_of_previous_pack_version_are_not_used(self):
+        self.pool.max_runs = 10
+
+        exit_code, _, _, _ = self._run(ECHOER_ACTION_PATH, parameters={'action_input': 'a'},
+                                       pack_version='1')
+        self.assertEqual(exit_code, 0)
+        pids = self._get_worker_pids()
+
+        # Pack has been updated, idle worker which has imported the previous version is stopped
+        exit_code, _, _, _ = self._run(ECHOER_ACTION_PATH, parameters={'action_input': 'b'},
+                                       pack_version='2')
+        self.assertEqual(exit_code, 0)
+
+        new_pids = self._get_worker_pids()
+        self.assertEqual(len(new_pids), 1)
+        self.assertNotEqual(new_pids, pids)
+        self.assertEqual([key[3] for key in self.pool._idle_workers], ['2'])
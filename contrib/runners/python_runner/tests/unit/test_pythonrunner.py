@@ -562,6 +562,63 @@ class PythonRunnerTestCase(RunnerTestCase, CleanDbTestCase):
         self.assertTrue('PYTHONPATH' in actual_env)
         self.assertTrue(pack_common_lib_path not in actual_env['PYTHONPATH'])
 
+    def test_simple_action_worker_pool(self):
+        cfg.CONF.set_override(name='python_runner_worker_pool', override=True,
+                              group='actionrunner')
+        self.addCleanup(cfg.CONF.clear_override, name='python_runner_worker_pool',
+                        group='actionrunner')
+        self.addCleanup(python_runner.get_worker_pool().shutdown)
+
+        for row_index, expected_result in [(5, [1, 5, 10, 10, 5, 1]), (2, [1, 2, 1])]:
+            runner = self._get_mock_runner_obj()
+            runner.entry_point = PASCAL_ROW_ACTION_PATH
+            runner.pre_run()
+            (status, output, _) = runner.run({'row_index': row_index})
+            self.assertEqual(status, LIVEACTION_STATUS_SUCCEEDED)
+            self.assertEqual(output['exit_code'], 0)
+            self.assertEqual(output['result'], expected_result)
+
+        workers = list(python_runner.get_worker_pool()._idle_workers.values())
+        self.assertEqual(len(workers), 1)
+        self.assertEqual(len(workers[0]), 1)
+        self.assertEqual(workers[0][0].runs, 2)
+
+    def test_runner_container_shutdown_stops_worker_pool(self):
+        container = RunnerContainer()
+        container._runner_names.add('python-script')
+        worker_pool = python_runner.get_worker_pool()
+
+        with mock.patch.object(worker_pool, 'shutdown') as mock_shutdown:
+            container.shutdown()
+
+        mock_shutdown.assert_called_once_with()
+        self.assertEqual(python_runner.WORKER_POOL, None)
+
+    @mock.patch('python_runner.python_runner.get_worker_pool')
+    def test_execution_specific_env_vars_are_passed_to_the_worker_with_request(self,
+                                                                            mock_get_worker_pool):
+        cfg.CONF.set_override(name='python_runner_worker_pool', override=True,
+                              group='actionrunner')
+        self.addCleanup(cfg.CONF.clear_override, name='python_runner_worker_pool',
+                        group='actionrunner')
+        mock_get_worker_pool.return_value.run.return_value = (0, '', '', False)
+
+        runner = self._get_mock_runner_obj()
+        runner.runner_parameters = {'env': {'key1': 'value1'}}
+        runner.auth_token = mock.Mock()
+        runner.auth_token.token = 'ponies'
+        runner.entry_point = PASCAL_ROW_ACTION_PATH
+        runner.pre_run()
+        (_, _, _) = runner.run({'row_index': 4})
+
+        _, call_kwargs = mock_get_worker_pool.return_value.run.call_args
+        request = call_kwargs['request']
+        self.assertEqual(request['parameters'], {'row_index': 4})
+        self.assertEqual(request['env']['key1'], 'value1')
+        self.assertCommonSt2EnvVarsAvailableInEnv(env=request['env'])
+        self.assertTrue('key1' not in call_kwargs['env'])
+        self.assertTrue('PYTHONPATH' in call_kwargs['env'])
+
     def test_action_class_instantiation_action_service_argument(self):
         class Action1(Action):
             # Constructor not overriden so no issue here
@@ -65,7 +65,7 @@ def _run_scheduler():
     )
 
     handler = scheduler_handler.get_handler()
-    entrypoint = scheduler_entrypoint.get_scheduler_entrypoint()
+    entrypoint = scheduler_entrypoint.get_scheduler_entrypoint(scheduling_handler=handler)
 
     # TODO: Remove this try block for _cleanup_policy_delayed in v3.2.
     # This is a temporary cleanup to remove executions in deprecated policy-delayed status.
@@ -29,6 +29,7 @@ from st2common.exceptions.param import ParamException
 from st2common.models.system.action import ResolvedActionParameters
 from st2common.persistence.execution import ActionExecution
 from st2common.services import access, executions, queries
+from st2common.services import action as action_service
 from st2common.util.action_db import (get_action_by_ref, get_runnertype_by_name)
 from st2common.util.action_db import (update_liveaction_status, get_liveaction_by_id)
 from st2common.util import param as param_utils
@@ -37,6 +38,7 @@ from st2common.metrics.base import CounterWithTimer
 from st2common.util import jsonify
 
 from st2common.runners.base import get_runner
+from st2common.runners.base import get_runner_module
 from st2common.runners.base import AsyncActionRunner, PollingAsyncActionRunner
 
 LOG = logging.getLogger(__name__)
@@ -49,6 +51,26 @@ __all__ = [
 
 class RunnerContainer(object):
 
+    def __init__(self):
+        # Names of the runners which have been used by this container
+        self._runner_names = set()
+
+    def shutdown(self):
+        """
+        Release process wide resources of the used runners (e.g. Python runner worker processes)
+        by calling the "shutdown" function of the runner modules which define it.
+        """
+        for runner_name in self._runner_names:
+            try:
+                shutdown_func = getattr(get_runner_module(name=runner_name), 'shutdown', None)
+
+                if shutdown_func:
+                    shutdown_func()
+            except:
+                LOG.exception('Failed to shutdown runner %s.', runner_name)
+
+        self._runner_names.clear()
+
     def dispatch(self, liveaction_db):
         action_db = get_action_by_ref(liveaction_db.action)
         if not action_db:
@@ -145,6 +167,10 @@ class RunnerContainer(object):
             extra = {'result': result, 'status': status}
             LOG.debug('Action "%s" completed.' % (runner.action.name), extra=extra)
 
+            # Store buffered output before the completion is published so the output consumers
+            # receive all the output before the completion event
+            action_service.flush_execution_output_data(execution_id=runner.execution_id)
+
             # Update the final status of liveaction and corresponding action execution.
             runner.liveaction = self._update_status(runner.liveaction.id, status, result, context)
 
@@ -166,6 +192,10 @@ class RunnerContainer(object):
             LOG.debug('Performing cancel for runner: %s', (runner.runner_id), extra=extra)
             (status, result, context) = runner.cancel()
 
+            # Store buffered output before the cancellation is published so the output consumers
+            # receive all the output before the completion event
+            action_service.flush_execution_output_data(execution_id=runner.execution_id)
+
             # Update the final status of liveaction and corresponding action execution.
             # The status is updated here because we want to keep the workflow running
             # as is if the cancel operation failed.
@@ -199,6 +229,9 @@ class RunnerContainer(object):
             context = runner.liveaction.context
             LOG.exception('Failed to pause action %s.' % (runner.liveaction.id), extra=result)
         finally:
+            # Store buffered output before the status change is published
+            action_service.flush_execution_output_data(execution_id=runner.execution_id)
+
             # Update the final status of liveaction and corresponding action execution.
             runner.liveaction = self._update_status(runner.liveaction.id, status, result, context)
 
@@ -226,6 +259,9 @@ class RunnerContainer(object):
             context = runner.liveaction.context
             LOG.exception('Failed to resume action %s.' % (runner.liveaction.id), extra=result)
         finally:
+            # Store buffered output before the status change is published
+            action_service.flush_execution_output_data(execution_id=runner.execution_id)
+
             # Update the final status of liveaction and corresponding action execution.
             runner.liveaction = self._update_status(runner.liveaction.id, status, result, context)
 
@@ -344,6 +380,7 @@ class RunnerContainer(object):
         runner = get_runner(
             name=runner_type_db.name,
             config=config)
+        self._runner_names.add(runner_type_db.name)
 
         # TODO: Pass those arguments to the constructor instead of late
         # assignment, late assignment is awful
@@ -52,5 +52,23 @@ def _register_notifier_opts():
 
     CONF.register_opts(notifier_opts, group='notifier')
 
+    consumer_opts = [
+        cfg.IntOpt(
+            'prefetch_count', default=1,
+            help='Maximum number of unacknowledged messages the notifier consumer can receive. '
+                 'Values larger than 1 enable batched acknowledgements and stop receiving new '
+                 'messages while there are no free dispatcher threads.'),
+        cfg.IntOpt(
+            'ack_batch_size', default=1,
+            help='Maximum number of messages which are acknowledged using a single ack (capped '
+                 'at prefetch_count).'),
+        cfg.FloatOpt(
+            'ack_batch_interval', default=0.5,
+            help='How long (in seconds) to wait before acknowledging a partially filled batch '
+                 'of messages.')
+    ]
+
+    CONF.register_opts(consumer_opts, group='notifier')
+
 
 register_opts()
@@ -74,6 +74,14 @@ class Notifier(consumers.MessageHandler):
             pack=ACTION_TRIGGER_TYPE['pack'],
             name=ACTION_TRIGGER_TYPE['name'])
 
+    def get_queue_consumer(self, connection, queues):
+        return consumers.QueueConsumer(
+            connection=connection, queues=queues, handler=self,
+            prefetch_count=cfg.CONF.notifier.prefetch_count,
+            ack_batch_size=cfg.CONF.notifier.ack_batch_size,
+            ack_batch_interval=cfg.CONF.notifier.ack_batch_interval,
+            name='notifier')
+
     @CounterWithTimer(key='notifier.action.executions')
     def process(self, execution_db):
         execution_id = str(execution_db.id)
@@ -16,9 +16,9 @@ from __future__ import absolute_import
 
 from st2common.constants import action as action_constants
 from st2common import log as logging
-from st2common.persistence import action as action_access
 from st2common.policies.concurrency import BaseConcurrencyApplicator
 from st2common.services import action as action_service
+from st2common.services import execution_counters
 
 
 __all__ = [
@@ -40,15 +40,8 @@ class ConcurrencyApplicator(BaseConcurrencyApplicator):
         return self._get_lock_name(values=values)
 
     def _apply_before(self, target):
-        # Get the count of scheduled instances of the action.
-        scheduled = action_access.LiveAction.count(
-            action=target.action, status=action_constants.LIVEACTION_STATUS_SCHEDULED)
-
-        # Get the count of running instances of the action.
-        running = action_access.LiveAction.count(
-            action=target.action, status=action_constants.LIVEACTION_STATUS_RUNNING)
-
-        count = scheduled + running
+        # Get the count of scheduled and running instances of the action.
+        count = execution_counters.count_inflight(action_ref=target.action)
 
         # Mark the execution as scheduled if threshold is not reached or delayed otherwise.
         if count < self.threshold:
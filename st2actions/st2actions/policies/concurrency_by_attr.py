@@ -19,8 +19,8 @@ import six
 
 from st2common.constants import action as action_constants
 from st2common import log as logging
-from st2common.persistence import action as action_access
 from st2common.services import action as action_service
+from st2common.services import execution_counters
 from st2common.policies.concurrency import BaseConcurrencyApplicator
 from st2common.services import coordination
 
@@ -49,29 +49,15 @@ class ConcurrencyByAttributeApplicator(BaseConcurrencyApplicator):
 
         return json.dumps(meta)
 
-    def _get_filters(self, target):
-        filters = {('parameters__%s' % k): v
-                   for k, v in six.iteritems(target.parameters)
-                   if k in self.attributes}
-
-        filters['action'] = target.action
-        filters['status'] = None
-
-        return filters
+    def _get_attribute_values(self, target):
+        return {k: v for k, v in six.iteritems(target.parameters) if k in self.attributes}
 
     def _apply_before(self, target):
-        # Get the count of scheduled and running instances of the action.
-        filters = self._get_filters(target)
-
-        # Get the count of scheduled instances of the action.
-        filters['status'] = action_constants.LIVEACTION_STATUS_SCHEDULED
-        scheduled = action_access.LiveAction.count(**filters)
-
-        # Get the count of running instances of the action.
-        filters['status'] = action_constants.LIVEACTION_STATUS_RUNNING
-        running = action_access.LiveAction.count(**filters)
-
-        count = scheduled + running
+        # Get the count of scheduled and running instances of the action with the same values of
+        # the policy attributes.
+        count = execution_counters.count_inflight(
+            action_ref=target.action,
+            parameters=self._get_attribute_values(target))
 
         # Mark the execution as scheduled if threshold is not reached or delayed otherwise.
         if count < self.threshold:
@@ -66,7 +66,34 @@ def _register_service_opts():
             help='The maximum number of attempts that the scheduler retries on error.'),
         cfg.IntOpt(
             'retry_wait_msec', default=3000,
-            help='The number of milliseconds to wait in between retries.')
+            help='The number of milliseconds to wait in between retries.'),
+        cfg.BoolOpt(
+            'enable_queue_notifications', default=True,
+            help='True to wake up the scheduler as soon as this scheduler process adds an item to '
+                 'the scheduling queue (or a delayed item becomes ready) instead of polling the '
+                 'queue every sleep_interval. Queue is still polled every fallback_poll_interval '
+                 'to pick up items added by other scheduler processes.'),
+        cfg.FloatOpt(
+            'fallback_poll_interval', default=1.0,
+            help='How often (in seconds) to poll the scheduling queue when queue notifications '
+                 'are enabled.'),
+        cfg.IntOpt(
+            'claim_batch_size', default=1,
+            help='Maximum number of scheduling queue items which are claimed at once (capped at '
+                 'the number of free threads in the pool). Values larger than 1 enable batch '
+                 'claim mode in which the scheduler doesn\'t sleep between claims while the '
+                 'queue is not drained.'),
+        cfg.BoolOpt(
+            'enable_execution_counters', default=False,
+            help='True to use in-memory counters of scheduled and running executions (kept up to '
+                 'date using liveaction status events and reconciled with the database every '
+                 'gc_interval) in concurrency policies instead of querying the database for each '
+                 'execution. Only safe to enable when a single scheduler process is running, '
+                 'otherwise concurrency policy thresholds can be exceeded.'),
+        cfg.BoolOpt(
+            'enable_resource_cache', default=True,
+            help='True to cache actions and policies in memory (cache is invalidated using '
+                 'resource CUD events).')
     ]
 
     cfg.CONF.register_opts(scheduler_opts, group='scheduler')
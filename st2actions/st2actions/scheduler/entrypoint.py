@@ -44,6 +44,15 @@ class SchedulerEntrypoint(consumers.MessageHandler):
     """
     message_type = LiveActionDB
 
+    def __init__(self, connection, queues, scheduling_handler=None):
+        """
+        :param scheduling_handler: Scheduling queue handler running in this process which is
+                                   notified when a new item is added to the scheduling queue.
+        :type scheduling_handler: :class:`ActionExecutionSchedulingQueueHandler`
+        """
+        super(SchedulerEntrypoint, self).__init__(connection, queues)
+        self._scheduling_handler = scheduling_handler
+
     def process(self, request):
         """
         Adds execution into execution_scheduling database for scheduling
@@ -86,6 +95,9 @@ class SchedulerEntrypoint(consumers.MessageHandler):
 
         ActionExecutionSchedulingQueue.add_or_update(execution_queue_item_db, publish=False)
 
+        if self._scheduling_handler:
+            self._scheduling_handler.notify(delay=liveaction_db.delay)
+
         return execution_queue_item_db
 
     def _create_execution_queue_item_db_from_liveaction(self, liveaction, delay=None):
@@ -107,6 +119,7 @@ class SchedulerEntrypoint(consumers.MessageHandler):
         return execution_queue_item_db
 
 
-def get_scheduler_entrypoint():
+def get_scheduler_entrypoint(scheduling_handler=None):
     with transport_utils.get_connection() as conn:
-        return SchedulerEntrypoint(conn, [ACTIONSCHEDULER_REQUEST_QUEUE])
+        return SchedulerEntrypoint(conn, [ACTIONSCHEDULER_REQUEST_QUEUE],
+                                   scheduling_handler=scheduling_handler)
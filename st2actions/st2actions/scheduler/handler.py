@@ -14,6 +14,8 @@
 
 from __future__ import absolute_import
 
+import uuid
+
 import eventlet
 import retrying
 from oslo_config import cfg
@@ -27,8 +29,10 @@ from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.services import action as action_service
 from st2common.services import coordination as coordination_service
+from st2common.services import execution_counters
 from st2common.services import executions as execution_service
 from st2common.services import policies as policy_service
+from st2common.persistence import cache as resource_cache
 from st2common.persistence.execution import ActionExecution
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.execution_queue import ActionExecutionSchedulingQueue
@@ -65,24 +69,94 @@ class ActionExecutionSchedulingQueueHandler(object):
         self._coordinator = coordination_service.get_coordinator(start_heart=True)
         self._main_thread = None
         self._cleanup_thread = None
+        self._resource_cache_watcher = None
+        self._execution_counters_watcher = None
+        self._work_ready = eventlet.event.Event()
 
     def run(self):
         LOG.debug('Starting scheduler handler...')
 
         while not self._shutdown:
+            self._wait_for_work()
+
+            # Keep claiming items without sleeping as long as the queue is not drained
+            while self.process() and not self._shutdown:
+                eventlet.greenthread.sleep(0)
+
+    def notify(self, delay=None):
+        """
+        Notify the scheduler that an item in the scheduling queue is (or will be after the
+        provided delay) ready to be scheduled so the main loop wakes up right away instead of
+        waiting for the next poll.
+
+        :param delay: Number of milliseconds after which the item is ready to be scheduled.
+        :type delay: ``int``
+        """
+        if not cfg.CONF.scheduler.enable_queue_notifications:
+            return
+
+        if delay and delay > 0:
+            eventlet.spawn_after(delay / 1000.0, self.notify)
+            return
+
+        if not self._work_ready.ready():
+            self._work_ready.send(True)
+
+    def _wait_for_work(self):
+        if not cfg.CONF.scheduler.enable_queue_notifications:
             eventlet.greenthread.sleep(cfg.CONF.scheduler.sleep_interval)
-            self.process()
+            return
+
+        # Items queued by other scheduler processes and items released by the garbage collection
+        # of other schedulers are only picked up by the fallback poll
+        notified = False
+
+        with eventlet.Timeout(cfg.CONF.scheduler.fallback_poll_interval, False):
+            notified = self._work_ready.wait()
+
+        metrics.get_driver().inc_counter('scheduler.wakeup.%s' %
+                                         ('notification' if notified else 'poll'))
+
+        # NOTE: Event is reset before the queue is processed so notifications which are received
+        # while processing are not lost
+        self._work_ready = eventlet.event.Event()
 
     @retrying.retry(
         retry_on_exception=service_utils.retry_on_exceptions,
         stop_max_attempt_number=cfg.CONF.scheduler.retry_max_attempt,
         wait_fixed=cfg.CONF.scheduler.retry_wait_msec)
     def process(self):
-        execution_queue_item_db = self._get_next_execution()
+        """
+        Claim next item(s) from the scheduling queue and dispatch them to the pool.
+
+        :return: True if an item (a full batch in batch mode) has been claimed and there are likely
+                 more items in the queue which are ready to be scheduled.
+        :rtype: ``bool``
+        """
+        batch_size = cfg.CONF.scheduler.claim_batch_size
+
+        if batch_size <= 1:
+            execution_queue_item_db = self._get_next_execution()
+
+            if execution_queue_item_db:
+                self._pool.spawn(self._handle_execution, execution_queue_item_db)
+
+            return execution_queue_item_db is not None
+
+        # Only claim as many items as we can start processing right away so claimed items don't
+        # wait in this process while other schedulers are idle
+        limit = min(batch_size, self._pool.free())
+
+        if limit <= 0:
+            return False
 
-        if execution_queue_item_db:
+        execution_queue_item_dbs = self._get_next_executions(limit=limit)
+
+        for execution_queue_item_db in execution_queue_item_dbs:
             self._pool.spawn(self._handle_execution, execution_queue_item_db)
 
+        return len(execution_queue_item_dbs) >= limit
+
     def cleanup(self):
         LOG.debug('Starting scheduler garbage collection...')
 
@@ -117,6 +191,7 @@ class ActionExecutionSchedulingQueueHandler(object):
                     execution_queue_item_db.action_execution_id,
                     str(execution_queue_item_db.id)
                 )
+                self.notify()
             except db_exc.StackStormDBObjectWriteConflictError:
                 LOG.info(
                     '[%s] Execution queue item "%s" updated during garbage collection.',
@@ -199,6 +274,17 @@ class ActionExecutionSchedulingQueueHandler(object):
         wait_fixed=cfg.CONF.scheduler.retry_wait_msec)
     def _handle_garbage_collection(self):
         self._reset_handling_flag()
+        self._reconcile_execution_counters()
+
+    def _reconcile_execution_counters(self):
+        """
+        Periodically reconcile in-memory in-flight execution counters (if enabled) with the
+        database to correct drift caused by missed or out of order liveaction status events.
+        """
+        counters = execution_counters.get_counters()
+
+        if counters:
+            counters.reconcile()
 
     # NOTE: This method call is intentionally not instrumented since it causes too much overhead
     # and noise under DEBUG log level
@@ -209,39 +295,104 @@ class ActionExecutionSchedulingQueueHandler(object):
 
         NOTE: FIFO order is not guaranteed anymore for executions which are re-scheduled and delayed
         due to a policy.
+
+        NOTE: If the item is claimed by another scheduler in the mean time, the next item is
+        retrieved so None is only returned once there are no items which are ready to be
+        scheduled.
+        """
+        while True:
+            query = {
+                'scheduled_start_timestamp__lte': date.get_datetime_utc_now(),
+                'handling': False,
+                'limit': 1,
+                'order_by': [
+                    '+scheduled_start_timestamp',
+                    '+original_start_timestamp'
+                ]
+            }
+
+            execution_queue_item_db = ActionExecutionSchedulingQueue.query(**query).first()
+
+            if not execution_queue_item_db:
+                return None
+
+            # Mark that this scheduler process is currently handling (processing) that request
+            # NOTE: This operation is atomic (CAS)
+            msg = '[%s] Retrieved item "%s" from scheduling queue.'
+            LOG.info(msg, execution_queue_item_db.action_execution_id, execution_queue_item_db.id)
+            execution_queue_item_db.handling = True
+
+            try:
+                ActionExecutionSchedulingQueue.add_or_update(execution_queue_item_db,
+                                                             publish=False)
+                return execution_queue_item_db
+            except db_exc.StackStormDBObjectWriteConflictError:
+                LOG.info(
+                    '[%s] Item "%s" is already handled by another scheduler.',
+                    execution_queue_item_db.action_execution_id,
+                    str(execution_queue_item_db.id)
+                )
+
+    def _get_next_executions(self, limit):
+        """
+        Claim up to "limit" items which are ready to be scheduled from the queue (in the same
+        order as _get_next_execution) and mark them as handled by this scheduler.
+
+        Items are marked as handled using a single conditional multi update which only matches
+        items which haven't been claimed by another scheduler in the mean time. Each claim uses
+        a unique claim id which is used to tell which items were claimed by this scheduler.
+
+        :rtype: ``list`` of :class:`ActionExecutionSchedulingQueueItemDB`
         """
         query = {
             'scheduled_start_timestamp__lte': date.get_datetime_utc_now(),
             'handling': False,
-            'limit': 1,
+            'limit': limit,
             'order_by': [
                 '+scheduled_start_timestamp',
                 '+original_start_timestamp'
             ]
         }
 
-        execution_queue_item_db = ActionExecutionSchedulingQueue.query(**query).first()
+        execution_queue_item_dbs = list(ActionExecutionSchedulingQueue.query(**query))
 
-        if not execution_queue_item_db:
-            return None
+        if not execution_queue_item_dbs:
+            return []
 
-        # Mark that this scheduler process is currently handling (processing) that request
-        # NOTE: This operation is atomic (CAS)
-        msg = '[%s] Retrieved item "%s" from scheduling queue.'
-        LOG.info(msg, execution_queue_item_db.action_execution_id, execution_queue_item_db.id)
-        execution_queue_item_db.handling = True
+        item_ids = [execution_queue_item_db.id for execution_queue_item_db in
+                    execution_queue_item_dbs]
+        claim_id = uuid.uuid4().hex
 
-        try:
-            ActionExecutionSchedulingQueue.add_or_update(execution_queue_item_db, publish=False)
-            return execution_queue_item_db
-        except db_exc.StackStormDBObjectWriteConflictError:
-            LOG.info(
-                '[%s] Item "%s" is already handled by another scheduler.',
-                execution_queue_item_db.action_execution_id,
-                str(execution_queue_item_db.id)
-            )
+        # Mark that this scheduler process is currently handling (processing) those requests
+        # NOTE: Revision is incremented so concurrent CAS updates of the same items fail
+        claimed_count = ActionExecutionSchedulingQueue.update_by_query(
+            {'id__in': item_ids, 'handling': False},
+            set__handling=True,
+            set__claim_id=claim_id,
+            inc__rev=1)
+
+        metrics.get_driver().inc_counter('scheduler.claimed', claimed_count)
 
-        return None
+        if claimed_count == len(execution_queue_item_dbs):
+            for execution_queue_item_db in execution_queue_item_dbs:
+                execution_queue_item_db.handling = True
+                execution_queue_item_db.claim_id = claim_id
+                execution_queue_item_db.rev += 1
+        else:
+            LOG.info('%s out of %s retrieved items are already handled by another scheduler.',
+                     len(execution_queue_item_dbs) - claimed_count, len(execution_queue_item_dbs))
+
+            query['id__in'] = item_ids
+            query['claim_id'] = claim_id
+            query.pop('scheduled_start_timestamp__lte')
+            query.pop('handling')
+            execution_queue_item_dbs = list(ActionExecutionSchedulingQueue.query(**query))
+
+        for execution_queue_item_db in execution_queue_item_dbs:
+            msg = '[%s] Retrieved item "%s" from scheduling queue.'
+            LOG.info(msg, execution_queue_item_db.action_execution_id, execution_queue_item_db.id)
+
+        return execution_queue_item_dbs
 
     @metrics.CounterWithTimer(key='scheduler.handle_execution')
     def _handle_execution(self, execution_queue_item_db):
@@ -336,6 +487,7 @@ class ActionExecutionSchedulingQueueHandler(object):
 
             try:
                 ActionExecutionSchedulingQueue.add_or_update(execution_queue_item_db, publish=False)
+                self.notify(delay=POLICY_DELAYED_EXECUTION_RESCHEDULE_TIME_MS)
             except db_exc.StackStormDBObjectWriteConflictError:
                 LOG.warning(
                     '[%s] Database write conflict on updating scheduling queue.',
@@ -374,6 +526,7 @@ class ActionExecutionSchedulingQueueHandler(object):
         try:
             execution_queue_item_db.handling = False
             ActionExecutionSchedulingQueue.add_or_update(execution_queue_item_db, publish=False)
+            self.notify(delay=POLICY_DELAYED_EXECUTION_RESCHEDULE_TIME_MS)
         except db_exc.StackStormDBObjectWriteConflictError:
             LOG.warning(
                 '[%s] Database write conflict on updating scheduling queue.',
@@ -433,17 +586,42 @@ class ActionExecutionSchedulingQueueHandler(object):
             liveaction_db = action_service.update_status(
                 liveaction_db, action_constants.LIVEACTION_STATUS_SCHEDULED, publish=False)
 
+        # Update the in-flight execution counters right away (while the policy lock is still
+        # held) so the next policy decision doesn't depend on the status event round trip
+        execution_counters.update(liveaction_db)
+
         # Publish the "scheduled" status here manually. Otherwise, there could be a
         # race condition with the update of the action_execution_db if the execution
         # of the liveaction completes first.
         LiveAction.publish_status(liveaction_db)
 
+        # End to end latency from the time execution was requested (includes requested delay and
+        # the time execution was delayed by the policies)
+        latency = date.get_datetime_utc_now() - liveaction_db.start_timestamp
+        metrics.get_driver().time('scheduler.requested_to_scheduled', latency.total_seconds())
+
         # Delete execution queue entry only after status is published.
         ActionExecutionSchedulingQueue.delete(execution_queue_item_db)
 
     def start(self):
         self._shutdown = False
 
+        # Action and policy lookups are cached and the cache is kept up to date by listening to
+        # the resource CUD events
+        if cfg.CONF.scheduler.enable_resource_cache:
+            cache = resource_cache.enable_cache()
+            self._resource_cache_watcher = resource_cache.get_cache_watcher(
+                cache=cache, queue_suffix='scheduler')
+            self._resource_cache_watcher.start()
+
+        # Concurrency policies use in-memory in-flight execution counters which are kept up to
+        # date by listening to the liveaction status events
+        if cfg.CONF.scheduler.enable_execution_counters:
+            counters = execution_counters.enable_counters()
+            self._execution_counters_watcher = execution_counters.get_counters_watcher(
+                counters=counters, queue_suffix='scheduler')
+            self._execution_counters_watcher.start()
+
         # Spawn the worker threads.
         self._main_thread = eventlet.spawn(self.run)
         self._cleanup_thread = eventlet.spawn(self.cleanup)
@@ -458,6 +636,16 @@ class ActionExecutionSchedulingQueueHandler(object):
         if not self._shutdown:
             self._shutdown = True
 
+            if self._resource_cache_watcher:
+                self._resource_cache_watcher.stop()
+                self._resource_cache_watcher = None
+                resource_cache.disable_cache()
+
+            if self._execution_counters_watcher:
+                self._execution_counters_watcher.stop()
+                self._execution_counters_watcher = None
+                execution_counters.disable_counters()
+
     def wait(self):
         # Wait for the worker threads to complete. If there is an exception thrown in the thread,
         # then the exception will be propagated to the main process for a proper return code.
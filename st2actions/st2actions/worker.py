@@ -16,14 +16,19 @@ from __future__ import absolute_import
 import sys
 import traceback
 
+from oslo_config import cfg
+
 from st2actions.container.base import RunnerContainer
 from st2common import log as logging
 from st2common.constants import action as action_constants
 from st2common.exceptions.actionrunner import ActionRunnerException
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.models.db.liveaction import LiveActionDB
+from st2common.persistence import cache as resource_cache
 from st2common.persistence.execution import ActionExecution
+from st2common.services import completions
 from st2common.services import executions
+from st2common.services import keyvalues as keyvalue_service
 from st2common.services import workflows as wf_svc
 from st2common.transport.consumers import MessageHandler
 from st2common.transport.consumers import ActionsQueueConsumer
@@ -63,6 +68,9 @@ class ActionExecutionDispatcher(MessageHandler):
         super(ActionExecutionDispatcher, self).__init__(connection, queues)
         self.container = RunnerContainer()
         self._running_liveactions = set()
+        self._kv_cache_watcher = None
+        self._resource_cache_watcher = None
+        self._completion_watcher = None
 
     def get_queue_consumer(self, connection, queues):
         # We want to use a special ActionsQueueConsumer which uses 2 dispatcher pools
@@ -121,8 +129,47 @@ class ActionExecutionDispatcher(MessageHandler):
 
         return dispatchers[liveaction.status](liveaction)
 
+    def start(self, wait=False):
+        # Datastore read cache (used when rendering parameters) is kept up to date by listening
+        # to the key value pair CUD events
+        kv_cache = keyvalue_service.enable_cache()
+        if kv_cache is not None:
+            self._kv_cache_watcher = keyvalue_service.get_cache_watcher(cache=kv_cache,
+                                                                        queue_suffix='actionrunner')
+            self._kv_cache_watcher.start()
+
+        # Action and runner type lookups are cached and the cache is kept up to date by listening
+        # to the resource CUD events
+        if cfg.CONF.actionrunner.enable_resource_cache:
+            cache = resource_cache.enable_cache()
+            self._resource_cache_watcher = resource_cache.get_cache_watcher(
+                cache=cache, queue_suffix='actionrunner')
+            self._resource_cache_watcher.start()
+
+        # Workflow runners (e.g. action chain) which wait for child executions are woken up by
+        # the liveaction status events instead of polling the database
+        registry = completions.enable_completion_registry()
+        self._completion_watcher = completions.get_completion_watcher(
+            registry=registry, queue_suffix='actionrunner')
+        self._completion_watcher.start()
+
+        super(ActionExecutionDispatcher, self).start(wait=wait)
+
     def shutdown(self):
         super(ActionExecutionDispatcher, self).shutdown()
+
+        if self._kv_cache_watcher:
+            self._kv_cache_watcher.stop()
+            keyvalue_service.disable_cache()
+
+        if self._resource_cache_watcher:
+            self._resource_cache_watcher.stop()
+            resource_cache.disable_cache()
+
+        if self._completion_watcher:
+            self._completion_watcher.stop()
+            completions.disable_completion_registry()
+
         # Abandon running executions if incomplete
         while self._running_liveactions:
             liveaction_id = self._running_liveactions.pop()
@@ -131,6 +178,8 @@ class ActionExecutionDispatcher(MessageHandler):
             except:
                 LOG.exception('Failed to abandon liveaction %s.', liveaction_id)
 
+        self.container.shutdown()
+
     def _run_action(self, liveaction_db):
         # stamp liveaction with process_info
         runner_info = system_info.get_process_info()
@@ -17,6 +17,7 @@ from __future__ import absolute_import
 import kombu
 
 from orquesta import statuses
+from oslo_config import cfg
 
 from st2common.constants import action as ac_const
 from st2common import log as logging
@@ -64,6 +65,10 @@ class WorkflowExecutionHandler(consumers.VariableMessageHandler):
             ex_db_models.ActionExecutionDB: handle_action_execution_with_instrumentation
         }
 
+        # Conductors are kept in memory between the task transitions of the running workflows
+        if cfg.CONF.workflow_engine.conductor_cache_size > 0:
+            wf_svc.enable_conductor_cache()
+
     def get_queue_consumer(self, connection, queues):
         # We want to use a special ActionsQueueConsumer which uses 2 dispatcher pools
         return consumers.VariableMessageQueueConsumer(
@@ -0,0 +1,121 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark which measures how many scheduling queue items per second a single scheduler can
+claim and dispatch with the single item claim (claim_batch_size = 1) and the batch claim mode
+for different queue depths.
+
+Scheduling itself (policies, liveaction status updates) is replaced with deleting the queue item
+so the benchmark only measures the claim overhead. It requires a running MongoDB server and uses
+the database configured for the tests (st2-test by default).
+
+Usage:
+
+    python st2actions/tests/benchmarks/benchmark_scheduler_claim.py [--depths 100,1000,5000] \
+        [--batch-size 10]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import time
+
+import eventlet
+from oslo_config import cfg
+
+from st2tests import config as tests_config
+tests_config.parse_args()
+
+from st2actions.scheduler import handler as scheduler_handler
+from st2common.models.db import db_setup
+from st2common.models.db import db_teardown
+from st2common.models.db.execution_queue import ActionExecutionSchedulingQueueItemDB
+from st2common.persistence.execution_queue import ActionExecutionSchedulingQueue
+from st2common.util import date as date_utils
+
+__all__ = [
+    'run_benchmark'
+]
+
+
+def _fill_queue(depth):
+    ActionExecutionSchedulingQueue.impl.model.objects.delete()
+
+    now = date_utils.get_datetime_utc_now()
+    item_dbs = [ActionExecutionSchedulingQueueItemDB(liveaction_id='liveaction-%s' % (index),
+                                                     action_execution_id='execution-%s' % (index),
+                                                     original_start_timestamp=now,
+                                                     scheduled_start_timestamp=now)
+                for index in range(0, depth)]
+    ActionExecutionSchedulingQueue.insert_many(item_dbs, publish=False, dispatch_trigger=False)
+
+
+def _run(depth, batch_size):
+    _fill_queue(depth=depth)
+    cfg.CONF.set_override(name='claim_batch_size', override=batch_size, group='scheduler')
+
+    handled = []
+
+    def handle_execution(execution_queue_item_db):
+        ActionExecutionSchedulingQueue.delete(execution_queue_item_db)
+        handled.append(execution_queue_item_db.id)
+
+    handler = scheduler_handler.ActionExecutionSchedulingQueueHandler()
+    handler._handle_execution = handle_execution
+
+    start_ts = time.time()
+
+    # Same as the scheduler main loop, but without sleep_interval between the iterations so we
+    # only measure the claim throughput
+    while len(handled) < depth:
+        handler.process()
+        eventlet.greenthread.sleep(0)
+
+    handler._pool.waitall()
+    duration = (time.time() - start_ts)
+
+    return (depth / duration)
+
+
+def run_benchmark(depths, batch_size):
+    db_setup(cfg.CONF.database.db_name, cfg.CONF.database.host, cfg.CONF.database.port,
+             ensure_indexes=True)
+
+    print('Scheduled executions per second (pool size %s, batch size %s):' %
+          (cfg.CONF.scheduler.pool_size, batch_size))
+
+    try:
+        for depth in depths:
+            single_rate = _run(depth=depth, batch_size=1)
+            batch_rate = _run(depth=depth, batch_size=batch_size)
+
+            print('  queue depth %s: single claim %.2f, batch claim %.2f (%.2fx)' %
+                  (depth, single_rate, batch_rate, batch_rate / single_rate))
+    finally:
+        ActionExecutionSchedulingQueue.impl.model.objects.delete()
+        db_teardown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scheduler claim benchmark.')
+    parser.add_argument('--depths', default='100,1000,5000',
+                        help='Comma separated list of queue depths.')
+    parser.add_argument('--batch-size', type=int, default=10,
+                        help='Batch claim size (capped at the scheduler pool size).')
+    args = parser.parse_args()
+
+    run_benchmark(depths=[int(depth) for depth in args.depths.split(',')],
+                  batch_size=args.batch_size)
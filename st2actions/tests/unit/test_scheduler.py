@@ -17,6 +17,7 @@ from __future__ import absolute_import, print_function
 import datetime
 import mock
 import eventlet
+from oslo_config import cfg
 
 from st2tests import config as test_config
 test_config.parse_args()
@@ -190,6 +191,96 @@ class ActionExecutionSchedulingQueueItemDBTest(ExecutionDbTestCase):
         schedule_q_db = self.scheduling_queue._get_next_execution()
         self.assertIsNone(schedule_q_db)
 
+    def test_next_executions_batch_claim(self):
+        self.reset()
+
+        liveaction_dbs = [self._create_liveaction_db() for _ in range(0, 3)]
+
+        for liveaction_db in liveaction_dbs:
+            LiveAction.publish_status(liveaction_db)
+
+        schedule_q_dbs = self.scheduling_queue._get_next_executions(limit=2)
+        self.assertEqual(len(schedule_q_dbs), 2)
+        self.assertEqual([schedule_q_db.liveaction_id for schedule_q_db in schedule_q_dbs],
+                         [str(liveaction_db.id) for liveaction_db in liveaction_dbs[:2]])
+
+        # Items are marked as handled in the database and the returned objects are up to date
+        for schedule_q_db in schedule_q_dbs:
+            self.assertTrue(schedule_q_db.handling)
+            schedule_q_db_2 = ActionExecutionSchedulingQueue.get_by_id(str(schedule_q_db.id))
+            self.assertTrue(schedule_q_db_2.handling)
+            self.assertEqual(schedule_q_db_2.claim_id, schedule_q_db.claim_id)
+            self.assertEqual(schedule_q_db_2.rev, schedule_q_db.rev)
+
+        schedule_q_dbs = self.scheduling_queue._get_next_executions(limit=2)
+        self.assertEqual(len(schedule_q_dbs), 1)
+        self.assertEqual(schedule_q_dbs[0].liveaction_id, str(liveaction_dbs[2].id))
+
+        self.assertEqual(self.scheduling_queue._get_next_executions(limit=2), [])
+
+    def test_next_executions_batch_claim_skips_items_claimed_by_other_scheduler(self):
+        self.reset()
+
+        liveaction_dbs = [self._create_liveaction_db() for _ in range(0, 2)]
+
+        for liveaction_db in liveaction_dbs:
+            LiveAction.publish_status(liveaction_db)
+
+        schedule_q_dbs = list(ActionExecutionSchedulingQueue.query(handling=False))
+        claimed_q_db = [schedule_q_db for schedule_q_db in schedule_q_dbs
+                        if schedule_q_db.liveaction_id == str(liveaction_dbs[0].id)][0]
+        query = ActionExecutionSchedulingQueue.query
+
+        def mock_query(*args, **kwargs):
+            result = list(query(*args, **kwargs))
+
+            # Another scheduler claims the first item after it has been retrieved
+            if kwargs.get('handling', None) is False:
+                claimed_q_db.handling = True
+                ActionExecutionSchedulingQueue.add_or_update(claimed_q_db, publish=False)
+
+            return result
+
+        with mock.patch.object(ActionExecutionSchedulingQueue, 'query',
+                               mock.MagicMock(side_effect=mock_query)):
+            schedule_q_dbs = self.scheduling_queue._get_next_executions(limit=2)
+
+        self.assertEqual(len(schedule_q_dbs), 1)
+        self.assertEqual(schedule_q_dbs[0].liveaction_id, str(liveaction_dbs[1].id))
+        self.assertTrue(schedule_q_dbs[0].handling)
+
+    def test_entrypoint_notifies_scheduling_handler(self):
+        self.reset()
+
+        scheduling_handler = mock.MagicMock()
+        entrypoint = scheduling.get_scheduler_entrypoint(scheduling_handler=scheduling_handler)
+
+        liveaction_db = self._create_liveaction_db()
+        entrypoint.process(liveaction_db)
+
+        scheduling_handler.notify.assert_called_once_with(delay=None)
+
+    def test_notify_wakes_up_main_loop(self):
+        cfg.CONF.set_override(name='fallback_poll_interval', override=10, group='scheduler')
+        self.addCleanup(cfg.CONF.clear_override, name='fallback_poll_interval',
+                        group='scheduler')
+
+        wait_thread = eventlet.spawn(self.scheduling_queue._wait_for_work)
+        eventlet.sleep(0)
+        self.scheduling_queue.notify()
+
+        with eventlet.Timeout(1):
+            wait_thread.wait()
+
+        # Delayed notification
+        wait_thread = eventlet.spawn(self.scheduling_queue._wait_for_work)
+        self.scheduling_queue.notify(delay=100)
+        eventlet.sleep(0.05)
+        self.assertFalse(wait_thread.dead)
+
+        with eventlet.Timeout(1):
+            wait_thread.wait()
+
     def test_no_processing_of_non_requested_actions(self):
         self.reset()
 
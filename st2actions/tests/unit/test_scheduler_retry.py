@@ -21,6 +21,7 @@ from st2tests import config as test_config
 test_config.parse_args()
 
 from st2actions.scheduler import handler
+from st2common.exceptions import db as db_exc
 from st2common.models.db import execution_queue as ex_q_db
 from st2common.persistence import execution_queue as ex_q_db_access
 from st2tests.base import CleanDbTestCase
@@ -32,6 +33,7 @@ __all__ = [
 
 
 MOCK_QUEUE_ITEM = ex_q_db.ActionExecutionSchedulingQueueItemDB(liveaction_id=uuid.uuid4().hex)
+MOCK_QUEUE_ITEM_2 = ex_q_db.ActionExecutionSchedulingQueueItemDB(liveaction_id=uuid.uuid4().hex)
 
 
 class SchedulerHandlerRetryTestCase(CleanDbTestCase):
@@ -117,3 +119,24 @@ class SchedulerHandlerRetryTestCase(CleanDbTestCase):
         )
 
         self.assertEqual(ex_q_db_access.ActionExecutionSchedulingQueue.add_or_update.call_count, 0)
+
+    @mock.patch.object(
+        ex_q_db_access.ActionExecutionSchedulingQueue, 'query',
+        mock.MagicMock(side_effect=[mock.MagicMock(first=mock.MagicMock(return_value=item))
+                                    for item in [MOCK_QUEUE_ITEM, MOCK_QUEUE_ITEM_2]]))
+    @mock.patch.object(
+        ex_q_db_access.ActionExecutionSchedulingQueue, 'add_or_update',
+        mock.MagicMock(side_effect=[db_exc.StackStormDBObjectWriteConflictError(MOCK_QUEUE_ITEM),
+                                    None]))
+    @mock.patch.object(
+        eventlet.GreenPool, 'spawn',
+        mock.MagicMock(return_value=None))
+    def test_handler_claims_next_item_on_write_conflict(self):
+        scheduling_queue_handler = handler.ActionExecutionSchedulingQueueHandler()
+
+        # Item claimed by another scheduler doesn't mean that the queue has been drained
+        self.assertTrue(scheduling_queue_handler.process())
+
+        calls = [mock.call(scheduling_queue_handler._handle_execution, MOCK_QUEUE_ITEM_2)]
+        eventlet.GreenPool.spawn.assert_has_calls(calls)
+        self.assertEqual(eventlet.GreenPool.spawn.call_count, 1)
@@ -14,6 +14,7 @@
 
 import six
 import uuid
+from oslo_config import cfg
 from six.moves.urllib import parse as urlparse  # pylint: disable=import-error
 urljoin = urlparse.urljoin
 
@@ -30,6 +31,7 @@ from st2common.services.trigger_dispatcher import TriggerDispatcherService
 from st2common.router import abort
 from st2common.router import Response
 from st2common.util.jsonify import get_json_type_for_python_value
+from st2common.validators.api import reactor as reactor_validators
 
 http_client = six.moves.http_client
 
@@ -93,6 +95,16 @@ class WebhooksController(object):
                                                queue_suffix=queue_suffix,
                                                exclusive=True)
         self._trigger_watcher.start()
+
+        # Compiled trigger payload validators are cached and the cache is invalidated on trigger
+        # type CUD events
+        if cfg.CONF.system.validate_trigger_payload:
+            cache = reactor_validators.enable_payload_validator_cache()
+            self._payload_validator_cache_watcher = \
+                reactor_validators.get_payload_validator_cache_watcher(
+                    cache=cache, queue_suffix=queue_suffix)
+            self._payload_validator_cache_watcher.start()
+
         self._register_webhook_trigger_types()
 
     def get_all(self):
@@ -139,15 +151,28 @@ class WebhooksController(object):
 
             trigger = body.get('trigger', None)
             payload = body.get('payload', None)
+            payloads = body.get('payloads', None)
 
             if not trigger:
                 msg = 'Trigger not specified.'
                 return abort(http_client.BAD_REQUEST, msg)
 
-            self._trigger_dispatcher_service.dispatch_with_context(trigger=trigger,
-                   payload=payload,
-                   trace_context=trace_context,
-                   throw_on_validation_error=True)
+            if payloads is not None:
+                # Multiple instances of the same trigger are dispatched using batched messages
+                if not isinstance(payloads, list):
+                    type_string = get_json_type_for_python_value(payloads)
+                    msg = ('Webhook payloads need to be an array, got: %s' % (type_string))
+                    raise ValueError(msg)
+
+                self._trigger_dispatcher_service.dispatch_many_with_context(trigger=trigger,
+                       payloads=payloads,
+                       trace_context=trace_context,
+                       throw_on_validation_error=True)
+            else:
+                self._trigger_dispatcher_service.dispatch_with_context(trigger=trigger,
+                       payload=payload,
+                       trace_context=trace_context,
+                       throw_on_validation_error=True)
         else:
             if not self._is_valid_hook(hook):
                 self._log_request('Invalid hook.', headers, body)
@@ -185,6 +185,28 @@ class TestWebhooksController(FunctionalTest):
         self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
         self.assertEqual(dispatch_mock.call_args[1]['trace_context'].trace_tag, 'tag1')
 
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
+        return_value=True))
+    @mock.patch('st2common.services.triggers.get_trigger_type_db', mock.MagicMock(
+        return_value=DUMMY_TRIGGER_TYPE_DB))
+    @mock.patch('st2common.transport.reactor.TriggerDispatcher.dispatch_many')
+    def test_st2_webhook_multiple_payloads(self, dispatch_many_mock):
+        data = {
+            'trigger': 'git.pr-merged',
+            'payloads': [ST2_WEBHOOK['payload'], ST2_WEBHOOK['payload']]
+        }
+        post_resp = self.__do_post('st2', data)
+        self.assertEqual(post_resp.status_int, http_client.ACCEPTED)
+
+        self.assertEqual(dispatch_many_mock.call_count, 1)
+        self.assertEqual(dispatch_many_mock.call_args[1]['payloads'], data['payloads'])
+        self.assertTrue(dispatch_many_mock.call_args[1]['trace_context'].trace_tag)
+
+        data['payloads'] = {}
+        post_resp = self.__do_post('st2', data, expect_errors=True)
+        self.assertEqual(post_resp.status_int, http_client.BAD_REQUEST)
+        self.assertTrue('Webhook payloads need to be an array, got: object' in post_resp)
+
     @mock.patch.object(TriggerInstancePublisher, 'publish_trigger', mock.MagicMock(
         return_value=True))
     def test_st2_webhook_body_missing_trigger(self):
@@ -35,6 +35,7 @@ from st2common.script_setup import setup as common_setup
 from st2common.script_setup import teardown as common_teardown
 from st2common.constants.exit_codes import SUCCESS_EXIT_CODE
 from st2common.constants.exit_codes import FAILURE_EXIT_CODE
+from st2common.garbage_collection.batch import PurgeCheckpoint
 from st2common.garbage_collection.executions import purge_executions
 
 __all__ = [
@@ -56,6 +57,14 @@ def _register_cli_opts():
                     help='Purge all models irrespective of their ``status``.' +
                     'By default, only executions in completed states such as "succeeeded" ' +
                     ', "failed", "canceled" and "timed_out" are deleted.'),
+        cfg.IntOpt('batch-size', default=0,
+                   help='If provided, executions are deleted in batches of this size.'),
+        cfg.IntOpt('max-docs-per-second', default=0,
+                   help='Maximum number of executions deleted per second when deleting in ' +
+                   'batches.'),
+        cfg.StrOpt('checkpoint-path', default=None,
+                   help='Path to the file where purge progress is stored when deleting in ' +
+                   'batches. If the file exists, purge continues where it left off.'),
     ]
     do_register_cli_opts(cli_opts)
 
@@ -78,7 +87,9 @@ def main():
 
     try:
         purge_executions(logger=LOG, timestamp=timestamp, action_ref=action_ref,
-                         purge_incomplete=purge_incomplete)
+                         purge_incomplete=purge_incomplete, batch_size=cfg.CONF.batch_size,
+                         max_docs_per_second=cfg.CONF.max_docs_per_second,
+                         checkpoint=PurgeCheckpoint(path=cfg.CONF.checkpoint_path))
     except Exception as e:
         LOG.exception(six.text_type(e))
         return FAILURE_EXIT_CODE
@@ -35,6 +35,7 @@ from st2common.script_setup import setup as common_setup
 from st2common.script_setup import teardown as common_teardown
 from st2common.constants.exit_codes import SUCCESS_EXIT_CODE
 from st2common.constants.exit_codes import FAILURE_EXIT_CODE
+from st2common.garbage_collection.batch import PurgeCheckpoint
 from st2common.garbage_collection.trigger_instances import purge_trigger_instances
 
 __all__ = [
@@ -49,7 +50,15 @@ def _register_cli_opts():
         cfg.StrOpt('timestamp', default=None,
                    help='Will delete trigger instances older than ' +
                    'this UTC timestamp. ' +
-                   'Example value: 2015-03-13T19:01:27.255542Z')
+                   'Example value: 2015-03-13T19:01:27.255542Z'),
+        cfg.IntOpt('batch-size', default=0,
+                   help='If provided, trigger instances are deleted in batches of this size.'),
+        cfg.IntOpt('max-docs-per-second', default=0,
+                   help='Maximum number of trigger instances deleted per second when deleting ' +
+                   'in batches.'),
+        cfg.StrOpt('checkpoint-path', default=None,
+                   help='Path to the file where purge progress is stored when deleting in ' +
+                   'batches. If the file exists, purge continues where it left off.')
     ]
     do_register_cli_opts(cli_opts)
 
@@ -70,7 +79,9 @@ def main():
 
     # Purge models.
     try:
-        purge_trigger_instances(logger=LOG, timestamp=timestamp)
+        purge_trigger_instances(logger=LOG, timestamp=timestamp, batch_size=cfg.CONF.batch_size,
+                                max_docs_per_second=cfg.CONF.max_docs_per_second,
+                                checkpoint=PurgeCheckpoint(path=cfg.CONF.checkpoint_path))
     except Exception as e:
         LOG.exception(six.text_type(e))
         return FAILURE_EXIT_CODE
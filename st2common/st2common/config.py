@@ -209,7 +209,16 @@ def register_opts(ignore_errors=False):
             'authentication_mechanism', default=None,
             help='Specifies database authentication mechanisms. '
                  'By default, it use SCRAM-SHA-1 with MongoDB 3.0 and later, '
-                 'MONGODB-CR (MongoDB Challenge Response protocol) for older servers.')
+                 'MONGODB-CR (MongoDB Challenge Response protocol) for older servers.'),
+        cfg.IntOpt(
+            'result_storage_threshold', default=0,
+            help='Execution results which are larger than this size (in bytes, serialized as JSON) '
+                 'are compressed and stored in a separate collection and retrieved on access. '
+                 '0 means results are always stored inline.'),
+        cfg.IntOpt(
+            'result_compression_level', default=6, min=1, max=9,
+            help='zlib compression level (1-9) used for results which are stored in a separate '
+                 'collection.')
     ]
 
     do_register_opts(db_opts, 'database', ignore_errors)
@@ -249,7 +258,12 @@ def register_opts(ignore_errors=False):
                  'used to validate certificates passed from RabbitMQ.'),
         cfg.StrOpt(
             'login_method', default=None,
-            help='Login method to use (AMQPLAIN, PLAIN, EXTERNAL, etc.).')
+            help='Login method to use (AMQPLAIN, PLAIN, EXTERNAL, etc.).'),
+        cfg.StrOpt(
+            'serializer', default='pickle', choices=['pickle', 'msgpack'],
+            help='Serializer used for messages published to the message bus. Consumers accept '
+                 'messages in both formats so this should only be changed to "msgpack" once '
+                 'all the services have been upgraded.')
     ]
 
     do_register_opts(messaging_opts, 'messaging', ignore_errors)
@@ -315,11 +329,34 @@ def register_opts(ignore_errors=False):
             'encryption_key_path', default='',
             help='Location of the symmetric encryption key for encrypting values in kvstore. '
                  'This key should be in JSON and should\'ve been generated using '
-                 'st2-generate-symmetric-crypto-key tool.')
+                 'st2-generate-symmetric-crypto-key tool.'),
+        cfg.BoolOpt(
+            'enable_cache', default=True,
+            help='Enable in-memory datastore read cache in services which support it (rules '
+                 'engine and action runner). Cache is invalidated on datastore changes.'),
+        cfg.IntOpt(
+            'cache_ttl', default=60,
+            help='How long (in seconds) to cache datastore values for.'),
+        cfg.IntOpt(
+            'cache_size', default=10000,
+            help='Maximum number of datastore items to cache.')
     ]
 
     do_register_opts(keyvalue_opts, group='keyvalue')
 
+    # Content pack resource cache options
+    resource_cache_opts = [
+        cfg.IntOpt(
+            'ttl', default=300,
+            help='How long (in seconds) to cache actions, runner types, triggers, trigger types '
+                 'and policies for in services which have the resource cache enabled.'),
+        cfg.IntOpt(
+            'size', default=1000,
+            help='Maximum number of resource lookup results to cache.')
+    ]
+
+    do_register_opts(resource_cache_opts, group='resource_cache')
+
     # Common auth options
     auth_opts = [
         cfg.StrOpt(
@@ -386,7 +423,39 @@ def register_opts(ignore_errors=False):
             help=('Buffer size to use for real time action output streaming. 0 means unbuffered '
                   '1 means line buffered, -1 means system default, which usually means fully '
                   'buffered and any other positive value means use a buffer of (approximately) '
-                  'that size'))
+                  'that size')),
+        cfg.FloatOpt(
+            'stream_output_flush_interval', default=0.5,
+            help='How long (in seconds) to buffer action output before storing and publishing '
+                 'it. Consecutive output lines are stored as a single document. 0 means each '
+                 'line is stored and published right away.'),
+        cfg.IntOpt(
+            'stream_output_flush_size', default=64 * 1024,
+            help='Maximum size (in bytes) of the buffered action output. Buffered output is '
+                 'stored when it reaches this size, even if the flush interval has not elapsed '
+                 'yet.'),
+        cfg.BoolOpt(
+            'python_runner_worker_pool', default=False,
+            help='True to run Python actions in a pool of long running, pre-imported Python '
+                 'processes (workers) per pack virtual environment instead of starting a new '
+                 'process for each execution. Actions which use "content_version" runner '
+                 'parameter always run in a new process.'),
+        cfg.IntOpt(
+            'python_runner_worker_pool_size', default=4,
+            help='Maximum number of idle Python runner workers per pack virtual environment.'),
+        cfg.IntOpt(
+            'python_runner_worker_max_runs', default=100,
+            help='Number of action runs after which a Python runner worker is recycled (0 means '
+                 'no limit).'),
+        cfg.IntOpt(
+            'python_runner_worker_max_memory_growth', default=100,
+            help='Memory usage growth (in MB) after which a Python runner worker is recycled '
+                 '(0 means no limit).'),
+        cfg.FloatOpt(
+            'completion_poll_interval', default=10.0,
+            help='How often (in seconds) workflow runners (e.g. action chain) check the database '
+                 'for completion of a child execution. Waiting runners are woken up by the '
+                 'liveaction status events so this is only a safety net for missed events.')
     ]
 
     do_register_opts(action_runner_opts, group='actionrunner')
@@ -402,6 +471,15 @@ def register_opts(ignore_errors=False):
 
     do_register_opts(dispatcher_pool_opts, group='actionrunner')
 
+    action_runner_cache_opts = [
+        cfg.BoolOpt(
+            'enable_resource_cache', default=True,
+            help='True to cache actions and runner types in memory (cache is invalidated using '
+                 'resource CUD events).')
+    ]
+
+    do_register_opts(action_runner_cache_opts, group='actionrunner')
+
     ssh_runner_opts = [
         cfg.StrOpt(
             'remote_dir', default='/tmp',
@@ -523,6 +601,15 @@ def register_opts(ignore_errors=False):
         cfg.FloatOpt(
             'query_interval', default=5,
             help='Time interval between queries to external workflow system.'),
+        cfg.FloatOpt(
+            'query_max_interval', default=60,
+            help='Maximum time interval between queries to external workflow system. Interval '
+                 'for an execution grows from "query_interval" up to this value while the '
+                 'execution state doesn\'t change and it\'s reset once the state changes.'),
+        cfg.FloatOpt(
+            'query_backoff_factor', default=2,
+            help='Factor by which the query interval for an execution is multiplied each time '
+                 'the execution state hasn\'t changed since the previous query.'),
         cfg.FloatOpt(
             'empty_q_sleep_time', default=1,
             help='Sleep delay in between queries when query queue is empty.'),
@@ -550,7 +637,24 @@ def register_opts(ignore_errors=False):
     stream_opts = [
         cfg.IntOpt(
             'heartbeat', default=25,
-            help='Send empty message every N seconds to keep connection open')
+            help='Send empty message every N seconds to keep connection open'),
+        cfg.IntOpt(
+            'subscriber_queue_size', default=1000,
+            help='Maximum number of events which are buffered for a single stream client. 0 '
+                 'means unlimited. Clients receive st2.stream__events_lost event when some of '
+                 'the events have been dropped. Execution output stream is not limited.'),
+        cfg.StrOpt(
+            'subscriber_overflow_policy', default='drop_oldest',
+            choices=['drop_oldest', 'coalesce', 'disconnect'],
+            help='What to do when a stream client can\'t keep up with the events and its buffer '
+                 'is full. "drop_oldest" drops the oldest buffered event, "coalesce" only keeps '
+                 'the latest update for each execution (and drops the oldest event otherwise) '
+                 'and "disconnect" closes the stream and sends the client a resume token.'),
+        cfg.IntOpt(
+            'replay_buffer_size', default=10000,
+            help='Number of recent events kept in memory so clients which have been '
+                 'disconnected by the "disconnect" overflow policy can resume the stream. At '
+                 'least twice the subscriber_queue_size events are kept.')
     ]
 
     do_register_opts(stream_opts, group='stream', ignore_errors=ignore_errors)
@@ -656,11 +760,42 @@ def register_opts(ignore_errors=False):
             'gc_max_idle_sec', default=0,
             help='Max seconds to allow workflow execution be idled before it is identified as '
                  'orphaned and cancelled by the garbage collector. A value of zero means the '
-                 'feature is disabled. This is disabled by default.')
+                 'feature is disabled. This is disabled by default.'),
+        cfg.IntOpt(
+            'conductor_cache_size', default=100,
+            help='Maximum number of workflow conductors which are kept in memory by the workflow '
+                 'engine between task transitions of the running workflow executions. Cached '
+                 'conductor is only used if the workflow execution hasn\'t been updated since. '
+                 'A value of zero disables the cache.')
     ]
 
     do_register_opts(workflow_engine_opts, group='workflow_engine', ignore_errors=ignore_errors)
 
+    # Garbage collector retention options. Those options are registered here (and not in the
+    # garbage collector service config) since they are also used by all the services when
+    # ensuring database TTL indexes.
+    garbage_collector_ttl_opts = [
+        cfg.IntOpt(
+            'action_executions_ttl', default=None,
+            help='Action executions and related objects (live actions, action output '
+                 'objects) older than this value (days) will be automatically deleted.'),
+        cfg.IntOpt(
+            'action_executions_output_ttl', default=7,
+            help='Action execution output objects (ones generated by action output '
+                 'streaming) older than this value (days) will be automatically deleted.'),
+        cfg.IntOpt(
+            'trigger_instances_ttl', default=None,
+            help='Trigger instances older than this value (days) will be automatically deleted.'),
+        cfg.BoolOpt(
+            'ttl_indexes', default=False,
+            help='Set to True to also let MongoDB expire objects using TTL indexes which are '
+                 'derived from the *_ttl options. Indexes are updated when the services start. '
+                 'Only completed executions are expired.')
+    ]
+
+    do_register_opts(garbage_collector_ttl_opts, group='garbagecollector',
+                     ignore_errors=ignore_errors)
+
 
 def parse_args(args=None):
     register_opts()
@@ -28,6 +28,7 @@ __all__ = [
 
     'PYTHON_RUNNER_DEFAULT_ACTION_TIMEOUT',
     'PYTHON_RUNNER_INVALID_ACTION_STATUS_EXIT_CODE',
+    'PYTHON_RUNNER_WORKER_RUN_END_DELIMITER',
 
     'WINDOWS_RUNNER_DEFAULT_ACTION_TIMEOUT',
 
@@ -70,6 +71,10 @@ PYTHON_RUNNER_INVALID_ACTION_STATUS_EXIT_CODE = 220
 
 PYTHON_RUNNER_DEFAULT_LOG_LEVEL = 'DEBUG'
 
+# Delimiter which is written to stdout and stderr by the Python runner worker process (see
+# python_runner.worker_pool) after each action run
+PYTHON_RUNNER_WORKER_RUN_END_DELIMITER = '%%%%%~=~=~=**st2-worker-run-end**=~=~=~%%%%'
+
 # Windows runner
 WINDOWS_RUNNER_DEFAULT_ACTION_TIMEOUT = 10 * 60
 
@@ -0,0 +1,223 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module with utility functions for purging objects in bounded batches.
+
+Objects are processed in batches ordered by id (which also corresponds to the object creation
+time) so the whole result set never needs to be loaded in memory and database is never asked
+to delete millions of objects in a single query.
+"""
+
+from __future__ import absolute_import
+
+import os
+import json
+import time
+import hashlib
+import datetime
+
+import bson
+import six
+
+from st2common.metrics.base import get_driver
+from st2common.util import concurrency
+from st2common.util import date as date_utils
+
+__all__ = [
+    'PurgeCheckpoint',
+    'purge_in_batches'
+]
+
+
+class PurgeCheckpoint(object):
+    """
+    Stores id of the last processed object for each resource which is being purged.
+
+    If a path is provided, checkpoint is persisted to a JSON file so an interrupted purge (e.g.
+    because the service has been restarted) can continue where it left off.
+
+    Checkpoints are keyed by the resource and a hash of the filters used for the purge (except
+    the time bounds) so a purge with different filters never resumes from the position of another
+    purge (objects before that position which only match the new filters would be skipped
+    otherwise).
+
+    Time bounds (filters with datetime values such as "timestamp__lt") are recomputed on each run
+    of the garbage collector so they are stored in the checkpoint instead. A purge is resumed if
+    its time bounds are the same or later than the stored ones. Objects before the checkpoint
+    which only match the later bounds are purged by the next run.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._checkpoints = self._load()
+
+    def get(self, resource, filters=None):
+        checkpoint = self._checkpoints.get(self._get_key(resource, filters), None)
+
+        if not isinstance(checkpoint, dict):
+            return None
+
+        time_filters = self._get_time_filters(filters)
+
+        for name, value in six.iteritems(checkpoint.get('time_filters', {})):
+            if name not in time_filters or time_filters[name] < date_utils.parse(value):
+                return None
+
+        return bson.ObjectId(checkpoint['last_id'])
+
+    def set(self, resource, object_id, filters=None):
+        key = self._get_key(resource, filters)
+
+        # Only the checkpoint of the last purge of a resource is kept
+        for other_key in self._get_resource_keys(resource):
+            if other_key != key:
+                del self._checkpoints[other_key]
+
+        time_filters = self._get_time_filters(filters)
+
+        self._checkpoints[key] = {
+            'last_id': str(object_id),
+            'time_filters': dict([(name, value.isoformat())
+                                  for name, value in six.iteritems(time_filters)])
+        }
+        self._save()
+
+    def clear(self, resource, filters=None):
+        if self._checkpoints.pop(self._get_key(resource, filters), None):
+            self._save()
+
+    def _get_key(self, resource, filters):
+        filters = dict([(name, value) for name, value in six.iteritems(filters or {})
+                        if not isinstance(value, datetime.datetime)])
+        data = json.dumps(filters, sort_keys=True, default=str).encode('utf-8')
+        return '%s:%s' % (resource, hashlib.sha1(data).hexdigest())
+
+    def _get_time_filters(self, filters):
+        return dict([(name, date_utils.convert_to_utc(value))
+                     for name, value in six.iteritems(filters or {})
+                     if isinstance(value, datetime.datetime)])
+
+    def _get_resource_keys(self, resource):
+        return [key for key in self._checkpoints if key.rsplit(':', 1)[0] == resource]
+
+    def _load(self):
+        if not self._path or not os.path.isfile(self._path):
+            return {}
+
+        with open(self._path, 'r') as fp:
+            return json.loads(fp.read() or '{}')
+
+    def _save(self):
+        if not self._path:
+            return
+
+        # Write to a temporary file first so a partially written checkpoint is never read
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            fp.write(json.dumps(self._checkpoints))
+
+        os.rename(tmp_path, self._path)
+
+
+def purge_in_batches(logger, resource, model, filters, purge_batch_func, batch_size,
+                     max_docs_per_second=0, checkpoint=None, only_fields=None):
+    """
+    Retrieve objects matching the provided filters in batches ordered by id and pass each batch
+    to the purge function.
+
+    :param resource: Name of the purged resource (used for checkpoints and metrics).
+    :type resource: ``str``
+
+    :param model: Persistence class for the purged objects.
+
+    :param purge_batch_func: Function which is called with a list of objects in the batch and
+                             returns number of purged objects.
+    :type purge_batch_func: ``callable``
+
+    :param batch_size: Maximum number of objects in a batch.
+    :type batch_size: ``int``
+
+    :param max_docs_per_second: Maximum number of objects processed per second. 0 means no
+                                limit.
+    :type max_docs_per_second: ``int``
+
+    :param checkpoint: Optional checkpoint used to resume an interrupted purge. Checkpoint is
+                       cleared once all the matching objects have been processed.
+    :type checkpoint: :class:`PurgeCheckpoint`
+
+    :param only_fields: Fields to retrieve for each object. Defaults to id only.
+    :type only_fields: ``list``
+
+    :return: Total number of purged objects.
+    :rtype: ``int``
+    """
+    if not batch_size or batch_size <= 0:
+        raise ValueError('Batch size needs to be a positive integer.')
+
+    driver = get_driver()
+
+    last_id = checkpoint.get(resource, filters=filters) if checkpoint else None
+    if last_id:
+        logger.info('Resuming purge of %s after checkpoint: %s' % (resource, last_id))
+
+    processed_count = 0
+    purged_count = 0
+    batch_count = 0
+    start_ts = time.time()
+
+    while True:
+        batch_start_ts = time.time()
+
+        batch_filters = dict(filters)
+        if last_id:
+            batch_filters['id__gt'] = last_id
+
+        object_dbs = list(model.query(only_fields=only_fields or ['id'], no_dereference=True,
+                                      order_by=['id'], limit=batch_size, **batch_filters))
+
+        if not object_dbs:
+            break
+
+        count = purge_batch_func(object_dbs)
+
+        last_id = object_dbs[-1].id
+        if checkpoint:
+            checkpoint.set(resource, last_id, filters=filters)
+
+        batch_count += 1
+        processed_count += len(object_dbs)
+        purged_count += count
+
+        driver.time('garbage_collection.%s.batch' % (resource), time.time() - batch_start_ts)
+        driver.inc_counter('garbage_collection.%s.purged' % (resource), count)
+        logger.debug('Purged %s %s objects in batch %s (%s objects processed so far)' %
+                     (count, resource, batch_count, processed_count))
+
+        if len(object_dbs) < batch_size:
+            break
+
+        # Sleep so the configured rate is not exceeded
+        if max_docs_per_second and max_docs_per_second > 0:
+            delay = (processed_count / float(max_docs_per_second)) - (time.time() - start_ts)
+
+            if delay > 0:
+                concurrency.sleep(delay)
+
+    if checkpoint:
+        checkpoint.clear(resource, filters=filters)
+
+    logger.info('Purged %s %s objects in %s batches' % (purged_count, resource, batch_count))
+
+    return purged_count
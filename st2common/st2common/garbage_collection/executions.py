@@ -25,10 +25,13 @@ import six
 from mongoengine.errors import InvalidQueryError
 
 from st2common.constants import action as action_constants
+from st2common.garbage_collection.batch import purge_in_batches
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.execution import ActionExecution
 from st2common.persistence.execution import ActionExecutionOutput
+from st2common.persistence.execution import ActionExecutionResult
 from st2common.services import action as action_service
+from st2common.services import results as results_service
 from st2common.services import workflows as workflow_service
 
 __all__ = [
@@ -42,9 +45,11 @@ DONE_STATES = [action_constants.LIVEACTION_STATUS_SUCCEEDED,
                action_constants.LIVEACTION_STATUS_CANCELED]
 
 
-def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False):
+def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False,
+                     batch_size=None, max_docs_per_second=0, checkpoint=None):
     """
-    Purge action executions and corresponding live action, execution output objects.
+    Purge action executions and corresponding live action, execution output and execution result
+    objects.
 
     :param timestamp: Exections older than this timestamp will be deleted.
     :type timestamp: ``datetime.datetime
@@ -54,6 +59,16 @@ def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False)
 
     :param purge_incomplete: True to also delete executions which are not in a done state.
     :type purge_incomplete: ``bool``
+
+    :param batch_size: If provided, objects are deleted in batches of this size instead of using
+                       a single query.
+    :type batch_size: ``int``
+
+    :param max_docs_per_second: Maximum number of executions deleted per second in batch mode.
+    :type max_docs_per_second: ``int``
+
+    :param checkpoint: Checkpoint used to resume an interrupted purge in batch mode.
+    :type checkpoint: :class:`st2common.garbage_collection.batch.PurgeCheckpoint`
     """
     if not timestamp:
         raise ValueError('Specify a valid timestamp to purge.')
@@ -78,6 +93,20 @@ def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False)
     if action_ref:
         liveaction_filters['action'] = action_ref
 
+    # Stored results can be shared by multiple executions so only results which are not
+    # referenced by any remaining execution or liveaction are deleted. Recently stored results
+    # are skipped since the document which references them might not have been saved yet.
+    result_filters = {'timestamp__lt': timestamp}
+
+    if batch_size:
+        _purge_executions_in_batches(logger=logger, exec_filters=exec_filters,
+                                     liveaction_filters=liveaction_filters,
+                                     result_filters=result_filters, batch_size=batch_size,
+                                     max_docs_per_second=max_docs_per_second,
+                                     checkpoint=checkpoint)
+        logger.info('All execution models older than timestamp %s were deleted.', timestamp)
+        return
+
     to_delete_execution_dbs = []
 
     # 1. Delete ActionExecutionDB objects
@@ -127,6 +156,21 @@ def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False)
     else:
         logger.info('Deleted %s execution output objects' % (deleted_count))
 
+    # 4. Delete ActionExecutionResultDB objects which are not referenced anymore
+    try:
+        result_dbs = list(ActionExecutionResult.query(only_fields=['id', 'digest'],
+                                                      **result_filters))
+        deleted_count = _delete_unreferenced_results(result_dbs, timestamp=timestamp)
+    except InvalidQueryError as e:
+        msg = ('Bad query (%s) used to delete execution result instances: %s'
+               'Please contact support.' % (result_filters, six.text_type(e)))
+        raise InvalidQueryError(msg)
+    except:
+        logger.exception('Deletion of execution result models failed for query with '
+                         'filters: %s.', result_filters)
+    else:
+        logger.info('Deleted %s execution result objects' % (deleted_count))
+
     zombie_execution_instances = len(ActionExecution.query(only_fields=['id'],
                                                            no_dereference=True,
                                                            **exec_filters))
@@ -142,7 +186,8 @@ def purge_executions(logger, timestamp, action_ref=None, purge_incomplete=False)
     logger.info('All execution models older than timestamp %s were deleted.', timestamp)
 
 
-def purge_execution_output_objects(logger, timestamp, action_ref=None):
+def purge_execution_output_objects(logger, timestamp, action_ref=None, batch_size=None,
+                                   max_docs_per_second=0, checkpoint=None):
     """
     Purge action executions output objects.
 
@@ -151,6 +196,10 @@ def purge_execution_output_objects(logger, timestamp, action_ref=None):
 
     :param action_ref: Only delete objects for the provided actions.
     :type action_ref: ``str``
+
+    :param batch_size: If provided, objects are deleted in batches of this size instead of using
+                       a single query.
+    :type batch_size: ``int``
     """
     if not timestamp:
         raise ValueError('Specify a valid timestamp to purge.')
@@ -164,6 +213,14 @@ def purge_execution_output_objects(logger, timestamp, action_ref=None):
     if action_ref:
         filters['action_ref'] = action_ref
 
+    if batch_size:
+        purge_in_batches(logger=logger, resource='action_executions_output',
+                         model=ActionExecutionOutput, filters=filters,
+                         purge_batch_func=_delete_objects_batch(ActionExecutionOutput),
+                         batch_size=batch_size, max_docs_per_second=max_docs_per_second,
+                         checkpoint=checkpoint)
+        return
+
     try:
         deleted_count = ActionExecutionOutput.delete_by_query(**filters)
     except InvalidQueryError as e:
@@ -177,6 +234,80 @@ def purge_execution_output_objects(logger, timestamp, action_ref=None):
         logger.info('Deleted %s execution output objects' % (deleted_count))
 
 
+def _purge_executions_in_batches(logger, exec_filters, liveaction_filters, batch_size,
+                                 max_docs_per_second=0, checkpoint=None, result_filters=None):
+    def purge_execution_batch(execution_dbs):
+        execution_ids = [execution_db.id for execution_db in execution_dbs]
+        liveaction_ids = [execution_db.liveaction['id'] for execution_db in execution_dbs
+                          if execution_db.liveaction and execution_db.liveaction.get('id')]
+
+        deleted_count = ActionExecution.delete_by_query(id__in=execution_ids)
+
+        if liveaction_ids:
+            LiveAction.delete_by_query(id__in=liveaction_ids)
+
+        ActionExecutionOutput.delete_by_query(
+            execution_id__in=[str(execution_id) for execution_id in execution_ids])
+
+        return deleted_count
+
+    # 1. Delete ActionExecutionDB objects together with the corresponding LiveActionDB and
+    # ActionExecutionOutputDB objects
+    purge_in_batches(logger=logger, resource='action_executions', model=ActionExecution,
+                     filters=exec_filters, purge_batch_func=purge_execution_batch,
+                     batch_size=batch_size, max_docs_per_second=max_docs_per_second,
+                     checkpoint=checkpoint, only_fields=['id', 'liveaction'])
+
+    # 2. Delete LiveActionDB objects which don't have a corresponding execution
+    purge_in_batches(logger=logger, resource='live_actions', model=LiveAction,
+                     filters=liveaction_filters, purge_batch_func=_delete_objects_batch(LiveAction),
+                     batch_size=batch_size, max_docs_per_second=max_docs_per_second,
+                     checkpoint=checkpoint)
+
+    # 3. Delete ActionExecutionResultDB objects which are not referenced anymore
+    if result_filters:
+        def purge_result_batch(result_dbs):
+            return _delete_unreferenced_results(result_dbs,
+                                                timestamp=result_filters['timestamp__lt'])
+
+        purge_in_batches(logger=logger, resource='action_execution_results',
+                         model=ActionExecutionResult, filters=result_filters,
+                         purge_batch_func=purge_result_batch,
+                         batch_size=batch_size, max_docs_per_second=max_docs_per_second,
+                         checkpoint=checkpoint, only_fields=['id', 'digest'])
+
+
+def _delete_objects_batch(model):
+    def delete_batch(object_dbs):
+        return model.delete_by_query(id__in=[object_db.id for object_db in object_dbs])
+
+    return delete_batch
+
+
+def _delete_unreferenced_results(result_dbs, timestamp):
+    """
+    Delete the provided results which are not referenced by any execution or liveaction.
+
+    Only results which are still older than the provided timestamp are deleted. Timestamp of a
+    result which has been stored again after the references have been checked is bumped so the
+    result is kept.
+
+    :rtype: ``int``
+    """
+    if not result_dbs:
+        return 0
+
+    referenced_digests = results_service.get_referenced_digests(
+        digests=[result_db.digest for result_db in result_dbs])
+    result_ids = [result_db.id for result_db in result_dbs
+                  if result_db.digest not in referenced_digests]
+
+    if not result_ids:
+        return 0
+
+    return ActionExecutionResult.delete_by_query(id__in=result_ids, timestamp__lt=timestamp)
+
+
 def purge_orphaned_workflow_executions(logger):
     """
     Purge workflow executions that are idled and identified as orphans.
@@ -13,9 +13,13 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+
+import functools
+
 from oslo_config import cfg
 
 from st2common.constants import action as action_constants
+from st2common.garbage_collection.batch import purge_in_batches
 from st2common.models.db.auth import UserDB
 from st2common.persistence.execution import ActionExecution
 from st2common.services import action as action_service
@@ -30,7 +34,7 @@ __all__ = [
 ]
 
 
-def purge_inquiries(logger):
+def purge_inquiries(logger, batch_size=None, max_docs_per_second=0):
     """Purge Inquiries that have exceeded their configured TTL
 
     At the moment, Inquiries do not have their own database model, so this function effectively
@@ -40,12 +44,28 @@ def purge_inquiries(logger):
     Then it will mark those that have a nonzero TTL have existed longer than their TTL as
     "timed out". It will then request that the parent workflow(s) resume, where the failure
     can be handled as the user desires.
-    """
 
-    # Get all existing Inquiries
+    If batch size is provided, Inquiries are retrieved and processed in batches of this size.
+    """
     filters = {'runner__name': 'inquirer', 'status': action_constants.LIVEACTION_STATUS_PENDING}
-    inquiries = list(ActionExecution.query(**filters))
 
+    if batch_size:
+        gc_count = purge_in_batches(logger=logger, resource='inquiries', model=ActionExecution,
+                                    filters=filters,
+                                    purge_batch_func=functools.partial(_timeout_inquiries,
+                                                                       logger),
+                                    batch_size=batch_size,
+                                    max_docs_per_second=max_docs_per_second,
+                                    only_fields=['id', 'result', 'start_timestamp', 'liveaction'])
+    else:
+        # Get all existing Inquiries
+        inquiries = list(ActionExecution.query(**filters))
+        gc_count = _timeout_inquiries(logger=logger, inquiries=inquiries)
+
+    logger.info('Marked %s ttl-expired Inquiries as "timed out".' % (gc_count))
+
+
+def _timeout_inquiries(logger, inquiries):
     gc_count = 0
 
     # Inspect each Inquiry, and determine if TTL is expired
@@ -85,4 +105,4 @@ def purge_inquiries(logger):
                     UserDB(cfg.CONF.system_user.user)
                 )
 
-    logger.info('Marked %s ttl-expired Inquiries as "timed out".' % (gc_count))
+    return gc_count
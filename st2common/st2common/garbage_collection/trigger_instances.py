@@ -21,6 +21,7 @@ from __future__ import absolute_import
 import six
 from mongoengine.errors import InvalidQueryError
 
+from st2common.garbage_collection.batch import purge_in_batches
 from st2common.persistence.trigger import TriggerInstance
 from st2common.util import isotime
 
@@ -29,10 +30,15 @@ __all__ = [
 ]
 
 
-def purge_trigger_instances(logger, timestamp):
+def purge_trigger_instances(logger, timestamp, batch_size=None, max_docs_per_second=0,
+                            checkpoint=None):
     """
     :param timestamp: Trigger instances older than this timestamp will be deleted.
     :type timestamp: ``datetime.datetime
+
+    :param batch_size: If provided, objects are deleted in batches of this size instead of using
+                       a single query.
+    :type batch_size: ``int``
     """
     if not timestamp:
         raise ValueError('Specify a valid timestamp to purge.')
@@ -42,6 +48,15 @@ def purge_trigger_instances(logger, timestamp):
 
     query_filters = {'occurrence_time__lt': isotime.parse(timestamp)}
 
+    if batch_size:
+        purge_in_batches(logger=logger, resource='trigger_instances', model=TriggerInstance,
+                         filters=query_filters, purge_batch_func=_delete_trigger_instances_batch,
+                         batch_size=batch_size, max_docs_per_second=max_docs_per_second,
+                         checkpoint=checkpoint)
+        logger.info('All trigger instance models older than timestamp %s were deleted.',
+                    timestamp)
+        return
+
     try:
         deleted_count = TriggerInstance.delete_by_query(**query_filters)
     except InvalidQueryError as e:
@@ -55,3 +70,7 @@ def purge_trigger_instances(logger, timestamp):
 
     # Print stats
     logger.info('All trigger instance models older than timestamp %s were deleted.', timestamp)
+
+
+def _delete_trigger_instances_batch(instance_dbs):
+    return TriggerInstance.delete_by_query(id__in=[instance_db.id for instance_db in instance_dbs])
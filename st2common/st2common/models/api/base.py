@@ -19,7 +19,9 @@ import six
 
 from oslo_config import cfg
 
+from st2common.models.db import stormbase
 from st2common.util import mongoescape as util_mongodb
+from st2common.util.ujson import fast_deepcopy
 from st2common import log as logging
 
 __all__ = [
@@ -76,13 +78,28 @@ class BaseAPI(object):
 
     @classmethod
     def _from_model(cls, model, mask_secrets=False):
-        doc = model.to_mongo()
+        # Result fields are retrieved using the field descriptor so results which are stored in
+        # a separate collection are resolved and results are not escaped and unescaped again
+        result_fields = [field for field in six.itervalues(model._fields)
+                         if isinstance(field, stormbase.ResultField)]
+
+        if result_fields:
+            doc = model.to_mongo(fields=[name for name, field in six.iteritems(model._fields)
+                                         if field not in result_fields])
+        else:
+            doc = model.to_mongo()
 
         if '_id' in doc:
             doc['id'] = str(doc.pop('_id'))
 
         doc = util_mongodb.unescape_chars(doc)
 
+        for field in result_fields:
+            value = getattr(model, field.name)
+
+            if value is not None:
+                doc[field.db_field] = fast_deepcopy(value)
+
         if mask_secrets and cfg.CONF.log.mask_secrets:
             doc = model.mask_secrets(value=doc)
 
@@ -22,12 +22,14 @@ import ssl as ssl_lib
 import six
 import mongoengine
 from mongoengine.queryset import visitor
+from oslo_config import cfg
 from pymongo import uri_parser
 from pymongo.errors import OperationFailure
 from pymongo.errors import ConnectionFailure
 
 from st2common import log as logging
 from st2common.util import isotime
+from st2common.util import mongoescape
 from st2common.util.misc import get_field_name_from_mongoengine_error
 from st2common.models.db import stormbase
 from st2common.models.utils.profiling import log_query_and_profile_data_for_queryset
@@ -64,6 +66,10 @@ INDEX_CLEANUP_MODEL_NAMES_BLACKLIST = [
     'PermissionGrantDB'
 ]
 
+# Key of the optional TTL index which is maintained for models which inherit from
+# TTLTimestampFieldMixin (see ensure_ttl_index)
+TTL_INDEX_KEY = [('ttl_timestamp', 1)]
+
 # Reference to DB model classes used for db_ensure_indexes
 # NOTE: This variable is populated lazily inside get_model_classes()
 MODEL_CLASSES = None
@@ -217,6 +223,9 @@ def db_ensure_indexes(model_classes=None):
         if removed_count:
             LOG.debug('Removed "%s" extra indexes for model "%s"' % (removed_count, class_name))
 
+        if issubclass(model_class, stormbase.TTLTimestampFieldMixin):
+            ensure_ttl_index(model_class=model_class)
+
     LOG.debug('Indexes are ensured for models: %s' %
               ', '.join(sorted((model_class.__name__ for model_class in model_classes))))
 
@@ -234,6 +243,10 @@ def cleanup_extra_indexes(model_class):
     removed_count = 0
     c = model_class._get_collection()
     for extra_index in extra_indexes:
+        # TTL index is not defined in the model meta and is maintained by ensure_ttl_index
+        if extra_index == TTL_INDEX_KEY:
+            continue
+
         try:
             c.drop_index(extra_index)
             LOG.debug('Dropped index %s for model %s.', extra_index, model_class.__name__)
@@ -244,6 +257,71 @@ def cleanup_extra_indexes(model_class):
     return removed_count
 
 
+def get_ttl_index_expire_after_seconds(model_class):
+    """
+    Return number of seconds after which documents of the provided model should be expired by the
+    TTL index or None if the TTL index is not enabled for this model.
+
+    :rtype: ``int``
+    """
+    if not cfg.CONF.garbagecollector.ttl_indexes:
+        return None
+
+    ttl_days = getattr(cfg.CONF.garbagecollector, model_class.TTL_OPTION_NAME, None)
+    if not ttl_days:
+        return None
+
+    if ttl_days < model_class.TTL_MINIMUM_DAYS:
+        LOG.warning('Not creating TTL index for model "%s" since "%s" is lower than the minimum '
+                    'possible TTL (%s days)' % (model_class.__name__,
+                                                model_class.TTL_OPTION_NAME,
+                                                model_class.TTL_MINIMUM_DAYS))
+        return None
+
+    return ttl_days * 24 * 60 * 60
+
+
+def ensure_ttl_index(model_class):
+    """
+    Create, update or drop the TTL index for the provided model so it matches the TTL which is
+    configured for the model in the garbage collector config.
+
+    :return: Number of seconds after which documents are expired or None if there is no TTL index.
+    :rtype: ``int``
+    """
+    class_name = model_class.__name__
+    expire_after_seconds = get_ttl_index_expire_after_seconds(model_class=model_class)
+
+    collection = model_class._get_collection()
+    existing_index = None
+    for index_name, info in six.iteritems(collection.index_information()):
+        if info['key'] == TTL_INDEX_KEY:
+            existing_index = (index_name, info)
+            break
+
+    if not expire_after_seconds:
+        if existing_index:
+            LOG.debug('Dropping TTL index for model "%s"' % (class_name))
+            collection.drop_index(existing_index[0])
+
+        return None
+
+    if not existing_index:
+        LOG.debug('Creating TTL index (%s seconds) for model "%s"' % (expire_after_seconds,
+                                                                       class_name))
+        collection.create_index(TTL_INDEX_KEY, expireAfterSeconds=expire_after_seconds,
+                                background=True)
+    elif existing_index[1].get('expireAfterSeconds', None) != expire_after_seconds:
+        # Note: Updating TTL using collMod is much cheaper than re-creating the index
+        LOG.debug('Updating TTL index (%s seconds) for model "%s"' % (expire_after_seconds,
+                                                                       class_name))
+        collection.database.command('collMod', collection.name,
+                                    index={'keyPattern': dict(TTL_INDEX_KEY),
+                                           'expireAfterSeconds': expire_after_seconds})
+
+    return expire_after_seconds
+
+
 def drop_obsolete_types_indexes(model_class):
     """
     Special class for droping offending "types" indexes for which support has
@@ -447,6 +525,15 @@ class MongoDBAccess(object):
         instance = self.model.objects.insert(instance)
         return self._undo_dict_field_escape(instance)
 
+    def insert_many(self, instances):
+        """
+        Insert multiple new instances using a single bulk write.
+
+        NOTE: Instances need to have ids assigned since they are not re-loaded from the database.
+        """
+        self.model.objects.insert(instances, load_bulk=False)
+        return [self._undo_dict_field_escape(instance) for instance in instances]
+
     def add_or_update(self, instance, validate=True):
         instance.save(validate=validate)
         return self._undo_dict_field_escape(instance)
@@ -467,6 +554,20 @@ class MongoDBAccess(object):
 
         return count
 
+    def update_by_query(self, query, **kwargs):
+        """
+        Update all the objects which match the provided query using a single write and return
+        number of updated objects.
+
+        :param query: Query filters.
+        :type query: ``dict``
+        """
+        qs = self.model.objects.filter(**query)
+        count = qs.update(**kwargs)
+        log_query_and_profile_data_for_queryset(queryset=qs)
+
+        return count
+
     def _undo_dict_field_escape(self, instance):
         for attr, field in six.iteritems(instance._fields):
             if isinstance(field, stormbase.EscapedDictField):
@@ -582,6 +683,54 @@ class ChangeRevisionMongoDBAccess(MongoDBAccess):
 
             return self._undo_dict_field_escape(instance)
 
+    def partial_update(self, instance, field_updates=None):
+        """
+        Write only the fields of an existing object which have changed since it has been loaded
+        (or saved) using a single conditional update. Unlike save, the whole document doesn't
+        need to be serialized and written.
+
+        :param field_updates: Optional granular updates for the changed fields (e.g. only the
+                              changed items of a large dictionary field). Dictionary with field
+                              name as a key and a dictionary of path (``tuple`` of keys / list
+                              indexes relative to the field) to the new value as a value.
+        :type field_updates: ``dict``
+        """
+        if not hasattr(instance, 'id') or not instance.id:
+            return self.insert(instance)
+
+        field_updates = field_updates or {}
+
+        changed_fields = set([path.split('.')[0] for path in instance._get_changed_fields()])
+        set_data = {}
+
+        for db_field_name in changed_fields:
+            name = instance._reverse_db_field_map.get(db_field_name, db_field_name)
+            field = instance._fields[name]
+
+            if name not in field_updates:
+                set_data[db_field_name] = field.to_mongo(getattr(instance, name))
+                continue
+
+            for path, value in six.iteritems(field_updates[name]):
+                path = [mongoescape.escape_key(str(key)) for key in path]
+                path = '.'.join([db_field_name] + path)
+
+                # Wrap the value so the same escaping is used for nested dicts and lists
+                set_data[path] = field.to_mongo({'value': value})['value']
+
+        save_condition = {'_id': instance.id, 'rev': instance.rev}
+        set_data['rev'] = instance.rev + 1
+
+        result = self.model._get_collection().update_one(save_condition, {'$set': set_data})
+
+        if not result.matched_count:
+            raise db_exc.StackStormDBObjectWriteConflictError(instance)
+
+        instance.rev = instance.rev + 1
+        instance._clear_changed_fields()
+
+        return instance
+
 
 def get_host_names_for_uri_dict(uri_dict):
     hosts = []
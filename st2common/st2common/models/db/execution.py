@@ -18,6 +18,9 @@ import copy
 import mongoengine as me
 
 from st2common import log as logging
+from st2common.constants.action import LIVEACTION_COMPLETED_STATES
+from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS
+from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS_EXECUTION_OUTPUT
 from st2common.models.db import stormbase
 from st2common.fields import ComplexDateTimeField
 from st2common.util import date as date_utils
@@ -28,16 +31,19 @@ from st2common.constants.types import ResourceType
 
 __all__ = [
     'ActionExecutionDB',
-    'ActionExecutionOutputDB'
+    'ActionExecutionOutputDB',
+    'ActionExecutionResultDB'
 ]
 
 
 LOG = logging.getLogger(__name__)
 
 
-class ActionExecutionDB(stormbase.StormFoundationDB):
+class ActionExecutionDB(stormbase.StormFoundationDB, stormbase.TTLTimestampFieldMixin):
     RESOURCE_TYPE = ResourceType.EXECUTION
     UID_FIELDS = ['id']
+    TTL_OPTION_NAME = 'action_executions_ttl'
+    TTL_MINIMUM_DAYS = MINIMUM_TTL_DAYS
 
     trigger = stormbase.EscapedDictField()
     trigger_type = stormbase.EscapedDictField()
@@ -61,7 +67,7 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
     parameters = stormbase.EscapedDynamicField(
         default={},
         help_text='The key-value pairs passed as to the action runner & action.')
-    result = stormbase.EscapedDynamicField(
+    result = stormbase.ResultField(
         default={},
         help_text='Action defined result.')
     context = me.DictField(
@@ -91,15 +97,26 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
             {'fields': ['context.user']},
             {'fields': ['-start_timestamp', 'action.ref', 'status']},
             {'fields': ['workflow_execution']},
-            {'fields': ['task_execution']}
+            {'fields': ['task_execution']},
+            {'fields': [stormbase.RESULT_REFERENCE_FIELD], 'sparse': True}
         ]
     }
 
+    def clean(self):
+        self.ttl_timestamp = self.get_ttl_timestamp()
+
     def get_uid(self):
         # TODO Construct od from non id field:
         uid = [self.RESOURCE_TYPE, str(self.id)]
         return ':'.join(uid)
 
+    def get_ttl_timestamp(self):
+        # Only completed executions are expired
+        if self.status in LIVEACTION_COMPLETED_STATES:
+            return self.end_timestamp
+
+        return None
+
     def mask_secrets(self, value):
         result = copy.deepcopy(value)
 
@@ -157,7 +174,7 @@ class ActionExecutionDB(stormbase.StormFoundationDB):
         return serializable_dict['parameters']
 
 
-class ActionExecutionOutputDB(stormbase.StormFoundationDB):
+class ActionExecutionOutputDB(stormbase.StormFoundationDB, stormbase.TTLTimestampFieldMixin):
     """
     Stores output of a particular execution.
 
@@ -173,6 +190,9 @@ class ActionExecutionOutputDB(stormbase.StormFoundationDB):
         data: Actual output data. This could either be line, chunk or similar, depending on the
               runner.
     """
+    TTL_OPTION_NAME = 'action_executions_output_ttl'
+    TTL_MINIMUM_DAYS = MINIMUM_TTL_DAYS_EXECUTION_OUTPUT
+
     execution_id = me.StringField(required=True)
     action_ref = me.StringField(required=True)
     runner_ref = me.StringField(required=True)
@@ -192,5 +212,42 @@ class ActionExecutionOutputDB(stormbase.StormFoundationDB):
         ]
     }
 
+    def __init__(self, *args, **values):
+        super(ActionExecutionOutputDB, self).__init__(*args, **values)
+        self.ttl_timestamp = self.get_ttl_timestamp()
+
+    def get_ttl_timestamp(self):
+        return self.timestamp
+
+
+class ActionExecutionResultDB(stormbase.StormFoundationDB):
+    """
+    Stores a large action execution result outside of the execution and liveaction documents
+    (see st2common.services.results).
+
+    NOTE: Results are shared by all the documents which reference them so they are not expired
+    using a TTL index, they are purged by the garbage collector once they are not referenced
+    anymore.
+
+    Attribute:
+        digest: SHA1 digest of the serialized result. Results are content addressed so the same
+                result (e.g. liveaction and execution result) is only stored once.
+        compression: Compression used for the data.
+        size: Size of the serialized result before compression (in bytes).
+        data: Compressed result serialized as JSON.
+        timestamp: Timestamp when the result has last been stored.
+    """
+    digest = me.StringField(required=True, unique=True)
+    compression = me.StringField(required=True)
+    size = me.IntField(min_value=0)
+    data = me.BinaryField(required=True)
+    timestamp = ComplexDateTimeField(default=date_utils.get_datetime_utc_now)
+
+    meta = {
+        'indexes': [
+            {'fields': ['timestamp']}
+        ]
+    }
+
 
-MODELS = [ActionExecutionDB, ActionExecutionOutputDB]
+MODELS = [ActionExecutionDB, ActionExecutionOutputDB, ActionExecutionResultDB]
@@ -58,6 +58,8 @@ class ActionExecutionSchedulingQueueItemDB(stormbase.StormFoundationDB,
     handling = me.BooleanField(default=False,
         help_text='Flag indicating if this item is currently being handled / '
                    'processed by a scheduler service')
+    claim_id = me.StringField(
+        help_text='Id of the batch claim which marked this item as being handled')
 
     meta = {
         'indexes': [
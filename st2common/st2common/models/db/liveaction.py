@@ -18,6 +18,8 @@ import copy
 import mongoengine as me
 
 from st2common import log as logging
+from st2common.constants.action import LIVEACTION_COMPLETED_STATES
+from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS
 from st2common.models.db import MongoDBAccess
 from st2common.models.db import stormbase
 from st2common.models.db.notification import NotificationSchema
@@ -35,7 +37,10 @@ LOG = logging.getLogger(__name__)
 PACK_SEPARATOR = '.'
 
 
-class LiveActionDB(stormbase.StormFoundationDB):
+class LiveActionDB(stormbase.StormFoundationDB, stormbase.TTLTimestampFieldMixin):
+    TTL_OPTION_NAME = 'action_executions_ttl'
+    TTL_MINIMUM_DAYS = MINIMUM_TTL_DAYS
+
     workflow_execution = me.StringField()
     task_execution = me.StringField()
     # TODO: Can status be an enum at the Mongo layer?
@@ -56,7 +61,7 @@ class LiveActionDB(stormbase.StormFoundationDB):
     parameters = stormbase.EscapedDynamicField(
         default={},
         help_text='The key-value pairs passed as to the action runner & execution.')
-    result = stormbase.EscapedDynamicField(
+    result = stormbase.ResultField(
         default={},
         help_text='Action defined result.')
     context = me.DictField(
@@ -83,10 +88,21 @@ class LiveActionDB(stormbase.StormFoundationDB):
             {'fields': ['status']},
             {'fields': ['context.trigger_instance.id']},
             {'fields': ['workflow_execution']},
-            {'fields': ['task_execution']}
+            {'fields': ['task_execution']},
+            {'fields': [stormbase.RESULT_REFERENCE_FIELD], 'sparse': True}
         ]
     }
 
+    def clean(self):
+        self.ttl_timestamp = self.get_ttl_timestamp()
+
+    def get_ttl_timestamp(self):
+        # Only completed live actions are expired
+        if self.status in LIVEACTION_COMPLETED_STATES:
+            return self.end_timestamp
+
+        return None
+
     def mask_secrets(self, value):
         from st2common.util import action_db
 
@@ -32,16 +32,28 @@ __all__ = [
 
     'EscapedDictField',
     'EscapedDynamicField',
+    'ResultField',
     'TagField',
 
     'RefFieldMixin',
     'UIDFieldMixin',
     'TagsMixin',
-    'ContentPackResourceMixin'
+    'ContentPackResourceMixin',
+    'TTLTimestampFieldMixin'
 ]
 
 JSON_UNFRIENDLY_TYPES = (datetime.datetime, bson.ObjectId, me.EmbeddedDocument)
 
+# Fields which are only used internally by the database layer and are not serialized
+INTERNAL_FIELD_NAMES = ['ttl_timestamp']
+
+# Key of the single item dictionary which references a result stored in a separate collection
+# (see ResultField)
+RESULT_REFERENCE_KEY = '__result_ref'
+
+# Path of the result reference in the documents which store the result in the "result" field
+RESULT_REFERENCE_FIELD = 'result.%s' % (RESULT_REFERENCE_KEY)
+
 
 class StormFoundationDB(me.Document, DictSerializableClassMixin):
     """
@@ -97,6 +109,9 @@ class StormFoundationDB(me.Document, DictSerializableClassMixin):
         """
         serializable_dict = {}
         for k in sorted(six.iterkeys(self._fields)):
+            if k in INTERNAL_FIELD_NAMES:
+                continue
+
             v = getattr(self, k)
             v = str(v) if isinstance(v, JSON_UNFRIENDLY_TYPES) else v
             serializable_dict[k] = v
@@ -106,6 +121,17 @@ class StormFoundationDB(me.Document, DictSerializableClassMixin):
 
         return serializable_dict
 
+    def to_mongo(self, use_db_field=True, fields=None):
+        root_fields = set([field.split('.')[0] for field in fields or []])
+
+        # Large results are stored before the document is serialized and replaced with a
+        # reference so later serializations (e.g. message bus payloads) only contain the reference
+        for name, field in six.iteritems(self._fields):
+            if isinstance(field, ResultField) and (not root_fields or name in root_fields):
+                field.store(instance=self)
+
+        return super(StormFoundationDB, self).to_mongo(use_db_field=use_db_field, fields=fields)
+
 
 class StormBaseDB(StormFoundationDB):
     """Abstraction for a user content model."""
@@ -150,6 +176,75 @@ class EscapedDynamicField(me.DynamicField):
         return mongoescape.unescape_chars(value)
 
 
+class ResultField(EscapedDynamicField):
+    """
+    Field for (potentially large) execution results.
+
+    Results which are larger than the configured threshold are stored in a separate collection
+    and only a reference is stored in the document (see ``st2common.services.results``). The
+    referenced result is retrieved on first access.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        # Late import to avoid import cycles
+        from st2common.services.results import ResultReference
+
+        value = instance._data.get(self.name)
+
+        if isinstance(value, ResultReference):
+            return value.get_value()
+
+        return value
+
+    def store(self, instance):
+        """
+        Store the result of the provided document in the results collection if it's larger than
+        the configured threshold and replace it with a reference which resolves to the result.
+        """
+        # Late import to avoid import cycles
+        from st2common.services import results as results_service
+
+        value = instance._data.get(self.name)
+
+        if value is None or results_service.is_result_reference(value):
+            return
+
+        reference = results_service.store_result(value)
+
+        if reference is not None:
+            reference.set_value(value)
+            instance._data[self.name] = reference
+
+    def to_mongo(self, value, use_db_field=True, fields=None):
+        # Late import to avoid import cycles
+        from st2common.services import results as results_service
+
+        if results_service.is_result_reference(value):
+            return dict(value)
+
+        reference = results_service.store_result(value)
+
+        if reference is not None:
+            return dict(reference)
+
+        return super(ResultField, self).to_mongo(value=value, use_db_field=use_db_field,
+                                                 fields=fields)
+
+    def to_python(self, value):
+        # Late import to avoid import cycles
+        from st2common.services import results as results_service
+
+        reference = results_service.get_result_reference(value)
+
+        if reference is not None:
+            return reference
+
+        return super(ResultField, self).to_python(value)
+
+
 class TagField(me.EmbeddedDocument):
     """
     To be attached to a db model object for the purpose of providing supplemental
@@ -298,3 +393,31 @@ class ChangeRevisionFieldMixin(object):
                 'unique': True
             }
         ]
+
+
+class TTLTimestampFieldMixin(object):
+    """
+    Mixin class which adds "ttl_timestamp" field to the class inheriting from it.
+
+    This field stores a native date (ComplexDateTimeField values are stored as integers) which is
+    used by the optional MongoDB TTL index. Documents are expired by MongoDB once the configured
+    number of days has passed since this timestamp. Documents without this field are never
+    expired by the TTL index.
+    """
+
+    # Name of the "garbagecollector" config option which contains the TTL in days
+    TTL_OPTION_NAME = abc.abstractproperty
+
+    # Minimum TTL in days for which the TTL index is created
+    TTL_MINIMUM_DAYS = abc.abstractproperty
+
+    ttl_timestamp = me.DateTimeField()
+
+    def get_ttl_timestamp(self):
+        """
+        Return timestamp from which the document expiration is calculated or None if the
+        document should not be expired (yet).
+
+        :rtype: ``datetime.datetime``
+        """
+        raise NotImplementedError('get_ttl_timestamp() not implemented')
@@ -20,6 +20,7 @@ import mongoengine as me
 
 from st2common.models.db import MongoDBAccess
 from st2common.models.db import stormbase
+from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS
 from st2common.constants.types import ResourceType
 
 __all__ = [
@@ -118,13 +119,16 @@ class TriggerDB(stormbase.StormBaseDB, stormbase.ContentPackResourceMixin,
         return len(parts) == len(self.UID_FIELDS) + 1 + 1
 
 
-class TriggerInstanceDB(stormbase.StormFoundationDB):
+class TriggerInstanceDB(stormbase.StormFoundationDB, stormbase.TTLTimestampFieldMixin):
     """An instance or occurrence of a type of Trigger.
     Attribute:
         trigger: Reference to the Trigger object.
         payload (dict): payload specific to the occurrence.
         occurrence_time (datetime): time of occurrence of the trigger.
     """
+    TTL_OPTION_NAME = 'trigger_instances_ttl'
+    TTL_MINIMUM_DAYS = MINIMUM_TTL_DAYS
+
     trigger = me.StringField()
     payload = stormbase.EscapedDictField()
     occurrence_time = me.DateTimeField()
@@ -141,6 +145,12 @@ class TriggerInstanceDB(stormbase.StormFoundationDB):
         ]
     }
 
+    def clean(self):
+        self.ttl_timestamp = self.get_ttl_timestamp()
+
+    def get_ttl_timestamp(self):
+        return self.occurrence_time
+
 
 # specialized access objects
 triggertype_access = MongoDBAccess(TriggerTypeDB)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+from st2common import transport
 from st2common.models.db.action import action_access
 from st2common.persistence import base as persistence
 from st2common.persistence.actionalias import ActionAlias
@@ -33,7 +34,14 @@ __all__ = [
 
 class Action(persistence.ContentPackResource):
     impl = action_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
+
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.resource.ActionCUDPublisher()
+        return cls.publisher
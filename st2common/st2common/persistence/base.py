@@ -15,6 +15,7 @@
 from __future__ import absolute_import
 import abc
 
+import bson
 import six
 
 from st2common import log as logging
@@ -161,6 +162,40 @@ class Access(object):
 
         return model_object
 
+    @classmethod
+    def insert_many(cls, model_objects, publish=True, dispatch_trigger=True):
+        """
+        Insert multiple new objects using a single bulk write. Ids are generated on the client
+        side for objects which don't have one assigned yet.
+
+        :rtype: ``list``
+        """
+        if not model_objects:
+            return []
+
+        for model_object in model_objects:
+            if not model_object.id:
+                model_object.id = bson.ObjectId()
+
+        model_objects = cls._get_impl().insert_many(model_objects)
+
+        for model_object in model_objects:
+            # Publish internal event on the message bus
+            if publish:
+                try:
+                    cls.publish_create(model_object)
+                except:
+                    LOG.exception('Publish failed.')
+
+            # Dispatch trigger
+            if dispatch_trigger:
+                try:
+                    cls.dispatch_create_trigger(model_object)
+                except:
+                    LOG.exception('Trigger dispatch failed.')
+
+        return model_objects
+
     @classmethod
     def add_or_update(cls, model_object, publish=True, dispatch_trigger=True, validate=True,
                       log_not_unique_error_as_debug=False):
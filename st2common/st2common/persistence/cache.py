@@ -0,0 +1,322 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide read-through cache of content pack resources which change rarely, but are retrieved
+from the database for each trigger instance and execution (actions, runner types, triggers,
+trigger types and policies).
+
+The cache is only used by services which also listen for the resource CUD events and invalidate
+the cache (see ``enable_cache`` and ``get_cache_watcher``). When the cache is not enabled, the
+lookup functions in this module simply call the corresponding persistence layer method.
+
+NOTE: Cached objects are shared between all the callers so they must be treated as read-only.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import time
+
+from oslo_config import cfg
+
+from st2common import log as logging
+
+__all__ = [
+    'get_cache',
+    'enable_cache',
+    'disable_cache',
+    'get_cache_watcher',
+
+    'get_by_ref',
+    'get_by_name',
+    'query',
+
+    'ResourceCache'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Process wide resource cache. It's only used by services which also listen for resource CUD
+# events and invalidate the cache (see enable_cache).
+CACHE = None
+
+LOOKUP_REF = 'ref'
+LOOKUP_NAME = 'name'
+LOOKUP_QUERY = 'query'
+
+
+def _inc_metrics_counter(key):
+    # Late import to avoid import cycles and long module import times
+    from st2common.exceptions.plugins import PluginLoadError
+    from st2common.metrics.base import get_driver
+
+    try:
+        driver = get_driver()
+    except PluginLoadError:
+        # Metrics are not available (e.g. when used outside of a StackStorm service)
+        return
+
+    driver.inc_counter(key)
+
+
+def _get_resource_type(access_cls):
+    return access_cls._get_impl().model.RESOURCE_TYPE
+
+
+def get_cache():
+    """
+    Return process wide resource cache or None if the cache is not enabled.
+
+    :rtype: :class:`ResourceCache`
+    """
+    return CACHE
+
+
+def enable_cache():
+    """
+    Enable process wide resource cache.
+
+    NOTE: The caller is responsible for checking the service specific config option and for
+    invalidating the cache on resource CUD events (e.g. by using ``get_cache_watcher``).
+
+    :rtype: :class:`ResourceCache`
+    """
+    global CACHE
+
+    CACHE = ResourceCache(ttl=cfg.CONF.resource_cache.ttl, size=cfg.CONF.resource_cache.size)
+    return CACHE
+
+
+def disable_cache():
+    global CACHE
+    CACHE = None
+
+
+def get_cache_watcher(cache, queue_suffix):
+    """
+    Return watcher which invalidates the provided cache on resource CUD events.
+
+    :param queue_suffix: Suffix for the watch queue name (usually the name of the service).
+    :type queue_suffix: ``str``
+
+    :rtype: :class:`st2common.services.cudwatcher.CUDWatcher`
+    """
+    # Late import to avoid import cycles
+    from st2common.services.cudwatcher import CUDWatcher
+    from st2common.transport.reactor import TRIGGER_CUD_XCHG
+    from st2common.transport.reactor import TRIGGER_TYPE_CUD_XCHG
+    from st2common.transport.resource import ACTION_CUD_XCHG
+    from st2common.transport.resource import RUNNER_TYPE_CUD_XCHG
+    from st2common.transport.resource import POLICY_CUD_XCHG
+
+    exchanges = [ACTION_CUD_XCHG, RUNNER_TYPE_CUD_XCHG, TRIGGER_CUD_XCHG, TRIGGER_TYPE_CUD_XCHG,
+                 POLICY_CUD_XCHG]
+    return CUDWatcher(exchange=exchanges,
+                      create_handler=cache.invalidate,
+                      update_handler=cache.invalidate,
+                      delete_handler=cache.invalidate,
+                      queue_name_base='st2.resource.watch',
+                      queue_suffix=queue_suffix)
+
+
+def get_by_ref(access_cls, ref):
+    """
+    Retrieve resource by reference, using the process wide cache if it's enabled.
+
+    :param access_cls: Persistence layer class (e.g. :class:`st2common.persistence.action.Action`).
+    :type access_cls: :class:`st2common.persistence.base.Access`
+    """
+    if CACHE is None or not ref:
+        return access_cls.get_by_ref(ref)
+
+    return CACHE.get(resource_type=_get_resource_type(access_cls), lookup=LOOKUP_REF, value=ref,
+                     retrieve_func=lambda: access_cls.get_by_ref(ref))
+
+
+def get_by_name(access_cls, name):
+    """
+    Retrieve resource by name, using the process wide cache if it's enabled.
+
+    :type access_cls: :class:`st2common.persistence.base.Access`
+    """
+    if CACHE is None:
+        return access_cls.get_by_name(name)
+
+    return CACHE.get(resource_type=_get_resource_type(access_cls), lookup=LOOKUP_NAME, value=name,
+                     retrieve_func=lambda: access_cls.get_by_name(name))
+
+
+def query(access_cls, **filters):
+    """
+    Retrieve a list of resources which match the provided filters, using the process wide cache
+    if it's enabled. Filter values need to be hashable.
+
+    :type access_cls: :class:`st2common.persistence.base.Access`
+
+    :rtype: ``list``
+    """
+    if CACHE is None:
+        return list(access_cls.query(**filters))
+
+    value = tuple(sorted(filters.items()))
+    return CACHE.get(resource_type=_get_resource_type(access_cls), lookup=LOOKUP_QUERY,
+                     value=value, retrieve_func=lambda: list(access_cls.query(**filters)))
+
+
+class ResourceCache(object):
+    """
+    Bounded, process local LRU cache of content pack resources.
+
+    Items are cached for up to "ttl" seconds and removed when a CUD event is received for a
+    resource which is included in the cached result (see ``invalidate``). Lookups which didn't
+    return anything are not cached.
+
+    Cache hits and misses are counted and reported to the metrics driver as
+    "resource_cache.<resource type>.hit" and "resource_cache.<resource type>.miss" counters.
+    """
+
+    def __init__(self, ttl=300, size=1000):
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+        # (resource type, lookup, value) -> (expire time, result, resource ids)
+        self._items = collections.OrderedDict()
+
+        # (resource type, resource id) -> set of item keys which include this resource. Used to
+        # also invalidate results of the lookups by the old reference when a resource is renamed.
+        self._keys_by_id = collections.defaultdict(set)
+
+        # Incremented on each invalidation. Used to prevent storing results which were retrieved
+        # from the database before an invalidation which happened while the query was in progress.
+        self._generations = collections.defaultdict(int)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+
+        if not total:
+            return 0.0
+
+        return float(self.hits) / total
+
+    def get(self, resource_type, lookup, value, retrieve_func):
+        """
+        Return cached lookup result or call the provided function to retrieve it from the
+        database and cache it.
+
+        :param resource_type: Resource type (see ``st2common.constants.types.ResourceType``).
+        :type resource_type: ``str``
+
+        :param lookup: Lookup type (e.g. ref, name, query).
+        :type lookup: ``str``
+
+        :param retrieve_func: Function which retrieves the result from the database.
+        :type retrieve_func: ``callable``
+        """
+        key = (resource_type, lookup, value)
+        now = time.time()
+        item = self._items.pop(key, None)
+
+        if item and item[0] > now:
+            # Re-insert the item so it's moved to the end (most recently used)
+            self._items[key] = item
+            self.hits += 1
+            _inc_metrics_counter('resource_cache.%s.hit' % (resource_type))
+            return item[1]
+
+        if item:
+            self._remove_id_keys(key=key, resource_type=resource_type, resource_ids=item[2])
+
+        self.misses += 1
+        _inc_metrics_counter('resource_cache.%s.miss' % (resource_type))
+
+        generation = self._generations[resource_type]
+        result = retrieve_func()
+
+        if not result and lookup != LOOKUP_QUERY:
+            return result
+
+        if generation != self._generations[resource_type] or self.ttl <= 0:
+            return result
+
+        if isinstance(result, list):
+            resource_ids = [str(resource.id) for resource in result]
+        else:
+            resource_ids = [str(result.id)]
+
+        self._items[key] = (now + self.ttl, result, resource_ids)
+
+        for resource_id in resource_ids:
+            self._keys_by_id[(resource_type, resource_id)].add(key)
+
+        while len(self._items) > self.size:
+            evicted_key, evicted_item = self._items.popitem(last=False)
+            self._remove_id_keys(key=evicted_key, resource_type=evicted_key[0],
+                                 resource_ids=evicted_item[2])
+
+        return result
+
+    def invalidate(self, model_object):
+        """
+        Remove all the cached lookup results which include the provided resource and all the
+        cached query results for this resource type. This method is used as a handler for
+        resource CUD events.
+
+        :param model_object: DB model of the created, updated or deleted resource.
+        :type model_object: :class:`st2common.models.db.stormbase.StormFoundationDB`
+        """
+        resource_type = getattr(model_object, 'RESOURCE_TYPE', None)
+
+        if not resource_type:
+            return
+
+        LOG.debug('Invalidating resource cache items for %s "%s"', resource_type,
+                  getattr(model_object, 'id', None))
+
+        self._generations[resource_type] += 1
+
+        keys = self._keys_by_id.pop((resource_type, str(model_object.id)), set([]))
+        keys.update([key for key in self._items.keys()
+                     if key[0] == resource_type and key[1] == LOOKUP_QUERY])
+
+        for key in keys:
+            item = self._items.pop(key, None)
+
+            if item:
+                self._remove_id_keys(key=key, resource_type=resource_type, resource_ids=item[2])
+
+    def clear(self):
+        for resource_type in list(self._generations.keys()):
+            self._generations[resource_type] += 1
+
+        self._items.clear()
+        self._keys_by_id.clear()
+
+    def _remove_id_keys(self, key, resource_type, resource_ids):
+        for resource_id in resource_ids:
+            id_keys = self._keys_by_id.get((resource_type, resource_id), None)
+
+            if id_keys is None:
+                continue
+
+            id_keys.discard(key)
+
+            if not id_keys:
+                del self._keys_by_id[(resource_type, resource_id)]
+
+    def __len__(self):
+        return len(self._items)
@@ -17,11 +17,13 @@ from st2common import transport
 from st2common.models.db import MongoDBAccess
 from st2common.models.db.execution import ActionExecutionDB
 from st2common.models.db.execution import ActionExecutionOutputDB
+from st2common.models.db.execution import ActionExecutionResultDB
 from st2common.persistence.base import Access
 
 __all__ = [
     'ActionExecution',
     'ActionExecutionOutput',
+    'ActionExecutionResult'
 ]
 
 
@@ -60,3 +62,19 @@ class ActionExecutionOutput(Access):
     @classmethod
     def delete_by_query(cls, *args, **query):
         return cls._get_impl().delete_by_query(*args, **query)
+
+
+class ActionExecutionResult(Access):
+    impl = MongoDBAccess(ActionExecutionResultDB)
+
+    @classmethod
+    def _get_impl(cls):
+        return cls.impl
+
+    @classmethod
+    def delete_by_query(cls, *args, **query):
+        return cls._get_impl().delete_by_query(*args, **query)
+
+    @classmethod
+    def update_by_query(cls, query, **kwargs):
+        return cls._get_impl().update_by_query(query, **kwargs)
@@ -29,3 +29,7 @@ class ActionExecutionSchedulingQueue(persistence.Access):
     @classmethod
     def _get_impl(cls):
         return cls.impl
+
+    @classmethod
+    def update_by_query(cls, query, **kwargs):
+        return cls._get_impl().update_by_query(query, **kwargs)
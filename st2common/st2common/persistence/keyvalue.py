@@ -15,6 +15,7 @@
 from __future__ import absolute_import
 
 from st2common import log as logging
+from st2common import transport
 from st2common.constants.triggers import KEY_VALUE_PAIR_CREATE_TRIGGER
 from st2common.constants.triggers import KEY_VALUE_PAIR_UPDATE_TRIGGER
 from st2common.constants.triggers import KEY_VALUE_PAIR_VALUE_CHANGE_TRIGGER
@@ -120,6 +121,12 @@ class KeyValuePair(Access):
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.keyvalue.KeyValuePairCUDPublisher()
+        return cls.publisher
+
     @classmethod
     def _get_by_object(cls, object):
         # For KeyValuePair name is unique.
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+from st2common import transport
 from st2common.models.db import MongoDBAccess
 from st2common.models.db.policy import PolicyTypeReference, PolicyTypeDB, PolicyDB
 from st2common.persistence.base import Access, ContentPackResource
@@ -44,7 +45,14 @@ class PolicyType(Access):
 
 class Policy(ContentPackResource):
     impl = MongoDBAccess(PolicyDB)
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
+
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.resource.PolicyCUDPublisher()
+        return cls.publisher
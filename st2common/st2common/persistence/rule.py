@@ -13,17 +13,25 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+from st2common import transport
 from st2common.models.db.rule import rule_access, rule_type_access
 from st2common.persistence.base import Access, ContentPackResource
 
 
 class Rule(ContentPackResource):
     impl = rule_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.reactor.RuleCUDPublisher()
+        return cls.publisher
+
 
 class RuleType(Access):
     impl = rule_type_access
@@ -13,17 +13,25 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+from st2common import transport
 from st2common.persistence import base as persistence
 from st2common.models.db.runner import runnertype_access
 
 
 class RunnerType(persistence.Access):
     impl = runnertype_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.resource.RunnerTypeCUDPublisher()
+        return cls.publisher
+
     @classmethod
     def _get_by_object(cls, object):
         # For RunnerType name is unique.
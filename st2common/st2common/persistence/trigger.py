@@ -31,11 +31,18 @@ LOG = logging.getLogger(__name__)
 
 class TriggerType(ContentPackResource):
     impl = triggertype_access
+    publisher = None
 
     @classmethod
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def _get_publisher(cls):
+        if not cls.publisher:
+            cls.publisher = transport.reactor.TriggerTypeCUDPublisher()
+        return cls.publisher
+
 
 class Trigger(ContentPackResource):
     impl = trigger_access
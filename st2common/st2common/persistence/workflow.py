@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+from st2common import log as logging
 from st2common import transport
 from st2common.models import db
 from st2common.models.db import workflow as wf_db_models
@@ -25,6 +26,8 @@ __all__ = [
     'TaskExecution'
 ]
 
+LOG = logging.getLogger(__name__)
+
 
 class WorkflowExecution(persistence.StatusBasedResource):
     impl = db.ChangeRevisionMongoDBAccess(wf_db_models.WorkflowExecutionDB)
@@ -34,6 +37,35 @@ class WorkflowExecution(persistence.StatusBasedResource):
     def _get_impl(cls):
         return cls.impl
 
+    @classmethod
+    def partial_update(cls, model_object, field_updates=None, publish=True,
+                       dispatch_trigger=True):
+        """
+        Write only the changed fields of the workflow execution. Unlike update, the object is
+        not re-read from the database.
+
+        :param field_updates: Optional granular updates for the changed fields (see
+                              ``ChangeRevisionMongoDBAccess.partial_update``).
+        :type field_updates: ``dict``
+        """
+        model_object = cls._get_impl().partial_update(model_object, field_updates=field_updates)
+
+        # Publish internal event on the message bus
+        if publish:
+            try:
+                cls.publish_update(model_object)
+            except:
+                LOG.exception('Publish failed.')
+
+        # Dispatch trigger
+        if dispatch_trigger:
+            try:
+                cls.dispatch_update_trigger(model_object)
+            except:
+                LOG.exception('Trigger dispatch failed.')
+
+        return model_object
+
     @classmethod
     def _get_publisher(cls):
         if not cls.publisher:
@@ -14,8 +14,11 @@
 
 from __future__ import absolute_import
 import abc
+import hashlib
+import heapq
+import itertools
+import json
 import eventlet
-import six.moves.queue
 import six
 import time
 
@@ -24,6 +27,7 @@ from oslo_config import cfg
 from st2common import log as logging
 from st2common.constants import action as action_constants
 from st2common.exceptions import db as db_exc
+from st2common.metrics.base import get_driver
 from st2common.persistence.executionstate import ActionExecutionState
 from st2common.persistence.liveaction import LiveAction
 from st2common.runners import utils as runners_utils
@@ -34,7 +38,9 @@ LOG = logging.getLogger(__name__)
 
 __all__ = [
     'Querier',
-    'QueryContext'
+    'QueryContext',
+    'QuerySchedule',
+    'ScheduledQuery'
 ]
 
 
@@ -59,9 +65,14 @@ class Querier(object):
         self._empty_q_sleep_time = self._get_config_value('empty_q_sleep_time')
         self._no_workers_sleep_time = self._get_config_value('no_workers_sleep_time')
         self._query_interval = self._get_config_value('query_interval')
+        self._query_max_interval = max(self._get_config_value('query_max_interval') or 0,
+                                       self._query_interval)
+        self._query_backoff_factor = max(self._get_config_value('query_backoff_factor') or 1,
+                                         1)
         self._query_thread_pool_size = self._get_config_value('thread_pool_size')
-        self._query_contexts = six.moves.queue.Queue()
+        self._query_contexts = QuerySchedule()
         self._thread_pool = eventlet.GreenPool(self._query_thread_pool_size)
+        self._metrics_prefix = 'resultstracker.%s' % (self.__class__.__name__.lower())
         self._started = False
 
     def start(self):
@@ -72,14 +83,24 @@ class Querier(object):
             while self._thread_pool.free() <= 0:
                 eventlet.greenthread.sleep(self._no_workers_sleep_time)
             self._fire_queries()
-            eventlet.sleep(self._query_interval)
+
+            # Sleep until the next query is due. New queries are due after the base query
+            # interval so they are never picked up later than that.
+            delay = self._query_interval
+            next_query_time = self._query_contexts.get_next_query_time()
+            if next_query_time is not None:
+                delay = min(max(next_query_time - time.time(), 0), delay)
+            eventlet.sleep(delay)
 
     def add_queries(self, query_contexts=None):
         if query_contexts is None:
             query_contexts = []
         LOG.debug('Adding queries to querier: %s' % query_contexts)
         for query_context in query_contexts:
-            self._query_contexts.put((time.time(), query_context))
+            scheduled_query = ScheduledQuery(query_context=query_context,
+                                             last_query_time=time.time(),
+                                             interval=self._query_interval)
+            self._query_contexts.put(scheduled_query)
 
     def is_started(self):
         return self._started
@@ -89,32 +110,39 @@ class Querier(object):
             return
 
         now = time.time()
-        reschedule_queries = []
+        driver = get_driver()
 
-        while not self._query_contexts.empty() and self._thread_pool.free() > 0:
-            (last_query_time, query_context) = self._query_contexts.get_nowait()
-            if now - last_query_time < self._query_interval:
-                reschedule_queries.append((last_query_time, query_context))
-                continue
+        # Due queries are popped until there are none left unless the pool is full first, so the
+        # remaining queries only need to be counted in the latter case
+        while True:
+            if self._thread_pool.free() <= 0:
+                due_backlog = self._query_contexts.count_due(now=now)
+                break
+
+            scheduled_query = self._query_contexts.pop_due(now=now)
+
+            if not scheduled_query:
+                due_backlog = 0
+                break
+
+            driver.time('%s.query_delay' % (self._metrics_prefix),
+                        now - scheduled_query.next_query_time)
+
+            if not blocking:
+                self._thread_pool.spawn(self._query_and_save_results, scheduled_query)
+            # Add an option to block and execute the function directly for unit tests.
             else:
-                if not blocking:
-                    self._thread_pool.spawn(
-                        self._query_and_save_results,
-                        query_context,
-                        last_query_time
-                    )
-                # Add an option to block and execute the function directly for unit tests.
-                else:
-                    self._query_and_save_results(
-                        query_context,
-                        last_query_time
-                    )
-
-        for query in reschedule_queries:
-            self._query_contexts.put((query[0], query[1]))
-
-    def _query_and_save_results(self, query_context, last_query_time=None):
+                self._query_and_save_results(scheduled_query)
+
+        driver.set_gauge('%s.queries_in_flight' % (self._metrics_prefix),
+                         self._thread_pool.running())
+        driver.set_gauge('%s.due_backlog' % (self._metrics_prefix), due_backlog)
+        driver.set_gauge('%s.tracked_queries' % (self._metrics_prefix),
+                         self._query_contexts.qsize())
+
+    def _query_and_save_results(self, scheduled_query):
         this_query_time = time.time()
+        query_context = scheduled_query.query_context
         execution_id = query_context.execution_id
         actual_query_context = query_context.query_context
 
@@ -123,7 +151,7 @@ class Querier(object):
             (status, results) = self.query(
                 execution_id,
                 actual_query_context,
-                last_query_time=last_query_time
+                last_query_time=scheduled_query.last_query_time
             )
         except:
             LOG.exception('Failed querying results for liveaction_id %s.', execution_id)
@@ -131,10 +159,17 @@ class Querier(object):
                 self._delete_state_object(query_context)
                 LOG.debug('Removed state object %s.', query_context)
             return
+        finally:
+            get_driver().time('%s.query' % (self._metrics_prefix), time.time() - this_query_time)
+
+        # Results are only written if the execution state has changed since the last query
+        results_digest = self._get_results_digest(status, results)
+        state_changed = not results_digest or results_digest != scheduled_query.results_digest
 
         liveaction_db = None
         try:
-            liveaction_db = self._update_action_results(execution_id, status, results)
+            if state_changed:
+                liveaction_db = self._update_action_results(execution_id, status, results)
         except Exception:
             LOG.exception('Failed updating action results for liveaction_id %s', execution_id)
             if self.delete_state_object_on_error:
@@ -161,7 +196,29 @@ class Querier(object):
 
             return
 
-        self._query_contexts.put((this_query_time, query_context))
+        # Executions which state doesn't change are queried less and less often
+        if state_changed:
+            interval = self._query_interval
+        else:
+            interval = min(scheduled_query.interval * self._query_backoff_factor,
+                           self._query_max_interval)
+
+        self._query_contexts.put(ScheduledQuery(query_context=query_context,
+                                                last_query_time=this_query_time,
+                                                interval=interval,
+                                                results_digest=results_digest))
+
+    def _get_results_digest(self, status, results):
+        """
+        Return digest of the query results which is used to detect execution state changes or
+        None if the results can't be serialized.
+        """
+        try:
+            data = json.dumps([status, results], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
 
     def _update_action_results(self, execution_id, status, results):
         liveaction_db = LiveAction.get_by_id(execution_id)
@@ -221,8 +278,89 @@ class Querier(object):
         pass
 
     def print_stats(self):
-        LOG.info('\t --- Name: %s, pending queuries: %d', self.__class__.__name__,
-                 self._query_contexts.qsize())
+        LOG.info('\t --- Name: %s, pending queuries: %d, due queries: %d',
+                 self.__class__.__name__, self._query_contexts.qsize(),
+                 self._query_contexts.count_due(now=time.time()))
+
+
+class ScheduledQuery(object):
+    """
+    Query context with the scheduling information.
+    """
+
+    def __init__(self, query_context, last_query_time, interval, results_digest=None):
+        self.query_context = query_context
+        self.last_query_time = last_query_time
+        self.interval = interval
+        self.results_digest = results_digest
+
+    @property
+    def next_query_time(self):
+        return self.last_query_time + self.interval
+
+    def __repr__(self):
+        return ('<ScheduledQuery query_context=%s,last_query_time=%s,interval=%s>' %
+                (self.query_context, self.last_query_time, self.interval))
+
+
+class QuerySchedule(object):
+    """
+    Heap of scheduled queries ordered by the time the next query is due so only the due queries
+    are visited on each pass.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def put(self, scheduled_query):
+        # Counter is used so queries which are due at the same time are never compared
+        item = (scheduled_query.next_query_time, next(self._counter), scheduled_query)
+        heapq.heappush(self._heap, item)
+
+    def pop_due(self, now):
+        """
+        Remove and return the query which is due the earliest or None if no query is due yet.
+
+        :rtype: :class:`ScheduledQuery`
+        """
+        if not self._heap or self._heap[0][0] > now:
+            return None
+
+        return heapq.heappop(self._heap)[2]
+
+    def get_next_query_time(self):
+        """
+        Return the time the next query is due or None if there are no queries.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def count_due(self, now):
+        """
+        Return the number of queries which are due.
+
+        Only the due queries are visited since the children of a query which is not due yet are
+        not due either.
+        """
+        count = 0
+        indexes = [0]
+
+        while indexes:
+            index = indexes.pop()
+
+            if index >= len(self._heap) or self._heap[index][0] > now:
+                continue
+
+            count += 1
+            indexes.extend([2 * index + 1, 2 * index + 2])
+
+        return count
+
+    def empty(self):
+        return not self._heap
+
+    def qsize(self):
+        return len(self._heap)
 
 
 class QueryContext(object):
@@ -179,12 +179,16 @@ class Router(object):
         self.spec_resolver = None
         self.routes = routes.Mapper()
 
+        # Compiled request and response schema validators keyed by the operation id
+        self._validators = {}
+
     def add_spec(self, spec, transforms):
         info = spec.get('info', {})
         LOG.debug('Adding API: %s %s', info.get('title', 'untitled'), info.get('version', '0.0.0'))
 
         self.spec = spec
         self.spec_resolver = jsonschema.RefResolver('', self.spec)
+        self._validators = {}
 
         validate(copy.deepcopy(self.spec))
 
@@ -414,7 +418,9 @@ class Router(object):
                     data = data.decode('utf-8')
 
                 try:
-                    CustomValidator(schema, resolver=self.spec_resolver).validate(data)
+                    validator = self._get_validator(
+                        key=(endpoint['operationId'], 'request', name), schema=schema)
+                    validator.validate(data)
                 except (jsonschema.ValidationError, ValueError) as e:
                     raise exc.HTTPBadRequest(detail=getattr(e, 'message', six.text_type(e)),
                                              comment=traceback.format_exc())
@@ -568,7 +574,9 @@ class Router(object):
                      (response_spec_name, endpoint['operationId'], resp.status_code))
 
             try:
-                validator = CustomValidator(response_spec['schema'], resolver=self.spec_resolver)
+                validator = self._get_validator(
+                    key=(endpoint['operationId'], 'response', response_spec_name),
+                    schema=response_spec['schema'])
 
                 response_type = response_spec['schema'].get('type', 'json')
                 if response_type == 'string':
@@ -594,6 +602,19 @@ class Router(object):
         resp = self(req)
         return resp(environ, start_response)
 
+    def _get_validator(self, key, schema):
+        """
+        Return a validator for the provided schema. Validators are built once per operation and
+        reused for all the subsequent requests.
+        """
+        validator = self._validators.get(key, None)
+
+        if validator is None:
+            validator = CustomValidator(schema, resolver=self.spec_resolver)
+            self._validators[key] = validator
+
+        return validator
+
     def _get_model_instance(self, model_cls, data):
         try:
             instance = model_cls(**data)
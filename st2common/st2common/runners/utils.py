@@ -88,9 +88,10 @@ def get_logger_for_python_runner_action(action_name, log_level='debug'):
     """
     logger_name = 'actions.python.%s' % (action_name)
 
+    level_name = log_level.upper()
+    log_level_constant = getattr(stdlib_logging, level_name, stdlib_logging.DEBUG)
+
     if logger_name not in LOGGERS:
-        level_name = log_level.upper()
-        log_level_constant = getattr(stdlib_logging, level_name, stdlib_logging.DEBUG)
         logger = logging.getLogger(logger_name)
 
         console = stdlib_logging.StreamHandler()
@@ -105,6 +106,13 @@ def get_logger_for_python_runner_action(action_name, log_level='debug'):
     else:
         logger = LOGGERS[logger_name]
 
+        # Long running Python runner worker processes run the same action many times and
+        # each execution can use a different log level
+        logger.setLevel(log_level_constant)
+
+        for handler in logger.handlers:
+            handler.setLevel(log_level_constant)
+
     return logger
 
 
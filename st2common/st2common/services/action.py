@@ -15,6 +15,8 @@
 from __future__ import absolute_import
 import six
 
+from oslo_config import cfg
+
 from st2common import log as logging
 from st2common.constants import action as action_constants
 from st2common.exceptions import actionrunner as runner_exc
@@ -27,6 +29,7 @@ from st2common.models.db.execution import ActionExecutionOutputDB
 from st2common.runners import utils as runners_utils
 from st2common.services import executions
 from st2common.services import trace as trace_service
+from st2common.util import concurrency
 from st2common.util import date as date_utils
 from st2common.util import action_db as action_utils
 from st2common.util import schema as util_schema
@@ -34,6 +37,7 @@ from st2common.util import schema as util_schema
 
 __all__ = [
     'request',
+    'prepare_request',
     'create_request',
     'publish_request',
     'is_action_canceled_or_canceling',
@@ -42,10 +46,17 @@ __all__ = [
     'request_resume',
 
     'store_execution_output_data',
+    'flush_execution_output_data',
+
+    'ExecutionOutputBuffer'
 ]
 
 LOG = logging.getLogger(__name__)
 
+# Execution id -> output buffer of the executions which are running in this process (see
+# store_execution_output_data)
+OUTPUT_BUFFERS = {}
+
 
 def _get_immutable_params(parameters):
     if not parameters:
@@ -53,9 +64,10 @@ def _get_immutable_params(parameters):
     return [k for k, v in six.iteritems(parameters) if v.get('immutable', False)]
 
 
-def create_request(liveaction, action_db=None, runnertype_db=None):
+def prepare_request(liveaction, action_db=None, runnertype_db=None):
     """
-    Create an action execution.
+    Validate an action execution request and populate the liveaction attributes which are set
+    when a request is created. Nothing is written to the database.
 
     :param action_db: Action model to operate one. If not provided, one is retrieved from the
                       database using values from "liveaction".
@@ -65,13 +77,9 @@ def create_request(liveaction, action_db=None, runnertype_db=None):
                           database using values from "liveaction".
     :type runnertype_db: :class:`RunnerTypeDB`
 
-    :return: (liveaction, execution)
+    :return: (liveaction, action_db, runnertype_db)
     :rtype: tuple
     """
-    # We import this here to avoid conflicts w/ runners that might import this
-    # file since the runners don't have the config context by default.
-    from st2common.metrics.base import get_driver
-
     # Use the user context from the parent action execution. Subtasks in a workflow
     # action can be invoked by a system user and so we want to use the user context
     # from the original workflow action.
@@ -128,6 +136,32 @@ def create_request(liveaction, action_db=None, runnertype_db=None):
     # Set the "action_is_workflow" attribute
     liveaction.action_is_workflow = action_db.is_workflow()
 
+    return liveaction, action_db, runnertype_db
+
+
+def create_request(liveaction, action_db=None, runnertype_db=None):
+    """
+    Create an action execution.
+
+    :param action_db: Action model to operate one. If not provided, one is retrieved from the
+                      database using values from "liveaction".
+    :type action_db: :class:`ActionDB`
+
+    :param runnertype_db: Runner model to operate one. If not provided, one is retrieved from the
+                          database using values from "liveaction".
+    :type runnertype_db: :class:`RunnerTypeDB`
+
+    :return: (liveaction, execution)
+    :rtype: tuple
+    """
+    # We import this here to avoid conflicts w/ runners that might import this
+    # file since the runners don't have the config context by default.
+    from st2common.metrics.base import get_driver
+
+    liveaction, action_db, runnertype_db = prepare_request(liveaction=liveaction,
+                                                           action_db=action_db,
+                                                           runnertype_db=runnertype_db)
+
     # Publish creation after both liveaction and actionexecution are created.
     liveaction = LiveAction.add_or_update(liveaction, publish=False)
     # Get trace_db if it exists. This could throw. If it throws, we have to cleanup
@@ -431,6 +465,10 @@ def store_execution_output_data(execution_db, action_db, data, output_type='outp
                                 timestamp=None):
     """
     Store output from an execution as a new document in the collection.
+
+    If output buffering is enabled (actionrunner.stream_output_flush_interval), output is
+    buffered per execution and stored in batches (see :class:`ExecutionOutputBuffer`). In that
+    case, :func:`flush_execution_output_data` needs to be called once the execution has completed.
     """
     execution_id = str(execution_db.id)
     action_ref = action_db.ref
@@ -443,12 +481,40 @@ def store_execution_output_data(execution_db, action_db, data, output_type='outp
                                         timestamp=timestamp,
                                         output_type=output_type,
                                         data=data)
-    output_db = ActionExecutionOutput.add_or_update(output_db, publish=True,
-                                                    dispatch_trigger=False)
 
+    flush_interval = cfg.CONF.actionrunner.stream_output_flush_interval
+
+    if flush_interval <= 0:
+        output_db = ActionExecutionOutput.add_or_update(output_db, publish=True,
+                                                        dispatch_trigger=False)
+        return output_db
+
+    output_buffer = OUTPUT_BUFFERS.get(execution_id, None)
+
+    if not output_buffer:
+        flush_size = cfg.CONF.actionrunner.stream_output_flush_size
+        output_buffer = ExecutionOutputBuffer(execution_id=execution_id,
+                                              flush_interval=flush_interval,
+                                              flush_size=flush_size)
+        OUTPUT_BUFFERS[execution_id] = output_buffer
+
+    output_buffer.append(output_db)
     return output_db
 
 
+def flush_execution_output_data(execution_id):
+    """
+    Store all the buffered output of the provided execution.
+
+    This function needs to be called before the execution is marked as completed so the output
+    consumers receive all the output before the completion event.
+    """
+    output_buffer = OUTPUT_BUFFERS.pop(str(execution_id), None)
+
+    if output_buffer:
+        output_buffer.close()
+
+
 def is_children_active(liveaction_id):
     execution_db = ActionExecution.get(liveaction__id=str(liveaction_id))
 
@@ -470,6 +536,103 @@ def is_children_active(liveaction_id):
     return (not all(completed))
 
 
+class ExecutionOutputBuffer(object):
+    """
+    Buffer of the output of a single execution.
+
+    Buffered output is stored when the buffered data reaches "flush_size" bytes or "flush_interval"
+    seconds after the first output has been buffered, whichever comes first. Consecutive output
+    of the same type is coalesced into a single document which is published as a single message.
+    Documents are stored in order (using a single bulk insert per flush) so the output can be
+    reassembled by concatenating the documents in the insertion order, the same as when each line
+    is stored as a separate document.
+    """
+
+    def __init__(self, execution_id, flush_interval=0.5, flush_size=64 * 1024):
+        self.execution_id = execution_id
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+
+        self._output_dbs = []
+        self._size = 0
+
+        # Green thread which flushes the buffer once the flush interval has elapsed
+        self._flush_thread = None
+
+        # Held while the buffered output is being stored. Output which is buffered in the mean
+        # time is stored by the same flush.
+        self._flush_lock = concurrency.get_semaphore_class()()
+
+    def append(self, output_db):
+        self._output_dbs.append(output_db)
+        self._size += len(output_db.data or '')
+
+        if self._size >= self.flush_size:
+            self.flush()
+        elif not self._flush_thread:
+            self._flush_thread = concurrency.spawn(self._flush_after_interval)
+
+    def flush(self):
+        if self._flush_lock.locked():
+            return
+
+        with self._flush_lock:
+            self._store_buffered()
+
+    def close(self):
+        """
+        Store all the buffered output and stop the flush thread.
+        """
+        flush_thread = self._flush_thread
+        self._flush_thread = None
+
+        if flush_thread and not self._flush_lock.locked():
+            concurrency.kill(flush_thread)
+
+        # Wait for the flush which is in progress in a different green thread (if any) to finish
+        # and store the output which has been buffered after that flush has finished
+        with self._flush_lock:
+            self._store_buffered()
+
+    def _store_buffered(self):
+        while self._output_dbs:
+            output_dbs = self._output_dbs
+            self._output_dbs = []
+            self._size = 0
+
+            self._store(output_dbs=output_dbs)
+
+    def _flush_after_interval(self):
+        concurrency.sleep(self.flush_interval)
+
+        try:
+            self.flush()
+        finally:
+            self._flush_thread = None
+
+            # Remove idle buffer so buffers of executions which are not flushed explicitly don't
+            # accumulate
+            if not self._output_dbs and OUTPUT_BUFFERS.get(self.execution_id, None) is self:
+                del OUTPUT_BUFFERS[self.execution_id]
+
+    def _store(self, output_dbs):
+        coalesced_output_dbs = []
+
+        for output_db in output_dbs:
+            previous_output_db = coalesced_output_dbs[-1] if coalesced_output_dbs else None
+
+            if previous_output_db and previous_output_db.output_type == output_db.output_type:
+                previous_output_db.data = (previous_output_db.data or '') + (output_db.data or '')
+            else:
+                coalesced_output_dbs.append(output_db)
+
+        try:
+            ActionExecutionOutput.insert_many(coalesced_output_dbs, publish=True,
+                                              dispatch_trigger=False)
+        except Exception:
+            LOG.exception('Failed to store output of execution "%s".', self.execution_id)
+
+
 def _cleanup_liveaction(liveaction):
     try:
         LiveAction.delete(liveaction)
@@ -0,0 +1,183 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide registry of green threads which wait for a liveaction (e.g. a child execution of an
+action chain) to reach a completed or paused state.
+
+Waiters are woken up by the liveaction status events (see ``get_completion_watcher``) so callers
+don't need to poll the database in short intervals. Status events can be missed (e.g. if the
+message bus connection is lost) so callers should still check the database in longer intervals.
+"""
+
+from __future__ import absolute_import
+
+from six.moves import queue
+
+from st2common import log as logging
+from st2common.constants import action as action_constants
+from st2common.util import concurrency
+
+__all__ = [
+    'get_completion_registry',
+    'enable_completion_registry',
+    'disable_completion_registry',
+    'get_completion_watcher',
+
+    'CompletionRegistry',
+    'CompletionWaiter'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Process wide completion registry. It's only used by services which also listen for the
+# liveaction status events (see enable_completion_registry).
+COMPLETION_REGISTRY = None
+
+# Statuses on which the waiters are woken up
+COMPLETION_STATES = action_constants.LIVEACTION_COMPLETED_STATES + [
+    action_constants.LIVEACTION_STATUS_PAUSED,
+    action_constants.LIVEACTION_STATUS_PENDING
+]
+
+
+def get_completion_registry():
+    """
+    Return process wide completion registry or None if the registry is not enabled.
+
+    :rtype: :class:`CompletionRegistry`
+    """
+    return COMPLETION_REGISTRY
+
+
+def enable_completion_registry():
+    """
+    Enable process wide completion registry.
+
+    NOTE: The caller is responsible for notifying the registry about the liveaction status
+    changes (e.g. by using ``get_completion_watcher``).
+
+    :rtype: :class:`CompletionRegistry`
+    """
+    global COMPLETION_REGISTRY
+
+    COMPLETION_REGISTRY = CompletionRegistry()
+    return COMPLETION_REGISTRY
+
+
+def disable_completion_registry():
+    global COMPLETION_REGISTRY
+    COMPLETION_REGISTRY = None
+
+
+def get_completion_watcher(registry, queue_suffix):
+    """
+    Return watcher which wakes up the waiters in the provided registry on liveaction status
+    events.
+
+    :param queue_suffix: Suffix for the watch queue name (usually the name of the service).
+    :type queue_suffix: ``str``
+
+    :rtype: :class:`st2common.services.cudwatcher.StatusWatcher`
+    """
+    # Late import to avoid import cycles
+    from st2common.services.cudwatcher import StatusWatcher
+    from st2common.transport.liveaction import LIVEACTION_STATUS_MGMT_XCHG
+
+    return StatusWatcher(exchange=LIVEACTION_STATUS_MGMT_XCHG,
+                         handler=registry.notify,
+                         statuses=COMPLETION_STATES,
+                         queue_name_base='st2.liveaction.status.watch',
+                         queue_suffix=queue_suffix)
+
+
+class CompletionRegistry(object):
+    """
+    Registry of waiters keyed by the liveaction id.
+    """
+
+    def __init__(self):
+        # liveaction id -> list of waiters
+        self._waiters = {}
+
+    def register(self, liveaction_id):
+        """
+        Register and return a new waiter for the provided liveaction. Waiter should be used as a
+        context manager so it's removed from the registry once the caller is done waiting.
+
+        NOTE: Events which are published before the waiter is registered are not delivered to it
+        so the caller should check the liveaction status after registering the waiter.
+
+        :rtype: :class:`CompletionWaiter`
+        """
+        waiter = CompletionWaiter(registry=self, liveaction_id=str(liveaction_id))
+        self._waiters.setdefault(waiter.liveaction_id, []).append(waiter)
+        return waiter
+
+    def unregister(self, waiter):
+        waiters = self._waiters.get(waiter.liveaction_id, [])
+
+        if waiter in waiters:
+            waiters.remove(waiter)
+
+        if not waiters:
+            self._waiters.pop(waiter.liveaction_id, None)
+
+    def notify(self, liveaction_db):
+        """
+        Wake up all the waiters for the provided liveaction. This method is used as a handler for
+        liveaction status events.
+
+        :type liveaction_db: :class:`LiveActionDB`
+        """
+        waiters = self._waiters.get(str(liveaction_db.id), [])
+
+        for waiter in list(waiters):
+            waiter.notify(liveaction_db.status)
+
+        if waiters:
+            LOG.debug('Notified %s waiters for liveaction "%s" with status "%s".',
+                      len(waiters), liveaction_db.id, liveaction_db.status)
+
+    def __len__(self):
+        return sum([len(waiters) for waiters in self._waiters.values()])
+
+
+class CompletionWaiter(object):
+    def __init__(self, registry, liveaction_id):
+        self.liveaction_id = liveaction_id
+
+        self._registry = registry
+        self._statuses = concurrency.get_queue_class()()
+
+    def notify(self, status):
+        self._statuses.put(status)
+
+    def wait(self, timeout):
+        """
+        Wait until a status event is received or the timeout expires.
+
+        :return: Status from the received event or None if the timeout has expired.
+        :rtype: ``str``
+        """
+        try:
+            return self._statuses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._registry.unregister(self)
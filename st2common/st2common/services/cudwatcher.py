@@ -0,0 +1,168 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Generic watcher which listens for CUD (create, update, delete) events on a resource exchange and
+calls the provided handler functions.
+
+It's primarily used to invalidate in-memory caches of resources which are kept by long running
+services (e.g. compiled rule index in the rules engine).
+"""
+
+from __future__ import absolute_import
+
+import six
+from kombu import Queue
+from kombu import binding
+from kombu.mixins import ConsumerMixin
+
+from st2common import log as logging
+from st2common.transport import publishers
+from st2common.transport import serializers
+from st2common.transport import utils as transport_utils
+from st2common.util import concurrency
+import st2common.util.queues as queue_utils
+
+__all__ = [
+    'CUDWatcher',
+    'StatusWatcher'
+]
+
+LOG = logging.getLogger(__name__)
+
+
+class CUDWatcher(ConsumerMixin):
+
+    def __init__(self, exchange, create_handler, update_handler, delete_handler,
+                 queue_name_base, queue_suffix):
+        """
+        :param exchange: Exchange on which the resource CUD events are published. If a list of
+                         exchanges is provided, a single watch queue is bound to all of them.
+        :type exchange: :class:`kombu.Exchange` or ``list`` of :class:`kombu.Exchange`
+
+        :param create_handler: Function which is called on resource create event.
+        :type create_handler: ``callable``
+
+        :param update_handler: Function which is called on resource update event.
+        :type update_handler: ``callable``
+
+        :param delete_handler: Function which is called on resource delete event.
+        :type delete_handler: ``callable``
+
+        :param queue_name_base: Base name for the exclusive watch queue.
+        :type queue_name_base: ``str``
+
+        :param queue_suffix: Queue name suffix (usually a service name). Random UUID is appended
+                             to it so each watcher gets its own queue.
+        :type queue_suffix: ``str``
+        """
+        self._exchange = exchange
+        self._watch_q = self._get_queue(exchange=exchange, queue_name_base=queue_name_base,
+                                        queue_suffix=queue_suffix)
+
+        self.connection = None
+        self._updates_thread = None
+
+        self._handlers = {
+            publishers.CREATE_RK: create_handler,
+            publishers.UPDATE_RK: update_handler,
+            publishers.DELETE_RK: delete_handler
+        }
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self._watch_q],
+                         accept=serializers.ACCEPT_CONTENT,
+                         callbacks=[self.process_task])]
+
+    def process_task(self, body, message):
+        LOG.debug('process_task')
+        LOG.debug('     body: %s', body)
+        LOG.debug('     message.properties: %s', message.properties)
+        LOG.debug('     message.delivery_info: %s', message.delivery_info)
+
+        routing_key = message.delivery_info.get('routing_key', '')
+        handler = self._handlers.get(routing_key, None)
+
+        try:
+            if not handler:
+                LOG.debug('Skipping message %s as no handler was found.', message)
+                return
+
+            try:
+                handler(body)
+            except Exception as e:
+                LOG.exception('Handling failed. Message body: %s. Exception: %s',
+                              body, six.text_type(e))
+        finally:
+            message.ack()
+
+    @property
+    def exchange_name(self):
+        if isinstance(self._exchange, (list, tuple)):
+            return ', '.join([exchange.name for exchange in self._exchange])
+
+        return self._exchange.name
+
+    def start(self):
+        try:
+            self.connection = transport_utils.get_connection()
+            self._updates_thread = concurrency.spawn(self.run)
+        except:
+            LOG.exception('Failed to start watcher for exchange "%s".', self.exchange_name)
+            self.connection.release()
+
+    def stop(self):
+        LOG.debug('Shutting down watcher for exchange "%s".', self.exchange_name)
+        try:
+            if self._updates_thread:
+                self._updates_thread = concurrency.kill(self._updates_thread)
+        finally:
+            if self.connection:
+                self.connection.release()
+
+    @staticmethod
+    def _get_queue(exchange, queue_name_base, queue_suffix):
+        queue_name = queue_utils.get_queue_name(queue_name_base=queue_name_base,
+                                                queue_name_suffix=queue_suffix,
+                                                add_random_uuid_to_suffix=True)
+
+        if isinstance(exchange, (list, tuple)):
+            bindings = [binding(item, routing_key='#') for item in exchange]
+            return Queue(queue_name, bindings=bindings, exclusive=True, auto_delete=True)
+
+        return Queue(queue_name, exchange, routing_key='#', exclusive=True, auto_delete=True)
+
+
+class StatusWatcher(CUDWatcher):
+    """
+    Watcher which listens for resource status events published on a state exchange (see
+    ``StatePublisherMixin``) and calls the provided handler for each of the provided statuses.
+    """
+
+    def __init__(self, exchange, handler, statuses, queue_name_base, queue_suffix):
+        """
+        :param handler: Function which is called on a resource status event.
+        :type handler: ``callable``
+
+        :param statuses: Statuses (routing keys) for which the handler is called.
+        :type statuses: ``list`` of ``str``
+        """
+        super(StatusWatcher, self).__init__(exchange=exchange,
+                                            create_handler=None,
+                                            update_handler=None,
+                                            delete_handler=None,
+                                            queue_name_base=queue_name_base,
+                                            queue_suffix=queue_suffix)
+
+        self._handlers = dict([(status, handler) for status in statuses])
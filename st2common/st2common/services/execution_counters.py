@@ -0,0 +1,270 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process wide counters of in-flight (scheduled and running) executions per action which are used by
+the concurrency policies instead of counting liveactions in the database for each execution.
+
+Counters for an action are loaded from the database the first time they are needed and then kept
+up to date using the liveaction status events (see ``get_counters_watcher``) and the status
+changes made by this process (see ``update``). Policy decisions for an action are serialized
+using the coordination backend lock held by the scheduler, and counters are periodically
+reconciled against the database (see ``ExecutionCounters.reconcile``) to correct any drift
+caused by missed or out of order events.
+
+NOTE: Counters are only safe to use with a single scheduler process. Status changes made by a
+different scheduler are only seen once the status event is received which can happen after the
+policy lock has been released and acquired by this process. Concurrency thresholds can be
+exceeded in that case.
+
+When the counters are not enabled, the functions in this module count liveactions in the
+database.
+"""
+
+from __future__ import absolute_import
+
+import six
+
+from st2common import log as logging
+from st2common.constants import action as action_constants
+from st2common.persistence.liveaction import LiveAction
+
+__all__ = [
+    'get_counters',
+    'enable_counters',
+    'disable_counters',
+    'get_counters_watcher',
+
+    'count_inflight',
+    'update',
+
+    'ExecutionCounters'
+]
+
+LOG = logging.getLogger(__name__)
+
+# Process wide execution counters. They are only used by services which also listen for the
+# liveaction status events (see enable_counters).
+COUNTERS = None
+
+INFLIGHT_STATES = [
+    action_constants.LIVEACTION_STATUS_SCHEDULED,
+    action_constants.LIVEACTION_STATUS_RUNNING
+]
+
+# Used to distinguish missing parameters from parameters with a None value
+MISSING = object()
+
+
+def get_counters():
+    """
+    Return process wide execution counters or None if the counters are not enabled.
+
+    :rtype: :class:`ExecutionCounters`
+    """
+    return COUNTERS
+
+
+def enable_counters():
+    """
+    Enable process wide execution counters.
+
+    NOTE: The caller is responsible for keeping the counters up to date using the liveaction
+    status events (e.g. by using ``get_counters_watcher``).
+
+    :rtype: :class:`ExecutionCounters`
+    """
+    global COUNTERS
+
+    COUNTERS = ExecutionCounters()
+    return COUNTERS
+
+
+def disable_counters():
+    global COUNTERS
+    COUNTERS = None
+
+
+def get_counters_watcher(counters, queue_suffix):
+    """
+    Return watcher which updates the provided counters on liveaction status events.
+
+    :param queue_suffix: Suffix for the watch queue name (usually the name of the service).
+    :type queue_suffix: ``str``
+
+    :rtype: :class:`st2common.services.cudwatcher.StatusWatcher`
+    """
+    # Late import to avoid import cycles
+    from st2common.services.cudwatcher import StatusWatcher
+    from st2common.transport.liveaction import LIVEACTION_STATUS_MGMT_XCHG
+
+    return StatusWatcher(exchange=LIVEACTION_STATUS_MGMT_XCHG,
+                         handler=counters.update,
+                         statuses=action_constants.LIVEACTION_STATUSES,
+                         queue_name_base='st2.liveaction.status.watch',
+                         queue_suffix=queue_suffix)
+
+
+def count_inflight(action_ref, parameters=None):
+    """
+    Return number of scheduled and running executions of the provided action.
+
+    :param parameters: Only count executions with those parameter values.
+    :type parameters: ``dict``
+
+    :rtype: ``int``
+    """
+    if COUNTERS is not None:
+        return COUNTERS.count(action_ref=action_ref, parameters=parameters)
+
+    filters = dict([('parameters__%s' % (key), value)
+                    for key, value in six.iteritems(parameters or {})])
+    return LiveAction.count(action=action_ref, status__in=INFLIGHT_STATES, **filters)
+
+
+def update(liveaction_db):
+    """
+    Update the process wide counters (if enabled) with the status of the provided liveaction.
+    This is used by the callers which changed the status to make sure the counters are up to date
+    before the status event is received.
+    """
+    if COUNTERS is not None:
+        COUNTERS.update(liveaction_db)
+
+
+class ExecutionCounters(object):
+    """
+    In-memory counters of in-flight executions per action.
+
+    In-flight executions are tracked as liveaction ids (with parameters which are needed to count
+    executions per attribute values) so duplicate updates don't change the counts. Completed
+    liveactions are remembered until the next reload so late events for in-flight states are
+    ignored. Other out of order events (e.g. "running" received after "paused") are corrected by
+    the next ``reconcile``.
+    """
+
+    def __init__(self):
+        # action ref -> {liveaction id -> parameters}
+        self._executions = {}
+
+        # action ref -> ids of liveactions which have completed since the counters were loaded
+        self._completed = {}
+
+        # action ref -> list of liveactions received while the counters were being loaded
+        self._loading = {}
+
+    def count(self, action_ref, parameters=None):
+        """
+        :param parameters: Only count executions with those parameter values.
+        :type parameters: ``dict``
+
+        :rtype: ``int``
+        """
+        executions = self._executions.get(action_ref, None)
+
+        if executions is None:
+            executions = self._load(action_ref=action_ref)
+
+        if not parameters:
+            return len(executions)
+
+        count = 0
+        for execution_parameters in six.itervalues(executions):
+            if all([execution_parameters.get(key, MISSING) == value
+                    for key, value in six.iteritems(parameters)]):
+                count += 1
+
+        return count
+
+    def update(self, liveaction_db):
+        """
+        Update counters with the status of the provided liveaction. This method is used as a
+        handler for liveaction status events.
+
+        :type liveaction_db: :class:`LiveActionDB`
+        """
+        action_ref = liveaction_db.action
+
+        if action_ref in self._loading:
+            self._loading[action_ref].append(liveaction_db)
+            return
+
+        executions = self._executions.get(action_ref, None)
+
+        # Counters for this action are not used
+        if executions is None:
+            return
+
+        self._apply(executions=executions, completed=self._completed[action_ref],
+                    liveaction_db=liveaction_db)
+
+    def reconcile(self):
+        """
+        Reload counters for all the tracked actions from the database.
+        """
+        for action_ref in list(self._executions.keys()):
+            previous_count = len(self._executions.get(action_ref, {}))
+            count = len(self._load(action_ref=action_ref))
+
+            if count != previous_count:
+                LOG.info('Reconciled in-flight execution counter for action "%s" (%s -> %s).',
+                         action_ref, previous_count, count)
+
+    def clear(self):
+        self._executions.clear()
+        self._completed.clear()
+
+    def _load(self, action_ref):
+        self._loading[action_ref] = []
+
+        try:
+            liveaction_dbs = LiveAction.query(action=action_ref, status__in=INFLIGHT_STATES,
+                                              only_fields=['id', 'action', 'status',
+                                                           'parameters'])
+
+            executions = {}
+            completed = set()
+
+            # Status changes which happened while the query was in progress are applied last.
+            # Completed liveactions are also ignored if they are returned by the query.
+            loading = self._loading[action_ref]
+            for liveaction_db in loading:
+                if liveaction_db.status in action_constants.LIVEACTION_COMPLETED_STATES:
+                    completed.add(str(liveaction_db.id))
+
+            for liveaction_db in list(liveaction_dbs) + loading:
+                self._apply(executions=executions, completed=completed,
+                            liveaction_db=liveaction_db)
+        finally:
+            self._loading.pop(action_ref, None)
+
+        self._executions[action_ref] = executions
+        self._completed[action_ref] = completed
+        return executions
+
+    @staticmethod
+    def _apply(executions, completed, liveaction_db):
+        liveaction_id = str(liveaction_db.id)
+
+        # Completed liveaction doesn't go back to an in-flight state, this is a late event
+        if liveaction_id in completed:
+            return
+
+        if liveaction_db.status in action_constants.LIVEACTION_COMPLETED_STATES:
+            completed.add(liveaction_id)
+
+        if liveaction_db.status in INFLIGHT_STATES:
+            executions[liveaction_id] = dict(liveaction_db.parameters or {})
+        else:
+            executions.pop(liveaction_id, None)
@@ -50,6 +50,7 @@ from six.moves import range
 
 
 __all__ = [
+    'build_execution_object',
     'create_execution_object',
     'update_execution',
     'abandon_execution_if_incomplete',
@@ -100,6 +101,43 @@ def _create_execution_log_entry(status):
 
 
 def create_execution_object(liveaction, action_db=None, runnertype_db=None, publish=True):
+    execution, parent = _build_execution_object(liveaction=liveaction, action_db=action_db,
+                                                runnertype_db=runnertype_db)
+
+    # NOTE: User input data is already validate as part of the API request,
+    # other data is set by us. Skipping validation here makes operation 10%-30% faster
+    execution = ActionExecution.add_or_update(execution, publish=publish, validate=False)
+
+    if parent and str(execution.id) not in parent.children:
+        values = {}
+        values['push__children'] = str(execution.id)
+        ActionExecution.update(parent, **values)
+
+    return execution
+
+
+def build_execution_object(liveaction, action_db=None, runnertype_db=None, rule_db=None,
+                           trigger_instance_db=None, trigger_db=None, trigger_type_db=None):
+    """
+    Build (but don't save) an ActionExecutionDB object for the provided liveaction. Resources
+    which are already available to the caller can be passed in to avoid additional lookups.
+
+    This is used when executions are inserted in bulk. Unlike create_execution_object it doesn't
+    add the execution to the parent execution children so it should only be used for executions
+    without a parent.
+
+    :rtype: :class:`ActionExecutionDB`
+    """
+    execution, _ = _build_execution_object(liveaction=liveaction, action_db=action_db,
+                                           runnertype_db=runnertype_db, rule_db=rule_db,
+                                           trigger_instance_db=trigger_instance_db,
+                                           trigger_db=trigger_db,
+                                           trigger_type_db=trigger_type_db)
+    return execution
+
+
+def _build_execution_object(liveaction, action_db=None, runnertype_db=None, rule_db=None,
+                            trigger_instance_db=None, trigger_db=None, trigger_type_db=None):
     if not action_db:
         action_db = action_utils.get_action_by_ref(liveaction.action)
 
@@ -114,19 +152,21 @@ def create_execution_object(liveaction, action_db=None, runnertype_db=None, publ
     attrs.update(_decompose_liveaction(liveaction))
 
     if 'rule' in liveaction.context:
-        rule = reference.get_model_from_ref(Rule, liveaction.context.get('rule', {}))
+        rule = rule_db or reference.get_model_from_ref(Rule, liveaction.context.get('rule', {}))
         attrs['rule'] = vars(RuleAPI.from_model(rule))
 
     if 'trigger_instance' in liveaction.context:
-        trigger_instance_id = liveaction.context.get('trigger_instance', {})
-        trigger_instance_id = trigger_instance_id.get('id', None)
-        trigger_instance = TriggerInstance.get_by_id(trigger_instance_id)
-        trigger = reference.get_model_by_resource_ref(db_api=Trigger,
-                                                      ref=trigger_instance.trigger)
-        trigger_type = reference.get_model_by_resource_ref(db_api=TriggerType,
-                                                           ref=trigger.type)
-        trigger_instance = reference.get_model_from_ref(
-            TriggerInstance, liveaction.context.get('trigger_instance', {}))
+        trigger_instance = trigger_instance_db
+
+        if not trigger_instance:
+            trigger_instance_id = liveaction.context.get('trigger_instance', {})
+            trigger_instance_id = trigger_instance_id.get('id', None)
+            trigger_instance = TriggerInstance.get_by_id(trigger_instance_id)
+
+        trigger = trigger_db or reference.get_model_by_resource_ref(db_api=Trigger,
+                                                                    ref=trigger_instance.trigger)
+        trigger_type = trigger_type_db or reference.get_model_by_resource_ref(db_api=TriggerType,
+                                                                              ref=trigger.type)
         attrs['trigger_instance'] = vars(TriggerInstanceAPI.from_model(trigger_instance))
         attrs['trigger'] = vars(TriggerAPI.from_model(trigger))
         attrs['trigger_type'] = vars(TriggerTypeAPI.from_model(trigger_type))
@@ -143,16 +183,7 @@ def create_execution_object(liveaction, action_db=None, runnertype_db=None, publ
     execution.id = ObjectId()
     execution.web_url = _get_web_url_for_execution(str(execution.id))
 
-    # NOTE: User input data is already validate as part of the API request,
-    # other data is set by us. Skipping validation here makes operation 10%-30% faster
-    execution = ActionExecution.add_or_update(execution, publish=publish, validate=False)
-
-    if parent and str(execution.id) not in parent.children:
-        values = {}
-        values['push__children'] = str(execution.id)
-        ActionExecution.update(parent, **values)
-
-    return execution
+    return execution, parent
 
 
 def _get_parent_execution(child_liveaction_db):
@@ -181,6 +212,9 @@ def update_execution(liveaction_db, publish=True):
     for k, v in six.iteritems(decomposed):
         kw['set__' + k] = v
 
+    # Note: Partial update bypasses model validation so TTL timestamp needs to be set explicitly
+    kw['set__ttl_timestamp'] = liveaction_db.get_ttl_timestamp()
+
     if liveaction_db.status != execution.status:
         # Note: If the status changes we store this transition in the "log" attribute of action
         # execution
@@ -14,6 +14,12 @@
 
 from __future__ import absolute_import
 
+import calendar
+import collections
+import time
+
+from oslo_config import cfg
+
 from st2common import log as logging
 
 from st2common.constants.keyvalue import DATASTORE_PARENT_SCOPE
@@ -25,17 +31,31 @@ from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.exceptions.keyvalue import InvalidScopeException, InvalidUserException
 from st2common.models.system.keyvalue import UserKeyReference
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.util import date as date_utils
 
 __all__ = [
     'get_kvp_for_name',
     'get_values_for_names',
 
+    'get_values_for_scope_and_names',
+    'prefetch_values',
+
+    'get_cache',
+    'get_cache_watcher',
+    'enable_cache',
+    'disable_cache',
+
+    'KeyValueCache',
     'KeyValueLookup',
     'UserKeyValueLookup'
 ]
 
 LOG = logging.getLogger(__name__)
 
+# Process wide datastore read cache. It's only used by services which also listen for datastore
+# CUD events and invalidate the cache (see enable_cache).
+CACHE = None
+
 
 def get_kvp_for_name(name):
     try:
@@ -68,10 +88,210 @@ def get_values_for_names(names, default_value=None):
     return result
 
 
+def get_cache():
+    """
+    Return process wide datastore read cache or None if the cache is not enabled.
+
+    :rtype: :class:`KeyValueCache`
+    """
+    return CACHE
+
+
+def enable_cache():
+    """
+    Enable process wide datastore read cache (if enabled in the config).
+
+    NOTE: The caller is responsible for invalidating the cache on datastore CUD events (e.g. by
+    using ``st2common.services.cudwatcher.CUDWatcher`` with ``KeyValueCache.invalidate``).
+
+    :rtype: :class:`KeyValueCache` or ``None``
+    """
+    global CACHE
+
+    if not cfg.CONF.keyvalue.enable_cache:
+        return None
+
+    CACHE = KeyValueCache(ttl=cfg.CONF.keyvalue.cache_ttl, size=cfg.CONF.keyvalue.cache_size)
+    return CACHE
+
+
+def disable_cache():
+    global CACHE
+    CACHE = None
+
+
+def get_cache_watcher(cache, queue_suffix):
+    """
+    Return watcher which invalidates the provided cache on datastore CUD events.
+
+    :param queue_suffix: Suffix for the watch queue name (usually the name of the service).
+    :type queue_suffix: ``str``
+
+    :rtype: :class:`st2common.services.cudwatcher.CUDWatcher`
+    """
+    # Late import to avoid import cycles
+    from st2common.services.cudwatcher import CUDWatcher
+    from st2common.transport.keyvalue import KEYVALUE_CUD_XCHG
+
+    return CUDWatcher(exchange=KEYVALUE_CUD_XCHG,
+                      create_handler=cache.invalidate,
+                      update_handler=cache.invalidate,
+                      delete_handler=cache.invalidate,
+                      queue_name_base='st2.keyvalue.watch',
+                      queue_suffix=queue_suffix)
+
+
+def _get_values_for_scope_and_names(scope, names):
+    """
+    Retrieve datastore items for the provided scope and key names using a single query.
+
+    :rtype: ``dict`` (name -> :class:`KeyValuePairDB`)
+    """
+    kvp_dbs = KeyValuePair.query(scope=scope, name__in=list(names))
+    return dict([(kvp_db.name, kvp_db) for kvp_db in kvp_dbs])
+
+
+def get_values_for_scope_and_names(scope, names):
+    """
+    Retrieve values for the provided scope and key names. Values are served from the process wide
+    cache (if enabled) and the remaining ones are retrieved using a single query.
+
+    :rtype: ``dict`` (name -> value or None if the key doesn't exist)
+    """
+    if CACHE is not None:
+        return CACHE.get_values(scope=scope, names=names)
+
+    kvp_dbs = _get_values_for_scope_and_names(scope=scope, names=names)
+    return dict([(name, kvp_dbs[name].value if name in kvp_dbs else None) for name in names])
+
+
+def prefetch_values(lookup, paths):
+    """
+    Retrieve values for all the keys referenced by the provided attribute paths using a single
+    query. Retrieved values are stored in the request scoped cache of the provided lookup which is
+    shared with all the child lookups.
+
+    For example, path ('a', 'b') references keys "a" and "a.b".
+
+    NOTE: This is a module level function and not a lookup method so it can't clash with a
+    datastore key name.
+
+    :param lookup: Datastore lookup.
+    :type lookup: :class:`KeyValueLookup` or :class:`UserKeyValueLookup`
+
+    :param paths: Attribute paths relative to the provided lookup.
+    :type paths: ``list`` of ``tuple``
+    """
+    kvp_keys = set([])
+
+    for path in paths:
+        key = lookup._key_prefix
+
+        for name in path:
+            key = lookup._get_child_key(key=key, name=name)
+            kvp_keys.add(lookup._get_kvp_key(key=key))
+
+    kvp_keys = [kvp_key for kvp_key in kvp_keys if kvp_key not in lookup._kvp_cache]
+
+    if not kvp_keys:
+        return
+
+    LOG.debug('Prefetching kv items: scope: %s and keys: %s', lookup._scope, kvp_keys)
+    values = get_values_for_scope_and_names(scope=lookup._scope, names=kvp_keys)
+    lookup._kvp_cache.update(values)
+
+
+class KeyValueCache(object):
+    """
+    Bounded, process local cache of datastore values (including non-existent keys).
+
+    Items are cached for up to "ttl" seconds (or until the item expires if it has an expiry
+    timestamp set) and removed when a CUD event is received for the item (see ``invalidate``).
+    """
+
+    def __init__(self, ttl=60, size=10000):
+        self.ttl = ttl
+        self.size = size
+
+        # (scope, name) -> (expire time, value)
+        self._items = collections.OrderedDict()
+
+        # Incremented on each invalidation. Used to prevent storing values which were retrieved
+        # from the database before an invalidation which happened while the query was in progress.
+        self._generation = 0
+
+    def get_values(self, scope, names):
+        """
+        Return values for the provided key names. Items which are not cached are retrieved using a
+        single query.
+
+        :rtype: ``dict`` (name -> value or None if the key doesn't exist)
+        """
+        result = {}
+        missing_names = []
+        now = time.time()
+
+        for name in names:
+            item = self._items.pop((scope, name), None)
+
+            if item and item[0] > now:
+                # Re-insert the item so it's moved to the end (most recently used)
+                self._items[(scope, name)] = item
+                result[name] = item[1]
+            else:
+                missing_names.append(name)
+
+        if not missing_names:
+            return result
+
+        generation = self._generation
+        kvp_dbs = _get_values_for_scope_and_names(scope=scope, names=missing_names)
+        store = (generation == self._generation)
+
+        for name in missing_names:
+            kvp_db = kvp_dbs.get(name, None)
+            value = kvp_db.value if kvp_db else None
+            result[name] = value
+
+            expire_time = now + self.ttl
+
+            if kvp_db and kvp_db.expire_timestamp:
+                expire_timestamp = date_utils.convert_to_utc(kvp_db.expire_timestamp)
+                expire_time = min(expire_time, calendar.timegm(expire_timestamp.utctimetuple()))
+
+            if store and expire_time > now:
+                self._items[(scope, name)] = (expire_time, value)
+
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+        return result
+
+    def invalidate(self, kvp_db):
+        """
+        Remove the provided item from the cache. This method is used as a handler for datastore CUD
+        events.
+
+        :type kvp_db: :class:`KeyValuePairDB`
+        """
+        self._generation += 1
+        self._items.pop((kvp_db.scope, kvp_db.name), None)
+
+    def clear(self):
+        self._generation += 1
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
 class BaseKeyValueLookup(object):
 
     scope = None
+    _prefix = None
     _key_prefix = None
+    _scope = None
+    _kvp_cache = None
 
     def get_key_name(self):
         """
@@ -93,12 +313,44 @@ class BaseKeyValueLookup(object):
         key_name = '.'.join(key_name_parts)
         return key_name
 
+    def _get_child_key(self, key, name):
+        if key:
+            return '%s.%s' % (key, name)
+
+        return name
+
+    def _get_kvp_key(self, key):
+        if self._prefix:
+            return DATASTORE_KEY_SEPARATOR.join([self._prefix, key])
+
+        return key
+
+    def _get_kv(self, key):
+        scope = self._scope
+
+        if key in self._kvp_cache:
+            value = self._kvp_cache[key]
+        elif CACHE is not None:
+            value = CACHE.get_values(scope=scope, names=[key])[key]
+            self._kvp_cache[key] = value
+        else:
+            try:
+                kvp = KeyValuePair.get_by_scope_and_name(scope=scope, name=key)
+            except StackStormDBObjectNotFoundError:
+                kvp = None
+
+            value = kvp.value if kvp else None
+            self._kvp_cache[key] = value
+
+        return value if value is not None else ''
+
 
 class KeyValueLookup(BaseKeyValueLookup):
 
     scope = SYSTEM_SCOPE
 
-    def __init__(self, prefix=None, key_prefix=None, cache=None, scope=FULL_SYSTEM_SCOPE):
+    def __init__(self, prefix=None, key_prefix=None, cache=None, scope=FULL_SYSTEM_SCOPE,
+                 kvp_cache=None):
         if not scope:
             scope = FULL_SYSTEM_SCOPE
 
@@ -108,6 +360,7 @@ class KeyValueLookup(BaseKeyValueLookup):
         self._prefix = prefix
         self._key_prefix = key_prefix or ''
         self._value_cache = cache or {}
+        self._kvp_cache = kvp_cache if kvp_cache is not None else {}
         self._scope = scope
 
     def __str__(self):
@@ -127,16 +380,10 @@ class KeyValueLookup(BaseKeyValueLookup):
 
     def _get(self, name):
         # get the value for this key and save in value_cache
-        if self._key_prefix:
-            key = '%s.%s' % (self._key_prefix, name)
-        else:
-            key = name
-
-        if self._prefix:
-            kvp_key = DATASTORE_KEY_SEPARATOR.join([self._prefix, key])
-        else:
-            kvp_key = key
+        key = self._get_child_key(key=self._key_prefix, name=name)
+        kvp_key = self._get_kvp_key(key=key)
 
+        LOG.debug('Lookup system kv: scope: %s and key: %s', self._scope, kvp_key)
         value = self._get_kv(kvp_key)
         self._value_cache[key] = value
         # return a KeyValueLookup as response since the lookup may not be complete e.g. if
@@ -144,27 +391,15 @@ class KeyValueLookup(BaseKeyValueLookup):
         # will expect to do a dictionary style lookup for key_base and key_value as subsequent
         # calls. Saving the value in cache avoids extra DB calls.
         return KeyValueLookup(prefix=self._prefix, key_prefix=key, cache=self._value_cache,
-                              scope=self._scope)
-
-    def _get_kv(self, key):
-        scope = self._scope
-        LOG.debug('Lookup system kv: scope: %s and key: %s', scope, key)
-
-        try:
-            kvp = KeyValuePair.get_by_scope_and_name(scope=scope, name=key)
-        except StackStormDBObjectNotFoundError:
-            kvp = None
-
-        if kvp:
-            LOG.debug('Got value %s from datastore.', kvp.value)
-        return kvp.value if kvp else ''
+                              scope=self._scope, kvp_cache=self._kvp_cache)
 
 
 class UserKeyValueLookup(BaseKeyValueLookup):
 
     scope = USER_SCOPE
 
-    def __init__(self, user, prefix=None, key_prefix=None, cache=None, scope=FULL_USER_SCOPE):
+    def __init__(self, user, prefix=None, key_prefix=None, cache=None, scope=FULL_USER_SCOPE,
+                 kvp_cache=None):
         if not scope:
             scope = FULL_USER_SCOPE
 
@@ -174,6 +409,7 @@ class UserKeyValueLookup(BaseKeyValueLookup):
         self._prefix = prefix
         self._key_prefix = key_prefix or ''
         self._value_cache = cache or {}
+        self._kvp_cache = kvp_cache if kvp_cache is not None else {}
         self._user = user
         self._scope = scope
 
@@ -188,15 +424,8 @@ class UserKeyValueLookup(BaseKeyValueLookup):
 
     def _get(self, name):
         # get the value for this key and save in value_cache
-        if self._key_prefix:
-            key = '%s.%s' % (self._key_prefix, name)
-        else:
-            key = UserKeyReference(name=name, user=self._user).ref
-
-        if self._prefix:
-            kvp_key = DATASTORE_KEY_SEPARATOR.join([self._prefix, key])
-        else:
-            kvp_key = key
+        key = self._get_child_key(key=self._key_prefix, name=name)
+        kvp_key = self._get_kvp_key(key=key)
 
         value = self._get_kv(kvp_key)
         self._value_cache[key] = value
@@ -205,17 +434,14 @@ class UserKeyValueLookup(BaseKeyValueLookup):
         # will expect to do a dictionary style lookup for key_base and key_value as subsequent
         # calls. Saving the value in cache avoids extra DB calls.
         return UserKeyValueLookup(prefix=self._prefix, user=self._user, key_prefix=key,
-                                  cache=self._value_cache, scope=self._scope)
-
-    def _get_kv(self, key):
-        scope = self._scope
+                                  cache=self._value_cache, scope=self._scope,
+                                  kvp_cache=self._kvp_cache)
 
-        try:
-            kvp = KeyValuePair.get_by_scope_and_name(scope=scope, name=key)
-        except StackStormDBObjectNotFoundError:
-            kvp = None
+    def _get_child_key(self, key, name):
+        if key:
+            return '%s.%s' % (key, name)
 
-        return kvp.value if kvp else ''
+        return UserKeyReference(name=name, user=self._user).ref
 
 
 def get_key_reference(scope, name, user=None):
@@ -16,6 +16,7 @@ from __future__ import absolute_import
 
 from st2common.constants import action as ac_const
 from st2common import log as logging
+from st2common.persistence import cache as resource_cache
 from st2common.persistence import policy as pc_db_access
 from st2common import policies as engine
 
@@ -23,24 +24,30 @@ from st2common import policies as engine
 LOG = logging.getLogger(__name__)
 
 
+def get_enabled_policies(action_ref):
+    """
+    Return enabled policies for the provided action. Policies are served from the process wide
+    resource cache if it's enabled.
+
+    :rtype: ``list`` of :class:`PolicyDB`
+    """
+    return resource_cache.query(pc_db_access.Policy, resource_ref=action_ref, enabled=True)
+
+
 def has_policies(lv_ac_db, policy_types=None):
-    query_params = {
-        'resource_ref': lv_ac_db.action,
-        'enabled': True
-    }
+    policy_dbs = get_enabled_policies(action_ref=lv_ac_db.action)
 
     if policy_types:
-        query_params['policy_type__in'] = policy_types
-
-    policy_dbs = pc_db_access.Policy.query(**query_params)
+        policy_dbs = [policy_db for policy_db in policy_dbs
+                      if policy_db.policy_type in policy_types]
 
-    return policy_dbs.count() > 0
+    return len(policy_dbs) > 0
 
 
 def apply_pre_run_policies(lv_ac_db):
     LOG.debug('Applying pre-run policies for liveaction "%s".' % str(lv_ac_db.id))
 
-    policy_dbs = pc_db_access.Policy.query(resource_ref=lv_ac_db.action, enabled=True)
+    policy_dbs = get_enabled_policies(action_ref=lv_ac_db.action)
     LOG.debug('Identified %s policies for the action "%s".' % (len(policy_dbs), lv_ac_db.action))
 
     for policy_db in policy_dbs:
@@ -64,7 +71,7 @@ def apply_pre_run_policies(lv_ac_db):
 def apply_post_run_policies(lv_ac_db):
     LOG.debug('Applying post run policies for liveaction "%s".' % str(lv_ac_db.id))
 
-    policy_dbs = pc_db_access.Policy.query(resource_ref=lv_ac_db.action, enabled=True)
+    policy_dbs = get_enabled_policies(action_ref=lv_ac_db.action)
     LOG.debug('Identified %s policies for the action "%s".' % (len(policy_dbs), lv_ac_db.action))
 
     for policy_db in policy_dbs:
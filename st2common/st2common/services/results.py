@@ -0,0 +1,227 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Out-of-line storage for large execution results.
+
+Results which are larger than ``database.result_storage_threshold`` bytes (serialized as JSON)
+are compressed and stored in a separate collection (see ``ActionExecutionResultDB``). The
+execution and liveaction documents only contain a small reference to the stored result which is
+resolved on access (see ``st2common.models.db.stormbase.ResultField``).
+
+Stored results are content addressed which means the same result which is stored on the
+liveaction and the corresponding execution is only stored once.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import hashlib
+import json
+import time
+import zlib
+
+from mongoengine import NotUniqueError
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.models.db.stormbase import RESULT_REFERENCE_FIELD
+from st2common.models.db.stormbase import RESULT_REFERENCE_KEY
+from st2common.util import date as date_utils
+
+__all__ = [
+    'is_result_reference',
+    'get_result_reference',
+    'store_result',
+    'load_result',
+    'get_referenced_digests',
+
+    'ResultReference'
+]
+
+LOG = logging.getLogger(__name__)
+
+COMPRESSION_ZLIB = 'zlib'
+
+# Results which have been stored recently (digest -> store time). Storing the same result again
+# (e.g. liveaction and execution result) within this interval doesn't hit the database.
+RECENTLY_STORED_RESULTS = collections.OrderedDict()
+RECENTLY_STORED_RESULTS_SIZE = 1000
+RECENTLY_STORED_RESULTS_TTL = 60
+
+
+class ResultReference(dict):
+    """
+    Reference to a result in the results collection. The referenced result is retrieved on first
+    access and cached on the reference object.
+    """
+
+    def __init__(self, digest):
+        super(ResultReference, self).__init__({RESULT_REFERENCE_KEY: digest})
+        self._value = None
+        self._loaded = False
+
+    @property
+    def digest(self):
+        return self[RESULT_REFERENCE_KEY]
+
+    def get_value(self):
+        if not self._loaded:
+            self._value = load_result(digest=self.digest)
+            self._loaded = True
+
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+        self._loaded = True
+
+    def __reduce__(self):
+        # Resolved value is not serialized, it's retrieved again by the receiver if needed
+        return (self.__class__, (self.digest,))
+
+
+def is_result_reference(value):
+    """
+    Return True if the provided value (as stored in the database) references a result in the
+    results collection.
+
+    :rtype: ``bool``
+    """
+    return isinstance(value, dict) and len(value) == 1 and RESULT_REFERENCE_KEY in value
+
+
+def get_result_reference(value):
+    """
+    Return :class:`ResultReference` for the provided value (as stored in the database) or None
+    if the value doesn't reference a result in the results collection.
+
+    :rtype: :class:`ResultReference`
+    """
+    if isinstance(value, ResultReference):
+        return value
+
+    if not is_result_reference(value):
+        return None
+
+    return ResultReference(digest=value[RESULT_REFERENCE_KEY])
+
+
+def store_result(value):
+    """
+    Store the provided result in the results collection if it's larger than the configured
+    threshold.
+
+    :return: Reference to the stored result or None if the result should be stored inline.
+    :rtype: :class:`ResultReference`
+    """
+    threshold = cfg.CONF.database.result_storage_threshold
+
+    if not threshold or not isinstance(value, (dict, list)):
+        return None
+
+    try:
+        data = json.dumps(value).encode('utf-8')
+    except (TypeError, ValueError):
+        # Result contains values which can't be serialized as JSON, store it inline as before
+        return None
+
+    if len(data) <= threshold:
+        return None
+
+    digest = hashlib.sha1(data).hexdigest()
+    reference = ResultReference(digest=digest)
+
+    if _is_recently_stored(digest=digest):
+        return reference
+
+    # Late import to avoid import cycles
+    from st2common.persistence.execution import ActionExecutionResult
+
+    compressed_data = zlib.compress(data, cfg.CONF.database.result_compression_level)
+
+    # Existing result only has the timestamp bumped
+    try:
+        ActionExecutionResult.update_by_query(
+            query={'digest': digest}, upsert=True,
+            set_on_insert__compression=COMPRESSION_ZLIB,
+            set_on_insert__size=len(data),
+            set_on_insert__data=compressed_data,
+            set__timestamp=date_utils.get_datetime_utc_now())
+    except NotUniqueError:
+        # Same result has been stored concurrently by a different process
+        pass
+
+    LOG.debug('Stored result "%s" (%s bytes, %s bytes compressed).', digest, len(data),
+              len(compressed_data))
+
+    _set_recently_stored(digest=digest)
+    return reference
+
+
+def load_result(digest):
+    """
+    Retrieve and decompress the result with the provided digest from the results collection.
+
+    :rtype: ``dict`` or ``list``
+    """
+    # Late import to avoid import cycles
+    from st2common.persistence.execution import ActionExecutionResult
+
+    result_db = ActionExecutionResult.get(digest=digest)
+
+    if not result_db:
+        LOG.warning('Result "%s" doesn\'t exist in the results collection, it has probably '
+                    'been garbage collected.', digest)
+        return {}
+
+    if result_db.compression != COMPRESSION_ZLIB:
+        raise ValueError('Unsupported result compression: %s' % (result_db.compression))
+
+    return json.loads(zlib.decompress(result_db.data).decode('utf-8'))
+
+
+def get_referenced_digests(digests):
+    """
+    Return digests of the provided results which are referenced by at least one execution or
+    liveaction.
+
+    :type digests: ``list`` of ``str``
+
+    :rtype: ``set`` of ``str``
+    """
+    # Late import to avoid import cycles
+    from st2common.persistence.execution import ActionExecution
+    from st2common.persistence.liveaction import LiveAction
+
+    query = {RESULT_REFERENCE_FIELD: {'$in': list(digests)}}
+
+    referenced_digests = set([])
+    for model in [ActionExecution, LiveAction]:
+        referenced_digests.update(model.distinct(field=RESULT_REFERENCE_FIELD, __raw__=query))
+
+    return referenced_digests
+
+
+def _is_recently_stored(digest):
+    store_time = RECENTLY_STORED_RESULTS.get(digest, None)
+    return store_time is not None and time.time() - store_time < RECENTLY_STORED_RESULTS_TTL
+
+
+def _set_recently_stored(digest):
+    RECENTLY_STORED_RESULTS.pop(digest, None)
+    RECENTLY_STORED_RESULTS[digest] = time.time()
+
+    while len(RECENTLY_STORED_RESULTS) > RECENTLY_STORED_RESULTS_SIZE:
+        RECENTLY_STORED_RESULTS.popitem(last=False)
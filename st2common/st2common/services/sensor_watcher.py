@@ -23,6 +23,7 @@ from kombu.mixins import ConsumerMixin
 
 from st2common import log as logging
 from st2common.transport import reactor, publishers
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
 from st2common.util import concurrency
 import st2common.util.queues as queue_utils
@@ -61,7 +62,7 @@ class SensorWatcher(ConsumerMixin):
 
     def get_consumers(self, Consumer, channel):
         consumers = [Consumer(queues=[self._sensor_watcher_q],
-                              accept=['pickle'],
+                              accept=serializers.ACCEPT_CONTENT,
                               callbacks=[self.process_task])]
         return consumers
 
@@ -77,6 +77,78 @@ class TriggerDispatcherService(object):
                                           True) instead of logging the error.
         :type throw_on_validation_error: ``boolean``
         """
+        if not self._validate_payload(trigger=trigger, payload=payload,
+                                      throw_on_validation_error=throw_on_validation_error):
+            return None
+
+        self._logger.debug('Dispatching trigger %s with payload %s.', trigger, payload)
+        return self._dispatcher.dispatch(trigger, payload=payload, trace_context=trace_context)
+
+    def dispatch_many(self, trigger, payloads, trace_tag=None, throw_on_validation_error=False):
+        """
+        Method which dispatches multiple instances of the same trigger using a single message.
+
+        :param trigger: Reference to the TriggerTypeDB (<pack>.<name>) or TriggerDB object.
+        :type trigger: ``str``
+
+        :param payloads: Trigger payloads.
+        :type payloads: ``list`` of ``dict``
+
+        :param trace_tag: Tracer to track the triggerinstances.
+        :type trace_tags: ``str``
+
+        :param throw_on_validation_error: True to throw on validation error (if validate_payload is
+                                          True) instead of logging the error.
+        :type throw_on_validation_error: ``boolean``
+
+        :return: Number of dispatched payloads.
+        :rtype: ``int``
+        """
+        trace_context = TraceContext(trace_tag=trace_tag) if trace_tag else None
+        self._logger.debug('Added trace_context %s to trigger %s.', trace_context, trigger)
+        return self.dispatch_many_with_context(trigger, payloads=payloads,
+                                               trace_context=trace_context,
+                                               throw_on_validation_error=throw_on_validation_error)
+
+    def dispatch_many_with_context(self, trigger, payloads, trace_context=None,
+                                   throw_on_validation_error=False):
+        """
+        Method which dispatches multiple instances of the same trigger using a single message.
+
+        Payloads which fail validation are skipped (or an exception is thrown if
+        throw_on_validation_error is True, in which case nothing is dispatched).
+
+        :param trigger: Reference to the TriggerTypeDB (<pack>.<name>) or TriggerDB object.
+        :type trigger: ``str``
+
+        :param payloads: Trigger payloads.
+        :type payloads: ``list`` of ``dict``
+
+        :param trace_context: Trace context to associate with Trigger.
+        :type trace_context: ``st2common.api.models.api.trace.TraceContext``
+
+        :param throw_on_validation_error: True to throw on validation error (if validate_payload is
+                                          True) instead of logging the error.
+        :type throw_on_validation_error: ``boolean``
+
+        :return: Number of dispatched payloads.
+        :rtype: ``int``
+        """
+        payloads = [payload for payload in payloads
+                    if self._validate_payload(trigger=trigger, payload=payload,
+                                              throw_on_validation_error=throw_on_validation_error)]
+
+        if not payloads:
+            return 0
+
+        self._logger.debug('Dispatching %s instances of trigger %s.', len(payloads), trigger)
+        self._dispatcher.dispatch_many(trigger, payloads=payloads, trace_context=trace_context)
+        return len(payloads)
+
+    def _validate_payload(self, trigger, payload, throw_on_validation_error=False):
+        """
+        Validate trigger payload and return True if the trigger should be dispatched.
+        """
         # Note: We perform validation even if it's disabled in the config so we can at least warn
         # the user if validation fals (but not throw if it's disabled)
         try:
@@ -97,7 +169,6 @@ class TriggerDispatcherService(object):
                     raise ValueError(msg)
 
                 self._logger.warn(msg)
-                return None
+                return False
 
-        self._logger.debug('Dispatching trigger %s with payload %s.', trigger, payload)
-        return self._dispatcher.dispatch(trigger, payload=payload, trace_context=trace_context)
+        return True
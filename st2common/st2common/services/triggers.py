@@ -24,6 +24,7 @@ from st2common.exceptions.db import StackStormDBObjectNotFoundError
 from st2common.exceptions.db import StackStormDBObjectConflictError
 from st2common.models.api.trigger import (TriggerAPI, TriggerTypeAPI)
 from st2common.models.system.common import ResourceReference
+from st2common.persistence import cache as resource_cache
 from st2common.persistence.trigger import (Trigger, TriggerType)
 
 __all__ = [
@@ -178,7 +179,7 @@ def get_trigger_db_by_ref(ref):
     :rtype trigger_type: ``object``
     """
     try:
-        return Trigger.get_by_ref(ref)
+        return resource_cache.get_by_ref(Trigger, ref)
     except StackStormDBObjectNotFoundError as e:
         LOG.debug('Database lookup for ref="%s" resulted ' +
                   'in exception : %s.', ref, e, exc_info=True)
@@ -213,7 +214,7 @@ def get_trigger_type_db(ref):
     :rtype trigger_type: ``object``
     """
     try:
-        return TriggerType.get_by_ref(ref)
+        return resource_cache.get_by_ref(TriggerType, ref)
     except StackStormDBObjectNotFoundError as e:
         LOG.debug('Database lookup for ref="%s" resulted ' +
                   'in exception : %s.', ref, e, exc_info=True)
@@ -21,6 +21,7 @@ from kombu.mixins import ConsumerMixin
 from st2common import log as logging
 from st2common.persistence.trigger import Trigger
 from st2common.transport import reactor, publishers
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
 from st2common.util import concurrency
 import st2common.util.queues as queue_utils
@@ -73,7 +74,7 @@ class TriggerWatcher(ConsumerMixin):
 
     def get_consumers(self, Consumer, channel):
         return [Consumer(queues=[self._trigger_watch_q],
-                         accept=['pickle'],
+                         accept=serializers.ACCEPT_CONTENT,
                          callbacks=[self.process_task])]
 
     def process_task(self, body, message):
@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+import collections
 import copy
 import datetime
 import retrying
@@ -50,6 +51,9 @@ from st2common.util import param as param_utils
 
 LOG = logging.getLogger(__name__)
 
+# Process wide cache of workflow conductors (see enable_conductor_cache)
+CONDUCTOR_CACHE = None
+
 
 def is_action_execution_under_workflow_context(ac_ex_db):
     # The action execution is executed under the context of a workflow
@@ -816,12 +820,141 @@ def deserialize_conductor(wf_ex_db):
 
 
 def refresh_conductor(wf_ex_id):
+    # Reuse the cached conductor if the workflow execution hasn't been updated since it was
+    # cached (revision of the cached object matches the one in the database). Item is removed
+    # from the cache so the conductor is never shared and it's only put back once the changes
+    # are written to the database (see update_execution_records).
+    if CONDUCTOR_CACHE is not None:
+        item = CONDUCTOR_CACHE.pop(str(wf_ex_id))
+
+        if item:
+            conductor, wf_ex_db = item
+            rev_dbs = wf_db_access.WorkflowExecution.query(id=wf_ex_id, only_fields=['rev'])
+            rev_db = rev_dbs.first()
+
+            if rev_db and rev_db.rev == wf_ex_db.rev:
+                return conductor, wf_ex_db
+
     wf_ex_db = wf_db_access.WorkflowExecution.get_by_id(wf_ex_id)
     conductor = deserialize_conductor(wf_ex_db)
 
     return conductor, wf_ex_db
 
 
+def get_conductor_cache():
+    """
+    Return process wide conductor cache or None if the cache is not enabled.
+
+    :rtype: :class:`ConductorCache`
+    """
+    return CONDUCTOR_CACHE
+
+
+def enable_conductor_cache(size=None):
+    """
+    Enable process wide cache of workflow conductors which is used by refresh_conductor to
+    avoid reading and deserializing the whole workflow execution on each task transition.
+
+    :param size: Maximum number of cached conductors. Defaults to the
+                 workflow_engine.conductor_cache_size config option.
+    :type size: ``int``
+
+    :rtype: :class:`ConductorCache`
+    """
+    global CONDUCTOR_CACHE
+
+    size = size if size is not None else cfg.CONF.workflow_engine.conductor_cache_size
+    CONDUCTOR_CACHE = ConductorCache(size=size)
+    return CONDUCTOR_CACHE
+
+
+def disable_conductor_cache():
+    global CONDUCTOR_CACHE
+    CONDUCTOR_CACHE = None
+
+
+class ConductorCache(object):
+    """
+    Bounded, process local LRU cache of workflow conductors (and the corresponding workflow
+    execution objects) keyed by the workflow execution id.
+
+    Cached items are only valid as long as revision of the workflow execution in the database
+    matches the revision of the cached object (see refresh_conductor).
+    """
+
+    def __init__(self, size=100):
+        self.size = size
+        self._items = collections.OrderedDict()
+
+    def pop(self, wf_ex_id):
+        """
+        Remove and return (conductor, workflow execution) tuple for the provided workflow
+        execution id or None if it's not cached.
+        """
+        return self._items.pop(wf_ex_id, None)
+
+    def put(self, wf_ex_db, conductor):
+        if self.size <= 0:
+            return
+
+        self._items.pop(str(wf_ex_db.id), None)
+        self._items[str(wf_ex_db.id)] = (conductor, wf_ex_db)
+
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def remove(self, wf_ex_id):
+        self._items.pop(str(wf_ex_id), None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def get_state_updates(old_state, new_state):
+    """
+    Compare the serialized workflow state which has been written to the database with the new
+    one and return only the changed parts of it.
+
+    :return: Dictionary of path (``tuple`` of dictionary keys and list indexes) to the new value
+             or None if the whole state needs to be written (e.g. items have been removed).
+    :rtype: ``dict``
+    """
+    if not old_state or not isinstance(old_state, dict):
+        return None
+
+    updates = {}
+    _get_value_updates(old_state, new_state, (), updates)
+
+    return None if () in updates else updates
+
+
+def _get_value_updates(old_value, new_value, path, updates):
+    if old_value == new_value:
+        return
+
+    if (isinstance(old_value, dict) and isinstance(new_value, dict) and '' not in new_value and
+            set(old_value.keys()).issubset(set(new_value.keys()))):
+        # Only added or changed items
+        for key, value in six.iteritems(new_value):
+            if key not in old_value:
+                updates[path + (key,)] = value
+            else:
+                _get_value_updates(old_value[key], value, path + (key,), updates)
+    elif (path and isinstance(old_value, list) and isinstance(new_value, list) and
+            len(new_value) >= len(old_value)):
+        # Only appended or changed items
+        for index, value in enumerate(new_value):
+            if index >= len(old_value):
+                updates[path + (index,)] = value
+            else:
+                _get_value_updates(old_value[index], value, path + (index,), updates)
+    else:
+        updates[path] = new_value
+
+
 @retrying.retry(
     retry_on_exception=wf_exc.retry_on_transient_db_errors,
     wait_fixed=cfg.CONF.workflow_engine.retry_wait_fixed_msec,
@@ -1174,10 +1307,22 @@ def update_execution_records(wf_ex_db, conductor, update_lv_ac_on_statuses=None,
 
     # Update task flow and other attributes.
     wf_ex_db.errors = copy.deepcopy(conductor.errors)
-    wf_ex_db.state = conductor.workflow_state.serialize()
-
-    # Write changes to the database.
-    wf_ex_db = wf_db_access.WorkflowExecution.update(wf_ex_db, publish=pub_wf_ex)
+    wf_state = conductor.workflow_state.serialize()
+    state_updates = get_state_updates(wf_ex_db.state, wf_state)
+    wf_ex_db.state = wf_state
+
+    # Write changes to the database. Only the changed parts of the task flow are written.
+    field_updates = {'state': state_updates} if state_updates is not None else None
+    wf_ex_db = wf_db_access.WorkflowExecution.partial_update(wf_ex_db,
+                                                             field_updates=field_updates,
+                                                             publish=pub_wf_ex)
+
+    # Keep the conductor around for the next event if the workflow execution is not completed.
+    if CONDUCTOR_CACHE is not None:
+        if wf_ex_db.status in statuses.COMPLETED_STATUSES:
+            CONDUCTOR_CACHE.remove(wf_ex_db.id)
+        else:
+            CONDUCTOR_CACHE.put(wf_ex_db, conductor)
 
     # Return if workflow execution status is not specified in update_lv_ac_on_statuses.
     if (isinstance(update_lv_ac_on_statuses, list) and
@@ -13,7 +13,10 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+import collections
 import fnmatch
+import time
+import uuid
 
 import eventlet
 
@@ -23,6 +26,11 @@ from oslo_config import cfg
 from st2common.models.api.action import LiveActionAPI
 from st2common.models.api.execution import ActionExecutionAPI
 from st2common.models.api.execution import ActionExecutionOutputAPI
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.execution import ActionExecutionOutputDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.metrics.base import get_driver
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
 from st2common.transport.queues import STREAM_ANNOUNCEMENT_WORK_QUEUE
 from st2common.transport.queues import STREAM_EXECUTION_ALL_WORK_QUEUE
@@ -35,25 +43,346 @@ __all__ = [
     'StreamListener',
     'ExecutionOutputListener',
 
+    'StreamEvent',
+    'Subscription',
+    'SubscriptionIndex',
+
     'get_listener',
     'get_listener_if_set'
 ]
 
 LOG = logging.getLogger(__name__)
 
+OVERFLOW_POLICY_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_POLICY_COALESCE = 'coalesce'
+OVERFLOW_POLICY_DISCONNECT = 'disconnect'
+
+OVERFLOW_POLICIES = [
+    OVERFLOW_POLICY_DROP_OLDEST,
+    OVERFLOW_POLICY_COALESCE,
+    OVERFLOW_POLICY_DISCONNECT
+]
+
+# Last event sent to the client which is disconnected because it couldn't keep up with the events
+OVERFLOW_EVENT = 'st2.stream__overflow'
+
+# Event sent to the client when some of the events for that client have been dropped or can't be
+# replayed when resuming the stream. "dropped" is the number of dropped events or None if the
+# number is not known.
+EVENTS_LOST_EVENT = 'st2.stream__events_lost'
+
+# How often (in seconds) to report the lag of a particular subscriber
+LAG_REPORT_INTERVAL = 10
 
 # Stores references to instantiated listeners
 _stream_listener = None
 _execution_output_listener = None
 
 
+def _is_glob(value):
+    return any(char in value for char in '*?[')
+
+
+class StreamEvent(object):
+    """
+    Event received from the message bus.
+
+    Body is converted to the API model lazily and only once, no matter how many subscribers
+    receive the event.
+    """
+
+    def __init__(self, sequence, name, body, model=None, action_ref=None, execution_id=None,
+                 coalesce_key=None):
+        self.sequence = sequence
+        self.name = name
+        self.action_ref = action_ref
+        self.execution_id = execution_id
+
+        # Events with the same key are updates of the same object and when using the "coalesce"
+        # overflow policy, only the latest one needs to be delivered
+        self.coalesce_key = coalesce_key
+
+        self.timestamp = time.time()
+
+        self._body = body
+        self._model = model
+
+    def get_body(self):
+        if self._model:
+            self._body = self._model.from_model(self._body,
+                                                mask_secrets=cfg.CONF.api.mask_secrets)
+            self._model = None
+
+        return self._body
+
+
+class Subscription(object):
+    """
+    Single stream client subscription with the filters it has been created with.
+
+    Events are buffered in a bounded queue (queue_size of 0 means unbounded). When the queue is
+    full, the overflow policy is applied:
+
+    * drop_oldest - oldest buffered event is dropped.
+    * coalesce - pending update of the same execution is replaced with the new one. If there is
+      no such update, the oldest buffered event is dropped.
+    * disconnect - subscription is closed and the client receives an overflow event with a resume
+      token which can be used to resume the stream.
+    """
+
+    def __init__(self, events=None, action_refs=None, execution_ids=None, queue_size=0,
+                 overflow_policy=OVERFLOW_POLICY_DROP_OLDEST):
+        self.queue = eventlet.Queue()
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+
+        events = events or []
+        self.event_names = set([event for event in events if not _is_glob(event)])
+        self.event_globs = [event for event in events if _is_glob(event)]
+        self.action_refs = set(action_refs or [])
+        self.execution_ids = set(execution_ids or [])
+
+        self.closed = False
+        self.dropped_count = 0
+
+        # Sequence number of the last event which has been delivered to the client
+        self.last_sequence = 0
+
+        # Maps coalesce key to the queue slot which holds the pending event for that key
+        self._pending = {}
+
+    @property
+    def has_event_filter(self):
+        return bool(self.event_names or self.event_globs)
+
+    def matches_event(self, event_name):
+        """
+        Return True if particular event should be included based on the event names filter.
+        """
+        if not self.has_event_filter or event_name in self.event_names:
+            return True
+
+        for event_name_filter_glob in self.event_globs:
+            if fnmatch.fnmatch(event_name, event_name_filter_glob):
+                return True
+
+        return False
+
+    def matches(self, event):
+        """
+        Return True if the provided event matches all the filters of this subscription.
+
+        :type event: :class:`StreamEvent`
+        """
+        if self.action_refs and event.action_ref not in self.action_refs:
+            return False
+
+        if self.execution_ids and event.execution_id not in self.execution_ids:
+            return False
+
+        return self.matches_event(event.name)
+
+    def put(self, event):
+        """
+        Put event in the queue applying the overflow policy when the queue is full.
+
+        :type event: :class:`StreamEvent`
+
+        :return: False if the subscription has been closed.
+        :rtype: ``bool``
+        """
+        if self.closed:
+            return False
+
+        coalesce = self.overflow_policy == OVERFLOW_POLICY_COALESCE and event.coalesce_key
+
+        if coalesce and event.coalesce_key in self._pending:
+            self._pending[event.coalesce_key][0] = event
+            get_driver().inc_counter('stream.subscriber.coalesced')
+            return True
+
+        if self.queue_size and self.queue.qsize() >= self.queue_size:
+            if self.overflow_policy == OVERFLOW_POLICY_DISCONNECT:
+                LOG.info('Closing stream subscription which can\'t keep up with the events '
+                         '(buffered events: %s)', self.queue.qsize())
+                get_driver().inc_counter('stream.subscriber.disconnected')
+                self.close()
+                return False
+
+            self._drop_oldest()
+
+        slot = [event]
+
+        if coalesce:
+            self._pending[event.coalesce_key] = slot
+
+        self.queue.put(slot)
+        return True
+
+    def get(self, timeout=None):
+        """
+        Return next buffered event or None if the subscription has been closed.
+
+        :raises: ``eventlet.queue.Empty`` if there are no events after the timeout.
+
+        :rtype: :class:`StreamEvent`
+        """
+        slot = self.queue.get(timeout=timeout)
+
+        if not slot:
+            return None
+
+        event = slot[0]
+        self._remove_pending(slot=slot)
+        self.last_sequence = max(self.last_sequence, event.sequence)
+
+        return event
+
+    def close(self):
+        self.closed = True
+        self._pending = {}
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+        # Wake up the client generator
+        self.queue.put(None)
+
+    def _drop_oldest(self):
+        slot = self.queue.get_nowait()
+        self._remove_pending(slot=slot)
+
+        self.dropped_count += 1
+        get_driver().inc_counter('stream.subscriber.dropped')
+
+    def _remove_pending(self, slot):
+        key = slot[0].coalesce_key
+
+        if key and self._pending.get(key, None) is slot:
+            del self._pending[key]
+
+
+class SubscriptionIndex(object):
+    """
+    Index which maps event name, action ref and execution id to the subscriptions which are
+    interested in a particular event.
+
+    Event name filters can contain globs. Since the number of distinct event names is small, the
+    matching subscriptions are cached per event name and the cache is cleared each time a
+    subscription is added or removed.
+    """
+
+    def __init__(self):
+        self._subscriptions = set([])
+
+        self._by_action_ref = collections.defaultdict(set)
+        self._by_execution_id = collections.defaultdict(set)
+
+        # Subscriptions which don't filter on action ref / execution id
+        self._any_action_ref = set([])
+        self._any_execution_id = set([])
+
+        # Maps event name to the subscriptions which event filter matches that event
+        self._event_subscriptions_cache = {}
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def add(self, subscription):
+        self._subscriptions.add(subscription)
+
+        self._add_to_index(index=self._by_action_ref, any_values=self._any_action_ref,
+                           values=subscription.action_refs, subscription=subscription)
+        self._add_to_index(index=self._by_execution_id, any_values=self._any_execution_id,
+                           values=subscription.execution_ids, subscription=subscription)
+
+        self._event_subscriptions_cache = {}
+
+    def remove(self, subscription):
+        self._subscriptions.discard(subscription)
+
+        self._remove_from_index(index=self._by_action_ref, any_values=self._any_action_ref,
+                                values=subscription.action_refs, subscription=subscription)
+        self._remove_from_index(index=self._by_execution_id, any_values=self._any_execution_id,
+                                values=subscription.execution_ids, subscription=subscription)
+
+        self._event_subscriptions_cache = {}
+
+    def get_subscriptions(self, event_name, action_ref=None, execution_id=None):
+        """
+        Return subscriptions which should receive the provided event.
+
+        :rtype: ``list`` of :class:`Subscription`
+        """
+        subscriptions = self._get_event_subscriptions(event_name=event_name)
+
+        if not subscriptions:
+            return []
+
+        if self._by_action_ref:
+            subscriptions = subscriptions & (self._any_action_ref |
+                                             self._by_action_ref.get(action_ref, set([])))
+
+        if self._by_execution_id:
+            subscriptions = subscriptions & (self._any_execution_id |
+                                             self._by_execution_id.get(execution_id, set([])))
+
+        return list(subscriptions)
+
+    def _get_event_subscriptions(self, event_name):
+        subscriptions = self._event_subscriptions_cache.get(event_name, None)
+
+        if subscriptions is None:
+            subscriptions = set([subscription for subscription in self._subscriptions
+                                 if subscription.matches_event(event_name)])
+            self._event_subscriptions_cache[event_name] = subscriptions
+
+        return subscriptions
+
+    @staticmethod
+    def _add_to_index(index, any_values, values, subscription):
+        if not values:
+            any_values.add(subscription)
+            return
+
+        for value in values:
+            index[value].add(subscription)
+
+    @staticmethod
+    def _remove_from_index(index, any_values, values, subscription):
+        if not values:
+            any_values.discard(subscription)
+            return
+
+        for value in values:
+            index[value].discard(subscription)
+
+            if not index[value]:
+                del index[value]
+
+
 class BaseListener(ConsumerMixin):
 
     def __init__(self, connection):
         self.connection = connection
-        self.queues = []
+        self.subscriptions = SubscriptionIndex()
         self._stopped = False
 
+        # Resume tokens are only valid for the listener which issued them
+        self._id = uuid.uuid4().hex
+        self._sequence = 0
+
+        # Recent events which are replayed to the clients which resume the stream. Clients can
+        # only be asked to resume the stream when using the "disconnect" overflow policy. Buffer
+        # needs to be larger than the subscriber queue since all the events in the queue of the
+        # disconnected client haven't been delivered yet.
+        replay_buffer_size = 0
+        if cfg.CONF.stream.subscriber_overflow_policy == OVERFLOW_POLICY_DISCONNECT:
+            replay_buffer_size = max(cfg.CONF.stream.replay_buffer_size,
+                                     cfg.CONF.stream.subscriber_queue_size * 2)
+
+        self._replay_buffer = collections.deque(maxlen=replay_buffer_size)
+
     def get_consumers(self, consumer, channel):
         raise NotImplementedError('get_consumers() is not implemented')
 
@@ -63,95 +392,176 @@ class BaseListener(ConsumerMixin):
             event_name = '%s__%s' % (meta.get('exchange'), meta.get('routing_key'))
 
             try:
-                if model:
-                    body = model.from_model(body, mask_secrets=cfg.CONF.api.mask_secrets)
-
-                self.emit(event_name, body)
+                self.emit(event_name, body, model=model)
             finally:
                 message.ack()
 
         return process
 
-    def emit(self, event, body):
-        pack = (event, body)
-        for queue in self.queues:
-            queue.put(pack)
+    def emit(self, event, body, model=None):
+        """
+        Dispatch event to the matching subscriptions.
+
+        :param model: Optional API model class. Body is converted to the API model only once
+                      and only if there is at least one subscription for this event.
+        """
+        self._sequence += 1
+
+        stream_event = StreamEvent(sequence=self._sequence, name=event, body=body, model=model,
+                                   action_ref=self._get_action_ref_for_body(body=body),
+                                   execution_id=self._get_execution_id_for_body(body=body),
+                                   coalesce_key=self._get_coalesce_key(event=event, body=body))
+        self._replay_buffer.append(stream_event)
+
+        subscriptions = self.subscriptions.get_subscriptions(
+            event_name=event,
+            action_ref=stream_event.action_ref,
+            execution_id=stream_event.execution_id)
+
+        if not subscriptions:
+            LOG.debug('Skipping event "%s", no matching subscriptions' % (event))
+            return
+
+        # Convert the body before putting the event in the queues so the conversion happens in
+        # a single (listener) thread
+        stream_event.get_body()
+
+        for subscription in subscriptions:
+            if not subscription.put(stream_event):
+                self.subscriptions.remove(subscription)
+
+    def generator(self, events=None, action_refs=None, execution_ids=None, resume_token=None,
+                  queue_size=None):
+        """
+        :param queue_size: Maximum number of events buffered for this client. Defaults to the
+                           stream.subscriber_queue_size config option. 0 means unlimited.
+        :type queue_size: ``int``
+        """
+        if queue_size is None:
+            queue_size = cfg.CONF.stream.subscriber_queue_size
+
+        subscription = Subscription(events=events, action_refs=action_refs,
+                                    execution_ids=execution_ids, queue_size=queue_size,
+                                    overflow_policy=cfg.CONF.stream.subscriber_overflow_policy)
 
-    def generator(self, events=None, action_refs=None, execution_ids=None):
-        queue = eventlet.Queue()
-        queue.put('')
-        self.queues.append(queue)
+        # NOTE: Replayed events are not put in the (bounded) subscription queue. New events are
+        # buffered in the queue while the replayed events are being sent.
+        replay_events, replay_complete = self._get_replay_events(subscription=subscription,
+                                                                 resume_token=resume_token)
+        self.subscriptions.add(subscription)
+
+        last_lag_report_ts = time.time()
+        reported_dropped_count = 0
 
         try:
+            yield ''
+
+            if not replay_complete:
+                yield (EVENTS_LOST_EVENT, {'dropped': None})
+
+            for event in replay_events:
+                subscription.last_sequence = event.sequence
+                yield (event.name, event.get_body())
+
             while not self._stopped:
                 try:
                     # TODO: Move to common option
-                    message = queue.get(timeout=cfg.CONF.stream.heartbeat)
-
-                    if not message:
-                        yield message
-                        continue
-
-                    event_name, body = message
-                    # TODO: We now do late filtering, but this could also be performed on the
-                    # message bus level if we modified our exchange layout and utilize routing keys
-                    # Filter on event name
-                    include_event = self._should_include_event(event_names_whitelist=events,
-                                                               event_name=event_name)
-                    if not include_event:
-                        LOG.debug('Skipping event "%s"' % (event_name))
-                        continue
-
-                    # Filter on action ref
-                    action_ref = self._get_action_ref_for_body(body=body)
-                    if action_refs and action_ref not in action_refs:
-                        LOG.debug('Skipping event "%s" with action_ref "%s"' % (event_name,
-                                                                                action_ref))
-                        continue
-
-                    # Filter on execution id
-                    execution_id = self._get_execution_id_for_body(body=body)
-                    if execution_ids and execution_id not in execution_ids:
-                        LOG.debug('Skipping event "%s" with execution_id "%s"' % (event_name,
-                                                                                  execution_id))
-                        continue
-
-                    yield message
+                    event = subscription.get(timeout=cfg.CONF.stream.heartbeat)
                 except eventlet.queue.Empty:
                     yield
+                    continue
+
+                if subscription.closed:
+                    yield (OVERFLOW_EVENT, {
+                        'resume_token': self._get_resume_token(subscription=subscription),
+                        'dropped': subscription.dropped_count
+                    })
+                    break
+
+                # Let the client know it has missed some events
+                if subscription.dropped_count > reported_dropped_count:
+                    yield (EVENTS_LOST_EVENT,
+                           {'dropped': subscription.dropped_count - reported_dropped_count})
+                    reported_dropped_count = subscription.dropped_count
+
+                # Events are filtered on event name, action ref and execution id before they are
+                # put in the queue
+                yield (event.name, event.get_body())
+
+                now = time.time()
+                if (now - last_lag_report_ts) >= LAG_REPORT_INTERVAL:
+                    get_driver().time('stream.subscriber.lag', now - event.timestamp)
+                    last_lag_report_ts = now
         finally:
-            self.queues.remove(queue)
+            self.subscriptions.remove(subscription)
 
     def shutdown(self):
         self._stopped = True
 
-    def _should_include_event(self, event_names_whitelist, event_name):
+    def _get_resume_token(self, subscription):
+        return '%s.%s' % (self._id, subscription.last_sequence)
+
+    def _get_replay_events(self, subscription, resume_token):
         """
-        Return True if particular event should be included based on the event names filter.
+        Return buffered events matching the subscription which have been published after the
+        event referenced by the resume token.
+
+        :return: Tuple of the events and a flag which is False if some of the events which have
+                 been published after the referenced event are not available anymore (or the
+                 token can't be honoured at all).
+        :rtype: ``tuple`` of (``list`` of :class:`StreamEvent`, ``bool``)
         """
-        if not event_names_whitelist:
-            return True
+        if not resume_token:
+            return [], True
 
-        for event_name_filter_glob in event_names_whitelist:
-            if fnmatch.fnmatch(event_name, event_name_filter_glob):
-                return True
+        try:
+            listener_id, sequence = resume_token.split('.', 1)
+            sequence = int(sequence)
+        except ValueError:
+            LOG.info('Ignoring invalid resume token "%s"' % (resume_token))
+            return [], False
+
+        if listener_id != self._id:
+            LOG.info('Ignoring resume token "%s" issued by a different listener' % (resume_token))
+            return [], False
+
+        complete = True
+
+        if ((self._replay_buffer and self._replay_buffer[0].sequence > sequence + 1) or
+                (not self._replay_buffer and self._sequence > sequence)):
+            LOG.info('Some of the events for resume token "%s" are not available anymore' %
+                     (resume_token))
+            complete = False
+
+        events = [event for event in self._replay_buffer
+                  if event.sequence > sequence and subscription.matches(event)]
+        return events, complete
+
+    @staticmethod
+    def _get_coalesce_key(event, body):
+        if not event.endswith('__update'):
+            return None
 
-        return False
+        if isinstance(body, (ActionExecutionDB, ActionExecutionAPI, LiveActionDB,
+                             LiveActionAPI)):
+            return (event, str(body.id))
+
+        return None
 
     def _get_action_ref_for_body(self, body):
         """
-        Retrieve action_ref for the provided message body.
+        Retrieve action_ref for the provided message body (database or API model object).
         """
         if not body:
             return None
 
         action_ref = None
 
-        if isinstance(body, ActionExecutionAPI):
+        if isinstance(body, (ActionExecutionDB, ActionExecutionAPI)):
             action_ref = body.action.get('ref', None) if body.action else None
-        elif isinstance(body, LiveActionAPI):
+        elif isinstance(body, (LiveActionDB, LiveActionAPI)):
             action_ref = body.action
-        elif isinstance(body, (ActionExecutionOutputAPI)):
+        elif isinstance(body, (ActionExecutionOutputDB, ActionExecutionOutputAPI)):
             action_ref = body.action_ref
 
         return action_ref
@@ -162,11 +572,11 @@ class BaseListener(ConsumerMixin):
 
         execution_id = None
 
-        if isinstance(body, ActionExecutionAPI):
+        if isinstance(body, (ActionExecutionDB, ActionExecutionAPI)):
             execution_id = str(body.id)
-        elif isinstance(body, LiveActionAPI):
+        elif isinstance(body, (LiveActionDB, LiveActionAPI)):
             execution_id = None
-        elif isinstance(body, (ActionExecutionOutputAPI)):
+        elif isinstance(body, (ActionExecutionOutputDB, ActionExecutionOutputAPI)):
             execution_id = body.execution_id
 
         return execution_id
@@ -182,19 +592,19 @@ class StreamListener(BaseListener):
     def get_consumers(self, consumer, channel):
         return [
             consumer(queues=[STREAM_ANNOUNCEMENT_WORK_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor()]),
 
             consumer(queues=[STREAM_EXECUTION_ALL_WORK_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(ActionExecutionAPI)]),
 
             consumer(queues=[STREAM_LIVEACTION_WORK_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(LiveActionAPI)]),
 
             consumer(queues=[STREAM_EXECUTION_OUTPUT_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(ActionExecutionOutputAPI)])
         ]
 
@@ -209,11 +619,11 @@ class ExecutionOutputListener(BaseListener):
     def get_consumers(self, consumer, channel):
         return [
             consumer(queues=[STREAM_EXECUTION_UPDATE_WORK_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(ActionExecutionAPI)]),
 
             consumer(queues=[STREAM_EXECUTION_OUTPUT_QUEUE],
-                     accept=['pickle'],
+                     accept=serializers.ACCEPT_CONTENT,
                      callbacks=[self.processor(ActionExecutionOutputAPI)])
         ]
 
@@ -15,6 +15,7 @@
 from __future__ import absolute_import
 
 from st2common.transport import liveaction, actionexecutionstate, execution, workflow
+from st2common.transport import keyvalue, resource
 from st2common.transport import publishers, reactor, utils, connection_retry_wrapper
 
 # TODO(manas) : Exchanges, Queues and RoutingKey design discussion pending.
@@ -24,6 +25,8 @@ __all__ = [
     'actionexecutionstate',
     'execution',
     'workflow',
+    'keyvalue',
+    'resource',
     'publishers',
     'reactor',
     'utils',
@@ -30,10 +30,19 @@ from st2common.transport.actionexecutionstate import ACTIONEXECUTIONSTATE_XCHG
 from st2common.transport.announcement import ANNOUNCEMENT_XCHG
 from st2common.transport.connection_retry_wrapper import ConnectionRetryWrapper
 from st2common.transport.execution import EXECUTION_XCHG
+from st2common.transport.keyvalue import KEYVALUE_CUD_XCHG
 from st2common.transport.liveaction import LIVEACTION_XCHG, LIVEACTION_STATUS_MGMT_XCHG
+from st2common.transport.reactor import RULE_CUD_XCHG
 from st2common.transport.reactor import SENSOR_CUD_XCHG
 from st2common.transport.reactor import TRIGGER_CUD_XCHG, TRIGGER_INSTANCE_XCHG
+from st2common.transport.reactor import TRIGGER_TYPE_CUD_XCHG
+from st2common.transport.resource import ACTION_CUD_XCHG
+from st2common.transport.resource import RUNNER_TYPE_CUD_XCHG
+from st2common.transport.resource import POLICY_CUD_XCHG
+from st2common.transport import keyvalue
 from st2common.transport import reactor
+from st2common.transport import resource
+from st2common.transport import serializers
 from st2common.transport.workflow import WORKFLOW_EXECUTION_XCHG
 from st2common.transport.workflow import WORKFLOW_EXECUTION_STATUS_MGMT_XCHG
 from st2common.transport.queues import ACTIONSCHEDULER_REQUEST_QUEUE
@@ -68,8 +77,14 @@ EXCHANGES = [
     LIVEACTION_XCHG,
     LIVEACTION_STATUS_MGMT_XCHG,
     TRIGGER_CUD_XCHG,
+    TRIGGER_TYPE_CUD_XCHG,
     TRIGGER_INSTANCE_XCHG,
     SENSOR_CUD_XCHG,
+    RULE_CUD_XCHG,
+    KEYVALUE_CUD_XCHG,
+    ACTION_CUD_XCHG,
+    RUNNER_TYPE_CUD_XCHG,
+    POLICY_CUD_XCHG,
     WORKFLOW_EXECUTION_XCHG,
     WORKFLOW_EXECUTION_STATUS_MGMT_XCHG
 ]
@@ -96,7 +111,13 @@ QUEUES = [
     # Those queues are dynamically / late created on some class init but we still need to
     # pre-declare them for redis Kombu backend to work.
     reactor.get_trigger_cud_queue(name='st2.preinit', routing_key='init'),
-    reactor.get_sensor_cud_queue(name='st2.preinit', routing_key='init')
+    reactor.get_sensor_cud_queue(name='st2.preinit', routing_key='init'),
+    reactor.get_rule_cud_queue(name='st2.preinit', routing_key='init'),
+    keyvalue.get_keyvalue_cud_queue(name='st2.preinit', routing_key='init'),
+    reactor.get_trigger_type_cud_queue(name='st2.preinit', routing_key='init'),
+    resource.get_action_cud_queue(name='st2.preinit', routing_key='init'),
+    resource.get_runner_type_cud_queue(name='st2.preinit', routing_key='init'),
+    resource.get_policy_cud_queue(name='st2.preinit', routing_key='init')
 ]
 
 
@@ -173,7 +194,7 @@ def register_exchanges_with_retry():
 def register_kombu_serializers():
     """
     Register our custom pickle serializer which knows how to handle UTF-8 (non
-    ascii) messages.
+    ascii) messages and our msgpack serializer.
 
     Default kombu pickle de-serializer calls .encode() on the bytes object without providing an
     encoding. This means it default to "ascii" and fail with UnicodeDecode error.
@@ -201,3 +222,6 @@ def register_kombu_serializers():
     register('pickle', pickle_dumps, unpickle,
              content_type='application/x-python-serialize',
              content_encoding='binary')
+
+    # Compact msgpack based serializer (see st2common.transport.serializers)
+    serializers.register_msgpack_serializer()
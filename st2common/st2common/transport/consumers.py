@@ -14,12 +14,16 @@
 
 from __future__ import absolute_import
 import abc
+import time
+
 import six
 
 from kombu.mixins import ConsumerMixin
 from oslo_config import cfg
 
 from st2common import log as logging
+from st2common.metrics.base import get_driver
+from st2common.transport import serializers
 from st2common.util.greenpooldispatch import BufferedDispatcher
 from st2common.util import concurrency
 
@@ -34,26 +38,77 @@ __all__ = [
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_PREFETCH_COUNT = 1
+DEFAULT_ACK_BATCH_SIZE = 1
+DEFAULT_ACK_BATCH_INTERVAL = 0.5
+
 
 class QueueConsumer(ConsumerMixin):
-    def __init__(self, connection, queues, handler):
+    """
+    Consumer which dispatches received messages to the handler using a BufferedDispatcher.
+
+    By default (prefetch_count=1) each message is acknowledged on its own once it has been
+    dispatched. When prefetch_count is larger than 1, the consumer operates in a batched mode:
+
+    1. Up to ``ack_batch_size`` messages are acknowledged using a single (multiple) ack. Partial
+       batches are acknowledged after ``ack_batch_interval`` seconds.
+    2. Consumer stops receiving new messages while there are no free dispatcher threads
+       (backpressure) so messages stay in the broker instead of the in-memory buffer.
+    """
+
+    def __init__(self, connection, queues, handler, prefetch_count=DEFAULT_PREFETCH_COUNT,
+                 ack_batch_size=DEFAULT_ACK_BATCH_SIZE,
+                 ack_batch_interval=DEFAULT_ACK_BATCH_INTERVAL, name=None):
         self.connection = connection
-        self._dispatcher = BufferedDispatcher()
         self._queues = queues
         self._handler = handler
 
+        self._init_consumer_options(prefetch_count=prefetch_count, ack_batch_size=ack_batch_size,
+                                    ack_batch_interval=ack_batch_interval, name=name)
+
+        # Consumer name is used as a dispatcher name so the dispatcher metrics have a stable key
+        self._dispatcher = BufferedDispatcher(name=self._name)
+
+    def _init_consumer_options(self, prefetch_count=DEFAULT_PREFETCH_COUNT,
+                               ack_batch_size=DEFAULT_ACK_BATCH_SIZE,
+                               ack_batch_interval=DEFAULT_ACK_BATCH_INTERVAL, name=None):
+        self._prefetch_count = max(prefetch_count, 1)
+        # Broker won't deliver more than prefetch_count unacknowledged messages so a larger batch
+        # would only ever be flushed by the interval
+        self._ack_batch_size = max(min(ack_batch_size, self._prefetch_count), 1)
+        self._ack_batch_interval = ack_batch_interval
+        self._name = name or self._handler.__class__.__name__
+
+        # Last received message which hasn't been acknowledged yet. Acknowledging it with
+        # multiple=True also acknowledges all the previous messages received on the same channel.
+        self._unacked_message = None
+        self._unacked_count = 0
+        self._unacked_since = None
+
     def shutdown(self):
+        self._flush_acks()
         self._dispatcher.shutdown()
 
     def get_consumers(self, Consumer, channel):
-        consumer = Consumer(queues=self._queues, accept=['pickle'], callbacks=[self.process])
+        consumer = Consumer(queues=self._queues, accept=serializers.ACCEPT_CONTENT,
+                            callbacks=[self.process])
 
-        # use prefetch_count=1 for fair dispatch. This way workers that finish an item get the next
-        # task and the work does not get queued behind any single large item.
-        consumer.qos(prefetch_count=1)
+        # By default we use prefetch_count=1 for fair dispatch. This way workers that finish an
+        # item get the next task and the work does not get queued behind any single large item.
+        consumer.qos(prefetch_count=self._prefetch_count)
 
         return [consumer]
 
+    def on_iteration(self):
+        if self._unacked_message is None:
+            return
+
+        if (time.time() - self._unacked_since) >= self._ack_batch_interval:
+            self._flush_acks()
+
+    def on_consume_end(self, connection, channel):
+        self._flush_acks()
+
     def process(self, body, message):
         try:
             if not isinstance(body, self._handler.message_type):
@@ -64,7 +119,61 @@ class QueueConsumer(ConsumerMixin):
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
         finally:
             # At this point we will always ack a message.
+            self._ack(message)
+
+        self._wait_for_dispatcher(self._dispatcher)
+
+    def _ack(self, message):
+        if self._ack_batch_size <= 1:
             message.ack()
+            get_driver().inc_counter('consumer.%s.acks' % (self._name))
+        else:
+            if self._unacked_message is None:
+                self._unacked_since = time.time()
+
+            self._unacked_message = message
+            self._unacked_count += 1
+
+            if self._unacked_count >= self._ack_batch_size:
+                self._flush_acks()
+
+        get_driver().inc_counter('consumer.%s.messages' % (self._name))
+
+    def _flush_acks(self):
+        message = self._unacked_message
+        count = self._unacked_count
+
+        if message is None:
+            return
+
+        self._unacked_message = None
+        self._unacked_count = 0
+        self._unacked_since = None
+
+        try:
+            message.ack(multiple=True)
+        except Exception:
+            # Channel has been closed, broker will re-deliver unacknowledged messages
+            LOG.exception('%s failed to acknowledge %s messages', self.__class__.__name__, count)
+            return
+
+        get_driver().inc_counter('consumer.%s.acks' % (self._name))
+
+    def _wait_for_dispatcher(self, dispatcher):
+        """
+        Block the consumer (and as such stop receiving new messages) until there is a free thread
+        in the dispatcher pool.
+        """
+        if self._prefetch_count <= 1 or dispatcher.free() > 0:
+            return
+
+        # Messages which have already been dispatched shouldn't wait for the batch to fill up
+        self._flush_acks()
+
+        start_ts = time.time()
+        dispatcher.wait_free()
+
+        get_driver().time('consumer.%s.backpressure' % (self._name), time.time() - start_ts)
 
     def _process_message(self, body):
         try:
@@ -88,7 +197,9 @@ class StagedQueueConsumer(QueueConsumer):
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
         finally:
             # At this point we will always ack a message.
-            message.ack()
+            self._ack(message)
+
+        self._wait_for_dispatcher(self._dispatcher)
 
 
 class ActionsQueueConsumer(QueueConsumer):
@@ -114,6 +225,8 @@ class ActionsQueueConsumer(QueueConsumer):
         self._actions_dispatcher = BufferedDispatcher(dispatch_pool_size=actions_pool_size,
                                                       name='actions-dispatcher')
 
+        self._init_consumer_options()
+
     def process(self, body, message):
         try:
             if not isinstance(body, self._handler.message_type):
@@ -133,9 +246,10 @@ class ActionsQueueConsumer(QueueConsumer):
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
         finally:
             # At this point we will always ack a message.
-            message.ack()
+            self._ack(message)
 
     def shutdown(self):
+        self._flush_acks()
         self._workflows_dispatcher.shutdown()
         self._actions_dispatcher.shutdown()
 
@@ -155,7 +269,9 @@ class VariableMessageQueueConsumer(QueueConsumer):
             LOG.exception('%s failed to process message: %s', self.__class__.__name__, body)
         finally:
             # At this point we will always ack a message.
-            message.ack()
+            self._ack(message)
+
+        self._wait_for_dispatcher(self._dispatcher)
 
 
 @six.add_metaclass(abc.ABCMeta)
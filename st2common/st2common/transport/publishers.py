@@ -20,6 +20,7 @@ from kombu.messaging import Producer
 
 from st2common import log as logging
 from st2common.metrics.base import Timer
+from st2common.transport import serializers
 from st2common.transport import utils as transport_utils
 from st2common.transport.connection_retry_wrapper import ConnectionRetryWrapper
 
@@ -52,6 +53,12 @@ class PoolPublisher(object):
         self.pool = connection.Pool(limit=10)
         self.cluster_size = len(urls)
 
+        self.serializer = serializers.get_serializer()
+        if self.serializer == serializers.MSGPACK_SERIALIZER:
+            # Make sure serializer is also available in scripts which don't go through the
+            # service setup
+            serializers.register_msgpack_serializer()
+
     def errback(self, exc, interval):
         LOG.error('Rabbitmq connection error: %s', exc.message, exc_info=False)
 
@@ -70,7 +77,7 @@ class PoolPublisher(object):
                         'body': payload,
                         'exchange': exchange,
                         'routing_key': routing_key,
-                        'serializer': 'pickle',
+                        'serializer': self.serializer,
                         'content_encoding': 'utf-8'
                     }
 
@@ -21,13 +21,17 @@ from st2common.models.api.trace import TraceContext
 from st2common.transport import publishers
 
 __all__ = [
+    'RuleCUDPublisher',
     'TriggerCUDPublisher',
+    'TriggerTypeCUDPublisher',
     'TriggerInstancePublisher',
 
     'TriggerDispatcher',
 
+    'get_rule_cud_queue',
     'get_sensor_cud_queue',
     'get_trigger_cud_queue',
+    'get_trigger_type_cud_queue',
     'get_trigger_instances_queue'
 ]
 
@@ -36,12 +40,25 @@ LOG = logging.getLogger(__name__)
 # Exchange for Trigger CUD events
 TRIGGER_CUD_XCHG = Exchange('st2.trigger', type='topic')
 
+# Exchange for TriggerType CUD events
+TRIGGER_TYPE_CUD_XCHG = Exchange('st2.triggertype', type='topic')
+
 # Exchange for TriggerInstance events
 TRIGGER_INSTANCE_XCHG = Exchange('st2.trigger_instances_dispatch', type='topic')
 
+# Routing keys for the single and batched trigger instance messages
+TRIGGER_INSTANCE_RK = 'trigger_instance'
+TRIGGER_INSTANCE_BATCH_RK = 'trigger_instance_batch'
+
+# Maximum number of payloads in a single batched trigger instance message
+TRIGGER_INSTANCE_BATCH_SIZE = 100
+
 # Exchane for Sensor CUD events
 SENSOR_CUD_XCHG = Exchange('st2.sensor', type='topic')
 
+# Exchange for Rule CUD events
+RULE_CUD_XCHG = Exchange('st2.rule', type='topic')
+
 
 class SensorCUDPublisher(publishers.CUDPublisher):
     """
@@ -61,6 +78,24 @@ class TriggerCUDPublisher(publishers.CUDPublisher):
         super(TriggerCUDPublisher, self).__init__(exchange=TRIGGER_CUD_XCHG)
 
 
+class TriggerTypeCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing TriggerType model CUD events.
+    """
+
+    def __init__(self):
+        super(TriggerTypeCUDPublisher, self).__init__(exchange=TRIGGER_TYPE_CUD_XCHG)
+
+
+class RuleCUDPublisher(publishers.CUDPublisher):
+    """
+    Publisher responsible for publishing Rule model CUD events.
+    """
+
+    def __init__(self):
+        super(RuleCUDPublisher, self).__init__(exchange=RULE_CUD_XCHG)
+
+
 class TriggerInstancePublisher(object):
     def __init__(self):
         self._publisher = publishers.PoolPublisher()
@@ -100,19 +135,59 @@ class TriggerDispatcher(object):
             'payload': payload,
             TRACE_CONTEXT: trace_context
         }
-        routing_key = 'trigger_instance'
+        routing_key = TRIGGER_INSTANCE_RK
 
         self._logger.debug('Dispatching trigger (trigger=%s,payload=%s)', trigger, payload)
         self._publisher.publish_trigger(payload=payload, routing_key=routing_key)
 
+    def dispatch_many(self, trigger, payloads, trace_context=None,
+                      batch_size=TRIGGER_INSTANCE_BATCH_SIZE):
+        """
+        Method which dispatches multiple instances of the same trigger. Payloads are published in
+        batched messages (up to batch_size payloads per message) instead of one message per
+        payload.
+
+        :param trigger: Full name / reference of the trigger.
+        :type trigger: ``str`` or ``object``
+
+        :param payloads: Trigger payloads.
+        :type payloads: ``list`` of ``dict``
+
+        :param trace_context: Trace context to associate with all the Triggers.
+        :type trace_context: ``TraceContext``
+        """
+        assert isinstance(payloads, (list, tuple))
+        assert all([isinstance(payload, (type(None), dict)) for payload in payloads])
+        assert isinstance(trace_context, (type(None), TraceContext))
+
+        for index in range(0, len(payloads), batch_size):
+            payload = {
+                'trigger': trigger,
+                'payloads': list(payloads[index:index + batch_size]),
+                TRACE_CONTEXT: trace_context
+            }
+            routing_key = TRIGGER_INSTANCE_BATCH_RK
+
+            self._logger.debug('Dispatching trigger batch (trigger=%s,count=%s)', trigger,
+                               len(payload['payloads']))
+            self._publisher.publish_trigger(payload=payload, routing_key=routing_key)
+
 
 def get_trigger_cud_queue(name, routing_key, exclusive=False):
     return Queue(name, TRIGGER_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
 
 
+def get_trigger_type_cud_queue(name, routing_key, exclusive=False):
+    return Queue(name, TRIGGER_TYPE_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
+
+
 def get_trigger_instances_queue(name, routing_key):
     return Queue(name, TRIGGER_INSTANCE_XCHG, routing_key=routing_key)
 
 
 def get_sensor_cud_queue(name, routing_key):
     return Queue(name, SENSOR_CUD_XCHG, routing_key=routing_key)
+
+
+def get_rule_cud_queue(name, routing_key, exclusive=False):
+    return Queue(name, RULE_CUD_XCHG, routing_key=routing_key, exclusive=exclusive)
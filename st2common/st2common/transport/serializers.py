@@ -0,0 +1,186 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Message serializers used for the messages which are sent over the message bus.
+
+In addition to the default pickle serializer we also support a compact msgpack based wire format.
+Database model objects (mongoengine documents) are encoded as a type tag plus their Mongo SON
+representation (the same representation which is stored in the database) and other non-native
+types (datetime, ObjectId, etc.) are encoded using msgpack extension types.
+
+Consumers accept both formats so the serializer used by the publishers can be switched after all
+the services have been upgraded (rolling upgrade).
+"""
+
+from __future__ import absolute_import
+
+import datetime
+import importlib
+
+import bson
+import dateutil.tz
+import msgpack
+from kombu.serialization import pickle
+from kombu.serialization import pickle_loads
+from kombu.serialization import pickle_protocol
+from kombu.serialization import register
+from mongoengine.base import get_document
+from mongoengine.base.document import BaseDocument
+from mongoengine.errors import NotRegistered
+from oslo_config import cfg
+
+__all__ = [
+    'ACCEPT_CONTENT',
+
+    'get_serializer',
+    'register_msgpack_serializer',
+
+    'msgpack_dumps',
+    'msgpack_loads'
+]
+
+PICKLE_SERIALIZER = 'pickle'
+
+# Name and content type under which our msgpack serializer is registered with kombu. We don't
+# re-use the builtin kombu "msgpack" serializer since it doesn't support custom types.
+MSGPACK_SERIALIZER = 'st2-msgpack'
+MSGPACK_CONTENT_TYPE = 'application/x-st2-msgpack'
+
+# Maps value of the "messaging.serializer" config option to the kombu serializer name
+SERIALIZERS = {
+    'pickle': PICKLE_SERIALIZER,
+    'msgpack': MSGPACK_SERIALIZER
+}
+
+# Content which is accepted by all the consumers.
+# NOTE: We use content type for msgpack since kombu requires serializer names to be registered
+# when the consumer is created.
+ACCEPT_CONTENT = [PICKLE_SERIALIZER, MSGPACK_CONTENT_TYPE]
+
+# Only documents from those modules can be imported when decoding a message
+ALLOWED_DOCUMENT_MODULE_PREFIXES = [
+    'st2common.models.db.'
+]
+
+EXT_TYPE_DOCUMENT = 1
+EXT_TYPE_DATETIME = 2
+EXT_TYPE_OBJECT_ID = 3
+# Values which can't be represented using msgpack types (e.g. API models) are pickled
+EXT_TYPE_PICKLE = 4
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def get_serializer():
+    """
+    Return name of the kombu serializer which should be used by the publishers.
+
+    :rtype: ``str``
+    """
+    return SERIALIZERS[cfg.CONF.messaging.serializer]
+
+
+def _pickle_dumps(obj):
+    return pickle.dumps(obj, protocol=pickle_protocol)
+
+
+def _datetime_to_micros(value):
+    if value.tzinfo:
+        value = value.astimezone(dateutil.tz.tzutc()).replace(tzinfo=None)
+
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _micros_to_datetime(value, is_aware):
+    result = EPOCH + datetime.timedelta(microseconds=value)
+
+    if is_aware:
+        result = result.replace(tzinfo=dateutil.tz.tzutc())
+
+    return result
+
+
+def _default(obj):
+    if isinstance(obj, BaseDocument):
+        cls = obj.__class__
+        data = msgpack_dumps([cls.__module__, cls._class_name, obj.to_mongo()])
+        return msgpack.ExtType(EXT_TYPE_DOCUMENT, data)
+    elif isinstance(obj, datetime.datetime):
+        is_aware = obj.tzinfo is not None
+        data = msgpack.packb([_datetime_to_micros(obj), is_aware])
+        return msgpack.ExtType(EXT_TYPE_DATETIME, data)
+    elif isinstance(obj, bson.ObjectId):
+        return msgpack.ExtType(EXT_TYPE_OBJECT_ID, obj.binary)
+
+    return msgpack.ExtType(EXT_TYPE_PICKLE, _pickle_dumps(obj))
+
+
+def _get_document_class(module_name, class_name):
+    try:
+        return get_document(class_name)
+    except NotRegistered:
+        pass
+
+    # Document class hasn't been imported by this process yet
+    for prefix in ALLOWED_DOCUMENT_MODULE_PREFIXES:
+        if module_name.startswith(prefix):
+            importlib.import_module(module_name)
+            return get_document(class_name)
+
+    raise ValueError('Invalid document class "%s.%s"' % (module_name, class_name))
+
+
+def _ext_hook(code, data):
+    if code == EXT_TYPE_DOCUMENT:
+        module_name, class_name, son = msgpack_loads(data)
+        cls = _get_document_class(module_name=module_name, class_name=class_name)
+        return cls._from_son(son)
+    elif code == EXT_TYPE_DATETIME:
+        value, is_aware = msgpack.unpackb(data)
+        return _micros_to_datetime(value=value, is_aware=is_aware)
+    elif code == EXT_TYPE_OBJECT_ID:
+        return bson.ObjectId(data)
+    elif code == EXT_TYPE_PICKLE:
+        return pickle_loads(data)
+
+    return msgpack.ExtType(code, data)
+
+
+def msgpack_dumps(obj):
+    """
+    Serialize provided object using msgpack.
+
+    :rtype: ``bytes``
+    """
+    try:
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    except (OverflowError, ValueError, TypeError):
+        # Value which can't be represented using msgpack (e.g. integer larger than 64 bits)
+        return msgpack.packb(msgpack.ExtType(EXT_TYPE_PICKLE, _pickle_dumps(obj)),
+                             use_bin_type=True)
+
+
+def msgpack_loads(data):
+    """
+    Deserialize object which has been serialized using msgpack_dumps.
+    """
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def register_msgpack_serializer():
+    register(MSGPACK_SERIALIZER, msgpack_dumps, msgpack_loads,
+             content_type=MSGPACK_CONTENT_TYPE,
+             content_encoding='binary')
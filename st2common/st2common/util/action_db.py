@@ -31,6 +31,7 @@ from st2common.constants.action import (
     LIVEACTION_STATUS_SUCCEEDED,
 )
 from st2common.exceptions.db import StackStormDBObjectNotFoundError
+from st2common.persistence import cache as resource_cache
 from st2common.persistence.action import Action
 from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.runner import RunnerType
@@ -103,7 +104,7 @@ def get_runnertype_by_name(runnertype_name):
         On error, raise ST2ObjectNotFoundError.
     """
     try:
-        runnertypes = RunnerType.query(name=runnertype_name)
+        runnertypes = resource_cache.query(RunnerType, name=runnertype_name)
     except (ValueError, ValidationError) as e:
         LOG.error('Database lookup for name="%s" resulted in exception: %s',
                   runnertype_name, e)
@@ -150,7 +151,7 @@ def get_action_by_ref(ref):
     :rtype action: ``object``
     """
     try:
-        return Action.get_by_ref(ref)
+        return resource_cache.get_by_ref(Action, ref)
     except ValueError as e:
         LOG.debug('Database lookup for ref="%s" resulted ' +
                   'in exception : %s.', ref, e, exc_info=True)
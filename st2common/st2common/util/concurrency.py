@@ -48,6 +48,7 @@ __all__ = [
     'get_greenlet_exit_exception_class',
 
     'get_green_pool_class',
+    'get_queue_class',
     'is_green_pool_free',
     'green_pool_wait_all'
 ]
@@ -148,6 +149,35 @@ def get_green_pool_class():
         raise ValueError('Unsupported concurrency library')
 
 
+def get_queue_class():
+    """
+    Return green queue class. Queue ``get`` method with a timeout raises ``queue.Empty`` if no
+    item is available.
+    """
+    if CONCURRENCY_LIBRARY == 'eventlet':
+        import eventlet.queue  # pylint: disable=import-error
+        return eventlet.queue.LightQueue
+    elif CONCURRENCY_LIBRARY == 'gevent':
+        import gevent.queue  # pylint: disable=import-error
+        return gevent.queue.Queue
+    else:
+        raise ValueError('Unsupported concurrency library')
+
+
+def get_semaphore_class():
+    """
+    Return green semaphore class.
+    """
+    if CONCURRENCY_LIBRARY == 'eventlet':
+        import eventlet.semaphore  # pylint: disable=import-error
+        return eventlet.semaphore.Semaphore
+    elif CONCURRENCY_LIBRARY == 'gevent':
+        import gevent.lock  # pylint: disable=import-error
+        return gevent.lock.Semaphore
+    else:
+        raise ValueError('Unsupported concurrency library')
+
+
 def is_green_pool_free(pool):
     """
     Return True if the provided green pool is free, False otherwise.
@@ -16,9 +16,11 @@ from __future__ import absolute_import
 import time
 
 import eventlet
-import six.moves.queue
+import eventlet.event
+import eventlet.queue
 
 from st2common import log as logging
+from st2common.metrics.base import get_driver
 
 __all__ = [
     'BufferedDispatcher'
@@ -33,64 +35,165 @@ BufferedDispatcher pool "%s" has been busy with no free threads for more than %s
 are server resources available, consider increasing the dispatcher pool size in the config.
 """.strip()
 
+# Name of the dispatchers which are created without a name (used in the metric keys)
+DEFAULT_DISPATCHER_NAME = 'default'
+
 LOG = logging.getLogger(__name__)
 
 
 class BufferedDispatcher(object):
+    """
+    Dispatcher which runs handlers in a green thread pool.
+
+    Work which is dispatched while there are no free threads in the pool is buffered and started
+    as soon as a thread becomes free. The buffer is bounded and ``dispatch`` blocks while the
+    buffer is full which pushes back on the caller (e.g. the message bus consumer).
+
+    The following metrics are reported for each dispatcher (under "dispatcher.<name>." prefix):
+
+    * queue_depth - number of buffered items (gauge).
+    * wait_time - time between dispatch and start of the handler (timer).
+    * utilization - percentage of the busy pool threads (gauge).
+    """
 
     def __init__(self, dispatch_pool_size=50, monitor_thread_empty_q_sleep_time=5,
-                 monitor_thread_no_workers_sleep_time=1, name=None):
+                 monitor_thread_no_workers_sleep_time=1, name=None, buffer_size=None):
+        """
+        :param dispatch_pool_size: Number of green threads in the pool.
+        :type dispatch_pool_size: ``int``
+
+        :param monitor_thread_empty_q_sleep_time: Not used anymore. Kept for backward
+                                                  compatibility.
+
+        :param monitor_thread_no_workers_sleep_time: Not used anymore. Kept for backward
+                                                     compatibility.
+
+        :param name: Dispatcher name which is used in the metric keys. It should be stable across
+                     restarts so the metrics can be tracked.
+        :type name: ``str``
+
+        :param buffer_size: Maximum number of buffered items. Defaults to the pool size. 0 means
+                            unbounded.
+        :type buffer_size: ``int``
+        """
+        if buffer_size is None:
+            buffer_size = dispatch_pool_size
+
         self._pool_limit = dispatch_pool_size
+        self._buffer_size = buffer_size
+        self._name = name or DEFAULT_DISPATCHER_NAME
+
         self._dispatcher_pool = eventlet.GreenPool(dispatch_pool_size)
-        self._dispatch_monitor_thread = eventlet.greenthread.spawn(self._flush)
-        self._monitor_thread_empty_q_sleep_time = monitor_thread_empty_q_sleep_time
-        self._monitor_thread_no_workers_sleep_time = monitor_thread_no_workers_sleep_time
-        self._name = name
+        self._work_buffer = eventlet.queue.Queue(maxsize=buffer_size or None)
+
+        # Sent (and replaced with a new event) each time a pool thread becomes free
+        self._thread_freed = eventlet.event.Event()
 
-        self._work_buffer = six.moves.queue.Queue()
+        # Number of buffered items which have been taken from the buffer and are waiting for a
+        # free pool thread (0 or 1)
+        self._waiting = 0
 
-        # Internal attributes we use to track how long the pool is busy without any free workers
-        self._pool_last_free_ts = time.time()
+        self._dispatch_thread = eventlet.greenthread.spawn(self._dispatch_buffered)
 
     @property
     def name(self):
-        return self._name or id(self)
+        return self._name
 
     def dispatch(self, handler, *args):
-        self._work_buffer.put((handler, args), block=True, timeout=1)
-        self._flush_now()
+        """
+        Run the provided handler in the pool. If there are no free threads, handler is buffered
+        and this method blocks while the buffer is full.
+        """
+        item = (handler, args, time.time())
+
+        if self.free() > 0 and self._work_buffer.empty():
+            self._spawn(item)
+            return
+
+        if self._work_buffer.full():
+            start_ts = time.time()
+            self._work_buffer.put(item)
+            get_driver().time('dispatcher.%s.backpressure' % (self.name), time.time() - start_ts)
+        else:
+            self._work_buffer.put(item)
+
+        self._report_queue_depth()
+
+    def free(self):
+        """
+        Return number of free pool threads which are not claimed by the already buffered work.
+
+        :rtype: ``int``
+        """
+        return max(self._dispatcher_pool.free() - self._work_buffer.qsize() - self._waiting, 0)
+
+    def wait_free(self):
+        """
+        Block until there is a free pool thread which is not claimed by the buffered work.
+        """
+        while self.free() <= 0:
+            self._thread_freed.wait()
 
     def shutdown(self):
-        self._dispatch_monitor_thread.kill()
+        self._dispatch_thread.kill()
 
-    def _flush(self):
+    def _dispatch_buffered(self):
         while True:
-            while self._work_buffer.empty():
-                eventlet.greenthread.sleep(self._monitor_thread_empty_q_sleep_time)
-            while self._dispatcher_pool.free() <= 0:
-                eventlet.greenthread.sleep(self._monitor_thread_no_workers_sleep_time)
-            self._flush_now()
+            item = self._work_buffer.get()
+            self._report_queue_depth()
+
+            if self._dispatcher_pool.free() > 0:
+                self._spawn(item)
+                continue
 
-    def _flush_now(self):
-        if self._dispatcher_pool.free() <= 0:
-            now = time.time()
+            # Blocks until a pool thread becomes free
+            busy_start_ts = time.time()
+            self._waiting = 1
 
-            if (now - self._pool_last_free_ts) >= POOL_BUSY_THRESHOLD_SECONDS:
+            try:
+                self._spawn(item)
+            finally:
+                self._waiting = 0
+
+            busy_duration = time.time() - busy_start_ts
+
+            if busy_duration >= POOL_BUSY_THRESHOLD_SECONDS:
                 LOG.info(POOL_BUSY_LOG_MESSAGE % (self.name, POOL_BUSY_THRESHOLD_SECONDS))
 
-            return
+    def _spawn(self, item):
+        handler, args, dispatch_ts = item
+
+        green_thread = self._dispatcher_pool.spawn(self._run, handler, args, dispatch_ts)
+
+        # Note: Pool releases the thread in the link it registers in spawn, so this link is called
+        # after the thread has been released
+        green_thread.link(self._on_thread_freed)
+
+    def _run(self, handler, args, dispatch_ts):
+        driver = get_driver()
+        driver.time('dispatcher.%s.wait_time' % (self.name), time.time() - dispatch_ts)
+        self._report_utilization(driver=driver)
+
+        handler(*args)
+
+    def _on_thread_freed(self, green_thread):
+        event = self._thread_freed
+        self._thread_freed = eventlet.event.Event()
+        event.send()
+
+        self._report_utilization(driver=get_driver())
 
-        # Update the time of when there were free threads available
-        self._pool_last_free_ts = time.time()
+    def _report_queue_depth(self):
+        get_driver().set_gauge('dispatcher.%s.queue_depth' % (self.name),
+                               self._work_buffer.qsize())
 
-        while not self._work_buffer.empty() and self._dispatcher_pool.free() > 0:
-            (handler, args) = self._work_buffer.get_nowait()
-            self._dispatcher_pool.spawn(handler, *args)
+    def _report_utilization(self, driver):
+        utilization = (self._dispatcher_pool.running() * 100) // max(self._pool_limit, 1)
+        driver.set_gauge('dispatcher.%s.utilization' % (self.name), utilization)
 
     def __repr__(self):
         free_count = self._dispatcher_pool.free()
-        values = (self.name, self._pool_limit, free_count, self._monitor_thread_empty_q_sleep_time,
-                  self._monitor_thread_no_workers_sleep_time)
+        values = (self.name, self._pool_limit, free_count, self._buffer_size,
+                  self._work_buffer.qsize())
         return ('<BufferedDispatcher name=%s,dispatch_pool_size=%s,free_threads=%s,'
-                'monitor_thread_empty_q_sleep_time=%s,monitor_thread_no_workers_sleep_time=%s>' %
-                values)
+                'buffer_size=%s,buffered=%s>' % values)
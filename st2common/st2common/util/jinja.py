@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+import collections
 import json
 import re
 import six
@@ -22,9 +23,14 @@ from st2common.util.compat import to_unicode
 
 
 __all__ = [
+    'TemplateCache',
+
     'get_jinja_environment',
+    'get_shared_jinja_environment',
+    'get_compiled_template',
     'render_values',
-    'is_jinja_expression'
+    'is_jinja_expression',
+    'is_static_template'
 ]
 
 
@@ -33,6 +39,15 @@ JINJA_EXPRESSIONS_START_MARKERS = [
     '{%'
 ]
 
+# Markers which are handled by the Jinja lexer. Strings which contain none of those render to
+# themselves.
+JINJA_MARKERS = JINJA_EXPRESSIONS_START_MARKERS + [
+    '{#'
+]
+
+# Maximum number of compiled templates which are cached per process
+TEMPLATE_CACHE_SIZE = 1000
+
 JINJA_REGEX = '({{(.*)}})'
 JINJA_REGEX_PTRN = re.compile(JINJA_REGEX)
 JINJA_BLOCK_REGEX = '({%(.*)%})'
@@ -41,6 +56,10 @@ JINJA_BLOCK_REGEX_PTRN = re.compile(JINJA_BLOCK_REGEX)
 
 LOG = logging.getLogger(__name__)
 
+# Stores shared jinja2.Environment instances keyed by (allow_undefined, trim_blocks, lstrip_blocks)
+# NOTE: Those are populated lazily on first use.
+_ENVIRONMENTS = {}
+
 
 def get_filters():
     # Lazy / late import to avoid long module import times
@@ -111,6 +130,116 @@ def get_jinja_environment(allow_undefined=False, trim_blocks=True, lstrip_blocks
     return env
 
 
+def get_shared_jinja_environment(allow_undefined=False, trim_blocks=True, lstrip_blocks=True):
+    """
+    Return process-wide jinja2.Environment object for the provided combination of options.
+
+    Creating an environment and registering all the custom filters is relatively expensive so
+    this should be used instead of ``get_jinja_environment`` when the environment doesn't need to
+    be modified.
+
+    NOTE: Returned environment is shared so the caller should never modify it.
+
+    :rtype: :class:`jinja2.Environment`
+    """
+    key = (allow_undefined, trim_blocks, lstrip_blocks)
+    env = _ENVIRONMENTS.get(key, None)
+
+    if env is None:
+        env = get_jinja_environment(allow_undefined=allow_undefined, trim_blocks=trim_blocks,
+                                    lstrip_blocks=lstrip_blocks)
+        _ENVIRONMENTS[key] = env
+
+    return env
+
+
+def _inc_metrics_counter(key):
+    # Late import to avoid import cycles and long module import times
+    from st2common.exceptions.plugins import PluginLoadError
+    from st2common.metrics.base import get_driver
+
+    try:
+        driver = get_driver()
+    except PluginLoadError:
+        # Metrics are not available (e.g. when used outside of a StackStorm service)
+        return
+
+    driver.inc_counter(key)
+
+
+class TemplateCache(object):
+    """
+    Bounded LRU cache of compiled templates keyed by the environment options and template source.
+
+    Cache hits and misses are counted and reported to the metrics driver as
+    "jinja.template_cache.hit" and "jinja.template_cache.miss" counters.
+    """
+
+    def __init__(self, size=TEMPLATE_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+        self._templates = collections.OrderedDict()
+
+    def get_template(self, value, allow_undefined=False, trim_blocks=True, lstrip_blocks=True):
+        """
+        Return compiled template for the provided template string.
+
+        :param value: Template string.
+        :type value: ``str``
+
+        :rtype: :class:`jinja2.Template`
+        """
+        key = (allow_undefined, trim_blocks, lstrip_blocks, value)
+        template = self._templates.pop(key, None)
+
+        if template is not None:
+            # Re-insert the item so it's moved to the end (most recently used)
+            self._templates[key] = template
+            self.hits += 1
+            _inc_metrics_counter('jinja.template_cache.hit')
+            return template
+
+        self.misses += 1
+        _inc_metrics_counter('jinja.template_cache.miss')
+
+        env = get_shared_jinja_environment(allow_undefined=allow_undefined,
+                                           trim_blocks=trim_blocks,
+                                           lstrip_blocks=lstrip_blocks)
+        template = env.from_string(value)
+
+        self._templates[key] = template
+
+        while len(self._templates) > self.size:
+            self._templates.popitem(last=False)
+
+        return template
+
+    def clear(self):
+        self._templates.clear()
+
+    def __len__(self):
+        return len(self._templates)
+
+
+TEMPLATE_CACHE = TemplateCache()
+
+
+def get_compiled_template(value, allow_undefined=False, trim_blocks=True, lstrip_blocks=True):
+    """
+    Return compiled template for the provided template string. Compiled templates are cached in
+    a process-wide LRU cache.
+
+    :param value: Template string.
+    :type value: ``str``
+
+    :rtype: :class:`jinja2.Template`
+    """
+    return TEMPLATE_CACHE.get_template(value=value, allow_undefined=allow_undefined,
+                                       trim_blocks=trim_blocks, lstrip_blocks=lstrip_blocks)
+
+
 def render_values(mapping=None, context=None, allow_undefined=False):
     """
     Render an incoming mapping using context provided in context using Jinja2. Returns a dict
@@ -135,7 +264,6 @@ def render_values(mapping=None, context=None, allow_undefined=False):
     super_context['__context'] = context
     super_context.update(context)
 
-    env = get_jinja_environment(allow_undefined=allow_undefined)
     rendered_mapping = {}
     for k, v in six.iteritems(mapping):
         # jinja2 works with string so transform list and dict to strings.
@@ -151,9 +279,15 @@ def render_values(mapping=None, context=None, allow_undefined=False):
                 # Other types (e.g. boolean, etc.)
                 v = str(v)
 
+        # Fast path - string contains no Jinja markup and would render to itself
+        if is_static_template(v):
+            rendered_mapping[k] = mapping[k]
+            continue
+
         try:
-            LOG.info('Rendering string %s. Super context=%s', v, super_context)
-            rendered_v = env.from_string(v).render(super_context)
+            LOG.debug('Rendering string %s.', v)
+            template = get_compiled_template(value=v, allow_undefined=allow_undefined)
+            rendered_v = template.render(super_context)
         except Exception as e:
             # Attach key and value which failed the rendering
             e.key = k
@@ -168,7 +302,7 @@ def render_values(mapping=None, context=None, allow_undefined=False):
         if reverse_json_dumps:
             rendered_v = json.loads(rendered_v)
         rendered_mapping[k] = rendered_v
-    LOG.info('Mapping: %s, rendered_mapping: %s, context: %s', mapping, rendered_mapping, context)
+    LOG.debug('Mapping: %s, rendered_mapping: %s', mapping, rendered_mapping)
     return rendered_mapping
 
 
@@ -187,6 +321,22 @@ def is_jinja_expression(value):
     return False
 
 
+def is_static_template(value):
+    """
+    Return True if the provided template string contains no Jinja markup and renders to itself.
+
+    NOTE: Jinja normalizes new lines and strips a single trailing new line so strings which would
+    be affected by that are not considered static.
+
+    :rtype: ``bool``
+    """
+    for marker in JINJA_MARKERS:
+        if marker in value:
+            return False
+
+    return u'\n'.join(value.splitlines()) == value
+
+
 def convert_jinja_to_raw_block(value):
     if isinstance(value, dict):
         return {k: convert_jinja_to_raw_block(v) for k, v in six.iteritems(value)}
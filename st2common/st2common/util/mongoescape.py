@@ -17,8 +17,6 @@ from __future__ import absolute_import
 import six
 from six.moves import zip
 
-from st2common.util.ujson import fast_deepcopy
-
 # http://docs.mongodb.org/manual/faq/developers/#faq-dollar-sign-escaping
 UNESCAPED = ['.', '$']
 ESCAPED = [u'\uFF0E', u'\uFF04']
@@ -33,56 +31,105 @@ RULE_CRITERIA_ESCAPE_TRANSLATION = dict(list(zip(RULE_CRITERIA_UNESCAPED,
 RULE_CRITERIA_UNESCAPE_TRANSLATION = dict(list(zip(RULE_CRITERIA_ESCAPED,
                                               RULE_CRITERIA_UNESCAPED)))
 
+# Translations are applied in a single pass so unescaping also covers the old rule criteria
+# characters
+FULL_UNESCAPE_TRANSLATION = dict(UNESCAPE_TRANSLATION)
+FULL_UNESCAPE_TRANSLATION.update(RULE_CRITERIA_UNESCAPE_TRANSLATION)
+
+
+def _translate_key(key, translation):
+    if not isinstance(key, six.string_types):
+        return key
+
+    for t_k, t_v in six.iteritems(translation):
+        if t_k in key:
+            key = key.replace(t_k, t_v)
 
-def _prep_work_items(d):
-    return [(k, v, d) for k, v in six.iteritems(d)]
+    return key
 
 
 def _translate_chars(field, translation):
-    # Only translate the fields of a dict
-    if not isinstance(field, dict):
-        return field
+    """
+    Translate characters in all the (nested) dictionary keys of the provided value.
+
+    Provided value is never modified. Only dictionaries and lists which contain translated keys
+    (directly or in one of the nested values) are copied, everything else is shared with the
+    provided value. If no key needs translating, provided value itself is returned.
+    """
+    if isinstance(field, dict):
+        changes = None
+
+        for key, value in six.iteritems(field):
+            new_key = _translate_key(key, translation)
+            new_value = value
 
-    work_items = _prep_work_items(field)
+            if isinstance(value, (dict, list)):
+                new_value = _translate_chars(value, translation)
 
-    while len(work_items) > 0:
-        work_item = work_items.pop(0)
-        oldkey = work_item[0]
-        value = work_item[1]
-        work_field = work_item[2]
-        newkey = oldkey
+            if new_key is not key or new_value is not value:
+                if changes is None:
+                    changes = {}
+                changes[key] = (new_key, new_value)
 
-        for t_k, t_v in six.iteritems(translation):
-            if t_k in newkey:
-                newkey = newkey.replace(t_k, t_v)
+        if not changes:
+            return field
 
-        if newkey != oldkey:
-            work_field[newkey] = value
-            del work_field[oldkey]
+        # Original key order is preserved
+        result = {}
+        for key, value in six.iteritems(field):
+            if key in changes:
+                key, value = changes[key]
+            result[key] = value
 
-        if isinstance(value, dict):
-            work_items.extend(_prep_work_items(value))
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict):
-                    work_items.extend(_prep_work_items(item))
+        return result
+    elif isinstance(field, list):
+        result = None
+
+        for index, item in enumerate(field):
+            if not isinstance(item, (dict, list)):
+                continue
+
+            new_item = _translate_chars(item, translation)
+
+            if new_item is not item:
+                if result is None:
+                    result = list(field)
+                result[index] = new_item
+
+        return result if result is not None else field
 
     return field
 
 
 def escape_chars(field):
+    """
+    Return a copy of the provided dictionary with "." and "$" in all the (nested) keys escaped.
+
+    NOTE: Returned value shares all the values which don't need escaping with the provided value
+    so it should be treated as read-only.
+    """
     if not isinstance(field, dict):
         return field
 
-    value = fast_deepcopy(field)
-    return _translate_chars(value, ESCAPE_TRANSLATION)
+    return _translate_chars(field, ESCAPE_TRANSLATION)
 
 
 def unescape_chars(field):
+    """
+    Return a copy of the provided dictionary with all the (nested) keys unescaped.
+
+    NOTE: Returned value shares all the values which don't need unescaping with the provided value
+    so it should be treated as read-only.
+    """
     if not isinstance(field, dict):
         return field
 
-    value = fast_deepcopy(field)
-    translated = _translate_chars(value, UNESCAPE_TRANSLATION)
-    translated = _translate_chars(value, RULE_CRITERIA_UNESCAPE_TRANSLATION)
-    return translated
+    return _translate_chars(field, FULL_UNESCAPE_TRANSLATION)
+
+
+def escape_key(key):
+    """
+    Escape a single dictionary key (e.g. when it's used as a part of a dotted field path in an
+    update query).
+    """
+    return _translate_key(key, ESCAPE_TRANSLATION)
@@ -32,10 +32,11 @@ from st2common.services.keyvalues import KeyValueLookup, UserKeyValueLookup
 from st2common.util.casts import get_cast
 from st2common.util.compat import to_unicode
 from st2common.util import jinja as jinja_utils
+from st2common.util import templating as templating_utils
 
 
 LOG = logging.getLogger(__name__)
-ENV = jinja_utils.get_jinja_environment()
+ENV = jinja_utils.get_shared_jinja_environment()
 
 __all__ = [
     'render_live_params',
@@ -199,7 +200,8 @@ def _render(node, render_context):
 
         LOG.debug('Rendering node: %s with context: %s', node, render_context)
 
-        result = ENV.from_string(str(node['template'])).render(render_context)
+        template = jinja_utils.get_compiled_template(value=str(node['template']))
+        result = template.render(render_context)
 
         LOG.debug('Render complete: %s', result)
 
@@ -212,10 +214,51 @@ def _render(node, render_context):
         return node['value']
 
 
+def _prefetch_datastore_values(G):
+    '''
+    Retrieve all the datastore values referenced in the parameter templates using a single query
+    per scope instead of a query per key
+    '''
+    if DATASTORE_PARENT_SCOPE not in G.node:
+        return
+
+    key_paths = {}
+    for name in G.nodes():
+        template = G.node[name].get('template', None)
+
+        if template is None:
+            continue
+
+        if isinstance(template, list) or isinstance(template, dict):
+            template = json.dumps(template)
+
+        try:
+            template_key_paths = templating_utils.get_datastore_key_paths(str(template))
+        except Exception:
+            # Invalid template, error will be reported when the parameter is rendered
+            continue
+
+        for scope, paths in six.iteritems(template_key_paths):
+            key_paths.setdefault(scope, set([])).update(paths)
+
+    if not key_paths:
+        return
+
+    context = {DATASTORE_PARENT_SCOPE: G.node[DATASTORE_PARENT_SCOPE]['value']}
+
+    try:
+        templating_utils.prefetch_datastore_values(context=context, key_paths=key_paths)
+    except Exception as e:
+        # Values will be retrieved (and errors reported) when the parameters are rendered
+        LOG.debug('Failed to prefetch datastore values: %s', e, exc_info=True)
+
+
 def _resolve_dependencies(G):
     '''
     Traverse the dependency graph starting from resolved nodes
     '''
+    _prefetch_datastore_values(G)
+
     context = {}
     for name in nx.topological_sort(G):
         node = G.node[name]
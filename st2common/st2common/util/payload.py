@@ -13,6 +13,8 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+
+import six
 from jsonpath_rw import parse
 
 from st2common.constants.keyvalue import SYSTEM_SCOPES
@@ -31,7 +33,15 @@ class PayloadLookup(object):
             self.context[system_scope] = KeyValueLookup(scope=system_scope)
 
     def get_value(self, lookup_key):
-        expr = parse(lookup_key)
+        """
+        :param lookup_key: Lookup key (jsonpath expression) or a pre-parsed jsonpath expression.
+        :type lookup_key: ``str`` or :class:`jsonpath_rw.JSONPath`
+        """
+        if isinstance(lookup_key, six.string_types):
+            expr = parse(lookup_key)
+        else:
+            expr = lookup_key
+
         matches = [match.value for match in expr.find(self.context)]
         if not matches:
             return None
@@ -38,7 +38,9 @@ __all__ = [
     'is_property_nullable',
     'is_attribute_type_array',
     'is_attribute_type_object',
-    'validate'
+    'validate',
+
+    'CompiledSchemaValidator'
 ]
 
 # https://github.com/json-schema/json-schema/blob/master/draft-04/schema
@@ -289,21 +291,45 @@ def validate(instance, schema, cls=None, use_default=True, allow_default_none=Fa
     :param use_default: True to support the use of the optional "default" property.
     :type use_default: ``bool``
     """
+    validator = CompiledSchemaValidator(schema, cls, use_default, allow_default_none, *args,
+                                        **kwargs)
+    return validator.validate(instance=instance)
 
-    instance = copy.deepcopy(instance)
-    schema_type = schema.get('type', None)
-    instance_is_dict = isinstance(instance, dict)
 
-    if use_default and allow_default_none:
-        schema = modify_schema_allow_default_none(schema=schema)
+class CompiledSchemaValidator(object):
+    """
+    Validator which pre-processes and checks the schema once so it can be re-used to validate
+    many instances against the same schema (see ``validate`` for the validation semantics).
+    """
 
-    if use_default and schema_type == 'object' and instance_is_dict:
-        instance = assign_default_values(instance=instance, schema=schema)
+    def __init__(self, schema, cls=None, use_default=True, allow_default_none=False, *args,
+                 **kwargs):
+        if use_default and allow_default_none:
+            schema = modify_schema_allow_default_none(schema=schema)
 
-    # pylint: disable=assignment-from-no-return
-    jsonschema.validate(instance=instance, schema=schema, cls=cls, *args, **kwargs)
+        if cls is None:
+            cls = jsonschema.validators.validator_for(schema)
 
-    return instance
+        cls.check_schema(schema)
+
+        self.schema = schema
+        self.use_default = use_default
+        self._validator = cls(schema, *args, **kwargs)
+
+    def validate(self, instance):
+        """
+        Validate the instance and return a cleaned instance with default values assigned.
+        """
+        instance = copy.deepcopy(instance)
+        schema_type = self.schema.get('type', None)
+        instance_is_dict = isinstance(instance, dict)
+
+        if self.use_default and schema_type == 'object' and instance_is_dict:
+            instance = assign_default_values(instance=instance, schema=self.schema)
+
+        self._validator.validate(instance)
+
+        return instance
 
 
 VALIDATORS = {
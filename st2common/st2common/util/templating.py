@@ -13,21 +13,142 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+import collections
+
 import six
 
-from st2common.util.jinja import get_jinja_environment
+from st2common.util.jinja import get_compiled_template
+from st2common.util.jinja import get_shared_jinja_environment
+from st2common.util.jinja import is_static_template
+from st2common.util.jinja import TEMPLATE_CACHE_SIZE
 from st2common.constants.keyvalue import DATASTORE_PARENT_SCOPE
 from st2common.constants.keyvalue import SYSTEM_SCOPE, FULL_SYSTEM_SCOPE
 from st2common.constants.keyvalue import USER_SCOPE, FULL_USER_SCOPE
 from st2common.services.keyvalues import KeyValueLookup
 from st2common.services.keyvalues import UserKeyValueLookup
+from st2common.services.keyvalues import prefetch_values
 
 __all__ = [
+    'compile_template',
     'render_template',
     'render_template_with_system_context',
-    'render_template_with_system_and_user_context'
+    'render_template_with_system_and_user_context',
+    'render_compiled_template_with_system_context',
+
+    'get_datastore_key_paths',
+    'get_datastore_key_paths_from_ast',
+    'prefetch_datastore_values'
 ]
 
+# Maps template string to the datastore key paths referenced in that template
+_DATASTORE_KEY_PATHS_CACHE = collections.OrderedDict()
+
+
+def get_datastore_key_paths(value):
+    """
+    Return datastore key paths referenced in the provided template string (e.g.
+    "{{ st2kv.system.a.b }}" references path ('a', 'b') in the "system" scope).
+
+    :param value: Template string.
+    :type value: ``str``
+
+    :return: Dictionary which maps scope to a set of referenced attribute paths.
+    :rtype: ``dict``
+    """
+    key_paths = _DATASTORE_KEY_PATHS_CACHE.get(value, None)
+
+    if key_paths is not None:
+        return key_paths
+
+    template_ast = get_shared_jinja_environment().parse(value)
+    key_paths = get_datastore_key_paths_from_ast(template_ast=template_ast)
+
+    _DATASTORE_KEY_PATHS_CACHE[value] = key_paths
+
+    while len(_DATASTORE_KEY_PATHS_CACHE) > TEMPLATE_CACHE_SIZE:
+        _DATASTORE_KEY_PATHS_CACHE.popitem(last=False)
+
+    return key_paths
+
+
+def get_datastore_key_paths_from_ast(template_ast):
+    """
+    Return datastore key paths referenced in the provided (parsed) template.
+
+    :param template_ast: Parsed template.
+    :type template_ast: :class:`jinja2.nodes.Template`
+
+    :return: Dictionary which maps scope to a set of referenced attribute paths.
+    :rtype: ``dict``
+    """
+    # Late import to avoid very expensive in-direct import when this function is not used
+    from jinja2 import nodes
+
+    key_paths = {}
+
+    for node in template_ast.find_all((nodes.Getattr, nodes.Getitem)):
+        path = []
+
+        # Walk the attribute chain from the outermost node to the root variable
+        while node is not None:
+            if isinstance(node, nodes.Getattr):
+                path.append(node.attr)
+                node = node.node
+            elif isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const) and \
+                    isinstance(node.arg.value, six.string_types):
+                path.append(node.arg.value)
+                node = node.node
+            elif isinstance(node, nodes.Name):
+                path.append(node.name)
+                node = None
+            else:
+                # Dynamic attribute access, path can't be determined statically
+                path = []
+                node = None
+
+        path.reverse()
+
+        if len(path) < 3 or path[0] != DATASTORE_PARENT_SCOPE:
+            continue
+
+        key_paths.setdefault(path[1], set([])).add(tuple(path[2:]))
+
+    return key_paths
+
+
+def prefetch_datastore_values(context, key_paths):
+    """
+    Retrieve values for all the datastore keys referenced in a template using a single query per
+    scope.
+
+    :param context: Template context with the datastore lookups.
+    :type context: ``dict``
+
+    :param key_paths: Referenced key paths (see get_datastore_key_paths).
+    :type key_paths: ``dict``
+    """
+    lookups = context.get(DATASTORE_PARENT_SCOPE, None) or {}
+
+    for scope, paths in six.iteritems(key_paths):
+        lookup = lookups.get(scope, None)
+
+        if isinstance(lookup, (KeyValueLookup, UserKeyValueLookup)):
+            prefetch_values(lookup=lookup, paths=paths)
+
+
+def compile_template(value):
+    """
+    Compile provided template string so it can be rendered multiple times without re-parsing.
+
+    :param value: Template string.
+    :type value: ``str``
+
+    :rtype: :class:`jinja2.Template`
+    """
+    assert isinstance(value, six.string_types)
+
+    return get_compiled_template(value=value, allow_undefined=False)  # nosec
+
 
 def render_template(value, context=None):
     """
@@ -42,8 +163,11 @@ def render_template(value, context=None):
     assert isinstance(value, six.string_types)
     context = context or {}
 
-    env = get_jinja_environment(allow_undefined=False)  # nosec
-    template = env.from_string(value)
+    # Fast path - template contains no Jinja markup and would render to itself
+    if is_static_template(value):
+        return value
+
+    template = get_compiled_template(value=value, allow_undefined=False)  # nosec
     rendered = template.render(context)
 
     return rendered
@@ -69,10 +193,46 @@ def render_template_with_system_context(value, context=None, prefix=None):
         SYSTEM_SCOPE: KeyValueLookup(prefix=prefix, scope=FULL_SYSTEM_SCOPE)
     }
 
+    if not is_static_template(value):
+        prefetch_datastore_values(context=context, key_paths=get_datastore_key_paths(value))
+
     rendered = render_template(value=value, context=context)
     return rendered
 
 
+def render_compiled_template_with_system_context(template, context=None, prefix=None,
+                                                 key_paths=None):
+    """
+    Render template which has been compiled using ``compile_template`` with a default system
+    context.
+
+    :param template: Compiled template.
+    :type template: :class:`jinja2.Template`
+
+    :param context: Template context (optional).
+    :type context: ``dict``
+
+    :param prefix: Datastore key prefix (optional).
+    :type prefix: ``str``
+
+    :param key_paths: Datastore key paths referenced in the template which are retrieved using a
+                      single query (optional).
+    :type key_paths: ``dict``
+
+    :rtype: ``str``
+    """
+    context = context or {}
+    context[DATASTORE_PARENT_SCOPE] = {
+        SYSTEM_SCOPE: KeyValueLookup(prefix=prefix, scope=FULL_SYSTEM_SCOPE)
+    }
+
+    if key_paths:
+        prefetch_datastore_values(context=context, key_paths=key_paths)
+
+    rendered = template.render(context)
+    return rendered
+
+
 def render_template_with_system_and_user_context(value, user, context=None, prefix=None):
     """
     Render provided template with a default system context and user context for the provided user.
@@ -97,5 +257,8 @@ def render_template_with_system_and_user_context(value, user, context=None, pref
         USER_SCOPE: UserKeyValueLookup(prefix=prefix, user=user, scope=FULL_USER_SCOPE)
     }
 
+    if not is_static_template(value):
+        prefetch_datastore_values(context=context, key_paths=get_datastore_key_paths(value))
+
     rendered = render_template(value=value, context=context)
     return rendered
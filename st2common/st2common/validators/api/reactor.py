@@ -14,6 +14,9 @@
 
 from __future__ import absolute_import
 
+import collections
+import functools
+
 import six
 import uuid
 from oslo_config import cfg
@@ -31,12 +34,23 @@ __all__ = [
     'validate_criteria',
 
     'validate_trigger_parameters',
-    'validate_trigger_payload'
+    'validate_trigger_payload',
+
+    'get_payload_validator_cache',
+    'enable_payload_validator_cache',
+    'disable_payload_validator_cache',
+    'get_payload_validator_cache_watcher',
+
+    'PayloadValidatorCache'
 ]
 
 
 LOG = logging.getLogger(__name__)
 
+# Process wide cache of compiled trigger payload validators. It's only used by services which also
+# listen for trigger type CUD events and invalidate the cache (see enable_payload_validator_cache).
+PAYLOAD_VALIDATOR_CACHE = None
+
 allowed_operators = criteria_operators.get_allowed_operators()
 
 
@@ -139,6 +153,31 @@ def validate_trigger_payload(trigger_type_ref, payload, throw_on_inexistent_trig
 
             trigger_type_ref = trigger_db.type
 
+    retrieve_func = functools.partial(_get_payload_validator, trigger_type_ref=trigger_type_ref,
+                                      throw_on_inexistent_trigger=throw_on_inexistent_trigger)
+
+    if PAYLOAD_VALIDATOR_CACHE is not None:
+        validator = PAYLOAD_VALIDATOR_CACHE.get(ref=trigger_type_ref, retrieve_func=retrieve_func)
+    else:
+        _, validator = retrieve_func()
+
+    if not validator:
+        return None
+
+    cleaned = validator.validate(instance=payload)
+
+    return cleaned
+
+
+def _get_payload_validator(trigger_type_ref, throw_on_inexistent_trigger=False):
+    """
+    Retrieve payload schema for the provided trigger type / trigger reference and return a
+    compiled validator for it.
+
+    :return: (trigger type reference, validator) tuple. Validator is None if validation is not
+             performed for this trigger type.
+    :rtype: ``tuple``
+    """
     is_system_trigger = trigger_type_ref in SYSTEM_TRIGGER_TYPES
     if is_system_trigger:
         # System trigger
@@ -168,21 +207,137 @@ def validate_trigger_payload(trigger_type_ref, payload, throw_on_inexistent_trig
                        (trigger_type_ref))
                 raise ValueError(msg)
 
-            return None
+            return trigger_type_ref, None
 
         payload_schema = getattr(trigger_type_db, 'payload_schema', {})
         if not payload_schema:
             # Payload schema not defined for the this trigger
-            return None
+            return trigger_type_ref, None
 
     # We only validate non-system triggers if config option is set (enabled)
     if not is_system_trigger and not cfg.CONF.system.validate_trigger_payload:
         LOG.debug('Got non-system trigger "%s", but trigger payload validation for non-system'
                   'triggers is disabled, skipping validation.' % (trigger_type_ref))
-        return None
+        return trigger_type_ref, None
 
-    cleaned = util_schema.validate(instance=payload, schema=payload_schema,
-                                   cls=util_schema.CustomValidator, use_default=True,
-                                   allow_default_none=True)
+    validator = util_schema.CompiledSchemaValidator(schema=payload_schema,
+                                                    cls=util_schema.CustomValidator,
+                                                    use_default=True, allow_default_none=True)
+    return trigger_type_ref, validator
 
-    return cleaned
+
+def get_payload_validator_cache():
+    """
+    Return process wide trigger payload validator cache or None if the cache is not enabled.
+
+    :rtype: :class:`PayloadValidatorCache`
+    """
+    return PAYLOAD_VALIDATOR_CACHE
+
+
+def enable_payload_validator_cache():
+    """
+    Enable process wide trigger payload validator cache.
+
+    NOTE: The caller is responsible for invalidating the cache on trigger type CUD events (e.g.
+    by using ``get_payload_validator_cache_watcher``).
+
+    :rtype: :class:`PayloadValidatorCache`
+    """
+    global PAYLOAD_VALIDATOR_CACHE
+
+    PAYLOAD_VALIDATOR_CACHE = PayloadValidatorCache()
+    return PAYLOAD_VALIDATOR_CACHE
+
+
+def disable_payload_validator_cache():
+    global PAYLOAD_VALIDATOR_CACHE
+    PAYLOAD_VALIDATOR_CACHE = None
+
+
+def get_payload_validator_cache_watcher(cache, queue_suffix):
+    """
+    Return watcher which invalidates the provided cache on trigger type CUD events.
+
+    :param queue_suffix: Suffix for the watch queue name (usually the name of the service).
+    :type queue_suffix: ``str``
+
+    :rtype: :class:`st2common.services.cudwatcher.CUDWatcher`
+    """
+    # Late import to avoid import cycles
+    from st2common.services.cudwatcher import CUDWatcher
+    from st2common.transport.reactor import TRIGGER_TYPE_CUD_XCHG
+
+    return CUDWatcher(exchange=TRIGGER_TYPE_CUD_XCHG,
+                      create_handler=cache.invalidate,
+                      update_handler=cache.invalidate,
+                      delete_handler=cache.invalidate,
+                      queue_name_base='st2.triggertype.watch',
+                      queue_suffix=queue_suffix)
+
+
+class PayloadValidatorCache(object):
+    """
+    Bounded, process local LRU cache of compiled trigger payload validators.
+
+    Items are keyed by the trigger type (or trigger) reference which is passed to
+    ``validate_trigger_payload`` and the cache revision. Revision is incremented on each trigger
+    type CUD event and all the items for the affected trigger type are removed (see
+    ``invalidate``).
+    """
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.revision = 0
+
+        # reference -> (trigger type reference, validator)
+        self._items = collections.OrderedDict()
+
+    def get(self, ref, retrieve_func):
+        """
+        Return cached validator or call the provided function to retrieve it and cache it.
+
+        :param retrieve_func: Function which returns (trigger type reference, validator) tuple.
+        :type retrieve_func: ``callable``
+        """
+        item = self._items.pop(ref, None)
+
+        if item:
+            # Re-insert the item so it's moved to the end (most recently used)
+            self._items[ref] = item
+            return item[1]
+
+        revision = self.revision
+        item = retrieve_func()
+
+        # Don't store the result if the cache was invalidated while retrieving it
+        if revision == self.revision:
+            self._items[ref] = item
+
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+        return item[1]
+
+    def invalidate(self, trigger_type_db):
+        """
+        Remove all the cached validators for the provided trigger type. This method is used as a
+        handler for trigger type CUD events.
+
+        :type trigger_type_db: :class:`st2common.models.db.trigger.TriggerTypeDB`
+        """
+        trigger_type_ref = trigger_type_db.get_reference().ref
+        LOG.debug('Invalidating payload validators for trigger type "%s"', trigger_type_ref)
+
+        self.revision += 1
+
+        for ref, item in list(self._items.items()):
+            if ref == trigger_type_ref or item[0] == trigger_type_ref:
+                del self._items[ref]
+
+    def clear(self):
+        self.revision += 1
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
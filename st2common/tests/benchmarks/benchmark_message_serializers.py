@@ -0,0 +1,144 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-benchmark which compares message size (bytes on the wire) and encode / decode cost of the
+pickle and msgpack message bus serializers for typical execution messages.
+
+Usage:
+
+    python st2common/tests/benchmarks/benchmark_message_serializers.py [--iterations 2000]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import time
+
+import bson
+from kombu.serialization import pickle
+from kombu.serialization import pickle_loads
+from kombu.serialization import pickle_protocol
+
+from st2common.constants import action as action_constants
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.transport.serializers import msgpack_dumps
+from st2common.transport.serializers import msgpack_loads
+from st2common.util import date as date_utils
+
+__all__ = [
+    'run_benchmark'
+]
+
+
+def _get_liveaction_db():
+    return LiveActionDB(
+        id=bson.ObjectId(),
+        action='core.local',
+        status=action_constants.LIVEACTION_STATUS_REQUESTED,
+        start_timestamp=date_utils.get_datetime_utc_now(),
+        parameters={'cmd': 'echo hello', 'env': {'A': '1', 'B': '2'}, 'timeout': 60},
+        context={'user': 'stanley', 'trace_context': {'trace_tag': 'benchmark'}}
+    )
+
+
+def _get_execution_db(result_size):
+    liveaction_db = _get_liveaction_db()
+
+    result = {
+        'failed': False,
+        'succeeded': True,
+        'return_code': 0,
+        'stderr': '',
+        'stdout': '\n'.join(['line %s of the action output' % (index)
+                             for index in range(0, result_size)]),
+        'items': [{'id': index, 'name': 'item-%s' % (index), 'enabled': index % 2 == 0}
+                  for index in range(0, result_size)]
+    }
+
+    return ActionExecutionDB(
+        id=bson.ObjectId(),
+        action={'ref': 'core.local', 'name': 'local', 'pack': 'core',
+                'runner_type': 'local-shell-cmd', 'parameters': {}},
+        runner={'name': 'local-shell-cmd', 'runner_module': 'local_runner',
+                'runner_parameters': {'cmd': {'type': 'string'}}},
+        liveaction={'id': str(liveaction_db.id), 'action': 'core.local',
+                    'parameters': liveaction_db.parameters},
+        status=action_constants.LIVEACTION_STATUS_SUCCEEDED,
+        start_timestamp=date_utils.get_datetime_utc_now(),
+        end_timestamp=date_utils.get_datetime_utc_now(),
+        parameters=liveaction_db.parameters,
+        result=result,
+        context=liveaction_db.context,
+        log=[{'status': 'requested', 'timestamp': date_utils.get_datetime_utc_now()},
+             {'status': 'succeeded', 'timestamp': date_utils.get_datetime_utc_now()}]
+    )
+
+
+def _pickle_dumps(obj):
+    return pickle.dumps(obj, protocol=pickle_protocol)
+
+
+SERIALIZERS = [
+    ('pickle', _pickle_dumps, pickle_loads),
+    ('msgpack', msgpack_dumps, msgpack_loads)
+]
+
+
+def _run(iterations, obj, dumps, loads):
+    data = dumps(obj)
+
+    start_ts = time.time()
+    for index in range(0, iterations):
+        dumps(obj)
+    encode_duration = (time.time() - start_ts)
+
+    start_ts = time.time()
+    for index in range(0, iterations):
+        loads(data)
+    decode_duration = (time.time() - start_ts)
+
+    return len(data), (encode_duration / iterations), (decode_duration / iterations)
+
+
+def run_benchmark(iterations):
+    payloads = [
+        ('LiveActionDB', _get_liveaction_db()),
+        ('ActionExecutionDB (small result)', _get_execution_db(result_size=10)),
+        ('ActionExecutionDB (large result)', _get_execution_db(result_size=5000))
+    ]
+
+    for name, obj in payloads:
+        print('%s (%s iterations):' % (name, iterations))
+
+        for serializer_name, dumps, loads in SERIALIZERS:
+            # Warm up (imports, document class lookups, etc.)
+            _run(iterations=10, obj=obj, dumps=dumps, loads=loads)
+
+            size, encode_duration, decode_duration = _run(iterations=iterations, obj=obj,
+                                                          dumps=dumps, loads=loads)
+            print('  %-8s size: %8s bytes, encode: %9.2f us, decode: %9.2f us' %
+                  (serializer_name, size, encode_duration * 1000000,
+                   decode_duration * 1000000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Message serializers micro-benchmark.')
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help='Number of encode / decode operations to perform per payload.')
+    args = parser.parse_args()
+
+    run_benchmark(iterations=args.iterations)
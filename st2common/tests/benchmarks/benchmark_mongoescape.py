@@ -0,0 +1,170 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-benchmark which compares the cost of escaping and unescaping dictionary keys (which is done
+on each save and load of execution results, parameters, contexts and workflow state) using the
+previous deep copy based implementation and the current copy-on-write implementation.
+
+Usage:
+
+    python st2common/tests/benchmarks/benchmark_mongoescape.py [--iterations 100]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import time
+
+import six
+
+from st2common.util import mongoescape
+from st2common.util.ujson import fast_deepcopy
+
+__all__ = [
+    'run_benchmark'
+]
+
+
+def _legacy_translate_chars(field, translation):
+    # Previous implementation which is kept for comparison
+    work_items = [(k, v, field) for k, v in six.iteritems(field)]
+
+    while len(work_items) > 0:
+        work_item = work_items.pop(0)
+        oldkey = work_item[0]
+        value = work_item[1]
+        work_field = work_item[2]
+        newkey = oldkey
+
+        for t_k, t_v in six.iteritems(translation):
+            if t_k in newkey:
+                newkey = newkey.replace(t_k, t_v)
+
+        if newkey != oldkey:
+            work_field[newkey] = value
+            del work_field[oldkey]
+
+        if isinstance(value, dict):
+            work_items.extend([(k, v, value) for k, v in six.iteritems(value)])
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    work_items.extend([(k, v, item) for k, v in six.iteritems(item)])
+
+    return field
+
+
+def _legacy_escape_chars(field):
+    return _legacy_translate_chars(fast_deepcopy(field), mongoescape.ESCAPE_TRANSLATION)
+
+
+def _legacy_unescape_chars(field):
+    value = fast_deepcopy(field)
+    _legacy_translate_chars(value, mongoescape.UNESCAPE_TRANSLATION)
+    return _legacy_translate_chars(value, mongoescape.RULE_CRITERIA_UNESCAPE_TRANSLATION)
+
+
+def _get_shell_result(size):
+    # local-shell-cmd / python-script result with a large output and no keys which need escaping
+    return {
+        'failed': False,
+        'succeeded': True,
+        'return_code': 0,
+        'stderr': '',
+        'stdout': '\n'.join(['line %s of the action output' % (index)
+                             for index in range(0, size * 10)]),
+        'result': {
+            'items': [{'id': index, 'name': 'item-%s' % (index), 'tags': ['a', 'b'],
+                       'enabled': index % 2 == 0} for index in range(0, size)]
+        }
+    }
+
+
+def _get_http_result(size):
+    # http-request result with dotted keys (e.g. domain names, versions) in the response body
+    return {
+        'status_code': 200,
+        'headers': {'Content-Type': 'application/json', 'X-Request-Id': 'abcd'},
+        'body': {
+            'hosts': dict([('host-%s.example.com' % (index),
+                            {'ip': '10.0.%s.%s' % (index // 256, index % 256),
+                             'packages': {'openssl-1.0.2': 'installed', 'bash': 'installed'}})
+                           for index in range(0, size)])
+        }
+    }
+
+
+def _get_workflow_result(size):
+    # Action chain / workflow result with many task results and published variables
+    return {
+        'tasks': [{'id': 'task%s' % (index), 'name': 'task%s' % (index),
+                   'execution_id': '5c61f2c9d4c2b4000123%04d' % (index),
+                   'state': 'succeeded',
+                   'created_at': '2019-01-01T00:00:00.000000Z',
+                   'updated_at': '2019-01-01T00:00:01.000000Z',
+                   'result': {'stdout': 'task %s output' % (index), 'return_code': 0}}
+                  for index in range(0, size)],
+        'published': dict([('var%s' % (index), {'$value': index, 'nested.key': index})
+                           for index in range(0, size // 10)])
+    }
+
+
+PAYLOADS = [
+    ('shell result', _get_shell_result),
+    ('http result with dotted keys', _get_http_result),
+    ('workflow result', _get_workflow_result)
+]
+
+FUNCTIONS = [
+    ('legacy', _legacy_escape_chars, _legacy_unescape_chars),
+    ('cow', mongoescape.escape_chars, mongoescape.unescape_chars)
+]
+
+
+def _run(iterations, value, func):
+    start_ts = time.time()
+    for index in range(0, iterations):
+        func(value)
+
+    return (time.time() - start_ts) / iterations
+
+
+def run_benchmark(iterations):
+    for size in [100, 5000]:
+        for name, get_payload in PAYLOADS:
+            value = get_payload(size)
+            escaped_value = mongoescape.escape_chars(value)
+
+            print('%s, %s items (%s iterations):' % (name, size, iterations))
+
+            for func_name, escape_func, unescape_func in FUNCTIONS:
+                assert escape_func(value) == escaped_value
+                assert unescape_func(escaped_value) == value
+
+                escape_duration = _run(iterations=iterations, value=value, func=escape_func)
+                unescape_duration = _run(iterations=iterations, value=escaped_value,
+                                         func=unescape_func)
+                print('  %-7s escape: %10.2f us, unescape: %10.2f us' %
+                      (func_name, escape_duration * 1000000, unescape_duration * 1000000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mongo key escaping micro-benchmark.')
+    parser.add_argument('--iterations', type=int, default=100,
+                        help='Number of escape / unescape operations to perform per payload.')
+    args = parser.parse_args()
+
+    run_benchmark(iterations=args.iterations)
@@ -0,0 +1,92 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import time
+
+import bson
+import unittest2
+
+from st2common.constants import action as action_constants
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.services import completions
+from st2common.util import concurrency
+
+__all__ = [
+    'CompletionRegistryTestCase'
+]
+
+
+class CompletionRegistryTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(CompletionRegistryTestCase, self).setUp()
+        self.registry = completions.enable_completion_registry()
+
+    def tearDown(self):
+        super(CompletionRegistryTestCase, self).tearDown()
+        completions.disable_completion_registry()
+
+    def _get_liveaction_db(self, status=action_constants.LIVEACTION_STATUS_SUCCEEDED):
+        return LiveActionDB(id=bson.ObjectId(), action='core.local', status=status)
+
+    def test_waiter_is_woken_up_by_status_event(self):
+        liveaction_db = self._get_liveaction_db()
+        statuses = []
+
+        def wait():
+            with self.registry.register(liveaction_db.id) as waiter:
+                statuses.append(waiter.wait(timeout=10))
+
+        start_ts = time.time()
+        thread = concurrency.spawn(wait)
+        concurrency.sleep(0)
+
+        self.assertEqual(len(self.registry), 1)
+        self.registry.notify(liveaction_db)
+        concurrency.wait(thread)
+
+        self.assertEqual(statuses, [action_constants.LIVEACTION_STATUS_SUCCEEDED])
+        self.assertTrue(time.time() - start_ts < 5)
+
+        # Waiter is removed from the registry once the caller is done waiting
+        self.assertEqual(len(self.registry), 0)
+
+    def test_wait_returns_none_on_timeout(self):
+        with self.registry.register(bson.ObjectId()) as waiter:
+            self.assertEqual(waiter.wait(timeout=0.01), None)
+
+        self.assertEqual(len(self.registry), 0)
+
+    def test_only_waiters_for_the_liveaction_are_notified(self):
+        liveaction_db = self._get_liveaction_db()
+
+        waiter_1 = self.registry.register(liveaction_db.id)
+        waiter_2 = self.registry.register(str(liveaction_db.id))
+        waiter_3 = self.registry.register(bson.ObjectId())
+
+        self.registry.notify(liveaction_db)
+
+        self.assertEqual(waiter_1.wait(timeout=0), action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(waiter_2.wait(timeout=0), action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        self.assertEqual(waiter_3.wait(timeout=0), None)
+
+        for waiter in [waiter_1, waiter_2, waiter_3]:
+            self.registry.unregister(waiter)
+
+        self.assertEqual(len(self.registry), 0)
+
+    def test_notify_without_waiters(self):
+        self.registry.notify(self._get_liveaction_db())
+        self.assertEqual(len(self.registry), 0)
@@ -0,0 +1,242 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import datetime
+import pickle
+
+import bson
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.models.api.action import LiveActionAPI
+from st2common.models.db.execution import ActionExecutionResultDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.garbage_collection import executions as executions_gc
+from st2common.persistence.execution import ActionExecution
+from st2common.persistence.execution import ActionExecutionResult
+from st2common.persistence.liveaction import LiveAction
+from st2common.services import results as results_service
+
+__all__ = [
+    'ResultStorageTestCase',
+    'ResultFieldTestCase',
+    'ResultPurgeTestCase'
+]
+
+SMALL_RESULT = {'stdout': 'small', 'return_code': 0}
+LARGE_RESULT = {
+    'stdout': '\n'.join(['line %s of the action output' % (index) for index in range(0, 1000)]),
+    'result': {'host.example.com': {'$value': 1}},
+    'return_code': 0
+}
+
+
+class ResultStorageTestCaseMixin(object):
+    def setUp(self):
+        super(ResultStorageTestCaseMixin, self).setUp()
+
+        cfg.CONF.set_override(name='result_storage_threshold', override=1024, group='database')
+        results_service.RECENTLY_STORED_RESULTS.clear()
+
+        # Fake results collection
+        self.result_dbs = {}
+
+        def update_by_query(query, **kwargs):
+            if query['digest'] not in self.result_dbs:
+                self.result_dbs[query['digest']] = ActionExecutionResultDB(
+                    digest=query['digest'], compression=kwargs['set_on_insert__compression'],
+                    size=kwargs['set_on_insert__size'], data=kwargs['set_on_insert__data'])
+
+            self.result_dbs[query['digest']].timestamp = kwargs['set__timestamp']
+            return 1
+
+        patcher = mock.patch.object(ActionExecutionResult, 'update_by_query',
+                                    mock.Mock(side_effect=update_by_query))
+        self.mock_update_by_query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def get(digest):
+            return self.result_dbs.get(digest, None)
+
+        patcher = mock.patch.object(ActionExecutionResult, 'get', mock.Mock(side_effect=get))
+        self.mock_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        super(ResultStorageTestCaseMixin, self).tearDown()
+        cfg.CONF.clear_override(name='result_storage_threshold', group='database')
+
+
+class ResultStorageTestCase(ResultStorageTestCaseMixin, unittest2.TestCase):
+    def test_results_are_stored_inline_if_storage_is_disabled(self):
+        cfg.CONF.set_override(name='result_storage_threshold', override=0, group='database')
+
+        self.assertEqual(results_service.store_result(LARGE_RESULT), None)
+        self.assertFalse(self.mock_update_by_query.called)
+
+    def test_small_and_non_json_results_are_stored_inline(self):
+        self.assertEqual(results_service.store_result(SMALL_RESULT), None)
+        self.assertEqual(results_service.store_result('a' * 2048), None)
+
+        result = dict(LARGE_RESULT, timestamp=datetime.datetime.utcnow())
+        self.assertEqual(results_service.store_result(result), None)
+
+        self.assertFalse(self.mock_update_by_query.called)
+
+    def test_store_and_load_large_result(self):
+        reference = results_service.store_result(LARGE_RESULT)
+
+        self.assertTrue(results_service.is_result_reference(reference))
+        self.assertEqual(len(self.result_dbs), 1)
+
+        result_db = self.result_dbs[reference.digest]
+        self.assertEqual(result_db.compression, 'zlib')
+        self.assertTrue(len(result_db.data) < result_db.size)
+        self.assertTrue(result_db.timestamp)
+
+        self.assertEqual(results_service.load_result(reference.digest), LARGE_RESULT)
+
+    def test_same_result_is_stored_once(self):
+        reference_1 = results_service.store_result(LARGE_RESULT)
+        reference_2 = results_service.store_result(dict(LARGE_RESULT))
+
+        self.assertEqual(reference_1, reference_2)
+        self.assertEqual(self.mock_update_by_query.call_count, 1)
+
+        # Result which hasn't been stored recently is stored again so the timestamp is bumped
+        results_service.RECENTLY_STORED_RESULTS.clear()
+        results_service.store_result(LARGE_RESULT)
+
+        self.assertEqual(self.mock_update_by_query.call_count, 2)
+        self.assertEqual(len(self.result_dbs), 1)
+
+    def test_load_result_which_doesnt_exist(self):
+        self.assertEqual(results_service.load_result('doesnt-exist'), {})
+
+    def test_result_reference_is_serialized_without_value(self):
+        reference = results_service.store_result(LARGE_RESULT)
+        self.assertEqual(reference.get_value(), LARGE_RESULT)
+
+        reference = pickle.loads(pickle.dumps(reference))
+        self.assertEqual(reference, {'__result_ref': reference.digest})
+        self.assertEqual(reference.get_value(), LARGE_RESULT)
+
+
+class ResultFieldTestCase(ResultStorageTestCaseMixin, unittest2.TestCase):
+    def _get_liveaction_db(self, result):
+        return LiveActionDB(id=bson.ObjectId(), action='core.local', status='succeeded',
+                            result=result)
+
+    def test_small_result_is_stored_inline(self):
+        liveaction_db = self._get_liveaction_db(result={'a.b': {'$c': 1}})
+        self.assertEqual(liveaction_db.to_mongo()['result'], {u'a\uff0eb': {u'\uff04c': 1}})
+
+    def test_large_result_is_stored_out_of_line_and_resolved_on_access(self):
+        liveaction_db = self._get_liveaction_db(result=LARGE_RESULT)
+
+        doc = liveaction_db.to_mongo()
+        self.assertTrue(results_service.is_result_reference(doc['result']))
+
+        liveaction_db = LiveActionDB._from_son(doc)
+        self.assertFalse(self.mock_get.called)
+
+        self.assertEqual(liveaction_db.result, LARGE_RESULT)
+        self.assertEqual(liveaction_db.result, LARGE_RESULT)
+        self.assertEqual(self.mock_get.call_count, 1)
+
+        # Reference is written back as is, the result is not stored again
+        self.assertEqual(liveaction_db.to_mongo()['result'], doc['result'])
+        self.assertEqual(self.mock_update_by_query.call_count, 1)
+
+    def test_api_model_contains_resolved_result(self):
+        liveaction_db = LiveActionDB._from_son(self._get_liveaction_db(result=LARGE_RESULT)
+                                               .to_mongo())
+
+        liveaction_api = LiveActionAPI.from_model(liveaction_db)
+        self.assertEqual(liveaction_api.result, LARGE_RESULT)
+        self.assertEqual(liveaction_api.action, 'core.local')
+
+        # API model doesn't share the result with the DB model
+        liveaction_api.result['return_code'] = 1
+        self.assertEqual(liveaction_db.result, LARGE_RESULT)
+
+    def test_stored_result_is_replaced_with_reference_on_the_model(self):
+        liveaction_db = self._get_liveaction_db(result=LARGE_RESULT)
+        liveaction_db.to_mongo()
+
+        # Model only holds the reference afterwards so it's serialized (e.g. when published on
+        # the message bus) without the result
+        self.assertTrue(isinstance(liveaction_db._data['result'],
+                                   results_service.ResultReference))
+        self.assertEqual(liveaction_db.result, LARGE_RESULT)
+        self.assertFalse(self.mock_get.called)
+
+        serialized = pickle.dumps(liveaction_db)
+        self.assertTrue(len(serialized) < len(pickle.dumps(LARGE_RESULT)))
+
+        liveaction_db = pickle.loads(serialized)
+        self.assertEqual(liveaction_db.result, LARGE_RESULT)
+        self.assertEqual(self.mock_get.call_count, 1)
+
+    def test_result_is_not_stored_when_serializing_other_fields(self):
+        liveaction_db = self._get_liveaction_db(result=LARGE_RESULT)
+        liveaction_db.to_mongo(fields=['action', 'status'])
+
+        self.assertEqual(liveaction_db._data['result'], LARGE_RESULT)
+        self.assertFalse(self.mock_update_by_query.called)
+
+
+class ResultPurgeTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(ResultPurgeTestCase, self).setUp()
+
+        patcher = mock.patch.object(ActionExecutionResult, 'delete_by_query',
+                                    mock.Mock(return_value=1))
+        self.mock_delete_by_query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(LiveAction, 'distinct', mock.Mock(return_value=['c']))
+    @mock.patch.object(ActionExecution, 'distinct', mock.Mock(return_value=['a']))
+    def test_only_unreferenced_results_are_deleted(self):
+        result_dbs = [ActionExecutionResultDB(id=bson.ObjectId(), digest=digest)
+                      for digest in ['a', 'b', 'c']]
+
+        timestamp = datetime.datetime.utcnow()
+        deleted_count = executions_gc._delete_unreferenced_results(result_dbs,
+                                                                   timestamp=timestamp)
+
+        # Results which have been stored again in the mean time (bumped timestamp) are kept
+        self.assertEqual(deleted_count, 1)
+        self.mock_delete_by_query.assert_called_once_with(id__in=[result_dbs[1].id],
+                                                          timestamp__lt=timestamp)
+
+        query = {'result.__result_ref': {'$in': ['a', 'b', 'c']}}
+        ActionExecution.distinct.assert_called_once_with(field='result.__result_ref',
+                                                         __raw__=query)
+        LiveAction.distinct.assert_called_once_with(field='result.__result_ref', __raw__=query)
+
+    @mock.patch.object(LiveAction, 'distinct', mock.Mock(return_value=['a']))
+    @mock.patch.object(ActionExecution, 'distinct', mock.Mock(return_value=[]))
+    def test_referenced_results_are_not_deleted(self):
+        result_dbs = [ActionExecutionResultDB(id=bson.ObjectId(), digest='a')]
+
+        self.assertEqual(executions_gc._delete_unreferenced_results(
+            result_dbs, timestamp=datetime.datetime.utcnow()), 0)
+        self.assertFalse(self.mock_delete_by_query.called)
@@ -0,0 +1,175 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import copy
+
+import bson
+import mock
+import unittest2
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.models.db import workflow as wf_db_models
+from st2common.persistence import workflow as wf_db_access
+from st2common.services import workflows as wf_svc
+
+__all__ = [
+    'ConductorCacheTestCase',
+    'WorkflowStateUpdatesTestCase'
+]
+
+STATE = {
+    'contexts': [{'foo': 'bar'}],
+    'routes': [[]],
+    'sequence': [
+        {'id': 'task1', 'route': 0, 'status': 'running', 'ctxs': {'in': [0]}}
+    ],
+    'staged': [
+        {'id': 'task2', 'route': 0, 'items': [{'status': 'running'}, {'status': 'running'}]}
+    ],
+    'status': 'running',
+    'tasks': {'task1__r0': 0}
+}
+
+
+def _get_state(**kwargs):
+    state = copy.deepcopy(STATE)
+    state.update(kwargs)
+    return state
+
+
+class WorkflowStateUpdatesTestCase(unittest2.TestCase):
+    def test_no_changes(self):
+        self.assertEqual(wf_svc.get_state_updates(STATE, _get_state()), {})
+
+    def test_changed_and_added_items(self):
+        new_state = _get_state(status='succeeded')
+        new_state['sequence'][0]['status'] = 'succeeded'
+        new_state['sequence'].append({'id': 'task2', 'route': 0, 'status': 'running'})
+        new_state['staged'][0]['items'][1]['status'] = 'succeeded'
+        new_state['tasks']['task2__r0'] = 1
+
+        self.assertEqual(wf_svc.get_state_updates(STATE, new_state), {
+            ('status',): 'succeeded',
+            ('sequence', 0, 'status'): 'succeeded',
+            ('sequence', 1): {'id': 'task2', 'route': 0, 'status': 'running'},
+            ('staged', 0, 'items', 1, 'status'): 'succeeded',
+            ('tasks', 'task2__r0'): 1
+        })
+
+    def test_removed_items(self):
+        # Removed list items, the whole list is written
+        self.assertEqual(wf_svc.get_state_updates(STATE, _get_state(staged=[])),
+                         {('staged',): []})
+
+        # Removed dictionary items, the whole dictionary is written
+        self.assertEqual(wf_svc.get_state_updates(STATE, _get_state(tasks={})),
+                         {('tasks',): {}})
+
+        # Removed top level items, the whole state is written
+        new_state = _get_state()
+        del new_state['contexts']
+        self.assertEqual(wf_svc.get_state_updates(STATE, new_state), None)
+
+    def test_no_previous_state(self):
+        self.assertEqual(wf_svc.get_state_updates({}, STATE), None)
+        self.assertEqual(wf_svc.get_state_updates(None, STATE), None)
+
+
+class ConductorCacheTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(ConductorCacheTestCase, self).setUp()
+        self.cache = wf_svc.enable_conductor_cache(size=2)
+
+    def tearDown(self):
+        super(ConductorCacheTestCase, self).tearDown()
+        wf_svc.disable_conductor_cache()
+
+    def _get_wf_ex_db(self, rev=1):
+        return wf_db_models.WorkflowExecutionDB(id=bson.ObjectId(), action_execution='1',
+                                                status='running', rev=rev)
+
+    def _mock_rev_query(self, rev):
+        rev_dbs = mock.Mock()
+        rev_dbs.first.return_value = mock.Mock(rev=rev) if rev else None
+        return mock.patch.object(wf_db_access.WorkflowExecution, 'query',
+                                 mock.Mock(return_value=rev_dbs))
+
+    @mock.patch.object(wf_db_access.WorkflowExecution, 'get_by_id')
+    @mock.patch.object(wf_svc, 'deserialize_conductor')
+    def test_cached_conductor_is_used_if_revision_matches(self, mock_deserialize, mock_get_by_id):
+        wf_ex_db = self._get_wf_ex_db(rev=3)
+        conductor = mock.Mock()
+        self.cache.put(wf_ex_db, conductor)
+
+        with self._mock_rev_query(rev=3):
+            self.assertEqual(wf_svc.refresh_conductor(str(wf_ex_db.id)), (conductor, wf_ex_db))
+
+        self.assertFalse(mock_get_by_id.called)
+        self.assertFalse(mock_deserialize.called)
+
+        # Item is removed from the cache until it's put back after the update
+        self.assertEqual(len(self.cache), 0)
+
+    @mock.patch.object(wf_db_access.WorkflowExecution, 'get_by_id')
+    @mock.patch.object(wf_svc, 'deserialize_conductor')
+    def test_cached_conductor_is_not_used_if_revision_changed(self, mock_deserialize,
+                                                              mock_get_by_id):
+        wf_ex_db = self._get_wf_ex_db(rev=3)
+        self.cache.put(wf_ex_db, mock.Mock())
+
+        with self._mock_rev_query(rev=4):
+            result = wf_svc.refresh_conductor(str(wf_ex_db.id))
+
+        self.assertEqual(result, (mock_deserialize.return_value, mock_get_by_id.return_value))
+        mock_get_by_id.assert_called_once_with(str(wf_ex_db.id))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_items_are_evicted(self):
+        wf_ex_dbs = [self._get_wf_ex_db() for _ in range(0, 3)]
+
+        for wf_ex_db in wf_ex_dbs:
+            self.cache.put(wf_ex_db, mock.Mock())
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.pop(str(wf_ex_dbs[0].id)), None)
+        self.assertEqual(self.cache.pop(str(wf_ex_dbs[2].id))[1], wf_ex_dbs[2])
+
+    @mock.patch.object(wf_db_access.WorkflowExecution, 'partial_update')
+    def test_update_execution_records_updates_cache(self, mock_partial_update):
+        mock_partial_update.side_effect = lambda wf_ex_db, **kwargs: wf_ex_db
+
+        wf_ex_db = self._get_wf_ex_db()
+        wf_ex_db.state = copy.deepcopy(STATE)
+
+        conductor = mock.Mock(errors=[])
+        conductor.get_workflow_status.return_value = 'running'
+        conductor.workflow_state.serialize.return_value = _get_state(status='paused')
+
+        wf_svc.update_execution_records(wf_ex_db, conductor, update_lv_ac_on_statuses=[])
+
+        mock_partial_update.assert_called_once_with(
+            wf_ex_db, field_updates={'state': {('status',): 'paused'}}, publish=False)
+        self.assertEqual(self.cache.pop(str(wf_ex_db.id)), (conductor, wf_ex_db))
+
+        # Completed workflow executions are removed from the cache
+        self.cache.put(wf_ex_db, conductor)
+        conductor.get_workflow_status.return_value = 'succeeded'
+        conductor.get_workflow_output.return_value = {}
+
+        wf_svc.update_execution_records(wf_ex_db, conductor, update_lv_ac_on_statuses=[])
+        self.assertEqual(len(self.cache), 0)
@@ -72,7 +72,7 @@ def mock_wf_db_update_conflict(wf_ex_db, publish=True, dispatch_trigger=True, **
             os.remove(temp_file_path)
             raise db_exc.StackStormDBObjectWriteConflictError(wf_ex_db)
 
-    return wf_db_access.WorkflowExecution._get_impl().update(wf_ex_db, **kwargs)
+    return wf_db_access.WorkflowExecution._get_impl().partial_update(wf_ex_db, **kwargs)
 
 
 @mock.patch.object(
@@ -214,7 +214,7 @@ class OrquestaServiceRetryTest(st2tests.WorkflowTestCase):
         )
 
     @mock.patch.object(
-        wf_db_access.WorkflowExecution, 'update',
+        wf_db_access.WorkflowExecution, 'partial_update',
         mock.MagicMock(side_effect=mock_wf_db_update_conflict))
     def test_recover_from_database_write_conflicts(self):
         # Create a temporary file which will be used to signal
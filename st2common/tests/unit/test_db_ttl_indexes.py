@@ -0,0 +1,137 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.constants import action as action_constants
+from st2common.models.db import ensure_ttl_index
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.models.db.execution import ActionExecutionOutputDB
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.models.db.trigger import TriggerInstanceDB
+from st2common.util import date as date_utils
+
+__all__ = [
+    'TTLIndexTestCase',
+    'TTLTimestampTestCase'
+]
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+class TTLIndexTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(TTLIndexTestCase, self).setUp()
+
+        cfg.CONF.set_override(name='ttl_indexes', override=True, group='garbagecollector')
+        cfg.CONF.set_override(name='trigger_instances_ttl', override=30,
+                              group='garbagecollector')
+
+        self.collection = mock.Mock()
+        self.collection.name = 'trigger_instance_d_b'
+        self.collection.index_information.return_value = {
+            '_id_': {'key': [('_id', 1)]}
+        }
+
+        patcher = mock.patch.object(TriggerInstanceDB, '_get_collection',
+                                    mock.Mock(return_value=self.collection))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        super(TTLIndexTestCase, self).tearDown()
+
+        cfg.CONF.clear_override(name='ttl_indexes', group='garbagecollector')
+        cfg.CONF.clear_override(name='trigger_instances_ttl', group='garbagecollector')
+
+    def _set_existing_ttl_index(self, expire_after_seconds):
+        self.collection.index_information.return_value['ttl_timestamp_1'] = {
+            'key': [('ttl_timestamp', 1)],
+            'expireAfterSeconds': expire_after_seconds
+        }
+
+    def test_index_is_created(self):
+        self.assertEqual(ensure_ttl_index(TriggerInstanceDB), 30 * DAY_SECONDS)
+
+        self.collection.create_index.assert_called_once_with(
+            [('ttl_timestamp', 1)], expireAfterSeconds=30 * DAY_SECONDS, background=True)
+        self.assertFalse(self.collection.drop_index.called)
+
+    def test_index_is_updated_when_ttl_changes(self):
+        self._set_existing_ttl_index(expire_after_seconds=10 * DAY_SECONDS)
+
+        self.assertEqual(ensure_ttl_index(TriggerInstanceDB), 30 * DAY_SECONDS)
+
+        self.collection.database.command.assert_called_once_with(
+            'collMod', 'trigger_instance_d_b',
+            index={'keyPattern': {'ttl_timestamp': 1}, 'expireAfterSeconds': 30 * DAY_SECONDS})
+        self.assertFalse(self.collection.create_index.called)
+
+    def test_index_is_not_changed_when_ttl_is_the_same(self):
+        self._set_existing_ttl_index(expire_after_seconds=30 * DAY_SECONDS)
+
+        self.assertEqual(ensure_ttl_index(TriggerInstanceDB), 30 * DAY_SECONDS)
+
+        self.assertFalse(self.collection.create_index.called)
+        self.assertFalse(self.collection.database.command.called)
+        self.assertFalse(self.collection.drop_index.called)
+
+    def test_index_is_dropped_when_disabled(self):
+        self._set_existing_ttl_index(expire_after_seconds=30 * DAY_SECONDS)
+        cfg.CONF.set_override(name='ttl_indexes', override=False, group='garbagecollector')
+
+        self.assertEqual(ensure_ttl_index(TriggerInstanceDB), None)
+        self.collection.drop_index.assert_called_once_with('ttl_timestamp_1')
+
+    def test_index_is_not_created_for_ttl_lower_than_minimum(self):
+        cfg.CONF.set_override(name='trigger_instances_ttl', override=1, group='garbagecollector')
+
+        self.assertEqual(ensure_ttl_index(TriggerInstanceDB), None)
+        self.assertFalse(self.collection.create_index.called)
+
+
+class TTLTimestampTestCase(unittest2.TestCase):
+    def test_only_completed_executions_have_ttl_timestamp(self):
+        end_timestamp = date_utils.get_datetime_utc_now()
+
+        for model_cls in [LiveActionDB, ActionExecutionDB]:
+            model_db = model_cls(status=action_constants.LIVEACTION_STATUS_RUNNING)
+            model_db.clean()
+            self.assertEqual(model_db.ttl_timestamp, None)
+
+            model_db.status = action_constants.LIVEACTION_STATUS_SUCCEEDED
+            model_db.end_timestamp = end_timestamp
+            model_db.clean()
+            self.assertEqual(model_db.ttl_timestamp, model_db.end_timestamp)
+
+            # Internal field is not serialized
+            self.assertTrue('ttl_timestamp' not in model_db.to_serializable_dict())
+
+    def test_trigger_instance_and_output_ttl_timestamp(self):
+        occurrence_time = date_utils.get_datetime_utc_now()
+
+        instance_db = TriggerInstanceDB(trigger='core.st2.webhook', occurrence_time=occurrence_time)
+        instance_db.clean()
+        self.assertEqual(instance_db.ttl_timestamp, occurrence_time)
+
+        output_db = ActionExecutionOutputDB(execution_id='1', action_ref='core.local',
+                                            runner_ref='local-shell-cmd', data='a')
+        self.assertEqual(output_db.ttl_timestamp, output_db.timestamp)
@@ -75,6 +75,61 @@ class WorkflowExecutionModelTest(st2tests.DbTestCase):
             doc_id
         )
 
+    def test_workflow_execution_partial_update(self):
+        initial = wf_db_models.WorkflowExecutionDB()
+        initial.action_execution = uuid.uuid4().hex
+        initial.graph = {'var1': 'foobar'}
+        initial.state = {
+            'sequence': [{'id': 'task1', 'status': 'running'}],
+            'tasks': {'task1__r0': 0}
+        }
+        initial.status = 'requested'
+
+        created = wf_db_access.WorkflowExecution.add_or_update(initial)
+        doc_id = created.id
+
+        # Only the changed parts of the state are written
+        retrieved = wf_db_access.WorkflowExecution.get_by_id(doc_id)
+        retrieved.status = 'running'
+        retrieved.state = {
+            'sequence': [
+                {'id': 'task1', 'status': 'succeeded'},
+                {'id': 'task.2', 'status': 'running'}
+            ],
+            'tasks': {'task1__r0': 0, 'task.2__r0': 1}
+        }
+        state_updates = {
+            ('sequence', 0, 'status'): 'succeeded',
+            ('sequence', 1): {'id': 'task.2', 'status': 'running'},
+            ('tasks', 'task.2__r0'): 1
+        }
+
+        retrieved = wf_db_access.WorkflowExecution.partial_update(
+            retrieved, field_updates={'state': state_updates}, publish=False)
+
+        updated = wf_db_access.WorkflowExecution.get_by_id(doc_id)
+        self.assertEqual(retrieved.rev, 2)
+        self.assertEqual(updated.rev, 2)
+        self.assertEqual(updated.status, 'running')
+        self.assertDictEqual(updated.graph, {'var1': 'foobar'})
+        self.assertDictEqual(updated.state, retrieved.state)
+
+        # Stale instance results in a write conflict
+        stale = wf_db_access.WorkflowExecution.get_by_id(doc_id)
+        stale.rev = 1
+        stale.status = 'failed'
+
+        self.assertRaises(
+            db_exc.StackStormDBObjectWriteConflictError,
+            wf_db_access.WorkflowExecution.partial_update,
+            stale
+        )
+
+        updated = wf_db_access.WorkflowExecution.get_by_id(doc_id)
+        self.assertEqual(updated.status, 'running')
+
+        created.delete()
+
     def test_workflow_execution_write_conflict(self):
         initial = wf_db_models.WorkflowExecutionDB()
         initial.action_execution = uuid.uuid4().hex
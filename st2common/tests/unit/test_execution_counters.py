@@ -0,0 +1,145 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import bson
+import mock
+import unittest2
+
+from st2common.constants import action as action_constants
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.persistence.liveaction import LiveAction
+from st2common.services import execution_counters
+from st2common.services.execution_counters import ExecutionCounters
+
+__all__ = [
+    'ExecutionCountersTestCase'
+]
+
+ACTION_REF = 'wolfpack.action-1'
+
+
+def _get_liveaction_db(status=action_constants.LIVEACTION_STATUS_SCHEDULED, parameters=None,
+                       action=ACTION_REF):
+    return LiveActionDB(id=bson.ObjectId(), action=action, status=status,
+                        parameters=parameters or {})
+
+
+class ExecutionCountersTestCase(unittest2.TestCase):
+    def tearDown(self):
+        super(ExecutionCountersTestCase, self).tearDown()
+        execution_counters.disable_counters()
+
+    def test_count_is_loaded_once_and_kept_up_to_date(self):
+        liveaction_db_1 = _get_liveaction_db()
+        liveaction_db_2 = _get_liveaction_db(status=action_constants.LIVEACTION_STATUS_RUNNING)
+
+        with mock.patch.object(LiveAction, 'query',
+                               mock.MagicMock(return_value=[liveaction_db_1, liveaction_db_2])):
+            counters = ExecutionCounters()
+            self.assertEqual(counters.count(ACTION_REF), 2)
+            self.assertEqual(counters.count(ACTION_REF), 2)
+            self.assertEqual(LiveAction.query.call_count, 1)
+
+        # Transition between in-flight states and duplicate events don't change the count
+        liveaction_db_1.status = action_constants.LIVEACTION_STATUS_RUNNING
+        counters.update(liveaction_db_1)
+        counters.update(liveaction_db_1)
+        self.assertEqual(counters.count(ACTION_REF), 2)
+
+        liveaction_db_3 = _get_liveaction_db()
+        counters.update(liveaction_db_3)
+        self.assertEqual(counters.count(ACTION_REF), 3)
+
+        liveaction_db_1.status = action_constants.LIVEACTION_STATUS_SUCCEEDED
+        counters.update(liveaction_db_1)
+        counters.update(liveaction_db_1)
+        self.assertEqual(counters.count(ACTION_REF), 2)
+
+        # Events for actions which are not tracked are ignored
+        counters.update(_get_liveaction_db(action='wolfpack.action-2'))
+        self.assertEqual(counters._executions.get('wolfpack.action-2', None), None)
+
+    def test_count_by_parameters(self):
+        liveaction_dbs = [
+            _get_liveaction_db(parameters={'host': 'a', 'port': 22}),
+            _get_liveaction_db(parameters={'host': 'a', 'port': 23}),
+            _get_liveaction_db(parameters={'host': 'b', 'port': 22}),
+            _get_liveaction_db(parameters={'port': 22})
+        ]
+
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(return_value=liveaction_dbs)):
+            counters = ExecutionCounters()
+            self.assertEqual(counters.count(ACTION_REF, parameters={'host': 'a'}), 2)
+            self.assertEqual(counters.count(ACTION_REF, parameters={'host': 'a', 'port': 22}), 1)
+            self.assertEqual(counters.count(ACTION_REF, parameters={'host': None}), 0)
+            self.assertEqual(counters.count(ACTION_REF, parameters={}), 4)
+
+    def test_events_received_while_loading_are_applied(self):
+        liveaction_db_1 = _get_liveaction_db()
+        liveaction_db_2 = _get_liveaction_db()
+        counters = ExecutionCounters()
+
+        def mock_query(*args, **kwargs):
+            # Execution has finished while the query was in progress
+            liveaction_db_1.status = action_constants.LIVEACTION_STATUS_SUCCEEDED
+            counters.update(liveaction_db_1)
+            counters.update(liveaction_db_2)
+
+            return [_get_liveaction_db()] + [LiveActionDB(id=liveaction_db_1.id, action=ACTION_REF,
+                                                          status='scheduled', parameters={})]
+
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(side_effect=mock_query)):
+            self.assertEqual(counters.count(ACTION_REF), 2)
+
+    def test_late_inflight_events_for_completed_executions_are_ignored(self):
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(return_value=[])):
+            counters = ExecutionCounters()
+            self.assertEqual(counters.count(ACTION_REF), 0)
+
+        liveaction_db = _get_liveaction_db(status=action_constants.LIVEACTION_STATUS_SUCCEEDED)
+        counters.update(liveaction_db)
+
+        # "scheduled" event is received after the "succeeded" event
+        liveaction_db.status = action_constants.LIVEACTION_STATUS_SCHEDULED
+        counters.update(liveaction_db)
+        self.assertEqual(counters.count(ACTION_REF), 0)
+
+    def test_reconcile(self):
+        liveaction_db = _get_liveaction_db()
+
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(return_value=[liveaction_db])):
+            counters = ExecutionCounters()
+            self.assertEqual(counters.count(ACTION_REF), 1)
+
+        # Completion event has been missed
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(return_value=[])):
+            counters.reconcile()
+            self.assertEqual(counters.count(ACTION_REF), 0)
+
+    def test_count_inflight_uses_database_when_counters_are_not_enabled(self):
+        with mock.patch.object(LiveAction, 'count', mock.MagicMock(return_value=5)):
+            count = execution_counters.count_inflight(ACTION_REF, parameters={'host': 'a'})
+            self.assertEqual(count, 5)
+            LiveAction.count.assert_called_once_with(
+                action=ACTION_REF, status__in=execution_counters.INFLIGHT_STATES,
+                parameters__host='a')
+
+        with mock.patch.object(LiveAction, 'query', mock.MagicMock(return_value=[])):
+            execution_counters.enable_counters()
+            self.assertEqual(execution_counters.count_inflight(ACTION_REF), 0)
+
+            execution_counters.update(_get_liveaction_db())
+            self.assertEqual(execution_counters.count_inflight(ACTION_REF), 1)
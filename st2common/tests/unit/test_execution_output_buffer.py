@@ -0,0 +1,146 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import bson
+import eventlet
+import eventlet.event
+import mock
+import unittest2
+
+from st2common.models.db.execution import ActionExecutionOutputDB
+from st2common.persistence.execution import ActionExecutionOutput
+from st2common.services import action as action_service
+from st2common.services.action import ExecutionOutputBuffer
+
+__all__ = [
+    'ExecutionOutputBufferTestCase'
+]
+
+EXECUTION_ID = str(bson.ObjectId())
+
+
+def _get_output_db(data, output_type='stdout'):
+    return ActionExecutionOutputDB(execution_id=EXECUTION_ID, action_ref='core.local',
+                                   runner_ref='local-shell-cmd', output_type=output_type,
+                                   data=data)
+
+
+def _get_stored_output(mock_insert_many):
+    return [[(output_db.output_type, output_db.data) for output_db in call_args[0][0]]
+            for call_args in mock_insert_many.call_args_list]
+
+
+@mock.patch.object(ActionExecutionOutput, 'insert_many')
+class ExecutionOutputBufferTestCase(unittest2.TestCase):
+    def tearDown(self):
+        super(ExecutionOutputBufferTestCase, self).tearDown()
+        action_service.OUTPUT_BUFFERS.clear()
+
+    def test_consecutive_output_of_the_same_type_is_coalesced(self, mock_insert_many):
+        output_buffer = ExecutionOutputBuffer(execution_id=EXECUTION_ID, flush_interval=60,
+                                              flush_size=1024)
+
+        for data, output_type in [('a\n', 'stdout'), ('b\n', 'stdout'), ('c\n', 'stderr'),
+                                  ('d\n', 'stdout'), ('e', 'stdout')]:
+            output_buffer.append(_get_output_db(data=data, output_type=output_type))
+
+        self.assertEqual(mock_insert_many.call_count, 0)
+
+        output_buffer.close()
+
+        self.assertEqual(_get_stored_output(mock_insert_many),
+                         [[('stdout', 'a\nb\n'), ('stderr', 'c\n'), ('stdout', 'd\ne')]])
+        mock_insert_many.assert_called_once_with(mock.ANY, publish=True, dispatch_trigger=False)
+
+        # Nothing left to flush
+        output_buffer.close()
+        self.assertEqual(mock_insert_many.call_count, 1)
+
+    def test_output_is_flushed_by_size(self, mock_insert_many):
+        output_buffer = ExecutionOutputBuffer(execution_id=EXECUTION_ID, flush_interval=60,
+                                              flush_size=4)
+
+        output_buffer.append(_get_output_db(data='ab\n'))
+        self.assertEqual(mock_insert_many.call_count, 0)
+
+        output_buffer.append(_get_output_db(data='c\n'))
+        output_buffer.append(_get_output_db(data='d\n'))
+        self.assertEqual(_get_stored_output(mock_insert_many), [[('stdout', 'ab\nc\n')]])
+
+        output_buffer.close()
+        self.assertEqual(_get_stored_output(mock_insert_many),
+                         [[('stdout', 'ab\nc\n')], [('stdout', 'd\n')]])
+
+    def test_close_waits_for_flush_in_progress(self, mock_insert_many):
+        output_buffer = ExecutionOutputBuffer(execution_id=EXECUTION_ID, flush_interval=60,
+                                              flush_size=2)
+        store_released = eventlet.event.Event()
+        stored_output = []
+
+        def insert_many(output_dbs, **kwargs):
+            if not stored_output:
+                store_released.wait()
+            stored_output.append([output_db.data for output_db in output_dbs])
+
+        mock_insert_many.side_effect = insert_many
+
+        # Flush triggered by the size in a different green thread
+        flusher = eventlet.spawn(output_buffer.append, _get_output_db(data='a\n'))
+        eventlet.sleep(0)
+
+        # Output is buffered after the flush in progress has taken its snapshot
+        output_buffer.append(_get_output_db(data='b\n'))
+        closer = eventlet.spawn(output_buffer.close)
+        eventlet.sleep(0)
+        self.assertFalse(closer.dead)
+
+        store_released.send()
+        flusher.wait()
+        closer.wait()
+
+        self.assertEqual(stored_output, [['a\n'], ['b\n']])
+
+    def test_output_is_flushed_by_interval(self, mock_insert_many):
+        action_service.OUTPUT_BUFFERS[EXECUTION_ID] = output_buffer = ExecutionOutputBuffer(
+            execution_id=EXECUTION_ID, flush_interval=0.01, flush_size=1024)
+
+        output_buffer.append(_get_output_db(data='a\n'))
+        output_buffer.append(_get_output_db(data='b\n'))
+        eventlet.sleep(0.1)
+
+        self.assertEqual(_get_stored_output(mock_insert_many), [[('stdout', 'a\nb\n')]])
+
+        # Idle buffer has been removed
+        self.assertEqual(action_service.OUTPUT_BUFFERS, {})
+
+    def test_store_execution_output_data_buffers_output_until_flushed(self, mock_insert_many):
+        execution_db = mock.Mock(id=EXECUTION_ID)
+        action_db = mock.Mock(ref='core.local', runner_type={'name': 'local-shell-cmd'})
+
+        with mock.patch.object(action_service, 'cfg') as mock_cfg:
+            mock_cfg.CONF.actionrunner.stream_output_flush_interval = 60
+            mock_cfg.CONF.actionrunner.stream_output_flush_size = 1024
+
+            action_service.store_execution_output_data(execution_db, action_db, data='a\n',
+                                                       output_type='stdout')
+            action_service.store_execution_output_data(execution_db, action_db, data='b\n',
+                                                       output_type='stdout')
+
+        self.assertEqual(mock_insert_many.call_count, 0)
+
+        action_service.flush_execution_output_data(execution_id=EXECUTION_ID)
+        self.assertEqual(_get_stored_output(mock_insert_many), [[('stdout', 'a\nb\n')]])
+        self.assertEqual(action_service.OUTPUT_BUFFERS, {})
@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 import eventlet
+import eventlet.event
 import mock
 
 from st2common.util.greenpooldispatch import BufferedDispatcher
@@ -50,3 +51,90 @@ class TestGreenPoolDispatch(TestCase):
         dispatcher.shutdown()
         call_args_list = [(args[0][0], args[0][1]) for args in mock_handler.call_args_list]
         self.assertItemsEqual(expected, call_args_list)
+
+    def test_buffered_work_starts_as_soon_as_thread_is_free(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1)
+        release = eventlet.event.Event()
+        started = []
+
+        dispatcher.dispatch(lambda: release.wait())
+        dispatcher.dispatch(started.append, 1)
+        eventlet.sleep(0)
+
+        self.assertEqual(started, [])
+        self.assertEqual(dispatcher.free(), 0)
+
+        release.send()
+        for _ in range(0, 3):
+            eventlet.sleep(0)
+
+        dispatcher.shutdown()
+        self.assertEqual(started, [1])
+
+    def test_dispatch_blocks_while_buffer_is_full(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1, buffer_size=1)
+        release = eventlet.event.Event()
+        started = []
+
+        dispatcher.dispatch(lambda: release.wait())
+
+        # First buffered item is taken from the buffer and waits for a free thread
+        dispatcher.dispatch(started.append, 1)
+        eventlet.sleep(0)
+        dispatcher.dispatch(started.append, 2)
+
+        blocked_dispatch = eventlet.spawn(dispatcher.dispatch, started.append, 3)
+        eventlet.sleep(0)
+        self.assertFalse(blocked_dispatch.dead)
+
+        release.send()
+        blocked_dispatch.wait()
+
+        while len(started) < 3:
+            eventlet.sleep(0.01)
+
+        dispatcher.shutdown()
+        self.assertEqual(started, [1, 2, 3])
+
+    def test_wait_free(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1)
+        release = eventlet.event.Event()
+
+        dispatcher.dispatch(lambda: release.wait())
+        waiter = eventlet.spawn(dispatcher.wait_free)
+        eventlet.sleep(0)
+        self.assertFalse(waiter.dead)
+
+        release.send()
+        waiter.wait()
+
+        dispatcher.shutdown()
+        self.assertEqual(dispatcher.free(), 1)
+
+    @mock.patch('st2common.util.greenpooldispatch.get_driver')
+    def test_metrics(self, mock_get_driver):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1, name='test')
+        release = eventlet.event.Event()
+
+        dispatcher.dispatch(lambda: release.wait())
+        dispatcher.dispatch(mock.MagicMock())
+        eventlet.sleep(0)
+
+        driver = mock_get_driver.return_value
+        driver.set_gauge.assert_any_call('dispatcher.test.utilization', 100)
+        driver.set_gauge.assert_any_call('dispatcher.test.queue_depth', 1)
+
+        release.send()
+        for _ in range(0, 3):
+            eventlet.sleep(0)
+
+        dispatcher.shutdown()
+        driver.set_gauge.assert_any_call('dispatcher.test.queue_depth', 0)
+        wait_time_keys = [call_args[0][0] for call_args in driver.time.call_args_list]
+        self.assertEqual(wait_time_keys, ['dispatcher.test.wait_time'] * 2)
+
+    def test_default_name(self):
+        dispatcher = BufferedDispatcher(dispatch_pool_size=1)
+        dispatcher.shutdown()
+
+        self.assertEqual(dispatcher.name, 'default')
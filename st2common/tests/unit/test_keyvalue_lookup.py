@@ -13,11 +13,16 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+
+import mock
+
 from st2tests.base import CleanDbTestCase
 from st2common.constants.keyvalue import FULL_SYSTEM_SCOPE, FULL_USER_SCOPE
 from st2common.constants.keyvalue import SYSTEM_SCOPE, USER_SCOPE
 from st2common.models.db.keyvalue import KeyValuePairDB
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.services import keyvalues as keyvalue_service
+from st2common.services.keyvalues import KeyValueCache
 from st2common.services.keyvalues import KeyValueLookup, UserKeyValueLookup
 
 
@@ -153,3 +158,86 @@ class TestKeyValueLookup(CleanDbTestCase):
         self.assertEqual(str(lookup.count), '5.5')
         self.assertEqual(float(lookup.count), 5.5)
         self.assertEqual(int(lookup.count), 5)
+
+    def test_prefetch_values(self):
+        KeyValuePair.add_or_update(KeyValuePairDB(name='a.b', value='v1'))
+        KeyValuePair.add_or_update(KeyValuePairDB(name='c', value='v2'))
+        KeyValuePair.add_or_update(KeyValuePairDB(name='stanley:d', value='v3',
+                                                  scope=FULL_USER_SCOPE))
+
+        lookup = KeyValueLookup(scope=FULL_SYSTEM_SCOPE)
+        user_lookup = UserKeyValueLookup(scope=FULL_USER_SCOPE, user='stanley')
+
+        with mock.patch.object(KeyValuePair, 'query',
+                               mock.Mock(wraps=KeyValuePair.query)) as mock_query, \
+                mock.patch.object(KeyValuePair, 'get_by_scope_and_name') as mock_get:
+            keyvalue_service.prefetch_values(lookup=lookup, paths=[('a', 'b'), ('c', ),
+                                                                   ('missing', )])
+            keyvalue_service.prefetch_values(lookup=user_lookup, paths=[('d', )])
+
+            self.assertEqual(str(lookup.a.b), 'v1')
+            self.assertEqual(str(lookup.a), '')
+            self.assertEqual(str(lookup.c), 'v2')
+            self.assertEqual(str(lookup.missing), '')
+            self.assertEqual(str(user_lookup.d), 'v3')
+
+            # Prefetched keys are not retrieved again
+            keyvalue_service.prefetch_values(lookup=lookup, paths=[('a', 'b')])
+
+            self.assertEqual(mock_query.call_count, 2)
+            self.assertEqual(mock_get.call_count, 0)
+
+
+class TestKeyValueCache(CleanDbTestCase):
+    def tearDown(self):
+        super(TestKeyValueCache, self).tearDown()
+        keyvalue_service.disable_cache()
+
+    def test_get_values_cached_and_invalidated(self):
+        k1 = KeyValuePair.add_or_update(KeyValuePairDB(name='k1', value='v1'))
+
+        cache = KeyValueCache(ttl=60, size=10)
+
+        with mock.patch.object(KeyValuePair, 'query',
+                               mock.Mock(wraps=KeyValuePair.query)) as mock_query:
+            values = cache.get_values(scope=FULL_SYSTEM_SCOPE, names=['k1', 'k2'])
+            self.assertEqual(values, {'k1': 'v1', 'k2': None})
+
+            values = cache.get_values(scope=FULL_SYSTEM_SCOPE, names=['k1', 'k2'])
+            self.assertEqual(values, {'k1': 'v1', 'k2': None})
+            self.assertEqual(mock_query.call_count, 1)
+
+            k1.value = 'v1-updated'
+            k1 = KeyValuePair.add_or_update(k1, publish=False)
+            k2 = KeyValuePair.add_or_update(KeyValuePairDB(name='k2', value='v2'),
+                                            publish=False)
+            cache.invalidate(k1)
+            cache.invalidate(k2)
+
+            values = cache.get_values(scope=FULL_SYSTEM_SCOPE, names=['k1', 'k2'])
+            self.assertEqual(values, {'k1': 'v1-updated', 'k2': 'v2'})
+            self.assertEqual(mock_query.call_count, 2)
+
+    def test_get_values_ttl_and_size(self):
+        KeyValuePair.add_or_update(KeyValuePairDB(name='k1', value='v1'))
+        KeyValuePair.add_or_update(KeyValuePairDB(name='k2', value='v2'))
+
+        cache = KeyValueCache(ttl=0, size=10)
+        cache.get_values(scope=FULL_SYSTEM_SCOPE, names=['k1', 'k2'])
+        self.assertEqual(len(cache), 0)
+
+        cache = KeyValueCache(ttl=60, size=1)
+        cache.get_values(scope=FULL_SYSTEM_SCOPE, names=['k1', 'k2'])
+        self.assertEqual(len(cache), 1)
+
+    def test_lookup_uses_process_cache(self):
+        KeyValuePair.add_or_update(KeyValuePairDB(name='k1', value='v1'))
+
+        cache = keyvalue_service.enable_cache()
+        self.assertEqual(keyvalue_service.get_cache(), cache)
+
+        self.assertEqual(str(KeyValueLookup(scope=FULL_SYSTEM_SCOPE).k1), 'v1')
+
+        with mock.patch.object(KeyValuePair, 'query') as mock_query:
+            self.assertEqual(str(KeyValueLookup(scope=FULL_SYSTEM_SCOPE).k1), 'v1')
+            self.assertEqual(mock_query.call_count, 0)
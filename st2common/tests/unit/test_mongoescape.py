@@ -89,3 +89,47 @@ class TestMongoEscape(unittest.TestCase):
 
         unescaped = mongoescape.unescape_chars(escaped)
         self.assertDictEqual(field, unescaped)
+
+    def test_nested_lists(self):
+        field = {'k1': [[{'l1.l2': '123'}], [1, 2]], 'k2': ({'l3.l4': '456'},)}
+
+        escaped = mongoescape.escape_chars(field)
+        self.assertEqual(escaped, {'k1': [[{u'l1\uff0el2': '123'}], [1, 2]],
+                                   'k2': ({'l3.l4': '456'},)})
+
+        unescaped = mongoescape.unescape_chars(escaped)
+        self.assertEqual(unescaped, field)
+
+    def test_provided_value_is_not_modified(self):
+        field = {'k1.k2': {'k3$': [{'k4.k5': 'v1'}]}, 'k6': 'v2'}
+
+        escaped = mongoescape.escape_chars(field)
+        self.assertEqual(field, {'k1.k2': {'k3$': [{'k4.k5': 'v1'}]}, 'k6': 'v2'})
+
+        mongoescape.unescape_chars(escaped)
+        self.assertEqual(escaped, {u'k1\uff0ek2': {u'k3\uff04': [{u'k4\uff0ek5': 'v1'}]},
+                                   'k6': 'v2'})
+
+    def test_only_translated_subtrees_are_copied(self):
+        unchanged = {'k3': [{'k4': 'v1'}], 'k5': ['a', 'b']}
+        changed = {'k6': [{'k7.k8': 'v2'}, {'k9': 'v3'}]}
+        field = {'k1': unchanged, 'k2': changed}
+
+        # Value is returned as is if nothing needs translating
+        self.assertTrue(mongoescape.escape_chars(unchanged) is unchanged)
+        self.assertTrue(mongoescape.unescape_chars(unchanged) is unchanged)
+
+        escaped = mongoescape.escape_chars(field)
+        self.assertFalse(escaped is field)
+        self.assertTrue(escaped['k1'] is unchanged)
+        self.assertFalse(escaped['k2'] is changed)
+        self.assertTrue(escaped['k2']['k6'][1] is changed['k6'][1])
+
+    def test_key_order_is_preserved(self):
+        field = {'a': 1, 'b.c': 2, 'd': 3, 'e$': 4}
+
+        escaped = mongoescape.escape_chars(field)
+        self.assertEqual(list(escaped.keys()), ['a', u'b\uff0ec', 'd', u'e\uff04'])
+
+        unescaped = mongoescape.unescape_chars(escaped)
+        self.assertEqual(list(unescaped.keys()), list(field.keys()))
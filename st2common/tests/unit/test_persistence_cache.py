@@ -0,0 +1,162 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import bson
+import mock
+import unittest2
+
+from st2common.models.db.action import ActionDB
+from st2common.models.db.policy import PolicyDB
+from st2common.persistence import cache as resource_cache
+from st2common.persistence.action import Action
+from st2common.persistence.cache import ResourceCache
+from st2common.persistence.policy import Policy
+
+__all__ = [
+    'ResourceCacheTestCase'
+]
+
+
+def _get_action_db(name='a1'):
+    return ActionDB(id=bson.ObjectId(), pack='dummy_pack_1', name=name, entry_point='',
+                    runner_type={'name': 'local-shell-cmd'})
+
+
+def _get_policy_db(name='p1', action_ref='dummy_pack_1.a1'):
+    return PolicyDB(id=bson.ObjectId(), pack='dummy_pack_1', name=name, resource_ref=action_ref,
+                    policy_type='action.concurrency', enabled=True)
+
+
+class ResourceCacheTestCase(unittest2.TestCase):
+    def tearDown(self):
+        super(ResourceCacheTestCase, self).tearDown()
+        resource_cache.disable_cache()
+
+    def test_get_cached_and_invalidated(self):
+        action_db = _get_action_db()
+        retrieve_func = mock.Mock(return_value=action_db)
+
+        cache = ResourceCache(ttl=60, size=10)
+
+        self.assertEqual(cache.get('action', 'ref', action_db.ref, retrieve_func), action_db)
+        self.assertEqual(cache.get('action', 'ref', action_db.ref, retrieve_func), action_db)
+        self.assertEqual(retrieve_func.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hit_rate, 0.5)
+
+        # Invalidation of an unrelated resource with the same id but a different type
+        cache.invalidate(_get_policy_db())
+        policy_db = _get_policy_db()
+        policy_db.id = action_db.id
+        cache.invalidate(policy_db)
+        self.assertEqual(len(cache), 1)
+
+        cache.invalidate(action_db)
+        self.assertEqual(len(cache), 0)
+
+        self.assertEqual(cache.get('action', 'ref', action_db.ref, retrieve_func), action_db)
+        self.assertEqual(retrieve_func.call_count, 2)
+
+    def test_lookups_by_old_reference_are_invalidated_on_rename(self):
+        action_db = _get_action_db(name='a1')
+        cache = ResourceCache(ttl=60, size=10)
+        cache.get('action', 'ref', 'dummy_pack_1.a1', lambda: action_db)
+
+        renamed_action_db = _get_action_db(name='a2')
+        renamed_action_db.id = action_db.id
+        cache.invalidate(renamed_action_db)
+
+        self.assertEqual(len(cache), 0)
+
+    def test_missing_resources_are_not_cached(self):
+        retrieve_func = mock.Mock(return_value=None)
+
+        cache = ResourceCache(ttl=60, size=10)
+        self.assertEqual(cache.get('action', 'ref', 'dummy_pack_1.a1', retrieve_func), None)
+        self.assertEqual(cache.get('action', 'ref', 'dummy_pack_1.a1', retrieve_func), None)
+        self.assertEqual(retrieve_func.call_count, 2)
+
+    def test_query_results_are_invalidated_on_any_change(self):
+        cache = ResourceCache(ttl=60, size=10)
+        retrieve_func = mock.Mock(return_value=[])
+
+        self.assertEqual(cache.get('policy', 'query', (('resource_ref', 'a'), ), retrieve_func),
+                         [])
+        self.assertEqual(cache.get('policy', 'query', (('resource_ref', 'a'), ), retrieve_func),
+                         [])
+        self.assertEqual(retrieve_func.call_count, 1)
+
+        # New policy for this action has been created
+        cache.invalidate(_get_policy_db(action_ref='a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_result_retrieved_before_invalidation_is_not_stored(self):
+        cache = ResourceCache(ttl=60, size=10)
+        action_db = _get_action_db()
+
+        def retrieve_func():
+            # Resource has been updated while the query was in progress
+            cache.invalidate(action_db)
+            return action_db
+
+        self.assertEqual(cache.get('action', 'ref', action_db.ref, retrieve_func), action_db)
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_and_size(self):
+        cache = ResourceCache(ttl=0, size=10)
+        cache.get('action', 'ref', 'dummy_pack_1.a1', _get_action_db)
+        self.assertEqual(len(cache), 0)
+
+        cache = ResourceCache(ttl=60, size=2)
+        action_dbs = [_get_action_db(name='a%s' % (index)) for index in range(0, 3)]
+
+        for action_db in action_dbs:
+            cache.get('action', 'ref', action_db.ref, lambda: action_db)
+
+        self.assertEqual(len(cache), 2)
+
+        # Least recently used item has been evicted
+        retrieve_func = mock.Mock(return_value=action_dbs[0])
+        cache.get('action', 'ref', action_dbs[0].ref, retrieve_func)
+        self.assertEqual(retrieve_func.call_count, 1)
+
+    def test_lookup_functions_use_process_cache_when_enabled(self):
+        action_db = _get_action_db()
+        policy_db = _get_policy_db()
+
+        with mock.patch.object(Action, 'get_by_ref', mock.Mock(return_value=action_db)) as \
+                mock_get_by_ref, \
+                mock.patch.object(Policy, 'query', mock.Mock(return_value=[policy_db])) as \
+                mock_query:
+            # Cache is not enabled
+            self.assertEqual(resource_cache.get_by_ref(Action, action_db.ref), action_db)
+            self.assertEqual(resource_cache.get_by_ref(Action, action_db.ref), action_db)
+            self.assertEqual(mock_get_by_ref.call_count, 2)
+
+            resource_cache.CACHE = ResourceCache(ttl=60, size=10)
+
+            self.assertEqual(resource_cache.get_by_ref(Action, action_db.ref), action_db)
+            self.assertEqual(resource_cache.get_by_ref(Action, action_db.ref), action_db)
+            self.assertEqual(mock_get_by_ref.call_count, 3)
+
+            for index in range(0, 2):
+                policy_dbs = resource_cache.query(Policy, resource_ref=policy_db.resource_ref,
+                                                  enabled=True)
+                self.assertEqual(policy_dbs, [policy_db])
+
+            self.assertEqual(mock_query.call_count, 1)
+            mock_query.assert_called_with(resource_ref=policy_db.resource_ref, enabled=True)
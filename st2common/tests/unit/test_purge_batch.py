@@ -0,0 +1,196 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import datetime
+import os
+import tempfile
+
+import bson
+import mock
+import unittest2
+
+from st2common import log as logging
+from st2common.garbage_collection import batch
+from st2common.garbage_collection.batch import PurgeCheckpoint
+from st2common.garbage_collection.batch import purge_in_batches
+from st2common.util import date as date_utils
+
+__all__ = [
+    'PurgeInBatchesTestCase'
+]
+
+LOG = logging.getLogger(__name__)
+
+
+class MockModel(object):
+    """
+    Mock persistence class which returns objects with id larger than the "id__gt" filter.
+    """
+
+    def __init__(self, count):
+        self.ids = sorted([bson.ObjectId() for _ in range(0, count)])
+        self.queries = []
+
+    def query(self, **kwargs):
+        self.queries.append(kwargs)
+        last_id = kwargs.get('id__gt', None)
+        ids = [object_id for object_id in self.ids if not last_id or object_id > last_id]
+        return [mock.Mock(id=object_id) for object_id in ids[:kwargs['limit']]]
+
+
+class PurgeInBatchesTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(PurgeInBatchesTestCase, self).setUp()
+
+        _, self.checkpoint_path = tempfile.mkstemp()
+        os.unlink(self.checkpoint_path)
+
+    def tearDown(self):
+        super(PurgeInBatchesTestCase, self).tearDown()
+
+        if os.path.isfile(self.checkpoint_path):
+            os.unlink(self.checkpoint_path)
+
+    def test_objects_are_purged_in_batches(self):
+        model = MockModel(count=5)
+        batches = []
+
+        def purge_batch(object_dbs):
+            batches.append([object_db.id for object_db in object_dbs])
+            return len(object_dbs)
+
+        purged_count = purge_in_batches(logger=LOG, resource='test', model=model,
+                                        filters={'status': 'succeeded'},
+                                        purge_batch_func=purge_batch, batch_size=2)
+
+        self.assertEqual(purged_count, 5)
+        self.assertEqual(batches, [model.ids[0:2], model.ids[2:4], model.ids[4:5]])
+
+        for query in model.queries:
+            self.assertEqual(query['status'], 'succeeded')
+            self.assertEqual(query['order_by'], ['id'])
+            self.assertEqual(query['limit'], 2)
+
+    def test_purge_is_resumed_from_checkpoint(self):
+        model = MockModel(count=5)
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+
+        def failing_purge_batch(object_dbs):
+            if object_dbs[0].id == model.ids[2]:
+                raise ValueError('Database is not available')
+            return len(object_dbs)
+
+        self.assertRaises(ValueError, purge_in_batches, logger=LOG, resource='test',
+                          model=model, filters={}, purge_batch_func=failing_purge_batch,
+                          batch_size=2, checkpoint=checkpoint)
+
+        # Checkpoint is persisted and contains the last id from the successfully purged batch
+        self.assertEqual(PurgeCheckpoint(path=self.checkpoint_path).get('test', filters={}),
+                         model.ids[1])
+
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+        purged_count = purge_in_batches(logger=LOG, resource='test', model=model, filters={},
+                                        purge_batch_func=lambda object_dbs: len(object_dbs),
+                                        batch_size=2, checkpoint=checkpoint)
+        self.assertEqual(purged_count, 3)
+        self.assertEqual(model.queries[-3]['id__gt'], model.ids[1])
+
+        # Checkpoint is cleared once all the objects have been purged
+        self.assertEqual(PurgeCheckpoint(path=self.checkpoint_path).get('test', filters={}), None)
+
+    def test_purge_with_different_filters_is_not_resumed_from_checkpoint(self):
+        model = MockModel(count=5)
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+        checkpoint.set('test', model.ids[1], filters={'action__ref': 'core.local'})
+
+        purged_count = purge_in_batches(logger=LOG, resource='test', model=model, filters={},
+                                        purge_batch_func=lambda object_dbs: len(object_dbs),
+                                        batch_size=2, checkpoint=checkpoint)
+        self.assertEqual(purged_count, 5)
+        self.assertNotIn('id__gt', model.queries[0])
+
+        # Checkpoint of the interrupted purge with other filters is replaced
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+        self.assertEqual(checkpoint.get('test', filters={'action__ref': 'core.local'}), None)
+
+    @mock.patch.object(date_utils, 'get_datetime_utc_now')
+    def test_purge_with_later_time_bound_is_resumed_from_checkpoint(self, mock_utc_now):
+        model = MockModel(count=5)
+
+        def get_filters():
+            # Time bound is recomputed on each run, same as in the garbage collector service
+            timestamp = date_utils.get_datetime_utc_now() - datetime.timedelta(days=7)
+            return {'status': 'succeeded', 'timestamp__lt': timestamp}
+
+        def failing_purge_batch(object_dbs):
+            if object_dbs[0].id == model.ids[2]:
+                raise ValueError('Database is not available')
+            return len(object_dbs)
+
+        now = date_utils.add_utc_tz(datetime.datetime(2019, 1, 1))
+        mock_utc_now.return_value = now
+
+        self.assertRaises(ValueError, purge_in_batches, logger=LOG, resource='test',
+                          model=model, filters=get_filters(),
+                          purge_batch_func=failing_purge_batch, batch_size=2,
+                          checkpoint=PurgeCheckpoint(path=self.checkpoint_path))
+
+        # Purge with an earlier time bound is not resumed
+        mock_utc_now.return_value = now - datetime.timedelta(minutes=5)
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+        self.assertEqual(checkpoint.get('test', filters=get_filters()), None)
+
+        # Purge after a restart (later time bound) is resumed
+        mock_utc_now.return_value = now + datetime.timedelta(minutes=5)
+        checkpoint = PurgeCheckpoint(path=self.checkpoint_path)
+        purged_count = purge_in_batches(logger=LOG, resource='test', model=model,
+                                        filters=get_filters(),
+                                        purge_batch_func=lambda object_dbs: len(object_dbs),
+                                        batch_size=2, checkpoint=checkpoint)
+        self.assertEqual(purged_count, 3)
+        self.assertEqual(model.queries[-3]['id__gt'], model.ids[1])
+
+    @mock.patch.object(batch.concurrency, 'sleep')
+    @mock.patch.object(batch.time, 'time', mock.Mock(return_value=0))
+    def test_rate_limit(self, mock_sleep):
+        model = MockModel(count=5)
+
+        purge_in_batches(logger=LOG, resource='test', model=model, filters={},
+                         purge_batch_func=lambda object_dbs: len(object_dbs), batch_size=2,
+                         max_docs_per_second=4)
+
+        # 2 objects after the first batch, 4 objects after the second batch (last batch is not
+        # followed by a sleep)
+        self.assertEqual(mock_sleep.call_args_list, [mock.call(0.5), mock.call(1.0)])
+
+    @mock.patch.object(batch, 'get_driver')
+    def test_batch_metrics(self, mock_get_driver):
+        model = MockModel(count=3)
+
+        purge_in_batches(logger=LOG, resource='test', model=model, filters={},
+                         purge_batch_func=lambda object_dbs: len(object_dbs), batch_size=2)
+
+        driver = mock_get_driver.return_value
+        self.assertEqual(driver.time.call_count, 2)
+        driver.time.assert_called_with('garbage_collection.test.batch', mock.ANY)
+        self.assertEqual(driver.inc_counter.call_args_list,
+                         [mock.call('garbage_collection.test.purged', 2),
+                          mock.call('garbage_collection.test.purged', 1)])
+
+    def test_invalid_batch_size(self):
+        self.assertRaises(ValueError, purge_in_batches, logger=LOG, resource='test',
+                          model=MockModel(count=1), filters={}, purge_batch_func=len,
+                          batch_size=0)
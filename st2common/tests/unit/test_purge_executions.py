@@ -266,6 +266,38 @@ class TestPurgeExecutions(CleanDbTestCase):
         stderr_dbs = ActionExecutionOutput.query(output_type='stderr')
         self.assertEqual(len(stderr_dbs), 0)
 
+    def test_purge_executions_in_batches(self):
+        now = date_utils.get_datetime_utc_now()
+
+        # Write executions (with corresponding live actions) before and after cut-off threshold
+        for days in [22, 22, 22, 5]:
+            liveaction_model = copy.deepcopy(self.models['liveactions']['liveaction4.yaml'])
+            liveaction_model['id'] = bson.ObjectId()
+            liveaction_model['start_timestamp'] = now - timedelta(days=days)
+            liveaction_model['end_timestamp'] = now - timedelta(days=days - 1)
+            liveaction_model['status'] = action_constants.LIVEACTION_STATUS_SUCCEEDED
+            liveaction = LiveAction.add_or_update(liveaction_model)
+
+            exec_model = copy.deepcopy(self.models['executions']['execution1.yaml'])
+            exec_model['start_timestamp'] = now - timedelta(days=days)
+            exec_model['end_timestamp'] = now - timedelta(days=days - 1)
+            exec_model['status'] = action_constants.LIVEACTION_STATUS_SUCCEEDED
+            exec_model['id'] = bson.ObjectId()
+            exec_model['liveaction']['id'] = str(liveaction.id)
+            ActionExecution.add_or_update(exec_model)
+
+            self._insert_mock_stdout_and_stderr_objects_for_execution(exec_model['id'], count=2)
+
+        self.assertEqual(len(ActionExecution.get_all()), 4)
+        self.assertEqual(len(LiveAction.get_all()), 4)
+        self.assertEqual(len(ActionExecutionOutput.get_all()), 16)
+
+        purge_executions(logger=LOG, timestamp=now - timedelta(days=10), batch_size=2)
+
+        self.assertEqual(len(ActionExecution.get_all()), 1)
+        self.assertEqual(len(LiveAction.get_all()), 1)
+        self.assertEqual(len(ActionExecutionOutput.get_all()), 4)
+
     @mock.patch('st2common.garbage_collection.executions.LiveAction')
     @mock.patch('st2common.garbage_collection.executions.ActionExecution')
     def test_purge_executions_whole_model_is_not_loaded_in_memory(self, mock_ActionExecution,
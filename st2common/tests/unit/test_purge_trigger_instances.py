@@ -70,3 +70,17 @@ class TestPurgeTriggerInstances(CleanDbTestCase):
         self.assertEqual(len(TriggerInstance.get_all()), 2)
         purge_trigger_instances(logger=LOG, timestamp=now - timedelta(days=10))
         self.assertEqual(len(TriggerInstance.get_all()), 1)
+
+    def test_purge_in_batches(self):
+        now = date_utils.get_datetime_utc_now()
+
+        for days in [20, 20, 20, 5]:
+            instance_db = TriggerInstanceDB(trigger='purge_tool.dummy.trigger',
+                                            payload={'hola': 'hi', 'kuraci': 'chicken'},
+                                            occurrence_time=now - timedelta(days=days),
+                                            status=TRIGGER_INSTANCE_PROCESSED)
+            TriggerInstance.add_or_update(instance_db)
+
+        self.assertEqual(len(TriggerInstance.get_all()), 4)
+        purge_trigger_instances(logger=LOG, timestamp=now - timedelta(days=10), batch_size=2)
+        self.assertEqual(len(TriggerInstance.get_all()), 1)
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 from __future__ import absolute_import
-import six.moves.queue
 import time
 import uuid
 
@@ -21,12 +20,37 @@ from unittest2 import TestCase
 import mock
 
 from st2common.constants import action as action_constants
-from st2common.query.base import Querier, QueryContext
+from st2common.query import base as query_base
+from st2common.query.base import Querier, QueryContext, QuerySchedule, ScheduledQuery
 from st2common.runners import utils as runners_utils
 from st2tests.config import parse_args
 parse_args()
 
 
+def _get_query_context(mistral_execution_id='6d624534-42ca-425c-aa3a-ccc676386fb2'):
+    return QueryContext(
+        uuid.uuid4().hex,
+        uuid.uuid4().hex,
+        {
+            'mistral': {
+                'workflow_name': 'st2ci.st2_pkg_e2e_test',
+                'execution_id': mistral_execution_id
+            }
+        },
+        'mistral_v2'
+    )
+
+
+def _get_query_schedule(*last_query_times):
+    query_contexts = QuerySchedule()
+
+    for last_query_time in last_query_times:
+        query_contexts.put(ScheduledQuery(query_context=_get_query_context(),
+                                          last_query_time=last_query_time, interval=5))
+
+    return query_contexts
+
+
 class QueryBaseTests(TestCase):
 
     @mock.patch.object(
@@ -74,10 +98,10 @@ class QueryBaseTests(TestCase):
         )
 
         now = time.time()
-        query_contexts = six.moves.queue.Queue()
-        query_contexts.put((now + 100000, mock_query_state_1)),
-        query_contexts.put((now + 100001, mock_query_state_2)),
-        query_contexts.put((now - 200000, mock_query_state_3)),
+        query_contexts = QuerySchedule()
+        query_contexts.put(ScheduledQuery(mock_query_state_1, now + 100000, 5))
+        query_contexts.put(ScheduledQuery(mock_query_state_2, now + 100001, 5))
+        query_contexts.put(ScheduledQuery(mock_query_state_3, now - 200000, 5))
         querier._query_contexts = query_contexts
         querier._fire_queries()
         self.assertEqual(querier._query_contexts.qsize(), 2)
@@ -118,8 +142,8 @@ class QueryBaseTests(TestCase):
         )
 
         now = time.time()
-        query_contexts = six.moves.queue.Queue()
-        query_contexts.put((now - 200000, mock_query_state_1)),
+        query_contexts = QuerySchedule()
+        query_contexts.put(ScheduledQuery(mock_query_state_1, now - 200000, 5))
         querier._query_contexts = query_contexts
         querier._fire_queries(blocking=True)
         self.assertFalse(Querier._delete_state_object.called)
@@ -166,8 +190,8 @@ class QueryBaseTests(TestCase):
         )
 
         now = time.time()
-        query_contexts = six.moves.queue.Queue()
-        query_contexts.put((now - 200000, mock_query_state_1)),
+        query_contexts = QuerySchedule()
+        query_contexts.put(ScheduledQuery(mock_query_state_1, now - 200000, 5))
         querier._query_contexts = query_contexts
         querier._fire_queries(blocking=True)
         self.assertTrue(runners_utils.invoke_post_run.called)
@@ -210,9 +234,105 @@ class QueryBaseTests(TestCase):
         )
 
         now = time.time()
-        query_contexts = six.moves.queue.Queue()
-        query_contexts.put((now - 200000, mock_query_state_1)),
+        query_contexts = QuerySchedule()
+        query_contexts.put(ScheduledQuery(mock_query_state_1, now - 200000, 5))
         querier._query_contexts = query_contexts
         querier._fire_queries(blocking=True)
         self.assertFalse(Querier._delete_state_object.called)
         self.assertEqual(querier._query_contexts.qsize(), 0)
+
+    def test_query_schedule_returns_due_queries_in_order(self):
+        now = time.time()
+        query_contexts = _get_query_schedule(now, now - 20, now - 10)
+
+        self.assertEqual(query_contexts.get_next_query_time(), now - 15)
+        self.assertEqual(query_contexts.count_due(now=now), 2)
+
+        self.assertEqual(query_contexts.pop_due(now=now).last_query_time, now - 20)
+        self.assertEqual(query_contexts.pop_due(now=now).last_query_time, now - 10)
+        self.assertEqual(query_contexts.pop_due(now=now), None)
+        self.assertEqual(query_contexts.qsize(), 1)
+
+    def test_query_schedule_count_due(self):
+        now = time.time()
+        query_contexts = _get_query_schedule(*[now - (index % 7) * 10 for index in range(0, 50)])
+
+        for offset in [-100, 0, 15, 25, 35, 100]:
+            expected = len([item for item in query_contexts._heap if item[0] <= now + offset])
+            self.assertEqual(query_contexts.count_due(now=now + offset), expected)
+
+    @mock.patch.object(
+        Querier,
+        '_update_action_results',
+        mock.MagicMock(return_value=None)
+    )
+    @mock.patch.object(
+        Querier,
+        '_is_state_object_exist',
+        mock.MagicMock(return_value=True)
+    )
+    def test_query_interval_backoff(self):
+        querier = Querier()
+        querier._query_interval = 5
+        querier._query_max_interval = 15
+        querier._query_backoff_factor = 2
+
+        results = {'tasks': []}
+        querier.query = mock.MagicMock(
+            return_value=(action_constants.LIVEACTION_STATUS_RUNNING, results))
+
+        def query():
+            scheduled_query = querier._query_contexts.pop_due(now=time.time() + 3600)
+            querier._query_and_save_results(scheduled_query)
+            return querier._query_contexts._heap[0][2]
+
+        querier._query_contexts = _get_query_schedule(time.time() - 5)
+
+        # Interval is multiplied while the state doesn't change and results are only written
+        # when the state changes
+        self.assertEqual(query().interval, 5)
+        self.assertEqual(query().interval, 10)
+        self.assertEqual(query().interval, 15)
+        self.assertEqual(query().interval, 15)
+        self.assertEqual(Querier._update_action_results.call_count, 1)
+
+        # Interval is reset once the state changes
+        results['tasks'].append({'id': 'task1'})
+        self.assertEqual(query().interval, 5)
+        self.assertEqual(Querier._update_action_results.call_count, 2)
+
+    @mock.patch.object(query_base, 'get_driver')
+    @mock.patch.object(
+        Querier,
+        '_query_and_save_results',
+        mock.MagicMock(return_value=True)
+    )
+    def test_fire_queries_metrics(self, mock_get_driver):
+        now = time.time()
+        querier = Querier()
+        querier._query_contexts = _get_query_schedule(now - 200000, now - 100000, now + 100000)
+        querier._fire_queries(blocking=True)
+
+        driver = mock_get_driver.return_value
+        self.assertEqual(driver.time.call_count, 2)
+        driver.time.assert_called_with('resultstracker.querier.query_delay', mock.ANY)
+        driver.set_gauge.assert_any_call('resultstracker.querier.due_backlog', 0)
+        driver.set_gauge.assert_any_call('resultstracker.querier.tracked_queries', 1)
+
+    @mock.patch.object(query_base, 'get_driver')
+    @mock.patch.object(
+        Querier,
+        '_query_and_save_results',
+        mock.MagicMock(return_value=True)
+    )
+    def test_fire_queries_due_backlog_when_pool_is_full(self, mock_get_driver):
+        now = time.time()
+        querier = Querier()
+        querier._query_contexts = _get_query_schedule(now - 300, now - 200, now - 100)
+        querier._thread_pool.free = mock.MagicMock(side_effect=[1, 1, 0])
+        querier._fire_queries(blocking=True)
+
+        driver = mock_get_driver.return_value
+        self.assertEqual(driver.time.call_count, 1)
+        driver.set_gauge.assert_any_call('resultstracker.querier.due_backlog', 2)
+        driver.set_gauge.assert_any_call('resultstracker.querier.tracked_queries', 2)
@@ -140,3 +140,64 @@ class VariableMessageQueueConsumerTest(DbTestCase):
         handler._queue_consumer.process(payload, mock_message)
         self.assertTrue(mock_message.ack.called)
         self.assertFalse(FakeVariableMessageHandler.process.called)
+
+
+class BatchedQueueConsumerTest(DbTestCase):
+
+    def _get_consumer(self, **kwargs):
+        handler = get_handler()
+        return consumers.QueueConsumer(connection=mock.MagicMock(), queues=[FAKE_WORK_Q],
+                                       handler=handler, **kwargs)
+
+    @mock.patch.object(BufferedDispatcher, 'dispatch', mock.MagicMock())
+    def test_messages_are_acknowledged_in_batches(self):
+        consumer = self._get_consumer(prefetch_count=10, ack_batch_size=3)
+        messages = [mock.MagicMock() for index in range(0, 4)]
+
+        for message in messages[:3]:
+            consumer.process(FakeModelDB(), message)
+
+        # Only the last message in a batch is acknowledged (multiple=True)
+        self.assertFalse(messages[0].ack.called)
+        self.assertFalse(messages[1].ack.called)
+        messages[2].ack.assert_called_once_with(multiple=True)
+
+        # Partial batch is acknowledged once the interval has passed
+        consumer.process(FakeModelDB(), messages[3])
+        consumer.on_iteration()
+        self.assertFalse(messages[3].ack.called)
+
+        consumer._unacked_since -= consumers.DEFAULT_ACK_BATCH_INTERVAL
+        consumer.on_iteration()
+        messages[3].ack.assert_called_once_with(multiple=True)
+
+    def test_ack_batch_size_is_capped_at_prefetch_count(self):
+        consumer = self._get_consumer(prefetch_count=2, ack_batch_size=10)
+        self.assertEqual(consumer._ack_batch_size, 2)
+
+    @mock.patch.object(BufferedDispatcher, 'dispatch', mock.MagicMock())
+    @mock.patch.object(BufferedDispatcher, 'free', mock.MagicMock(return_value=0))
+    @mock.patch.object(BufferedDispatcher, 'wait_free', mock.MagicMock())
+    def test_backpressure_waits_for_free_dispatcher_threads(self):
+        consumer = self._get_consumer(prefetch_count=10, ack_batch_size=5)
+        message = mock.MagicMock()
+
+        consumer.process(FakeModelDB(), message)
+
+        self.assertEqual(BufferedDispatcher.wait_free.call_count, 1)
+        # Pending acks are flushed before waiting
+        message.ack.assert_called_once_with(multiple=True)
+
+    @mock.patch('st2common.util.greenpooldispatch.get_driver')
+    def test_dispatcher_metrics_use_consumer_name(self, mock_get_driver):
+        consumer = self._get_consumer(name='rulesengine')
+        self.assertEqual(consumer._dispatcher.name, 'rulesengine')
+
+        consumer.process(FakeModelDB(), mock.MagicMock())
+        consumer.shutdown()
+
+        driver = mock_get_driver.return_value
+        driver.set_gauge.assert_any_call('dispatcher.rulesengine.utilization', mock.ANY)
+
+        # Handler class name is used for consumers without a name
+        self.assertEqual(self._get_consumer()._dispatcher.name, 'FakeMessageHandler')
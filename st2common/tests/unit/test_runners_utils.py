@@ -13,7 +13,10 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+import logging
+
 import mock
+import unittest2
 
 from st2common.runners import utils
 from st2common.services import executions as exe_svc
@@ -69,3 +72,16 @@ class RunnersUtilityTests(base.CleanDbTestCase):
         utils.invoke_post_run(self.liveaction_db)
         action_db_utils.get_action_by_ref.assert_called_once()
         action_db_utils.get_runnertype_by_name.assert_not_called()
+
+
+class PythonRunnerActionLoggerTestCase(unittest2.TestCase):
+    def test_log_level_is_updated_for_cached_logger(self):
+        logger = utils.get_logger_for_python_runner_action(action_name='LogLevelTestAction',
+                                                           log_level='debug')
+        self.assertEqual(logger.level, logging.DEBUG)
+
+        logger = utils.get_logger_for_python_runner_action(action_name='LogLevelTestAction',
+                                                           log_level='error')
+        self.assertEqual(logger.level, logging.ERROR)
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertEqual(logger.handlers[0].level, logging.ERROR)
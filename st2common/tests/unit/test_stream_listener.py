@@ -0,0 +1,249 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import mock
+import unittest2
+from oslo_config import cfg
+
+from st2common.models.api.execution import ActionExecutionOutputAPI
+from st2common.models.db.execution import ActionExecutionOutputDB
+from st2common.stream import listener as listener_module
+from st2common.stream.listener import BaseListener
+from st2common.stream.listener import StreamEvent
+from st2common.stream.listener import Subscription
+from st2common.stream.listener import SubscriptionIndex
+from st2tests import config as tests_config
+
+__all__ = [
+    'SubscriptionIndexTestCase',
+    'SubscriptionTestCase',
+    'BaseListenerTestCase'
+]
+
+
+def _get_event(sequence, name='st2.execution__update', coalesce_key=None):
+    return StreamEvent(sequence=sequence, name=name, body={'sequence': sequence},
+                       coalesce_key=coalesce_key)
+
+
+class SubscriptionIndexTestCase(unittest2.TestCase):
+    def test_get_subscriptions(self):
+        all_events = Subscription()
+        execution_events = Subscription(events=['st2.execution__*'])
+        create_events = Subscription(events=['st2.execution__create', 'st2.liveaction__create'])
+        action_events = Subscription(action_refs=['core.local'])
+        execution_output = Subscription(events=['st2.execution.output__create'],
+                                        execution_ids=['e1'])
+
+        index = SubscriptionIndex()
+        for subscription in [all_events, execution_events, create_events, action_events,
+                             execution_output]:
+            index.add(subscription)
+
+        self.assertEqual(len(index), 5)
+
+        result = index.get_subscriptions('st2.execution__create', action_ref='core.local',
+                                         execution_id='e2')
+        self.assertEqual(set(result), set([all_events, execution_events, create_events,
+                                           action_events]))
+
+        result = index.get_subscriptions('st2.execution__update', action_ref='core.remote',
+                                         execution_id='e1')
+        self.assertEqual(set(result), set([all_events, execution_events]))
+
+        result = index.get_subscriptions('st2.execution.output__create',
+                                         action_ref='core.remote', execution_id='e1')
+        self.assertEqual(set(result), set([all_events, execution_output]))
+
+        result = index.get_subscriptions('st2.announcement__chatops')
+        self.assertEqual(set(result), set([all_events]))
+
+        # Cached event subscriptions are invalidated when subscription is removed
+        index.remove(all_events)
+        index.remove(execution_output)
+        self.assertEqual(index.get_subscriptions('st2.announcement__chatops'), [])
+        self.assertEqual(index.get_subscriptions('st2.execution.output__create',
+                                                 execution_id='e1'), [])
+
+
+class SubscriptionTestCase(unittest2.TestCase):
+    def _get_sequences(self, subscription):
+        sequences = []
+        while not subscription.queue.empty():
+            sequences.append(subscription.get().sequence)
+        return sequences
+
+    def test_drop_oldest_overflow_policy(self):
+        subscription = Subscription(queue_size=2,
+                                    overflow_policy=listener_module.OVERFLOW_POLICY_DROP_OLDEST)
+
+        for sequence in range(1, 5):
+            self.assertTrue(subscription.put(_get_event(sequence=sequence)))
+
+        self.assertEqual(subscription.dropped_count, 2)
+        self.assertEqual(self._get_sequences(subscription), [3, 4])
+        self.assertEqual(subscription.last_sequence, 4)
+
+    def test_coalesce_overflow_policy(self):
+        subscription = Subscription(queue_size=2,
+                                    overflow_policy=listener_module.OVERFLOW_POLICY_COALESCE)
+
+        subscription.put(_get_event(sequence=1, coalesce_key='e1'))
+        subscription.put(_get_event(sequence=2, coalesce_key='e2'))
+        subscription.put(_get_event(sequence=3, coalesce_key='e1'))
+        self.assertEqual(subscription.dropped_count, 0)
+        self.assertEqual(self._get_sequences(subscription), [3, 2])
+
+        # Delivered update is not coalesced with the new ones
+        subscription.put(_get_event(sequence=4, coalesce_key='e1'))
+        subscription.put(_get_event(sequence=5, name='st2.execution.output__create'))
+        subscription.put(_get_event(sequence=6, name='st2.execution.output__create'))
+        self.assertEqual(subscription.dropped_count, 1)
+        self.assertEqual(self._get_sequences(subscription), [5, 6])
+
+    def test_disconnect_overflow_policy(self):
+        subscription = Subscription(queue_size=2,
+                                    overflow_policy=listener_module.OVERFLOW_POLICY_DISCONNECT)
+
+        self.assertTrue(subscription.put(_get_event(sequence=1)))
+        self.assertEqual(subscription.get().sequence, 1)
+        self.assertTrue(subscription.put(_get_event(sequence=2)))
+        self.assertTrue(subscription.put(_get_event(sequence=3)))
+        self.assertFalse(subscription.put(_get_event(sequence=4)))
+
+        self.assertTrue(subscription.closed)
+        self.assertEqual(subscription.get(), None)
+        self.assertEqual(subscription.last_sequence, 1)
+
+
+class BaseListenerTestCase(unittest2.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        tests_config.parse_args()
+
+    def test_body_is_converted_once_and_only_when_there_are_subscribers(self):
+        listener = BaseListener(connection=mock.MagicMock())
+        output_db = ActionExecutionOutputDB(execution_id='e1', action_ref='core.local',
+                                            output_type='stdout', data='line 1')
+
+        with mock.patch.object(ActionExecutionOutputAPI, 'from_model',
+                               mock.MagicMock(return_value='api')) as mock_from_model:
+            listener.emit('st2.execution.output__create', output_db,
+                          model=ActionExecutionOutputAPI)
+            self.assertEqual(mock_from_model.call_count, 0)
+
+            subscription_1 = Subscription(execution_ids=['e1'])
+            subscription_2 = Subscription(action_refs=['core.local'])
+            subscription_3 = Subscription(execution_ids=['e2'])
+            for subscription in [subscription_1, subscription_2, subscription_3]:
+                listener.subscriptions.add(subscription)
+
+            listener.emit('st2.execution.output__create', output_db,
+                          model=ActionExecutionOutputAPI)
+            self.assertEqual(mock_from_model.call_count, 1)
+
+        for subscription in [subscription_1, subscription_2]:
+            event = subscription.get()
+            self.assertEqual((event.name, event.get_body()),
+                             ('st2.execution.output__create', 'api'))
+
+        self.assertTrue(subscription_3.queue.empty())
+
+    def test_disconnected_subscriber_can_resume_the_stream(self):
+        cfg.CONF.set_override(name='subscriber_overflow_policy', override='disconnect',
+                              group='stream')
+        cfg.CONF.set_override(name='subscriber_queue_size', override=2, group='stream')
+        self.addCleanup(cfg.CONF.clear_override, name='subscriber_overflow_policy',
+                        group='stream')
+        self.addCleanup(cfg.CONF.clear_override, name='subscriber_queue_size', group='stream')
+
+        listener = BaseListener(connection=mock.MagicMock())
+        generator = listener.generator(events=['st2.announcement__*'])
+        self.assertEqual(next(generator), '')
+
+        for index in range(0, 4):
+            listener.emit('st2.announcement__chatops', {'index': index})
+            listener.emit('st2.liveaction__create', {})
+
+        # Subscription is closed and removed from the index once its queue overflows
+        self.assertEqual(len(listener.subscriptions), 0)
+
+        event_name, body = next(generator)
+        self.assertEqual(event_name, listener_module.OVERFLOW_EVENT)
+        self.assertRaises(StopIteration, next, generator)
+
+        # Matching events which haven't been delivered are replayed
+        generator = listener.generator(events=['st2.announcement__*'],
+                                       resume_token=body['resume_token'])
+        self.assertEqual(next(generator), '')
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 0}))
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 1}))
+
+    def test_client_is_notified_about_dropped_events(self):
+        cfg.CONF.set_override(name='subscriber_queue_size', override=2, group='stream')
+        self.addCleanup(cfg.CONF.clear_override, name='subscriber_queue_size', group='stream')
+
+        listener = BaseListener(connection=mock.MagicMock())
+        generator = listener.generator(events=['st2.announcement__*'])
+        self.assertEqual(next(generator), '')
+
+        for index in range(0, 4):
+            listener.emit('st2.announcement__chatops', {'index': index})
+
+        self.assertEqual(next(generator), (listener_module.EVENTS_LOST_EVENT, {'dropped': 2}))
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 2}))
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 3}))
+
+        # Unbounded subscription doesn't drop events
+        generator = listener.generator(events=['st2.announcement__*'], queue_size=0)
+        self.assertEqual(next(generator), '')
+
+        for index in range(0, 4):
+            listener.emit('st2.announcement__chatops', {'index': index})
+
+        for index in range(0, 4):
+            self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': index}))
+
+    def test_client_is_notified_when_resume_token_cant_be_honoured(self):
+        cfg.CONF.set_override(name='subscriber_overflow_policy', override='disconnect',
+                              group='stream')
+        cfg.CONF.set_override(name='subscriber_queue_size', override=1, group='stream')
+        cfg.CONF.set_override(name='replay_buffer_size', override=1, group='stream')
+        for name in ['subscriber_overflow_policy', 'subscriber_queue_size', 'replay_buffer_size']:
+            self.addCleanup(cfg.CONF.clear_override, name=name, group='stream')
+
+        listener = BaseListener(connection=mock.MagicMock())
+        generator = listener.generator(events=['st2.announcement__*'])
+        self.assertEqual(next(generator), '')
+
+        for index in range(0, 5):
+            listener.emit('st2.announcement__chatops', {'index': index})
+
+        event_name, body = next(generator)
+        self.assertEqual(event_name, listener_module.OVERFLOW_EVENT)
+
+        # Replay buffer only holds the last two events
+        generator = listener.generator(events=['st2.announcement__*'],
+                                       resume_token=body['resume_token'])
+        self.assertEqual(next(generator), '')
+        self.assertEqual(next(generator), (listener_module.EVENTS_LOST_EVENT, {'dropped': None}))
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 3}))
+        self.assertEqual(next(generator), ('st2.announcement__chatops', {'index': 4}))
+
+        # Token issued by a different listener
+        generator = listener.generator(events=['st2.announcement__*'], resume_token='abcd.1')
+        self.assertEqual(next(generator), '')
+        self.assertEqual(next(generator), (listener_module.EVENTS_LOST_EVENT, {'dropped': None}))
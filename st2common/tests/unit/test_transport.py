@@ -14,12 +14,16 @@
 
 import ssl
 
+import mock
 import unittest2
 
+from st2common.transport.reactor import TriggerDispatcher
+from st2common.transport.reactor import TriggerInstancePublisher
 from st2common.transport.utils import _get_ssl_kwargs
 
 __all__ = [
-    'TransportUtilsTestCase'
+    'TransportUtilsTestCase',
+    'TriggerDispatcherTestCase'
 ]
 
 
@@ -77,3 +81,25 @@ class TransportUtilsTestCase(unittest2.TestCase):
             'ca_certs': '/tmp/ca_certs',
             'cert_reqs': ssl.CERT_REQUIRED
         })
+
+
+class TriggerDispatcherTestCase(unittest2.TestCase):
+    @mock.patch.object(TriggerInstancePublisher, 'publish_trigger')
+    def test_dispatch_many_payloads_are_published_in_batches(self, mock_publish_trigger):
+        payloads = [{'count': index} for index in range(0, 5)]
+
+        dispatcher = TriggerDispatcher()
+        dispatcher.dispatch_many('pack.trigger', payloads=payloads, batch_size=2)
+
+        self.assertEqual(mock_publish_trigger.call_count, 3)
+
+        published_payloads = []
+        for call_args in mock_publish_trigger.call_args_list:
+            message = call_args[1]['payload']
+
+            self.assertEqual(call_args[1]['routing_key'], 'trigger_instance_batch')
+            self.assertEqual(message['trigger'], 'pack.trigger')
+            self.assertTrue(len(message['payloads']) <= 2)
+            published_payloads.extend(message['payloads'])
+
+        self.assertEqual(published_payloads, payloads)
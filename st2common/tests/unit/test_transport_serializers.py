@@ -0,0 +1,102 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import datetime
+
+import bson
+import msgpack
+import unittest2
+from kombu.serialization import dumps
+from kombu.serialization import loads
+from kombu.serialization import prepare_accept_content
+
+from st2common.models.db.liveaction import LiveActionDB
+from st2common.transport import serializers
+from st2common.transport.serializers import msgpack_dumps
+from st2common.transport.serializers import msgpack_loads
+from st2common.util import date as date_utils
+
+__all__ = [
+    'MessageSerializersTestCase'
+]
+
+
+class MessageSerializersTestCase(unittest2.TestCase):
+    def test_document_round_trip(self):
+        liveaction_db = LiveActionDB(id=bson.ObjectId(), action='core.local', status='requested',
+                                     start_timestamp=date_utils.get_datetime_utc_now(),
+                                     parameters={'cmd': 'ls', 'a.b$': 1},
+                                     context={'user': 'stanley'})
+
+        result = msgpack_loads(msgpack_dumps({'payload': liveaction_db}))['payload']
+
+        self.assertTrue(isinstance(result, LiveActionDB))
+        self.assertEqual(result.id, liveaction_db.id)
+        self.assertEqual(result.action, 'core.local')
+        self.assertEqual(result.parameters, {'cmd': 'ls', 'a.b$': 1})
+        self.assertEqual(result.context, {'user': 'stanley'})
+        self.assertEqual(result.start_timestamp, liveaction_db.start_timestamp)
+
+    def test_native_and_extension_types_round_trip(self):
+        naive_dt = datetime.datetime(2019, 10, 1, 12, 30, 15, 123456)
+        aware_dt = date_utils.add_utc_tz(naive_dt)
+        object_id = bson.ObjectId()
+
+        value = {
+            'str': 'unicode ☃',
+            'bytes': b'\x00\x01',
+            'int': 1,
+            'int_key': {1: 'one'},
+            'float': 1.5,
+            'none': None,
+            'list': [1, 'two'],
+            'naive_dt': naive_dt,
+            'aware_dt': aware_dt,
+            'object_id': object_id,
+            'set': set([1, 2])
+        }
+
+        result = msgpack_loads(msgpack_dumps(value))
+        self.assertEqual(result, value)
+        self.assertEqual(result['naive_dt'].tzinfo, None)
+        self.assertTrue(result['aware_dt'].tzinfo is not None)
+
+    def test_values_which_cant_be_packed_fall_back_to_pickle(self):
+        value = {'big_int': 2 ** 70}
+        self.assertEqual(msgpack_loads(msgpack_dumps(value)), value)
+
+    def test_only_whitelisted_document_classes_are_decoded(self):
+        data = msgpack.packb([u'os', u'Popen', {}], use_bin_type=True)
+        data = msgpack.packb(msgpack.ExtType(serializers.EXT_TYPE_DOCUMENT, data),
+                             use_bin_type=True)
+
+        self.assertRaisesRegexp(ValueError, 'Invalid document class', msgpack_loads, data)
+
+    def test_registered_kombu_serializer(self):
+        serializers.register_msgpack_serializer()
+
+        content_type, content_encoding, data = dumps({'a': 1},
+                                                     serializer=serializers.MSGPACK_SERIALIZER)
+        self.assertEqual(content_type, serializers.MSGPACK_CONTENT_TYPE)
+
+        # Consumers accept both, pickle and msgpack messages
+        accept = prepare_accept_content(serializers.ACCEPT_CONTENT)
+        result = loads(data, content_type, content_encoding, accept=accept)
+        self.assertEqual(result, {'a': 1})
+
+        content_type, content_encoding, data = dumps({'a': 1}, serializer='pickle')
+        result = loads(data, content_type, content_encoding, accept=accept)
+        self.assertEqual(result, {'a': 1})
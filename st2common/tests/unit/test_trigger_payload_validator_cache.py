@@ -0,0 +1,156 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import jsonschema
+import mock
+import unittest2
+from oslo_config import cfg
+
+import st2tests.config as tests_config
+tests_config.parse_args()
+
+from st2common.models.db.trigger import TriggerTypeDB
+from st2common.util import schema as util_schema
+from st2common.validators.api import reactor
+from st2common.validators.api.reactor import PayloadValidatorCache
+from st2common.validators.api.reactor import validate_trigger_payload
+
+__all__ = [
+    'CompiledSchemaValidatorTestCase',
+    'PayloadValidatorCacheTestCase'
+]
+
+PAYLOAD_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {
+            'type': 'string',
+            'required': True
+        },
+        'count': {
+            'type': 'integer',
+            'default': 1
+        }
+    }
+}
+
+
+class CompiledSchemaValidatorTestCase(unittest2.TestCase):
+    def test_validate_assigns_defaults_and_doesnt_mutate_instance(self):
+        validator = util_schema.CompiledSchemaValidator(schema=PAYLOAD_SCHEMA,
+                                                        cls=util_schema.CustomValidator,
+                                                        use_default=True)
+
+        instance = {'name': 'test'}
+        self.assertEqual(validator.validate(instance), {'name': 'test', 'count': 1})
+        self.assertEqual(instance, {'name': 'test'})
+
+        self.assertRaises(jsonschema.ValidationError, validator.validate, {'count': 2})
+
+    def test_validate_is_equal_to_compiled_validator(self):
+        instance = {'name': 'test'}
+        validator = util_schema.CompiledSchemaValidator(schema=PAYLOAD_SCHEMA,
+                                                        cls=util_schema.CustomValidator)
+
+        self.assertEqual(validator.validate(instance),
+                         util_schema.validate(instance=instance, schema=PAYLOAD_SCHEMA,
+                                              cls=util_schema.CustomValidator))
+
+
+class PayloadValidatorCacheTestCase(unittest2.TestCase):
+    def setUp(self):
+        super(PayloadValidatorCacheTestCase, self).setUp()
+
+        cfg.CONF.set_override(name='validate_trigger_payload', override=True, group='system')
+        self.cache = reactor.enable_payload_validator_cache()
+
+        self.trigger_type_db = TriggerTypeDB(pack='dummy_pack_1', name='event',
+                                             payload_schema=PAYLOAD_SCHEMA)
+
+        patcher = mock.patch.object(reactor.triggers, 'get_trigger_type_db',
+                                    mock.Mock(return_value=self.trigger_type_db))
+        self.mock_get_trigger_type_db = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        super(PayloadValidatorCacheTestCase, self).tearDown()
+
+        reactor.disable_payload_validator_cache()
+        cfg.CONF.clear_override(name='validate_trigger_payload', group='system')
+
+    def test_validator_is_compiled_once(self):
+        with mock.patch.object(util_schema, 'CompiledSchemaValidator',
+                               wraps=util_schema.CompiledSchemaValidator) as mock_validator_cls:
+            for _ in range(0, 3):
+                result = validate_trigger_payload(trigger_type_ref='dummy_pack_1.event',
+                                                  payload={'name': 'test'})
+                self.assertEqual(result, {'name': 'test', 'count': 1})
+
+            self.assertRaises(jsonschema.ValidationError, validate_trigger_payload,
+                              trigger_type_ref='dummy_pack_1.event', payload={})
+
+        self.assertEqual(mock_validator_cls.call_count, 1)
+        self.assertEqual(self.mock_get_trigger_type_db.call_count, 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_trigger_type_without_schema_is_cached(self):
+        self.trigger_type_db.payload_schema = {}
+
+        for _ in range(0, 2):
+            self.assertEqual(validate_trigger_payload(trigger_type_ref='dummy_pack_1.event',
+                                                      payload={'a': 'b'}), None)
+
+        self.assertEqual(self.mock_get_trigger_type_db.call_count, 1)
+
+    def test_validator_is_invalidated_on_trigger_type_change(self):
+        validate_trigger_payload(trigger_type_ref='dummy_pack_1.event', payload={'name': 'a'})
+
+        # Payload schema has been updated
+        self.trigger_type_db.payload_schema = {
+            'type': 'object',
+            'properties': {
+                'name': {
+                    'type': 'integer'
+                }
+            }
+        }
+        self.cache.invalidate(self.trigger_type_db)
+        self.assertEqual(len(self.cache), 0)
+
+        self.assertRaises(jsonschema.ValidationError, validate_trigger_payload,
+                          trigger_type_ref='dummy_pack_1.event', payload={'name': 'a'})
+        self.assertEqual(self.mock_get_trigger_type_db.call_count, 2)
+
+    def test_result_is_not_cached_if_invalidated_during_retrieval(self):
+        def retrieve_func():
+            self.cache.invalidate(self.trigger_type_db)
+            return 'dummy_pack_1.event', mock.Mock()
+
+        self.cache.get(ref='dummy_pack_1.event', retrieve_func=retrieve_func)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_items_are_evicted(self):
+        cache = PayloadValidatorCache(size=2)
+
+        for ref in ['a.a', 'b.b', 'a.a', 'c.c']:
+            cache.get(ref=ref, retrieve_func=lambda: (ref, mock.Mock()))
+
+        retrieve_func = mock.Mock(return_value=('b.b', None))
+        cache.get(ref='a.a', retrieve_func=retrieve_func)
+        self.assertFalse(retrieve_func.called)
+
+        cache.get(ref='b.b', retrieve_func=retrieve_func)
+        self.assertTrue(retrieve_func.called)
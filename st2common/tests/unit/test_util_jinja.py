@@ -114,3 +114,57 @@ class JinjaUtilsRenderTestCase(unittest2.TestCase):
         }
 
         self.assertDictEqual(expected_raw_block, jinja_utils.convert_jinja_to_raw_block(jinja_expr))
+
+
+class JinjaUtilsTemplateCacheTestCase(unittest2.TestCase):
+
+    def test_shared_environment_per_options(self):
+        env_1 = jinja_utils.get_shared_jinja_environment()
+        env_2 = jinja_utils.get_shared_jinja_environment(allow_undefined=True)
+
+        self.assertEqual(jinja_utils.get_shared_jinja_environment(), env_1)
+        self.assertNotEqual(env_1, env_2)
+
+    def test_template_cache_hit_miss_and_eviction(self):
+        cache = jinja_utils.TemplateCache(size=2)
+
+        template = cache.get_template('{{a}}')
+        self.assertEqual(cache.get_template('{{a}}'), template)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Templates are also keyed by the environment options
+        self.assertNotEqual(cache.get_template('{{a}}', allow_undefined=True), template)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # "{{a}}" is the least recently used item and should be evicted
+        cache.get_template('{{a}}', allow_undefined=True)
+        cache.get_template('{{b}}')
+        self.assertEqual(len(cache), 2)
+
+        self.assertNotEqual(cache.get_template('{{a}}'), template)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_template_cache_syntax_errors_are_not_cached(self):
+        cache = jinja_utils.TemplateCache()
+
+        self.assertRaises(Exception, cache.get_template, '{{ a. }}')
+        self.assertEqual(len(cache), 0)
+
+    def test_is_static_template(self):
+        self.assertTrue(jinja_utils.is_static_template(''))
+        self.assertTrue(jinja_utils.is_static_template('foo bar'))
+        self.assertTrue(jinja_utils.is_static_template('foo\nbar'))
+        self.assertFalse(jinja_utils.is_static_template('{{ foo }}'))
+        self.assertFalse(jinja_utils.is_static_template('{% raw %}foo{% endraw %}'))
+        self.assertFalse(jinja_utils.is_static_template('{# comment #}foo'))
+        self.assertFalse(jinja_utils.is_static_template('foo\n'))
+        self.assertFalse(jinja_utils.is_static_template('foo\r\nbar'))
+
+    def test_render_values_static_values_retain_type(self):
+        mapping = {'k1': 'foo', 'k2': True, 'k3': 10, 'k4': ['a', 'b'], 'k5': 'foo\n',
+                   'k6': '{{a}}'}
+
+        actual = jinja_utils.render_values(mapping=mapping, context={'a': 'v1'})
+        expected = {'k1': 'foo', 'k2': True, 'k3': 10, 'k4': ['a', 'b'], 'k5': 'foo',
+                    'k6': 'v1'}
+        self.assertEqual(actual, expected)
@@ -13,10 +13,14 @@
 # limitations under the License.
 
 from __future__ import absolute_import
+
+import mock
+
 from st2tests.base import CleanDbTestCase
 from st2common.constants.keyvalue import FULL_USER_SCOPE
 from st2common.models.db.keyvalue import KeyValuePairDB
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.util.templating import get_datastore_key_paths
 from st2common.util.templating import render_template_with_system_and_user_context
 
 
@@ -63,3 +67,25 @@ class TemplatingUtilsTestCase(CleanDbTestCase):
 
         result = render_template_with_system_and_user_context(value=template, user=user)
         self.assertEqual(result, 'valuejoe1')
+
+        # 3. Multiple references are retrieved using a single query per scope
+        template = '{{st2kv.system.key1}} {{st2kv.system.key2}} {{st2kv.user.key1}}'
+
+        with mock.patch.object(KeyValuePair, 'query',
+                               mock.Mock(wraps=KeyValuePair.query)) as mock_query:
+            result = render_template_with_system_and_user_context(value=template, user='joe')
+
+        self.assertEqual(result, 'valuea valueb valuejoe1')
+        self.assertEqual(mock_query.call_count, 2)
+
+    def test_get_datastore_key_paths(self):
+        template = ('{{ st2kv.system.a.b }} {{ st2kv.system["c"] | decrypt_kv }} '
+                    '{% if st2kv.user.d %}{{ st2kv.system[trigger.key].e }}{% endif %} '
+                    '{{ trigger.f.g }}')
+
+        # NOTE: Intermediate paths are also returned, but those keys would be retrieved anyway
+        key_paths = get_datastore_key_paths(template)
+        self.assertEqual(key_paths, {
+            'system': set([('a', ), ('a', 'b'), ('c', )]),
+            'user': set([('d', )])
+        })
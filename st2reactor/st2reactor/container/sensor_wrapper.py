@@ -32,6 +32,7 @@ from st2common.util import loader
 from st2common.util.config_loader import ContentPackConfigLoader
 from st2common.services.triggerwatcher import TriggerWatcher
 from st2common.services.trigger_dispatcher import TriggerDispatcherService
+from st2common.validators.api import reactor as reactor_validators
 from st2reactor.sensor.base import Sensor
 from st2reactor.sensor.base import PollingSensor
 from st2reactor.sensor import config
@@ -117,6 +118,49 @@ class SensorService(object):
             trace_context=trace_context,
             throw_on_validation_error=False)
 
+    def dispatch_many(self, trigger, payloads, trace_tag=None):
+        """
+        Method which dispatches multiple instances of the same trigger. Payloads are sent to the
+        rules engine in batches which is much more efficient than calling dispatch for each
+        payload.
+
+        :param trigger: Full name / reference of the trigger.
+        :type trigger: ``str``
+
+        :param payloads: Trigger payloads.
+        :type payloads: ``list`` of ``dict``
+
+        :param trace_tag: Tracer to track the triggerinstances.
+        :type trace_tags: ``str``
+
+        :return: Number of dispatched payloads.
+        :rtype: ``int``
+        """
+        return self._trigger_dispatcher_service.dispatch_many(trigger=trigger, payloads=payloads,
+                                                              trace_tag=trace_tag,
+                                                              throw_on_validation_error=False)
+
+    def dispatch_many_with_context(self, trigger, payloads, trace_context=None):
+        """
+        Method which dispatches multiple instances of the same trigger.
+
+        :param trigger: Full name / reference of the trigger.
+        :type trigger: ``str``
+
+        :param payloads: Trigger payloads.
+        :type payloads: ``list`` of ``dict``
+
+        :param trace_context: Trace context to associate with Triggers.
+        :type trace_context: ``st2common.api.models.api.trace.TraceContext``
+
+        :return: Number of dispatched payloads.
+        :rtype: ``int``
+        """
+        return self._trigger_dispatcher_service.dispatch_many_with_context(trigger=trigger,
+            payloads=payloads,
+            trace_context=trace_context,
+            throw_on_validation_error=False)
+
     ##################################
     # Methods for datastore management
     ##################################
@@ -194,6 +238,17 @@ class SensorWrapper(object):
                                                (self._pack, self._class_name),
                                                exclusive=True)
 
+        # 3.1 Compiled trigger payload validators are cached and the cache is invalidated on
+        # trigger type CUD events
+        self._payload_validator_cache_watcher = None
+
+        if cfg.CONF.system.validate_trigger_payload:
+            cache = reactor_validators.enable_payload_validator_cache()
+            self._payload_validator_cache_watcher = \
+                reactor_validators.get_payload_validator_cache_watcher(
+                    cache=cache, queue_suffix='sensorwrapper_%s_%s' % (self._pack,
+                                                                       self._class_name))
+
         # 4. Set up logging
         self._logger = logging.getLogger('SensorWrapper.%s.%s' %
                                          (self._pack, self._class_name))
@@ -214,6 +269,9 @@ class SensorWrapper(object):
         self._trigger_watcher.start()
         self._logger.info('Watcher started')
 
+        if self._payload_validator_cache_watcher:
+            self._payload_validator_cache_watcher.start()
+
         self._logger.info('Running sensor initialization code')
         self._sensor_instance.setup()
 
@@ -239,6 +297,9 @@ class SensorWrapper(object):
         self._logger.info('Stopping trigger watcher')
         self._trigger_watcher.stop()
 
+        if self._payload_validator_cache_watcher:
+            self._payload_validator_cache_watcher.stop()
+
         # Run sensor cleanup code
         self._logger.info('Invoking cleanup on sensor')
         self._sensor_instance.cleanup()
@@ -54,6 +54,44 @@ def create_trigger_instance(trigger, payload, occurrence_time, raise_on_no_trigg
     return TriggerInstance.add_or_update(trigger_instance)
 
 
+def create_trigger_instances(trigger, payloads, occurrence_time, raise_on_no_trigger=False):
+    """
+    This creates trigger instance objects for multiple payloads of the same trigger using a single
+    bulk insert.
+
+    :param trigger: Trigger reference or dictionary with trigger query filters.
+    :type trigger: ``str`` or ``dict``
+
+    :param payloads: Trigger payloads.
+    :type payloads: ``list`` of ``dict``
+
+    :rtype: ``list`` of :class:`TriggerInstanceDB`
+    """
+    trigger_db = get_trigger_db_by_ref_or_dict(trigger=trigger)
+
+    if not trigger_db:
+        LOG.debug('No trigger in db for %s', trigger)
+        if raise_on_no_trigger:
+            raise StackStormDBObjectNotFoundError('Trigger not found for %s' % trigger)
+        return []
+
+    trigger_ref = trigger_db.get_reference().ref
+
+    trigger_instances = []
+    for payload in payloads:
+        trigger_instance = TriggerInstanceDB()
+        trigger_instance.trigger = trigger_ref
+        trigger_instance.payload = payload
+        trigger_instance.occurrence_time = occurrence_time
+        trigger_instance.status = TRIGGER_INSTANCE_PENDING
+
+        # Bulk insert doesn't validate (and clean) the objects
+        trigger_instance.validate()
+        trigger_instances.append(trigger_instance)
+
+    return TriggerInstance.insert_many(trigger_instances)
+
+
 def update_trigger_instance_status(trigger_instance, status):
     trigger_instance.status = status
     return TriggerInstance.add_or_update(trigger_instance)
@@ -35,6 +35,7 @@ from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS
 from st2common.constants.garbage_collection import MINIMUM_TTL_DAYS_EXECUTION_OUTPUT
 from st2common.util import isotime
 from st2common.util.date import get_datetime_utc_now
+from st2common.garbage_collection.batch import PurgeCheckpoint
 from st2common.garbage_collection.executions import purge_executions
 from st2common.garbage_collection.executions import purge_execution_output_objects
 from st2common.garbage_collection.executions import purge_orphaned_workflow_executions
@@ -68,6 +69,12 @@ class GarbageCollectorService(object):
         self._purge_inquiries = cfg.CONF.garbagecollector.purge_inquiries
         self._workflow_execution_max_idle = cfg.CONF.workflow_engine.gc_max_idle_sec
 
+        # Options used when purging objects in batches
+        self._purge_batch_size = cfg.CONF.garbagecollector.purge_batch_size
+        self._purge_max_docs_per_second = cfg.CONF.garbagecollector.purge_max_docs_per_second
+        self._purge_checkpoint = PurgeCheckpoint(
+            path=cfg.CONF.garbagecollector.purge_checkpoint_path)
+
         self._validate_ttl_values()
 
         self._sleep_delay = sleep_delay
@@ -198,7 +205,7 @@ class GarbageCollectorService(object):
         assert timestamp < utc_now
 
         try:
-            purge_executions(logger=LOG, timestamp=timestamp)
+            purge_executions(logger=LOG, timestamp=timestamp, **self._get_batch_kwargs())
         except Exception as e:
             LOG.exception('Failed to delete executions: %s' % (six.text_type(e)))
 
@@ -218,7 +225,8 @@ class GarbageCollectorService(object):
         assert timestamp < utc_now
 
         try:
-            purge_execution_output_objects(logger=LOG, timestamp=timestamp)
+            purge_execution_output_objects(logger=LOG, timestamp=timestamp,
+                                           **self._get_batch_kwargs())
         except Exception as e:
             LOG.exception('Failed to delete execution output objects: %s' % (six.text_type(e)))
 
@@ -241,7 +249,7 @@ class GarbageCollectorService(object):
         assert timestamp < utc_now
 
         try:
-            purge_trigger_instances(logger=LOG, timestamp=timestamp)
+            purge_trigger_instances(logger=LOG, timestamp=timestamp, **self._get_batch_kwargs())
         except Exception as e:
             LOG.exception('Failed to trigger instances: %s' % (six.text_type(e)))
 
@@ -251,12 +259,27 @@ class GarbageCollectorService(object):
         """Mark Inquiries as "timeout" that have exceeded their TTL
         """
         try:
-            purge_inquiries(logger=LOG)
+            purge_inquiries(logger=LOG, batch_size=self._purge_batch_size,
+                            max_docs_per_second=self._purge_max_docs_per_second)
         except Exception as e:
             LOG.exception('Failed to purge inquiries: %s' % (six.text_type(e)))
 
         return True
 
+    def _get_batch_kwargs(self):
+        """
+        Return keyword arguments for the purge functions which enable purging in batches (if
+        configured).
+        """
+        if not self._purge_batch_size or self._purge_batch_size <= 0:
+            return {}
+
+        return {
+            'batch_size': self._purge_batch_size,
+            'max_docs_per_second': self._purge_max_docs_per_second,
+            'checkpoint': self._purge_checkpoint
+        }
+
     def _purge_orphaned_workflow_executions(self):
         """
         Purge workflow executions that are idled and orphaned.
@@ -66,21 +66,7 @@ def _register_garbage_collector_opts():
 
     CONF.register_opts(common_opts, group='garbagecollector')
 
-    ttl_opts = [
-        cfg.IntOpt(
-            'action_executions_ttl', default=None,
-            help='Action executions and related objects (live actions, action output '
-                 'objects) older than this value (days) will be automatically deleted.'),
-        cfg.IntOpt(
-            'action_executions_output_ttl', default=7,
-            help='Action execution output objects (ones generated by action output '
-                 'streaming) older than this value (days) will be automatically deleted.'),
-        cfg.IntOpt(
-            'trigger_instances_ttl', default=None,
-            help='Trigger instances older than this value (days) will be automatically deleted.')
-    ]
-
-    CONF.register_opts(ttl_opts, group='garbagecollector')
+    # Note: TTL options are registered in st2common.config
 
     inquiry_opts = [
         cfg.BoolOpt(
@@ -91,5 +77,22 @@ def _register_garbage_collector_opts():
 
     CONF.register_opts(inquiry_opts, group='garbagecollector')
 
+    batch_opts = [
+        cfg.IntOpt(
+            'purge_batch_size', default=0,
+            help='If set to a value larger than 0, objects are purged in batches of this size '
+                 'ordered by id instead of using a single query per object type.'),
+        cfg.IntOpt(
+            'purge_max_docs_per_second', default=0,
+            help='Maximum number of objects purged per second when purging in batches. 0 '
+                 'means no limit.'),
+        cfg.StrOpt(
+            'purge_checkpoint_path', default=None,
+            help='Path to the file where id of the last purged object is stored when purging in '
+                 'batches so an interrupted purge can be resumed.')
+    ]
+
+    CONF.register_opts(batch_opts, group='garbagecollector')
+
 
 register_opts()
@@ -0,0 +1,205 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compiled form of rule criteria.
+
+Compiled criteria hold everything which doesn't depend on the trigger payload (pre-parsed
+jsonpath expression, resolved operator function, pre-compiled regular expression and pre-compiled
+Jinja templates for the pattern). This way this work is performed once when the rule is loaded
+instead of on every trigger instance.
+
+Errors which happen during compilation are stored and re-raised during evaluation so the rule
+filter reports them in exactly the same way as before.
+"""
+
+from __future__ import absolute_import
+
+import re
+
+import six
+from jsonpath_rw import parse
+
+from st2common import operators as criteria_operators
+from st2common.constants.rules import MATCH_CRITERIA
+from st2common.util.jinja import is_static_template
+from st2common.util.templating import compile_template
+from st2common.util.templating import get_datastore_key_paths
+
+__all__ = [
+    'CompiledRule',
+    'CompiledCriterion',
+
+    'compile_rule',
+    'is_static_pattern'
+]
+
+MATCH_CRITERIA_PTRN = re.compile(MATCH_CRITERIA)
+
+# Maps regex based operators to the compile flags and the name of the pattern method to use
+REGEX_OPERATORS = {
+    criteria_operators.MATCH_REGEX: (re.DOTALL, 'match'),
+    criteria_operators.REGEX: (0, 'search'),
+    criteria_operators.IREGEX: (re.IGNORECASE, 'search')
+}
+
+
+def is_static_pattern(pattern):
+    """
+    Return True if the provided criteria pattern renders to itself (contains no Jinja markup).
+
+    :rtype: ``bool``
+    """
+    if not isinstance(pattern, six.string_types):
+        return True
+
+    return is_static_template(pattern)
+
+
+def compile_rule(rule):
+    """
+    :type rule: :class:`RuleDB`
+
+    :rtype: :class:`CompiledRule`
+    """
+    return CompiledRule(rule=rule)
+
+
+def _get_regex_operator_func(compiled_regex, method_name):
+    match_func = getattr(compiled_regex, method_name)
+
+    def op_func(value, criteria_pattern):
+        value, _ = criteria_operators.ensure_operators_are_strings(value, None)
+        return match_func(value) is not None
+
+    return op_func
+
+
+class CompiledRule(object):
+    def __init__(self, rule):
+        self.rule = rule
+        self.criteria = [CompiledCriterion(key=key, criterion=criterion)
+                         for key, criterion in six.iteritems(rule.criteria or {})]
+
+
+class CompiledCriterion(object):
+    def __init__(self, key, criterion):
+        self.key = key
+        self.criterion = criterion
+
+        # Comparison operator type not specified means criterion can't match
+        self.has_operator = 'type' in criterion
+        self.operator = criterion.get('type', None)
+        self.condition = criterion.get('condition', None)
+        self.pattern = criterion.get('pattern', None)
+        self.is_static = is_static_pattern(self.pattern)
+
+        self.expression = self._parse_key(key=key)
+
+        self._op_func, self._op_error = self._get_operator_func()
+        self._template, self._template_error = None, None
+        self._complex_template, self._complex_template_error = None, None
+
+        # Datastore keys referenced in the pattern which are retrieved using a single query
+        self.datastore_key_paths = None
+
+        if not self.is_static:
+            self._template, self._template_error = self._compile_template(self.pattern)
+
+            if not self._template_error:
+                self.datastore_key_paths = get_datastore_key_paths(self.pattern)
+
+            if MATCH_CRITERIA_PTRN.findall(self.pattern):
+                complex_pattern = MATCH_CRITERIA_PTRN.sub(r'\1\2 | to_complex\3', self.pattern)
+                self._complex_template, self._complex_template_error = \
+                    self._compile_template(complex_pattern)
+
+        # Child criteria for the "search" operator
+        self.children = {}
+
+        if self.operator == criteria_operators.SEARCH and isinstance(self.pattern, dict):
+            for child_key, child_criterion in six.iteritems(self.pattern):
+                self.children[child_key] = CompiledCriterion(key=child_key,
+                                                             criterion=child_criterion)
+
+    @property
+    def has_complex_template(self):
+        return bool(self._complex_template or self._complex_template_error)
+
+    def get_operator_func(self):
+        if self._op_error:
+            raise self._op_error
+
+        return self._op_func
+
+    def get_template(self):
+        if self._template_error:
+            raise self._template_error
+
+        return self._template
+
+    def get_complex_template(self):
+        if self._complex_template_error:
+            raise self._complex_template_error
+
+        return self._complex_template
+
+    def get_child(self, key, criterion):
+        child = self.children.get(key, None)
+
+        if not child:
+            child = CompiledCriterion(key=key, criterion=criterion)
+
+        return child
+
+    @staticmethod
+    def _parse_key(key):
+        try:
+            return parse(key)
+        except Exception:
+            # Key will be parsed again during evaluation and the error will be reported
+            return None
+
+    @staticmethod
+    def _compile_template(value):
+        try:
+            return compile_template(value), None
+        except Exception as e:
+            return None, e
+
+    def _get_operator_func(self):
+        if not self.has_operator:
+            return None, None
+
+        try:
+            op_func = criteria_operators.get_operator(self.operator)
+        except Exception as e:
+            return None, e
+
+        regex_operator = REGEX_OPERATORS.get(self.operator.lower(), None)
+
+        if regex_operator and self.is_static and self.pattern is not None:
+            flags, method_name = regex_operator
+            _, pattern = criteria_operators.ensure_operators_are_strings(None, self.pattern)
+
+            try:
+                compiled_regex = re.compile(pattern, flags)
+            except Exception:
+                # Invalid regex, original operator will throw and report it during evaluation
+                return op_func, None
+
+            op_func = _get_regex_operator_func(compiled_regex=compiled_regex,
+                                               method_name=method_name)
+
+        return op_func, None
@@ -52,5 +52,55 @@ def _register_rules_engine_opts():
 
     CONF.register_opts(logging_opts, group='rulesengine')
 
+    rule_index_opts = [
+        cfg.BoolOpt(
+            'enable_rule_index', default=True,
+            help='True to keep an in-memory index of enabled rules per trigger (kept up to date '
+                 'using rule CUD events) and only evaluate rules selected by the index for each '
+                 'trigger instance.')
+    ]
+
+    CONF.register_opts(rule_index_opts, group='rulesengine')
+
+    resource_cache_opts = [
+        cfg.BoolOpt(
+            'enable_resource_cache', default=True,
+            help='True to cache triggers, actions and runner types in memory (cache is '
+                 'invalidated using resource CUD events).')
+    ]
+
+    CONF.register_opts(resource_cache_opts, group='rulesengine')
+
+    enforcement_opts = [
+        cfg.BoolOpt(
+            'enable_batch_enforcement', default=True,
+            help='True to enforce all the rules which matched a trigger instance as a single '
+                 'batch (single trace update and bulk inserts of executions and enforcements).'),
+        cfg.IntOpt(
+            'enforcement_pool_size', default=10,
+            help='Maximum number of rules of a batch for which parameters are rendered '
+                 'concurrently.')
+    ]
+
+    CONF.register_opts(enforcement_opts, group='rulesengine')
+
+    consumer_opts = [
+        cfg.IntOpt(
+            'prefetch_count', default=1,
+            help='Maximum number of unacknowledged messages the rules engine consumer can receive. '
+                 'Values larger than 1 enable batched acknowledgements and stop receiving new '
+                 'messages while there are no free dispatcher threads.'),
+        cfg.IntOpt(
+            'ack_batch_size', default=1,
+            help='Maximum number of messages which are acknowledged using a single ack (capped '
+                 'at prefetch_count).'),
+        cfg.FloatOpt(
+            'ack_batch_interval', default=0.5,
+            help='How long (in seconds) to wait before acknowledging a partially filled batch '
+                 'of messages.')
+    ]
+
+    CONF.register_opts(consumer_opts, group='rulesengine')
+
 
 register_opts()
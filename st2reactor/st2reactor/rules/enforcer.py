@@ -18,6 +18,8 @@ import sys
 import json
 import traceback
 
+import bson
+import eventlet
 import six
 
 from st2common import log as logging
@@ -30,9 +32,15 @@ from st2common.models.api.trace import TraceContext
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.models.db.rule_enforcement import RuleEnforcementDB
 from st2common.models.api.auth import get_system_username
+from st2common.metrics.base import get_driver
+from st2common.metrics.base import Timer
+from st2common.persistence.execution import ActionExecution
+from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.rule_enforcement import RuleEnforcement
 from st2common.services import action as action_service
+from st2common.services import executions
 from st2common.services import trace as trace_service
+from st2common.services import triggers as trigger_service
 from st2common.util import reference
 from st2common.util import action_db as action_utils
 from st2common.util import param as param_utils
@@ -40,7 +48,8 @@ from st2common.exceptions import param as param_exc
 from st2common.exceptions import apivalidation as validation_exc
 
 __all__ = [
-    'RuleEnforcer'
+    'RuleEnforcer',
+    'BatchRuleEnforcer'
 ]
 
 
@@ -84,14 +93,33 @@ class RuleEnforcer(object):
 
         return resolved_params
 
-    def enforce(self):
+    def get_enforcement_db(self):
         rule_spec = {'ref': self.rule.ref, 'id': str(self.rule.id), 'uid': self.rule.uid}
         enforcement_db = RuleEnforcementDB(trigger_instance_id=str(self.trigger_instance.id),
                                            rule=rule_spec)
+        return enforcement_db
+
+    def get_log_extra(self):
         extra = {
             'trigger_instance_db': self.trigger_instance,
             'rule_db': self.rule
         }
+        return extra
+
+    def log_enforcement_result(self, execution_db, extra):
+        # pylint: disable=no-member
+        if not execution_db or execution_db.status not in EXEC_KICKED_OFF_STATES:
+            LOG.audit('Rule enforcement failed. Execution of Action %s failed. '
+                      'TriggerInstance: %s and Rule: %s',
+                      self.rule.action.ref, self.trigger_instance, self.rule,
+                      extra=extra)
+        else:
+            LOG.audit('Rule enforced. Execution %s, TriggerInstance %s and Rule %s.',
+                      execution_db, self.trigger_instance, self.rule, extra=extra)
+
+    def enforce(self):
+        enforcement_db = self.get_enforcement_db()
+        extra = self.get_log_extra()
         execution_db = None
         try:
             execution_db = self._do_enforce()
@@ -107,15 +135,7 @@ class RuleEnforcer(object):
         finally:
             self._update_enforcement(enforcement_db)
 
-        # pylint: disable=no-member
-        if not execution_db or execution_db.status not in EXEC_KICKED_OFF_STATES:
-            LOG.audit('Rule enforcement failed. Execution of Action %s failed. '
-                      'TriggerInstance: %s and Rule: %s',
-                      self.rule.action.ref, self.trigger_instance, self.rule,
-                      extra=extra)
-        else:
-            LOG.audit('Rule enforced. Execution %s, TriggerInstance %s and Rule %s.',
-                      execution_db, self.trigger_instance, self.rule, extra=extra)
+        self.log_enforcement_result(execution_db=execution_db, extra=extra)
 
         return execution_db
 
@@ -187,10 +207,25 @@ class RuleEnforcer(object):
 
         :rtype: :class:`LiveActionDB` on successful scheduling, None otherwise.
         """
-        action_ref = action_db.ref
-        runnertype_db = action_utils.get_runnertype_by_name(action_db.runner_type['name'])
+        liveaction_db = self.get_liveaction_db(action_db=action_db, runnertype_db=runnertype_db,
+                                               params=params, context=context,
+                                               additional_contexts=additional_contexts)
+
+        liveaction_db, execution_db = action_service.request(liveaction_db)
+
+        return execution_db
 
-        liveaction_db = LiveActionDB(action=action_ref, context=context, parameters=params)
+    def get_liveaction_db(self, action_db, runnertype_db, params, context=None,
+                          additional_contexts=None):
+        """
+        Return (unsaved) LiveActionDB with resolved parameters for the action execution request.
+
+        If parameters can't be resolved, a failed execution is created and an exception is
+        raised.
+
+        :rtype: :class:`LiveActionDB`
+        """
+        liveaction_db = LiveActionDB(action=action_db.ref, context=context, parameters=params)
 
         try:
             liveaction_db.parameters = self.get_resolved_parameters(
@@ -215,6 +250,242 @@ class RuleEnforcer(object):
             # the exception.
             raise validation_exc.ValueValidationException(six.text_type(e))
 
-        liveaction_db, execution_db = action_service.request(liveaction_db)
+        return liveaction_db
 
-        return execution_db
+
+class RuleEnforcementRequest(object):
+    """
+    Intermediate state of a single rule enforcement in a batch.
+    """
+
+    def __init__(self, enforcer):
+        self.enforcer = enforcer
+        self.enforcement_db = enforcer.get_enforcement_db()
+        self.action_db = None
+        self.runnertype_db = None
+        self.liveaction_db = None
+        self.execution_db = None
+        self.error = None
+
+    def set_error(self, error):
+        self.error = error
+        self.liveaction_db = None
+        self.execution_db = None
+
+
+class BatchRuleEnforcer(object):
+    """
+    Enforces all the rules which matched a single trigger instance.
+
+    Compared to enforcing rules one by one, the trace is only updated once per trigger instance
+    and liveactions, executions and rule enforcements are written using bulk inserts. Parameters
+    are rendered concurrently in a bounded green pool.
+
+    Time spent in each stage is reported using "rule.enforcement.<stage>" timer metrics.
+    """
+
+    def __init__(self, trigger_instance, enforcers, pool_size=10):
+        """
+        :param enforcers: Enforcers for the rules which matched the trigger instance.
+        :type enforcers: ``list`` of :class:`RuleEnforcer`
+
+        :param pool_size: Maximum number of rules for which parameters are rendered concurrently.
+        :type pool_size: ``int``
+        """
+        self.trigger_instance = trigger_instance
+        self.enforcers = enforcers
+        self.pool_size = pool_size
+
+    def enforce(self):
+        """
+        :return: Execution for each of the enforcers (None if enforcement failed).
+        :rtype: ``list``
+        """
+        with Timer(key='rule.enforcement.trace_lookup'):
+            trace_db = self._get_trace_db()
+
+        trace_context = None
+        if trace_db:
+            trace_context = vars(TraceContext(id_=str(trace_db.id), trace_tag=trace_db.trace_tag))
+
+        with Timer(key='rule.enforcement.prepare'):
+            requests = self._prepare_requests(trace_context=trace_context)
+
+        with Timer(key='rule.enforcement.insert'):
+            self._insert_requests(requests=requests)
+
+        with Timer(key='rule.enforcement.trace'):
+            self._update_trace(trace_db=trace_db, requests=requests)
+
+        with Timer(key='rule.enforcement.publish'):
+            self._publish_requests(requests=requests)
+
+        with Timer(key='rule.enforcement.record'):
+            self._insert_enforcements(requests=requests)
+
+        return [request.execution_db for request in requests]
+
+    def _get_trace_db(self):
+        try:
+            return trace_service.get_trace_db_by_trigger_instance(self.trigger_instance)
+        except:
+            LOG.exception('No Trace found for TriggerInstance %s.', self.trigger_instance.id)
+            return None
+
+    def _prepare_requests(self, trace_context):
+        # Trigger and trigger type are the same for all the executions
+        trigger_db = trigger_service.get_trigger_db_by_ref(self.trigger_instance.trigger)
+        trigger_type_db = None
+        if trigger_db:
+            trigger_type_db = trigger_service.get_trigger_type_db(trigger_db.type)
+
+        def prepare(enforcer):
+            request = RuleEnforcementRequest(enforcer=enforcer)
+
+            try:
+                self._prepare_request(request=request, trace_context=trace_context,
+                                      trigger_db=trigger_db, trigger_type_db=trigger_type_db)
+            except Exception as e:
+                request.set_error(e)
+                LOG.exception('Failed kicking off execution for rule %s.', enforcer.rule,
+                              extra=enforcer.get_log_extra())
+
+            return request
+
+        pool = eventlet.GreenPool(self.pool_size)
+        return list(pool.imap(prepare, self.enforcers))
+
+    def _prepare_request(self, request, trace_context, trigger_db, trigger_type_db):
+        enforcer = request.enforcer
+        action_ref = enforcer.rule.action['ref']
+
+        # Verify action referenced in the rule exists in the database
+        action_db = action_utils.get_action_by_ref(action_ref)
+        if not action_db:
+            raise ValueError('Action "%s" doesn\'t exist' % (action_ref))
+
+        request.action_db = action_db
+        runnertype_db = action_utils.get_runnertype_by_name(action_db.runner_type['name'])
+
+        params = enforcer.rule.action.parameters
+        LOG.info('Invoking action %s for trigger_instance %s with params %s.',
+                 enforcer.rule.action.ref, self.trigger_instance.id,
+                 json.dumps(params))
+
+        context, additional_contexts = enforcer.get_action_execution_context(
+            action_db=action_db,
+            trace_context=trace_context)
+
+        liveaction_db = enforcer.get_liveaction_db(action_db=action_db,
+                                                   runnertype_db=runnertype_db, params=params,
+                                                   context=context,
+                                                   additional_contexts=additional_contexts)
+        liveaction_db, action_db, runnertype_db = action_service.prepare_request(
+            liveaction=liveaction_db, action_db=action_db, runnertype_db=runnertype_db)
+
+        # Id is needed before the liveaction is saved since it's referenced by the execution
+        liveaction_db.id = bson.ObjectId()
+
+        request.action_db = action_db
+        request.runnertype_db = runnertype_db
+        request.liveaction_db = liveaction_db
+        request.execution_db = executions.build_execution_object(
+            liveaction=liveaction_db, action_db=action_db, runnertype_db=runnertype_db,
+            rule_db=enforcer.rule, trigger_instance_db=self.trigger_instance,
+            trigger_db=trigger_db, trigger_type_db=trigger_type_db)
+
+    def _insert_requests(self, requests):
+        requests = [request for request in requests if request.liveaction_db]
+
+        if not requests:
+            return
+
+        liveaction_dbs = [request.liveaction_db for request in requests]
+
+        try:
+            LiveAction.insert_many(liveaction_dbs, publish=False)
+        except Exception as e:
+            LOG.exception('Failed to insert liveactions for trigger instance %s.',
+                          self.trigger_instance.id)
+            for request in requests:
+                request.set_error(e)
+            return
+
+        try:
+            ActionExecution.insert_many([request.execution_db for request in requests],
+                                        publish=False)
+        except Exception as e:
+            LOG.exception('Failed to insert executions for trigger instance %s.',
+                          self.trigger_instance.id)
+
+            # Don't leave requested liveactions without an execution behind
+            LiveAction.delete_by_query(id__in=[liveaction_db.id
+                                               for liveaction_db in liveaction_dbs])
+
+            for request in requests:
+                request.set_error(e)
+            return
+
+        metrics_driver = get_driver()
+        for request in requests:
+            metrics_driver.inc_counter('action.executions.%s' % (request.liveaction_db.status))
+
+    def _update_trace(self, trace_db, requests):
+        if not trace_db:
+            return
+
+        # Same as with the sequential enforcement, rules which reference a non-existent action
+        # are not added to the trace
+        rules = [trace_service.get_trace_component_for_rule(request.enforcer.rule,
+                                                             self.trigger_instance)
+                 for request in requests if request.action_db]
+        action_executions = [
+            trace_service.get_trace_component_for_action_execution(request.execution_db,
+                                                                   request.liveaction_db)
+            for request in requests if request.execution_db
+        ]
+
+        if not rules and not action_executions:
+            return
+
+        try:
+            trace_service.add_or_update_given_trace_db(trace_db=trace_db, rules=rules,
+                                                       action_executions=action_executions)
+        except:
+            LOG.exception('Failed to update trace %s for trigger instance %s.', trace_db.id,
+                          self.trigger_instance.id)
+
+    def _publish_requests(self, requests):
+        for request in requests:
+            if not request.execution_db:
+                continue
+
+            try:
+                action_service.publish_request(request.liveaction_db, request.execution_db)
+            except Exception as e:
+                LOG.exception('Failed to publish execution request for rule %s.',
+                              request.enforcer.rule, extra=request.enforcer.get_log_extra())
+                request.error = e
+
+    def _insert_enforcements(self, requests):
+        for request in requests:
+            enforcement_db = request.enforcement_db
+            extra = request.enforcer.get_log_extra()
+
+            if request.error is None:
+                enforcement_db.execution_id = str(request.execution_db.id)
+                enforcement_db.status = RULE_ENFORCEMENT_STATUS_SUCCEEDED
+                extra['execution_db'] = request.execution_db
+            else:
+                # Record the failure reason in the RuleEnforcement.
+                enforcement_db.status = RULE_ENFORCEMENT_STATUS_FAILED
+                enforcement_db.failure_reason = six.text_type(request.error)
+
+            execution_db = request.execution_db if request.error is None else None
+            request.enforcer.log_enforcement_result(execution_db=execution_db, extra=extra)
+
+        try:
+            RuleEnforcement.insert_many([request.enforcement_db for request in requests])
+        except:
+            LOG.exception('Failed writing enforcement models to db for trigger instance %s.',
+                          self.trigger_instance.id)
@@ -16,6 +16,7 @@ from __future__ import absolute_import
 from st2common import log as logging
 from st2common.services.rules import get_rules_given_trigger
 from st2common.services.triggers import get_trigger_db_by_ref
+from st2reactor.rules.enforcer import BatchRuleEnforcer
 from st2reactor.rules.enforcer import RuleEnforcer
 from st2reactor.rules.matcher import RulesMatcher
 from st2common.metrics.base import get_driver
@@ -28,6 +29,25 @@ __all__ = [
 
 
 class RulesEngine(object):
+    def __init__(self, rule_index_cache=None, batch_enforcement=False, enforcement_pool_size=10):
+        """
+        :param rule_index_cache: Optional cache of rule indexes. When provided, rules are
+                                 retrieved from the cache instead of the database and only the
+                                 candidate rules selected by the index are evaluated.
+        :type rule_index_cache: :class:`st2reactor.rules.index.RuleIndexCache`
+
+        :param batch_enforcement: True to enforce all the rules which matched a trigger instance
+                                  as a single batch (see ``BatchRuleEnforcer``).
+        :type batch_enforcement: ``bool``
+
+        :param enforcement_pool_size: Maximum number of rules of a batch which are enforced
+                                      concurrently.
+        :type enforcement_pool_size: ``int``
+        """
+        self._rule_index_cache = rule_index_cache
+        self._batch_enforcement = batch_enforcement
+        self._enforcement_pool_size = enforcement_pool_size
+
     def handle_trigger_instance(self, trigger_instance):
         # Find matching rules for trigger instance.
         matching_rules = self.get_matching_rules_for_trigger(trigger_instance)
@@ -50,16 +70,29 @@ class RulesEngine(object):
             LOG.error('No matching trigger found in db for trigger instance %s.', trigger_instance)
             return None
 
-        rules = get_rules_given_trigger(trigger=trigger)
+        if self._rule_index_cache:
+            rule_index = self._rule_index_cache.get_index(trigger_ref=trigger_db.ref)
 
-        LOG.info('Found %d rules defined for trigger %s', len(rules),
-                 trigger_db.get_reference().ref)
+            LOG.info('Found %d rules defined for trigger %s', len(rule_index.rules),
+                     trigger_db.get_reference().ref)
+
+            rules = rule_index.get_candidate_rules(payload=trigger_instance.payload)
+
+            LOG.debug('Rule index selected %d candidate rule(s) for trigger_instance %s',
+                      len(rules), trigger_instance['id'])
+        else:
+            rules = get_rules_given_trigger(trigger=trigger)
+
+            LOG.info('Found %d rules defined for trigger %s', len(rules),
+                     trigger_db.get_reference().ref)
 
         if len(rules) < 1:
             return rules
 
+        compiled_rules = rule_index.compiled_rules if self._rule_index_cache else None
         matcher = RulesMatcher(trigger_instance=trigger_instance,
-                               trigger=trigger_db, rules=rules)
+                               trigger=trigger_db, rules=rules,
+                               compiled_rules=compiled_rules)
 
         matching_rules = matcher.get_matching_rules()
         LOG.info('Matched %s rule(s) for trigger_instance %s (trigger=%s)', len(matching_rules),
@@ -84,8 +117,24 @@ class RulesEngine(object):
         return enforcers
 
     def enforce_rules(self, enforcers):
+        if self._batch_enforcement and len(enforcers) > 1:
+            self._enforce_rules_batch(enforcers)
+            return
+
         for enforcer in enforcers:
             try:
                 enforcer.enforce()  # Should this happen in an eventlet pool?
             except:
                 LOG.exception('Exception enforcing rule %s.', enforcer.rule)
+
+    def _enforce_rules_batch(self, enforcers):
+        # All the enforcers are created for the same trigger instance
+        trigger_instance = enforcers[0].trigger_instance
+        batch_enforcer = BatchRuleEnforcer(trigger_instance=trigger_instance, enforcers=enforcers,
+                                           pool_size=self._enforcement_pool_size)
+
+        try:
+            batch_enforcer.enforce()
+        except:
+            LOG.exception('Exception enforcing rules for trigger instance %s.',
+                          trigger_instance.id)
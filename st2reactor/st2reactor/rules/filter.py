@@ -15,20 +15,20 @@
 from __future__ import absolute_import
 
 import json
-import re
 
 import six
 
 from st2common import log as logging
 from st2common import operators as criteria_operators
 from st2common.constants.rules import RULE_TYPE_BACKSTOP
-from st2common.constants.rules import MATCH_CRITERIA
 from st2common.constants.rule_enforcement import RULE_ENFORCEMENT_STATUS_FAILED
 from st2common.models.db.rule_enforcement import RuleEnforcementDB
 from st2common.persistence.rule_enforcement import RuleEnforcement
 
 from st2common.util.payload import PayloadLookup
-from st2common.util.templating import render_template_with_system_context
+from st2common.util.templating import render_compiled_template_with_system_context
+from st2reactor.rules.compiler import CompiledCriterion
+from st2reactor.rules.compiler import compile_rule
 
 __all__ = [
     'RuleFilter'
@@ -39,7 +39,7 @@ LOG = logging.getLogger('st2reactor.ruleenforcement.filter')
 
 
 class RuleFilter(object):
-    def __init__(self, trigger_instance, trigger, rule, extra_info=False):
+    def __init__(self, trigger_instance, trigger, rule, extra_info=False, compiled_rule=None):
         """
         :param trigger_instance: TriggerInstance DB object.
         :type trigger_instance: :class:`TriggerInstanceDB``
@@ -49,11 +49,16 @@ class RuleFilter(object):
 
         :param rule: Rule DB object.
         :type rule: :class:`RuleDB`
+
+        :param compiled_rule: Compiled form of the rule. If not provided, rule is compiled on
+                              the fly.
+        :type compiled_rule: :class:`st2reactor.rules.compiler.CompiledRule`
         """
         self.trigger_instance = trigger_instance
         self.trigger = trigger
         self.rule = rule
         self.extra_info = extra_info
+        self.compiled_rule = compiled_rule or compile_rule(rule)
 
         # Base context used with a logger
         self._base_logger_context = {
@@ -87,18 +92,15 @@ class RuleFilter(object):
         LOG.debug('Trigger payload: %s', self.trigger_instance.payload,
                   extra=self._base_logger_context)
 
-        for (criterion_k, criterion_v) in six.iteritems(criteria):
-            is_rule_applicable, payload_value, criterion_pattern = self._check_criterion(
-                criterion_k,
-                criterion_v,
-                payload_lookup
-            )
+        for compiled_criterion in self.compiled_rule.criteria:
+            is_rule_applicable, payload_value, criterion_pattern = \
+                self._check_compiled_criterion(compiled_criterion, payload_lookup)
             if not is_rule_applicable:
                 if self.extra_info:
                     criteria_extra_info = '\n'.join([
-                        '  key: %s' % criterion_k,
+                        '  key: %s' % compiled_criterion.key,
                         '  pattern: %s' % criterion_pattern,
-                        '  type: %s' % criterion_v['type'],
+                        '  type: %s' % compiled_criterion.operator,
                         '  payload: %s' % payload_value
                     ])
                     LOG.info('Validation for rule %s failed on criteria -\n%s', self.rule.ref,
@@ -113,19 +115,25 @@ class RuleFilter(object):
         return is_rule_applicable
 
     def _check_criterion(self, criterion_k, criterion_v, payload_lookup):
-        if 'type' not in criterion_v:
+        compiled_criterion = CompiledCriterion(key=criterion_k, criterion=criterion_v)
+        return self._check_compiled_criterion(compiled_criterion, payload_lookup)
+
+    def _check_compiled_criterion(self, compiled_criterion, payload_lookup):
+        if not compiled_criterion.has_operator:
             # Comparison operator type not specified, can't perform a comparison
             return (False, None, None)
 
-        criteria_operator = criterion_v['type']
-        criteria_condition = criterion_v.get('condition', None)
-        criteria_pattern = criterion_v.get('pattern', None)
+        criterion_k = compiled_criterion.key
+        criteria_operator = compiled_criterion.operator
+        criteria_condition = compiled_criterion.condition
+        criteria_pattern = compiled_criterion.pattern
 
         # Render the pattern (it can contain a jinja expressions)
         try:
             criteria_pattern = self._render_criteria_pattern(
                 criteria_pattern=criteria_pattern,
-                criteria_context=payload_lookup.context
+                criteria_context=payload_lookup.context,
+                compiled_criterion=compiled_criterion
             )
         except Exception as e:
             msg = ('Failed to render pattern value "%s" for key "%s"' % (criteria_pattern,
@@ -136,7 +144,7 @@ class RuleFilter(object):
             return (False, None, None)
 
         try:
-            matches = payload_lookup.get_value(criterion_k)
+            matches = payload_lookup.get_value(compiled_criterion.expression or criterion_k)
             # pick value if only 1 matches else will end up being an array match.
             if matches:
                 payload_value = matches[0] if len(matches) > 0 else matches
@@ -149,13 +157,19 @@ class RuleFilter(object):
 
             return (False, None, None)
 
-        op_func = criteria_operators.get_operator(criteria_operator)
+        op_func = compiled_criterion.get_operator_func()
 
         try:
             if criteria_operator == criteria_operators.SEARCH:
+                def check_function(child_criterion_k, child_criterion_v, child_payload_lookup):
+                    child_criterion = compiled_criterion.get_child(child_criterion_k,
+                                                                   child_criterion_v)
+                    return self._check_compiled_criterion(child_criterion,
+                                                          child_payload_lookup)[0]
+
                 result = op_func(value=payload_value, criteria_pattern=criteria_pattern,
                                  criteria_condition=criteria_condition,
-                                 check_function=self._bool_criterion)
+                                 check_function=check_function)
             else:
                 result = op_func(value=payload_value, criteria_pattern=criteria_pattern)
         except Exception as e:
@@ -172,7 +186,8 @@ class RuleFilter(object):
         # final result
         return self._check_criterion(criterion_k, criterion_v, payload_lookup)[0]
 
-    def _render_criteria_pattern(self, criteria_pattern, criteria_context):
+    def _render_criteria_pattern(self, criteria_pattern, criteria_context,
+                                 compiled_criterion=None):
         # Note: Here we want to use strict comparison to None to make sure that
         # other falsy values such as integer 0 are handled correctly.
         if criteria_pattern is None:
@@ -183,6 +198,14 @@ class RuleFilter(object):
             # makes no sense
             return criteria_pattern
 
+        if not compiled_criterion:
+            compiled_criterion = CompiledCriterion(key=None,
+                                                   criterion={'pattern': criteria_pattern})
+
+        if compiled_criterion.is_static:
+            # Pattern contains no Jinja markup and renders to itself
+            return criteria_pattern
+
         LOG.debug(
             'Rendering criteria pattern (%s) with context: %s',
             criteria_pattern,
@@ -193,17 +216,14 @@ class RuleFilter(object):
 
         # Check if jinja variable is in criteria_pattern and if so lets ensure
         # the proper type is applied to it using to_complex jinja filter
-        if len(re.findall(MATCH_CRITERIA, criteria_pattern)) > 0:
+        if compiled_criterion.has_complex_template:
             LOG.debug("Rendering Complex")
-            complex_criteria_pattern = re.sub(
-                MATCH_CRITERIA, r'\1\2 | to_complex\3',
-                criteria_pattern
-            )
 
             try:
-                criteria_rendered = render_template_with_system_context(
-                    value=complex_criteria_pattern,
-                    context=criteria_context
+                criteria_rendered = render_compiled_template_with_system_context(
+                    template=compiled_criterion.get_complex_template(),
+                    context=criteria_context,
+                    key_paths=compiled_criterion.datastore_key_paths
                 )
                 criteria_rendered = json.loads(criteria_rendered)
                 to_complex = True
@@ -211,9 +231,10 @@ class RuleFilter(object):
                 LOG.debug('Criteria pattern not valid JSON: %s', error)
 
         if not to_complex:
-            criteria_rendered = render_template_with_system_context(
-                value=criteria_pattern,
-                context=criteria_context
+            criteria_rendered = render_compiled_template_with_system_context(
+                template=compiled_criterion.get_template(),
+                context=criteria_context,
+                key_paths=compiled_criterion.datastore_key_paths
             )
 
         LOG.debug(
@@ -252,7 +273,7 @@ class SecondPassRuleFilter(RuleFilter):
     Special filter that handles all second pass rules. For not these are only
     backstop rules i.e. those that can match when no other rule has matched.
     """
-    def __init__(self, trigger_instance, trigger, rule, first_pass_matched):
+    def __init__(self, trigger_instance, trigger, rule, first_pass_matched, compiled_rule=None):
         """
         :param trigger_instance: TriggerInstance DB object.
         :type trigger_instance: :class:`TriggerInstanceDB``
@@ -265,8 +286,12 @@ class SecondPassRuleFilter(RuleFilter):
 
         :param first_pass_matched: Rules that matched in the first pass.
         :type first_pass_matched: `list`
+
+        :param compiled_rule: Compiled form of the rule.
+        :type compiled_rule: :class:`st2reactor.rules.compiler.CompiledRule`
         """
-        super(SecondPassRuleFilter, self).__init__(trigger_instance, trigger, rule)
+        super(SecondPassRuleFilter, self).__init__(trigger_instance, trigger, rule,
+                                                   compiled_rule=compiled_rule)
         self.first_pass_matched = first_pass_matched
 
     def filter(self):
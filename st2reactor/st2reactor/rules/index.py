@@ -0,0 +1,361 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-memory index of enabled rules for a particular trigger.
+
+The index is used as a pre-filter in front of the regular ``RuleFilter`` based matching. For each
+first pass rule we pick a single criterion which can be answered using a hash or a prefix lookup
+(``equals``, ``iequals``, ``exists`` and ``startswith`` with a static pattern). For each incoming
+payload, we then only need to run full filtering on the rules which were selected by those
+lookups plus all the rules which don't have an indexable criterion.
+
+Since the indexed criterion is still evaluated by the full filter, the index only needs to
+guarantee that it never drops a rule which could match the payload.
+"""
+
+from __future__ import absolute_import
+
+import collections
+
+import six
+
+from st2common import log as logging
+from st2common import operators as criteria_operators
+from st2common.constants.rules import RULE_TYPE_BACKSTOP
+from st2common.constants.rules import TRIGGER_PAYLOAD_PREFIX
+from st2common.services.rules import get_rules_with_trigger_ref
+from st2reactor.rules.compiler import compile_rule
+
+__all__ = [
+    'RuleIndex',
+    'RuleIndexCache'
+]
+
+LOG = logging.getLogger(__name__)
+
+INDEX_TYPE_EQUALS = 'equals'
+INDEX_TYPE_IEQUALS = 'iequals'
+INDEX_TYPE_STARTSWITH = 'startswith'
+INDEX_TYPE_EXISTS = 'exists'
+
+# Maps operator name to the index type. Order in INDEX_TYPE_PREFERENCE determines which
+# criterion is picked when a rule contains multiple indexable criteria (most selective first).
+OPERATOR_TO_INDEX_TYPE_MAP = {
+    criteria_operators.EQUALS_SHORT: INDEX_TYPE_EQUALS,
+    criteria_operators.EQUALS_LONG: INDEX_TYPE_EQUALS,
+    criteria_operators.IEQUALS_SHORT: INDEX_TYPE_IEQUALS,
+    criteria_operators.IEQUALS_LONG: INDEX_TYPE_IEQUALS,
+    criteria_operators.STARTSWITH_LONG: INDEX_TYPE_STARTSWITH,
+    criteria_operators.KEY_EXISTS: INDEX_TYPE_EXISTS
+}
+
+INDEX_TYPE_PREFERENCE = [
+    INDEX_TYPE_EQUALS,
+    INDEX_TYPE_IEQUALS,
+    INDEX_TYPE_STARTSWITH,
+    INDEX_TYPE_EXISTS
+]
+
+
+def _to_text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+
+    return value
+
+
+class RuleIndex(object):
+    """
+    Index of enabled rules for a single trigger.
+    """
+
+    def __init__(self, trigger_ref, rules):
+        """
+        :param trigger_ref: Reference of the trigger the rules belong to.
+        :type trigger_ref: ``str``
+
+        :param rules: Enabled rules for this trigger.
+        :type rules: ``list`` of :class:`RuleDB`
+        """
+        self.trigger_ref = trigger_ref
+        self.rules = list(rules or [])
+
+        # Maps rule id to the compiled form of the rule. Rules are compiled once when the index
+        # is built and the whole index is dropped when any of the rules changes.
+        self.compiled_rules = {}
+
+        # Positions (in self.rules) of rules which need to be evaluated for every payload
+        self._unindexed = set([])
+
+        # Maps criteria key to the pre-parsed jsonpath expression
+        self._key_expressions = {}
+
+        # key -> {pattern value -> set(positions)}
+        self._equals_index = collections.defaultdict(lambda: collections.defaultdict(set))
+        # key -> {lower case pattern value -> set(positions)}
+        self._iequals_index = collections.defaultdict(lambda: collections.defaultdict(set))
+        # key -> {prefix length -> {prefix -> set(positions)}}
+        self._startswith_index = collections.defaultdict(
+            lambda: collections.defaultdict(lambda: collections.defaultdict(set)))
+        # key -> set(positions)
+        self._exists_index = collections.defaultdict(set)
+
+        for position, rule in enumerate(self.rules):
+            compiled_rule = compile_rule(rule)
+            self.compiled_rules[str(rule.id)] = compiled_rule
+            self._add_rule(position=position, compiled_rule=compiled_rule)
+
+    @property
+    def indexed_rules_count(self):
+        return len(self.rules) - len(self._unindexed)
+
+    def get_candidate_rules(self, payload):
+        """
+        Return rules which could potentially match the provided trigger payload. Order of the
+        returned rules is the same as the order of rules in the index.
+
+        :param payload: Trigger instance payload.
+        :type payload: ``dict``
+
+        :rtype: ``list`` of :class:`RuleDB`
+        """
+        if len(self._unindexed) == len(self.rules):
+            return list(self.rules)
+
+        positions = set(self._unindexed)
+        context = {TRIGGER_PAYLOAD_PREFIX: payload}
+
+        for key, expression in six.iteritems(self._key_expressions):
+            try:
+                matches = [match.value for match in expression.find(context)]
+            except Exception:
+                # Let the full filter deal with (and report) the error
+                positions.update(self._get_key_positions(key=key))
+                continue
+
+            value = _to_text(matches[0]) if matches else None
+            positions.update(self._lookup(key=key, value=value))
+
+        return [rule for position, rule in enumerate(self.rules) if position in positions]
+
+    def _lookup(self, key, value):
+        positions = set([])
+
+        if key in self._exists_index and value is not None:
+            positions.update(self._exists_index[key])
+
+        if key in self._equals_index:
+            try:
+                positions.update(self._equals_index[key].get(value, ()))
+            except TypeError:
+                # Unhashable value can't be equal to any of the indexed (hashable) patterns
+                pass
+
+        # NOTE: String operators throw on non-string values. For those we let the full filter
+        # run so the failure is recorded as before. Missing keys can never match so we skip them.
+        if key in self._iequals_index and value is not None:
+            if isinstance(value, six.string_types):
+                positions.update(self._iequals_index[key].get(value.lower(), ()))
+            else:
+                for value_positions in six.itervalues(self._iequals_index[key]):
+                    positions.update(value_positions)
+
+        if key in self._startswith_index and value is not None:
+            for length, prefixes in six.iteritems(self._startswith_index[key]):
+                if not isinstance(value, six.string_types):
+                    for prefix_positions in six.itervalues(prefixes):
+                        positions.update(prefix_positions)
+                elif len(value) >= length:
+                    positions.update(prefixes.get(value[:length], ()))
+
+        return positions
+
+    def _get_key_positions(self, key):
+        positions = set(self._exists_index.get(key, ()))
+
+        for value_positions in six.itervalues(self._equals_index.get(key, {})):
+            positions.update(value_positions)
+
+        for value_positions in six.itervalues(self._iequals_index.get(key, {})):
+            positions.update(value_positions)
+
+        for prefixes in six.itervalues(self._startswith_index.get(key, {})):
+            for prefix_positions in six.itervalues(prefixes):
+                positions.update(prefix_positions)
+
+        return positions
+
+    def _add_rule(self, position, compiled_rule):
+        rule = compiled_rule.rule
+
+        # Backstop rules are evaluated in the second pass and depend on the first pass result
+        if rule.type and rule.type['ref'] == RULE_TYPE_BACKSTOP:
+            self._unindexed.add(position)
+            return
+
+        indexable = self._get_indexable_criterion(compiled_rule=compiled_rule)
+
+        if not indexable:
+            self._unindexed.add(position)
+            return
+
+        index_type, key, pattern = indexable
+
+        if index_type == INDEX_TYPE_EQUALS:
+            self._equals_index[key][pattern].add(position)
+        elif index_type == INDEX_TYPE_IEQUALS:
+            self._iequals_index[key][pattern.lower()].add(position)
+        elif index_type == INDEX_TYPE_STARTSWITH:
+            self._startswith_index[key][len(pattern)][pattern].add(position)
+        elif index_type == INDEX_TYPE_EXISTS:
+            self._exists_index[key].add(position)
+
+    def _get_indexable_criterion(self, compiled_rule):
+        """
+        Return (index type, key, pattern) tuple for the most selective indexable criterion of
+        the provided rule or None if rule has no indexable criteria.
+        """
+        candidates = {}
+
+        for criterion in compiled_rule.criteria:
+            index_type = self._get_criterion_index_type(criterion=criterion)
+
+            if not index_type or index_type in candidates:
+                continue
+
+            candidates[index_type] = (criterion, _to_text(criterion.pattern))
+
+        for index_type in INDEX_TYPE_PREFERENCE:
+            if index_type not in candidates:
+                continue
+
+            criterion, pattern = candidates[index_type]
+
+            if criterion.key not in self._key_expressions:
+                self._key_expressions[criterion.key] = criterion.expression
+
+            return index_type, criterion.key, pattern
+
+        return None
+
+    @staticmethod
+    def _get_criterion_index_type(criterion):
+        """
+        :type criterion: :class:`st2reactor.rules.compiler.CompiledCriterion`
+        """
+        if not isinstance(criterion.key, six.string_types):
+            return None
+
+        if not criterion.key.startswith(TRIGGER_PAYLOAD_PREFIX + '.'):
+            return None
+
+        # Invalid key, full filter will report the error
+        if not criterion.expression:
+            return None
+
+        if not isinstance(criterion.operator, six.string_types):
+            return None
+
+        index_type = OPERATOR_TO_INDEX_TYPE_MAP.get(criterion.operator.lower(), None)
+        if not index_type:
+            return None
+
+        if index_type == INDEX_TYPE_EXISTS:
+            return index_type
+
+        pattern = _to_text(criterion.pattern)
+
+        if pattern is None or not criterion.is_static:
+            return None
+
+        if index_type == INDEX_TYPE_EQUALS:
+            try:
+                hash(pattern)
+            except TypeError:
+                return None
+        elif not isinstance(pattern, six.string_types):
+            return None
+
+        return index_type
+
+
+class RuleIndexCache(object):
+    """
+    Process local cache of rule indexes keyed by trigger reference.
+
+    Indexes are built lazily on first use and dropped when a rule which belongs to the trigger is
+    created, updated or deleted (see ``invalidate_rule``).
+    """
+
+    def __init__(self):
+        self._indexes = {}
+
+        # Maps rule id to the trigger reference so we can also invalidate the old trigger index
+        # when rule's trigger is changed
+        self._rule_trigger_refs = {}
+
+        # Incremented on each invalidation. Used to prevent storing an index which was built from
+        # data which has been invalidated while the build was in progress.
+        self._generations = collections.defaultdict(int)
+
+    def get_index(self, trigger_ref):
+        """
+        :rtype: :class:`RuleIndex`
+        """
+        rule_index = self._indexes.get(trigger_ref, None)
+
+        if rule_index:
+            return rule_index
+
+        generation = self._generations[trigger_ref]
+        rules = get_rules_with_trigger_ref(trigger_ref=trigger_ref) or []
+        rule_index = RuleIndex(trigger_ref=trigger_ref, rules=rules)
+
+        if generation == self._generations[trigger_ref]:
+            self._indexes[trigger_ref] = rule_index
+
+            for rule in rule_index.rules:
+                self._rule_trigger_refs[str(rule.id)] = trigger_ref
+
+        LOG.debug('Built rule index for trigger %s (rules=%s, indexed=%s)', trigger_ref,
+                  len(rule_index.rules), rule_index.indexed_rules_count)
+        return rule_index
+
+    def invalidate(self, trigger_ref):
+        self._generations[trigger_ref] += 1
+        self._indexes.pop(trigger_ref, None)
+
+    def invalidate_rule(self, rule):
+        """
+        Invalidate index for the trigger the provided rule belongs to. This method is used as a
+        handler for rule CUD events.
+
+        :type rule: :class:`RuleDB`
+        """
+        trigger_refs = set([rule.trigger])
+
+        old_trigger_ref = self._rule_trigger_refs.pop(str(rule.id), None)
+        if old_trigger_ref:
+            trigger_refs.add(old_trigger_ref)
+
+        for trigger_ref in trigger_refs:
+            LOG.debug('Invalidating rule index for trigger %s (rule=%s)', trigger_ref, rule.ref)
+            self.invalidate(trigger_ref=trigger_ref)
+
+    def clear(self):
+        for trigger_ref in list(self._indexes.keys()):
+            self.invalidate(trigger_ref=trigger_ref)
+
+        self._rule_trigger_refs = {}
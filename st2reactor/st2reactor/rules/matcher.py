@@ -21,11 +21,17 @@ LOG = logging.getLogger('st2reactor.rules.RulesMatcher')
 
 
 class RulesMatcher(object):
-    def __init__(self, trigger_instance, trigger, rules, extra_info=False):
+    def __init__(self, trigger_instance, trigger, rules, extra_info=False, compiled_rules=None):
+        """
+        :param compiled_rules: Optional map of rule id to the compiled form of the rule. Rules
+                               which are not in this map are compiled on the fly.
+        :type compiled_rules: ``dict``
+        """
         self.trigger_instance = trigger_instance
         self.trigger = trigger
         self.rules = rules
         self.extra_info = extra_info
+        self.compiled_rules = compiled_rules or {}
 
     def get_matching_rules(self):
         first_pass, second_pass = self._split_rules_into_passes()
@@ -33,14 +39,16 @@ class RulesMatcher(object):
         rule_filters = [RuleFilter(trigger_instance=self.trigger_instance,
                                    trigger=self.trigger,
                                    rule=rule,
-                                   extra_info=self.extra_info)
+                                   extra_info=self.extra_info,
+                                   compiled_rule=self._get_compiled_rule(rule))
                         for rule in first_pass]
         matched_rules = [rule_filter.rule for rule_filter in rule_filters if rule_filter.filter()]
         LOG.debug('[1st_pass] %d rule(s) found to enforce for %s.', len(matched_rules),
                   self.trigger['name'])
         # second pass
         rule_filters = [SecondPassRuleFilter(self.trigger_instance, self.trigger, rule,
-                                             matched_rules)
+                                             matched_rules,
+                                             compiled_rule=self._get_compiled_rule(rule))
                         for rule in second_pass]
         matched_in_second_pass = [rule_filter.rule for rule_filter in rule_filters
                                   if rule_filter.filter()]
@@ -66,5 +74,8 @@ class RulesMatcher(object):
                 second_pass.append(rule)
         return first_pass, second_pass
 
+    def _get_compiled_rule(self, rule):
+        return self.compiled_rules.get(str(rule.id), None)
+
     def _is_first_pass_rule(self, rule):
         return rule.type['ref'] != RULE_TYPE_BACKSTOP
@@ -14,15 +14,22 @@
 
 from __future__ import absolute_import
 
+from oslo_config import cfg
+
 from st2common import log as logging
 from st2common.constants.trace import TRACE_CONTEXT, TRACE_ID
 from st2common.constants import triggers as trigger_constants
 from st2common.util import date as date_utils
+from st2common.persistence import cache as resource_cache
+from st2common.services import keyvalues as keyvalue_service
 from st2common.services import trace as trace_service
+from st2common.services.cudwatcher import CUDWatcher
 from st2common.transport import consumers
 from st2common.transport import utils as transport_utils
+from st2common.transport.reactor import RULE_CUD_XCHG
 import st2reactor.container.utils as container_utils
 from st2reactor.rules.engine import RulesEngine
+from st2reactor.rules.index import RuleIndexCache
 from st2common.transport.queues import RULESENGINE_WORK_QUEUE
 from st2common.metrics.base import CounterWithTimer
 from st2common.metrics.base import Timer
@@ -37,14 +44,92 @@ class TriggerInstanceDispatcher(consumers.StagedMessageHandler):
 
     def __init__(self, connection, queues):
         super(TriggerInstanceDispatcher, self).__init__(connection, queues)
-        self.rules_engine = RulesEngine()
+
+        rule_index_cache = None
+        self._rule_watcher = None
+        self._kv_cache_watcher = None
+        self._resource_cache_watcher = None
+
+        if cfg.CONF.rulesengine.enable_rule_index:
+            # Rule index is kept up to date by listening to the rule CUD events
+            rule_index_cache = RuleIndexCache()
+            self._rule_watcher = CUDWatcher(exchange=RULE_CUD_XCHG,
+                                            create_handler=rule_index_cache.invalidate_rule,
+                                            update_handler=rule_index_cache.invalidate_rule,
+                                            delete_handler=rule_index_cache.invalidate_rule,
+                                            queue_name_base='st2.rule.watch',
+                                            queue_suffix='rulesengine')
+
+        self.rules_engine = RulesEngine(
+            rule_index_cache=rule_index_cache,
+            batch_enforcement=cfg.CONF.rulesengine.enable_batch_enforcement,
+            enforcement_pool_size=cfg.CONF.rulesengine.enforcement_pool_size)
+
+    def start(self, wait=False):
+        if self._rule_watcher:
+            self._rule_watcher.start()
+
+        # Datastore read cache is kept up to date by listening to the key value pair CUD events
+        kv_cache = keyvalue_service.enable_cache()
+        if kv_cache is not None:
+            self._kv_cache_watcher = keyvalue_service.get_cache_watcher(cache=kv_cache,
+                                                                        queue_suffix='rulesengine')
+            self._kv_cache_watcher.start()
+
+        # Trigger, action and runner type lookups are cached and the cache is kept up to date by
+        # listening to the resource CUD events
+        if cfg.CONF.rulesengine.enable_resource_cache:
+            cache = resource_cache.enable_cache()
+            self._resource_cache_watcher = resource_cache.get_cache_watcher(
+                cache=cache, queue_suffix='rulesengine')
+            self._resource_cache_watcher.start()
+
+        super(TriggerInstanceDispatcher, self).start(wait=wait)
+
+    def shutdown(self):
+        super(TriggerInstanceDispatcher, self).shutdown()
+
+        if self._rule_watcher:
+            self._rule_watcher.stop()
+
+        if self._kv_cache_watcher:
+            self._kv_cache_watcher.stop()
+            keyvalue_service.disable_cache()
+
+        if self._resource_cache_watcher:
+            self._resource_cache_watcher.stop()
+            resource_cache.disable_cache()
+
+    def get_queue_consumer(self, connection, queues):
+        return consumers.StagedQueueConsumer(
+            connection=connection, queues=queues, handler=self,
+            prefetch_count=cfg.CONF.rulesengine.prefetch_count,
+            ack_batch_size=cfg.CONF.rulesengine.ack_batch_size,
+            ack_batch_interval=cfg.CONF.rulesengine.ack_batch_interval,
+            name='rulesengine')
 
     def pre_ack_process(self, message):
         '''
         TriggerInstance from message is create prior to acknowledging the message. This
         gets us a way to not acknowledge messages.
+
+        Batched messages (with "payloads" instead of "payload" key) result in multiple
+        TriggerInstances which are created using a single bulk insert.
         '''
         trigger = message['trigger']
+
+        if 'payloads' in message:
+            payloads = [payload or {} for payload in message['payloads']]
+
+            with Timer(key='trigger.batch_insert'):
+                trigger_instances = container_utils.create_trigger_instances(
+                    trigger,
+                    payloads,
+                    date_utils.get_datetime_utc_now(),
+                    raise_on_no_trigger=True)
+
+            return self._compose_pre_ack_process_response(trigger_instances, message)
+
         payload = message['payload']
 
         # Accomodate for not being able to create a TrigegrInstance if a TriggerDB
@@ -62,6 +147,15 @@ class TriggerInstanceDispatcher(consumers.StagedMessageHandler):
         if not trigger_instance:
             raise ValueError('No trigger_instance provided for processing.')
 
+        if isinstance(trigger_instance, list):
+            # Batched message, rules are evaluated for each of the trigger instances
+            for item in trigger_instance:
+                self._process_trigger_instance(item, message)
+            return
+
+        self._process_trigger_instance(trigger_instance, message)
+
+    def _process_trigger_instance(self, trigger_instance, message):
         get_driver().inc_counter('trigger.%s.processed' % (trigger_instance.trigger))
 
         try:
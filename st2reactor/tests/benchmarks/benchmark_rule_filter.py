@@ -0,0 +1,126 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-benchmark which measures rule criteria evaluations per second with and without compiled
+rules.
+
+Without a compiled rule, ``RuleFilter`` compiles the criteria on every evaluation which is
+equivalent to the previous behavior where jsonpath keys, regular expressions and Jinja templates
+were parsed for each trigger instance.
+
+Usage:
+
+    python st2reactor/tests/benchmarks/benchmark_rule_filter.py [--iterations 5000]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import time
+
+import bson
+
+from st2common.models.db.rule import RuleDB, ActionExecutionSpecDB
+from st2common.models.db.trigger import TriggerDB, TriggerInstanceDB
+from st2common.util import date as date_utils
+from st2reactor.rules.compiler import compile_rule
+from st2reactor.rules.filter import RuleFilter
+
+__all__ = [
+    'run_benchmark'
+]
+
+TRIGGER_DB = TriggerDB(pack='dummy_pack_1', name='webhook', type='core.st2.webhook')
+
+TRIGGER_INSTANCE_DB = TriggerInstanceDB(
+    trigger=TRIGGER_DB.get_reference().ref,
+    occurrence_time=date_utils.get_datetime_utc_now(),
+    payload={
+        'headers': {'X-Github-Event': 'push', 'Content-Type': 'application/json'},
+        'body': {
+            'ref': 'refs/heads/master',
+            'repository': {'full_name': 'StackStorm/st2', 'private': False},
+            'commits': [
+                {'id': 'abcd', 'message': 'Fix something', 'author': {'name': 'Stanley'}},
+                {'id': 'efgh', 'message': 'Add something', 'author': {'name': 'Stanley'}}
+            ]
+        }
+    }
+)
+
+CRITERIA = {
+    'trigger.headers.X-Github-Event': {
+        'type': 'equals',
+        'pattern': 'push'
+    },
+    'trigger.body.ref': {
+        'type': 'regex',
+        'pattern': '^refs/heads/(master|v[0-9.]+)$'
+    },
+    'trigger.body.repository.full_name': {
+        'type': 'iequals',
+        'pattern': '{{ trigger.body.repository.full_name | lower }}'
+    },
+    'trigger.body.commits': {
+        'type': 'search',
+        'condition': 'any',
+        'pattern': {
+            'item.author.name': {
+                'type': 'equals',
+                'pattern': 'Stanley'
+            }
+        }
+    }
+}
+
+RULE_DB = RuleDB(id=bson.ObjectId(), pack='benchmark', name='github_push', criteria=CRITERIA,
+                 trigger=TRIGGER_DB.get_reference().ref,
+                 action=ActionExecutionSpecDB(ref='core.local'))
+
+
+def _run(iterations, compiled_rule=None):
+    start_ts = time.time()
+
+    for index in range(0, iterations):
+        rule_filter = RuleFilter(trigger_instance=TRIGGER_INSTANCE_DB, trigger=TRIGGER_DB,
+                                 rule=RULE_DB, compiled_rule=compiled_rule)
+        assert rule_filter.filter() is True
+
+    duration = (time.time() - start_ts)
+    return (iterations / duration)
+
+
+def run_benchmark(iterations):
+    # Warm up (imports, Jinja filters, etc.)
+    _run(iterations=10)
+
+    uncompiled_rate = _run(iterations=iterations)
+    compiled_rate = _run(iterations=iterations, compiled_rule=compile_rule(RULE_DB))
+
+    print('Criteria evaluations per second (%s iterations, %s criteria per rule):' %
+          (iterations, len(CRITERIA)))
+    print('  compiled per evaluation (before): %.2f' % (uncompiled_rate))
+    print('  compiled once on rule load (after): %.2f' % (compiled_rate))
+    print('  speed up: %.2fx' % (compiled_rate / uncompiled_rate))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rule filter micro-benchmark.')
+    parser.add_argument('--iterations', type=int, default=5000,
+                        help='Number of rule evaluations to perform.')
+    args = parser.parse_args()
+
+    run_benchmark(iterations=args.iterations)
@@ -17,7 +17,9 @@ import mock
 
 from st2common.transport.publishers import PoolPublisher
 from st2reactor.container.utils import create_trigger_instance
+from st2reactor.container.utils import create_trigger_instances
 from st2common.persistence.trigger import Trigger
+from st2common.persistence.trigger import TriggerInstance
 from st2common.models.db.trigger import TriggerDB
 from st2tests.base import CleanDbTestCase
 
@@ -76,3 +78,23 @@ class ContainerUtilsTest(CleanDbTestCase):
         trigger_instance_db = create_trigger_instance(trigger=trigger, payload=payload,
                                                       occurrence_time=occurrence_time)
         self.assertEqual(trigger_instance_db, None)
+
+    def test_create_trigger_instances_success(self):
+        payloads = [{'count': 1}, {'count': 2}, {'count': 3}]
+
+        trigger = {'id': self.trigger_db.id}
+        trigger_instance_dbs = create_trigger_instances(trigger=trigger, payloads=payloads,
+                                                        occurrence_time=None)
+        self.assertEqual(len(trigger_instance_dbs), 3)
+
+        for trigger_instance_db, payload in zip(trigger_instance_dbs, payloads):
+            self.assertEqual(trigger_instance_db.trigger, 'pack1.name1')
+            self.assertEqual(trigger_instance_db.status, 'pending')
+
+            stored_trigger_instance_db = TriggerInstance.get_by_id(trigger_instance_db.id)
+            self.assertEqual(stored_trigger_instance_db.payload, payload)
+
+    def test_create_trigger_instances_invalid_trigger(self):
+        trigger_instance_dbs = create_trigger_instances(trigger='dummy_pack.footrigger',
+                                                        payloads=[{}], occurrence_time=None)
+        self.assertEqual(trigger_instance_dbs, [])
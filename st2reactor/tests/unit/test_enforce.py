@@ -25,13 +25,17 @@ from st2common.models.db.trigger import TriggerInstanceDB
 from st2common.models.db.execution import ActionExecutionDB
 from st2common.models.db.liveaction import LiveActionDB
 from st2common.models.db.keyvalue import KeyValuePairDB
+from st2common.persistence.execution import ActionExecution
 from st2common.persistence.keyvalue import KeyValuePair
+from st2common.persistence.liveaction import LiveAction
 from st2common.persistence.rule_enforcement import RuleEnforcement
 from st2common.services import action as action_service
+from st2common.services import trace as trace_service
 from st2common.bootstrap import runnersregistrar as runners_registrar
 from st2common.util import casts
 from st2common.util import reference
 from st2common.util import date as date_utils
+from st2reactor.rules.enforcer import BatchRuleEnforcer
 from st2reactor.rules.enforcer import RuleEnforcer
 
 from st2tests import DbTestCase
@@ -39,6 +43,7 @@ from st2tests.fixturesloader import FixturesLoader
 
 __all__ = [
     'RuleEnforcerTestCase',
+    'BatchRuleEnforcerTestCase',
     'RuleEnforcerDataTransformationTestCase'
 ]
 
@@ -329,6 +334,79 @@ class RuleEnforcerTestCase(BaseRuleEnforcerTestCase):
                          expected_msg)
 
 
+class BatchRuleEnforcerTestCase(BaseRuleEnforcerTestCase):
+
+    def _get_enforcers(self):
+        return [RuleEnforcer(MOCK_TRIGGER_INSTANCE, self.models['rules']['rule1.yaml']),
+                RuleEnforcer(MOCK_TRIGGER_INSTANCE, self.models['rules']['rule2.yaml'])]
+
+    @mock.patch.object(LiveAction, 'insert_many', mock.MagicMock())
+    @mock.patch.object(ActionExecution, 'insert_many', mock.MagicMock())
+    @mock.patch.object(RuleEnforcement, 'insert_many', mock.MagicMock())
+    @mock.patch.object(action_service, 'publish_request', mock.MagicMock())
+    @mock.patch.object(trace_service, 'add_or_update_given_trace_db', mock.MagicMock())
+    def test_batch_enforcement_uses_bulk_inserts(self):
+        enforcers = self._get_enforcers()
+        execution_dbs = BatchRuleEnforcer(MOCK_TRIGGER_INSTANCE, enforcers, pool_size=2).enforce()
+
+        self.assertEqual(len(execution_dbs), 2)
+        self.assertTrue(all(execution_dbs))
+
+        self.assertEqual(LiveAction.insert_many.call_count, 1)
+        liveaction_dbs = LiveAction.insert_many.call_args[0][0]
+        self.assertEqual(len(liveaction_dbs), 2)
+        self.assertEqual([liveaction_db.status for liveaction_db in liveaction_dbs],
+                         [action_constants.LIVEACTION_STATUS_REQUESTED] * 2)
+
+        self.assertEqual(ActionExecution.insert_many.call_count, 1)
+        self.assertEqual(ActionExecution.insert_many.call_args[0][0], execution_dbs)
+
+        # Execution references the liveaction and the rule
+        for enforcer, liveaction_db, execution_db in zip(enforcers, liveaction_dbs,
+                                                         execution_dbs):
+            self.assertEqual(execution_db.liveaction['id'], str(liveaction_db.id))
+            self.assertEqual(execution_db.rule['ref'], enforcer.rule.ref)
+
+        # Trace is updated once for all the rules and executions
+        self.assertEqual(trace_service.add_or_update_given_trace_db.call_count, 1)
+        call_kwargs = trace_service.add_or_update_given_trace_db.call_args[1]
+        self.assertEqual(len(call_kwargs['rules']), 2)
+        self.assertEqual(len(call_kwargs['action_executions']), 2)
+
+        self.assertEqual(action_service.publish_request.call_count, 2)
+
+        self.assertEqual(RuleEnforcement.insert_many.call_count, 1)
+        enforcement_dbs = RuleEnforcement.insert_many.call_args[0][0]
+        self.assertEqual([enforcement_db.rule.ref for enforcement_db in enforcement_dbs],
+                         [enforcer.rule.ref for enforcer in enforcers])
+        self.assertEqual([enforcement_db.status for enforcement_db in enforcement_dbs],
+                         [RULE_ENFORCEMENT_STATUS_SUCCEEDED] * 2)
+        self.assertEqual([enforcement_db.execution_id for enforcement_db in enforcement_dbs],
+                         [str(execution_db.id) for execution_db in execution_dbs])
+
+    @mock.patch.object(LiveAction, 'insert_many', mock.MagicMock())
+    @mock.patch.object(LiveAction, 'delete_by_query', mock.MagicMock())
+    @mock.patch.object(ActionExecution, 'insert_many', mock.MagicMock(
+        side_effect=ValueError(FAILURE_REASON)))
+    @mock.patch.object(RuleEnforcement, 'insert_many', mock.MagicMock())
+    @mock.patch.object(action_service, 'publish_request', mock.MagicMock())
+    @mock.patch.object(trace_service, 'add_or_update_given_trace_db', mock.MagicMock())
+    def test_batch_enforcement_insert_failure(self):
+        execution_dbs = BatchRuleEnforcer(MOCK_TRIGGER_INSTANCE, self._get_enforcers()).enforce()
+
+        self.assertEqual(execution_dbs, [None, None])
+
+        # Liveactions without an execution are removed
+        self.assertTrue(LiveAction.delete_by_query.called)
+        self.assertFalse(action_service.publish_request.called)
+
+        enforcement_dbs = RuleEnforcement.insert_many.call_args[0][0]
+        self.assertEqual([enforcement_db.status for enforcement_db in enforcement_dbs],
+                         [RULE_ENFORCEMENT_STATUS_FAILED] * 2)
+        self.assertEqual([enforcement_db.failure_reason for enforcement_db in enforcement_dbs],
+                         [FAILURE_REASON] * 2)
+
+
 class RuleEnforcerDataTransformationTestCase(BaseRuleEnforcerTestCase):
 
     def test_payload_data_transform(self):
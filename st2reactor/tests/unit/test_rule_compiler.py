@@ -0,0 +1,87 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest2
+
+from st2common import operators
+from st2reactor.rules.compiler import CompiledCriterion
+from st2reactor.rules.compiler import is_static_pattern
+
+__all__ = [
+    'CompiledCriterionTestCase'
+]
+
+
+class CompiledCriterionTestCase(unittest2.TestCase):
+    def test_is_static_pattern(self):
+        self.assertTrue(is_static_pattern('foo'))
+        self.assertTrue(is_static_pattern(1))
+        self.assertTrue(is_static_pattern(None))
+        self.assertTrue(is_static_pattern('foo\nbar'))
+        self.assertFalse(is_static_pattern('{{ trigger.foo }}'))
+        self.assertFalse(is_static_pattern('{% if True %}a{% endif %}'))
+        self.assertFalse(is_static_pattern('foo\n'))
+
+    def test_static_pattern_is_not_compiled(self):
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'equals',
+                                                                   'pattern': 'v1'})
+        self.assertTrue(criterion.is_static)
+        self.assertTrue(criterion.expression is not None)
+        self.assertEqual(criterion.get_template(), None)
+        self.assertFalse(criterion.has_complex_template)
+        self.assertEqual(criterion.get_operator_func(), operators.equals)
+
+    def test_dynamic_pattern_templates_are_compiled(self):
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'equals',
+                                                                   'pattern': '{{trigger.k2}}'})
+        self.assertFalse(criterion.is_static)
+        self.assertTrue(criterion.has_complex_template)
+        self.assertEqual(criterion.get_template().render({'trigger': {'k2': 'v2'}}), 'v2')
+
+    def test_compile_errors_are_raised_on_use(self):
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'equals',
+                                                                   'pattern': '{{ trigger. }}'})
+        self.assertRaises(Exception, criterion.get_template)
+
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'invalid',
+                                                                   'pattern': 'v1'})
+        self.assertRaisesRegexp(Exception, 'Invalid operator', criterion.get_operator_func)
+
+    def test_regex_operators_are_pre_compiled(self):
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'iregex',
+                                                                   'pattern': '^FOO.*'})
+        op_func = criterion.get_operator_func()
+        self.assertNotEqual(op_func, operators.iregex)
+        self.assertTrue(op_func(value='foobar', criteria_pattern='^FOO.*'))
+        self.assertTrue(op_func(value=b'foobar', criteria_pattern='^FOO.*'))
+        self.assertFalse(op_func(value='barfoo', criteria_pattern='^FOO.*'))
+
+        # Invalid regex falls back to the original operator which reports the error
+        criterion = CompiledCriterion(key='trigger.k1', criterion={'type': 'regex',
+                                                                   'pattern': '(['})
+        self.assertEqual(criterion.get_operator_func(), operators.regex)
+
+    def test_search_children_are_compiled(self):
+        criterion = CompiledCriterion(key='trigger.k1', criterion={
+            'type': 'search',
+            'condition': 'any',
+            'pattern': {
+                'item.field_name': {'type': 'equals', 'pattern': 'Status'}
+            }
+        })
+        child = criterion.get_child('item.field_name', {})
+        self.assertEqual(child, criterion.children['item.field_name'])
+        self.assertEqual(child.pattern, 'Status')
@@ -0,0 +1,134 @@
+# Copyright 2019 Extreme Networks, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import bson
+import mock
+import unittest2
+
+from st2common.constants.rules import RULE_TYPE_BACKSTOP
+from st2common.models.db.rule import RuleDB, RuleTypeSpecDB, ActionExecutionSpecDB
+from st2reactor.rules import index as index_module
+from st2reactor.rules.index import RuleIndex
+from st2reactor.rules.index import RuleIndexCache
+
+__all__ = [
+    'RuleIndexTestCase',
+    'RuleIndexCacheTestCase'
+]
+
+TRIGGER_REF = 'dummy_pack_1.st2.test.trigger1'
+
+
+def _get_rule(name, criteria, rule_type=None, trigger=TRIGGER_REF):
+    rule = RuleDB(id=bson.ObjectId(), pack='wolfpack', name=name, trigger=trigger,
+                  criteria=criteria, action=ActionExecutionSpecDB(ref='core.local'))
+
+    if rule_type:
+        rule.type = RuleTypeSpecDB(ref=rule_type)
+
+    return rule
+
+
+class RuleIndexTestCase(unittest2.TestCase):
+    def _get_candidate_names(self, rule_index, payload):
+        return [rule.name for rule in rule_index.get_candidate_rules(payload=payload)]
+
+    def test_equals_index(self):
+        rules = [
+            _get_rule('r1', {'trigger.k1': {'type': 'equals', 'pattern': 'v1'}}),
+            _get_rule('r2', {'trigger.k1': {'type': 'eq', 'pattern': 'v2'}}),
+            _get_rule('r3', {'trigger.k1': {'type': 'equals', 'pattern': 1}}),
+            _get_rule('r4', {'trigger.k1': {'type': 'equals', 'pattern': '{{trigger.k2}}'}})
+        ]
+        rule_index = RuleIndex(trigger_ref=TRIGGER_REF, rules=rules)
+
+        self.assertEqual(rule_index.indexed_rules_count, 3)
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'v1'}), ['r1', 'r4'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'v2'}), ['r2', 'r4'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 1}), ['r3', 'r4'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': ['a']}), ['r4'])
+        self.assertEqual(self._get_candidate_names(rule_index, {}), ['r4'])
+
+    def test_iequals_startswith_and_exists_index(self):
+        rules = [
+            _get_rule('r1', {'trigger.k1': {'type': 'iequals', 'pattern': 'FoO'}}),
+            _get_rule('r2', {'trigger.k2': {'type': 'startswith', 'pattern': 'pre'}}),
+            _get_rule('r3', {'trigger.k2': {'type': 'startswith', 'pattern': 'prefix'}}),
+            _get_rule('r4', {'trigger.k3': {'type': 'exists'}}),
+            _get_rule('r5', {'trigger.k3': {'type': 'regex', 'pattern': '.*'}})
+        ]
+        rule_index = RuleIndex(trigger_ref=TRIGGER_REF, rules=rules)
+
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'foo'}), ['r1', 'r5'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k2': 'prefixed'}),
+                         ['r2', 'r3', 'r5'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k2': 'pretty'}), ['r2', 'r5'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k3': 'a'}), ['r4', 'r5'])
+
+        # Operator would fail on non-string values so the rule needs to go through full filtering
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 1, 'k2': 'x'}),
+                         ['r1', 'r5'])
+
+    def test_most_selective_criterion_is_used(self):
+        rules = [
+            _get_rule('r1', {
+                'trigger.k1': {'type': 'exists'},
+                'trigger.k2': {'type': 'equals', 'pattern': 'v2'}
+            })
+        ]
+        rule_index = RuleIndex(trigger_ref=TRIGGER_REF, rules=rules)
+
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'a', 'k2': 'v2'}), ['r1'])
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'a', 'k2': 'v3'}), [])
+
+    def test_backstop_and_datastore_criteria_are_not_indexed(self):
+        rules = [
+            _get_rule('r1', {'trigger.k1': {'type': 'equals', 'pattern': 'v1'}},
+                      rule_type=RULE_TYPE_BACKSTOP),
+            _get_rule('r2', {'st2kv.system.k1': {'type': 'equals', 'pattern': 'v1'}})
+        ]
+        rule_index = RuleIndex(trigger_ref=TRIGGER_REF, rules=rules)
+
+        self.assertEqual(rule_index.indexed_rules_count, 0)
+        self.assertEqual(self._get_candidate_names(rule_index, {'k1': 'v2'}), ['r1', 'r2'])
+
+
+class RuleIndexCacheTestCase(unittest2.TestCase):
+    def test_get_index_is_cached_and_invalidated(self):
+        rule_1 = _get_rule('r1', {'trigger.k1': {'type': 'equals', 'pattern': 'v1'}})
+        rule_2 = _get_rule('r2', {}, trigger='dummy_pack_1.st2.test.trigger2')
+
+        def mock_get_rules(trigger_ref):
+            return [rule for rule in [rule_1, rule_2] if rule.trigger == trigger_ref]
+
+        with mock.patch.object(index_module, 'get_rules_with_trigger_ref',
+                               mock.MagicMock(side_effect=mock_get_rules)) as mock_get:
+            cache = RuleIndexCache()
+
+            rule_index = cache.get_index(trigger_ref=TRIGGER_REF)
+            self.assertEqual(rule_index.rules, [rule_1])
+            self.assertEqual(cache.get_index(trigger_ref=TRIGGER_REF), rule_index)
+            self.assertEqual(mock_get.call_count, 1)
+
+            # Rule moved to a different trigger, both indexes need to be invalidated
+            cache.get_index(trigger_ref=rule_2.trigger)
+            rule_1.trigger = rule_2.trigger
+            cache.invalidate_rule(rule_1)
+
+            self.assertEqual(cache.get_index(trigger_ref=TRIGGER_REF).rules, [])
+            self.assertEqual(cache.get_index(trigger_ref=rule_2.trigger).rules,
+                             [rule_1, rule_2])
+            self.assertEqual(mock_get.call_count, 4)
@@ -252,6 +252,28 @@ class SensorServiceTestCase(unittest2.TestCase):
         self.sensor_service.dispatch('not-in-database-ref', {})
         self.assertEqual(self._dispatched_count, 0)
 
+    @mock.patch('st2common.services.triggers.get_trigger_type_db',
+                mock.MagicMock(return_value=TriggerTypeDBMock(TEST_SCHEMA)))
+    def test_dispatch_many_invalid_payloads_are_skipped(self):
+        cfg.CONF.system.validate_trigger_payload = True
+
+        dispatch_many = self.sensor_service._trigger_dispatcher_service._dispatcher.dispatch_many
+        payloads = [{'name': 'John Doe'}, {'name': 1}, {'name': 'Jane Doe', 'age': 25}]
+
+        result = self.sensor_service.dispatch_many('trigger-name', payloads)
+        self.assertEqual(result, 2)
+
+        # Valid payloads are dispatched using a single call
+        dispatch_many.assert_called_once_with('trigger-name',
+                                              payloads=[payloads[0], payloads[2]],
+                                              trace_context=None)
+        self.assertEqual(self._dispatched_count, 0)
+
+        # Nothing is dispatched if there are no valid payloads
+        dispatch_many.reset_mock()
+        self.assertEqual(self.sensor_service.dispatch_many('trigger-name', [{'age': 1}]), 0)
+        self.assertFalse(dispatch_many.called)
+
     def test_datastore_methods(self):
         self.sensor_service._datastore_service = mock.Mock()
 
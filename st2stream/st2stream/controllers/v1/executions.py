@@ -104,7 +104,10 @@ class ActionExecutionOutputStreamController(ResourceController):
             # Wait for and return any new line which may come in
             execution_ids = [execution_id]
             listener = get_listener(name='execution_output')  # pylint: disable=no-member
-            gen = listener.generator(execution_ids=execution_ids)
+
+            # Output lines can't be dropped so the client buffer is not bounded. Number of events
+            # is limited by the output of a single execution.
+            gen = listener.generator(execution_ids=execution_ids, queue_size=0)
 
             def format(gen):
                 for pack in gen:
@@ -53,7 +53,8 @@ def format(gen):
 
 
 class StreamController(object):
-    def get_all(self, events=None, action_refs=None, execution_ids=None, requester_user=None):
+    def get_all(self, events=None, action_refs=None, execution_ids=None, resume_token=None,
+                requester_user=None):
         events = events if events else DEFAULT_EVENTS_WHITELIST
         action_refs = action_refs if action_refs else None
         execution_ids = execution_ids if execution_ids else None
@@ -61,7 +62,8 @@ class StreamController(object):
         def make_response():
             listener = get_listener(name='stream')
             app_iter = format(listener.generator(events=events, action_refs=action_refs,
-                                                 execution_ids=execution_ids))
+                                                 execution_ids=execution_ids,
+                                                 resume_token=resume_token))
             res = Response(content_type='text/event-stream', app_iter=app_iter)
             return res
 
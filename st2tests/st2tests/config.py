@@ -58,6 +58,7 @@ def _override_config_opts(coordinator_noop=False):
     _override_api_opts()
     _override_keyvalue_opts()
     _override_scheduler_opts()
+    _override_resource_cache_opts()
     _override_workflow_engine_opts()
     _override_coordinator_opts(noop=coordinator_noop)
 
@@ -72,6 +73,8 @@ def _register_config_opts():
     _register_scheduler_opts()
     _register_exporter_opts()
     _register_sensor_container_opts()
+    _register_rules_engine_opts()
+    _register_notifier_opts()
     _register_garbage_collector_opts()
 
 
@@ -91,6 +94,7 @@ def _override_common_opts():
     CONF.set_override(name='jitter_interval', override=0, group='mistral')
     CONF.set_override(name='query_interval', override=0.1, group='resultstracker')
     CONF.set_override(name='stream_output', override=False, group='actionrunner')
+    CONF.set_override(name='stream_output_flush_interval', override=0, group='actionrunner')
 
 
 def _override_api_opts():
@@ -110,6 +114,18 @@ def _override_keyvalue_opts():
 def _override_scheduler_opts():
     CONF.set_override(name='sleep_interval', group='scheduler', override=0.01)
 
+    # Tests mock out liveaction status publishing so the counters are only enabled by the tests
+    # which exercise them
+    CONF.set_override(name='enable_execution_counters', group='scheduler', override=False)
+
+
+def _override_resource_cache_opts():
+    # Tests re-create resources with the same references and often mock out the CUD publishers so
+    # the process wide resource cache is only enabled by the tests which exercise it
+    CONF.set_override(name='enable_resource_cache', override=False, group='actionrunner')
+    CONF.set_override(name='enable_resource_cache', override=False, group='rulesengine')
+    CONF.set_override(name='enable_resource_cache', override=False, group='scheduler')
+
 
 def _override_coordinator_opts(noop=False):
     driver = None if noop else 'zake://'
@@ -297,7 +313,34 @@ def _register_scheduler_opts():
             help='The maximum number of attempts that the scheduler retries on error.'),
         cfg.IntOpt(
             'retry_wait_msec', default=100,
-            help='The number of milliseconds to wait in between retries.')
+            help='The number of milliseconds to wait in between retries.'),
+        cfg.BoolOpt(
+            'enable_queue_notifications', default=True,
+            help='True to wake up the scheduler as soon as this scheduler process adds an item to '
+                 'the scheduling queue (or a delayed item becomes ready) instead of polling the '
+                 'queue every sleep_interval. Queue is still polled every fallback_poll_interval '
+                 'to pick up items added by other scheduler processes.'),
+        cfg.FloatOpt(
+            'fallback_poll_interval', default=0.01,
+            help='How often (in seconds) to poll the scheduling queue when queue notifications '
+                 'are enabled.'),
+        cfg.IntOpt(
+            'claim_batch_size', default=1,
+            help='Maximum number of scheduling queue items which are claimed at once (capped at '
+                 'the number of free threads in the pool). Values larger than 1 enable batch '
+                 'claim mode in which the scheduler doesn\'t sleep between claims while the '
+                 'queue is not drained.'),
+        cfg.BoolOpt(
+            'enable_execution_counters', default=False,
+            help='True to use in-memory counters of scheduled and running executions (kept up to '
+                 'date using liveaction status events and reconciled with the database every '
+                 'gc_interval) in concurrency policies instead of querying the database for each '
+                 'execution. Only safe to enable when a single scheduler process is running, '
+                 'otherwise concurrency policy thresholds can be exceeded.'),
+        cfg.BoolOpt(
+            'enable_resource_cache', default=True,
+            help='True to cache actions and policies in memory (cache is invalidated using '
+                 'resource CUD events).')
     ]
 
     _register_opts(scheduler_opts, group='scheduler')
@@ -354,6 +397,78 @@ def _register_sensor_container_opts():
     _register_cli_opts(cli_opts)
 
 
+def _register_rules_engine_opts():
+    rule_index_opts = [
+        cfg.BoolOpt(
+            'enable_rule_index', default=True,
+            help='True to keep an in-memory index of enabled rules per trigger (kept up to date '
+                 'using rule CUD events) and only evaluate rules selected by the index for each '
+                 'trigger instance.')
+    ]
+
+    _register_opts(rule_index_opts, group='rulesengine')
+
+    resource_cache_opts = [
+        cfg.BoolOpt(
+            'enable_resource_cache', default=True,
+            help='True to cache triggers, actions and runner types in memory (cache is '
+                 'invalidated using resource CUD events).')
+    ]
+
+    _register_opts(resource_cache_opts, group='rulesengine')
+
+    enforcement_opts = [
+        cfg.BoolOpt(
+            'enable_batch_enforcement', default=True,
+            help='True to enforce all the rules which matched a trigger instance as a single '
+                 'batch (single trace update and bulk inserts of executions and enforcements).'),
+        cfg.IntOpt(
+            'enforcement_pool_size', default=10,
+            help='Maximum number of rules of a batch for which parameters are rendered '
+                 'concurrently.')
+    ]
+
+    _register_opts(enforcement_opts, group='rulesengine')
+
+    consumer_opts = [
+        cfg.IntOpt(
+            'prefetch_count', default=1,
+            help='Maximum number of unacknowledged messages the rules engine consumer can receive. '
+                 'Values larger than 1 enable batched acknowledgements and stop receiving new '
+                 'messages while there are no free dispatcher threads.'),
+        cfg.IntOpt(
+            'ack_batch_size', default=1,
+            help='Maximum number of messages which are acknowledged using a single ack (capped '
+                 'at prefetch_count).'),
+        cfg.FloatOpt(
+            'ack_batch_interval', default=0.5,
+            help='How long (in seconds) to wait before acknowledging a partially filled batch '
+                 'of messages.')
+    ]
+
+    _register_opts(consumer_opts, group='rulesengine')
+
+
+def _register_notifier_opts():
+    consumer_opts = [
+        cfg.IntOpt(
+            'prefetch_count', default=1,
+            help='Maximum number of unacknowledged messages the notifier consumer can receive. '
+                 'Values larger than 1 enable batched acknowledgements and stop receiving new '
+                 'messages while there are no free dispatcher threads.'),
+        cfg.IntOpt(
+            'ack_batch_size', default=1,
+            help='Maximum number of messages which are acknowledged using a single ack (capped '
+                 'at prefetch_count).'),
+        cfg.FloatOpt(
+            'ack_batch_interval', default=0.5,
+            help='How long (in seconds) to wait before acknowledging a partially filled batch '
+                 'of messages.')
+    ]
+
+    _register_opts(consumer_opts, group='notifier')
+
+
 def _register_garbage_collector_opts():
     common_opts = [
         cfg.IntOpt(
@@ -367,21 +482,7 @@ def _register_garbage_collector_opts():
 
     _register_opts(common_opts, group='garbagecollector')
 
-    ttl_opts = [
-        cfg.IntOpt(
-            'action_executions_ttl', default=None,
-            help='Action executions and related objects (live actions, action output '
-                 'objects) older than this value (days) will be automatically deleted.'),
-        cfg.IntOpt(
-            'action_executions_output_ttl', default=7,
-            help='Action execution output objects (ones generated by action output '
-                 'streaming) older than this value (days) will be automatically deleted.'),
-        cfg.IntOpt(
-            'trigger_instances_ttl', default=None,
-            help='Trigger instances older than this value (days) will be automatically deleted.')
-    ]
-
-    _register_opts(ttl_opts, group='garbagecollector')
+    # Note: TTL options are registered in st2common.config
 
     inquiry_opts = [
         cfg.BoolOpt(
@@ -392,6 +493,23 @@ def _register_garbage_collector_opts():
 
     _register_opts(inquiry_opts, group='garbagecollector')
 
+    batch_opts = [
+        cfg.IntOpt(
+            'purge_batch_size', default=0,
+            help='If set to a value larger than 0, objects are purged in batches of this size '
+                 'ordered by id instead of using a single query per object type.'),
+        cfg.IntOpt(
+            'purge_max_docs_per_second', default=0,
+            help='Maximum number of objects purged per second when purging in batches. 0 '
+                 'means no limit.'),
+        cfg.StrOpt(
+            'purge_checkpoint_path', default=None,
+            help='Path to the file where id of the last purged object is stored when purging in '
+                 'batches so an interrupted purge can be resumed.')
+    ]
+
+    _register_opts(batch_opts, group='garbagecollector')
+
 
 def _register_opts(opts, group=None):
     CONF.register_opts(opts, group)
@@ -84,3 +84,15 @@ class MockSensorService(SensorService):
         }
         self.dispatched_triggers.append(item)
         return item
+
+    def dispatch_many(self, trigger, payloads, trace_tag=None):
+        trace_context = TraceContext(trace_tag=trace_tag) if trace_tag else None
+        return self.dispatch_many_with_context(trigger=trigger, payloads=payloads,
+                                               trace_context=trace_context)
+
+    def dispatch_many_with_context(self, trigger, payloads, trace_context=None):
+        for payload in payloads:
+            self.dispatch_with_context(trigger=trigger, payload=payload,
+                                       trace_context=trace_context)
+
+        return len(payloads)